@@ -26,6 +26,17 @@ EXPORT_PATH = os.getenv("EXPORT_PATH", "./export")
 MAX_DEBUG_LOG_FILE_COUNT = int(os.getenv("MAX_DEBUG_LOG_FILE_COUNT", "10"))
 MAX_EXCEL_LOG_FILE_COUNT = int(os.getenv("MAX_EXCEL_LOG_FILE_COUNT", "10"))
 
+# Schreibpuffer der Debug-Log-Datei in Bytes; die Einträge werden von einem Hintergrund-Thread geschrieben.
+# 0 = jeden Eintrag sofort im aufrufenden Thread schreiben (ohne Hintergrund-Thread)
+LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", "65536"))
+
+# Maximale Größe der Debug-Log-Datei in MB; danach wird sie als komprimierter Teil (..._001.txt.gz) abgelegt (0 = unbegrenzt)
+LOG_MAX_FILE_SIZE_MB = int(os.getenv("LOG_MAX_FILE_SIZE_MB", "100"))
+# Maximale Anzahl komprimierter Teile je Debug-Log-Datei; ältere Teile werden gelöscht (0 = unbegrenzt)
+LOG_MAX_ROTATED_FILES = int(os.getenv("LOG_MAX_ROTATED_FILES", "20"))
+# Stichprobe: DEBUG/TRACE-Einträge nur für jede N-te MSG-Datei und für MSG-Dateien mit Warnungen oder Fehlern (1 = alle Dateien)
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "1"))
+
 # Konsolen-Logging zusätzlich aktivieren
 LOG_TO_CONSOLE = os.getenv("LOG_TO_CONSOLE", "false").lower() == "true"
 
@@ -42,4 +53,59 @@ TARGET_DIRECTORY_TEST_DATA = os.getenv("TARGET_DIRECTORY_TEST_DATA", "./tests/fu
 TARGET_DIRECTORY = os.getenv("TARGET_DIRECTORY", "./tests/functional/testdir")
 
 # Maximale Länge des Dateipfades (Windows-Limitierung)
-MAX_PATH_LENGTH = int(os.getenv("MAX_PATH_LENGTH", "255"))
\ No newline at end of file
+MAX_PATH_LENGTH = int(os.getenv("MAX_PATH_LENGTH", "255"))
+
+# Zurückgestellte Wiederholungen für gesperrte Dateien (z.B. durch Outlook oder Virenscanner)
+RETRY_DEADLINE_SECONDS = float(os.getenv("RETRY_DEADLINE_SECONDS", "60"))
+RETRY_INITIAL_DELAY_MS = int(os.getenv("RETRY_INITIAL_DELAY_MS", "200"))
+RETRY_MAX_DELAY_MS = int(os.getenv("RETRY_MAX_DELAY_MS", "10000"))
+
+# Parallele Verzeichnissuche (z.B. für Netzlaufwerke); 0 oder 1 = sequentielle Suche
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "0"))
+
+# Prozess-Pool für Einlesen der MSG-Dateien und Dateinamens-Erzeugung (--workers); 0 = im Hauptprozess
+WORKERS = int(os.getenv("WORKERS", "0"))
+WORKER_CHUNK_SIZE = int(os.getenv("WORKER_CHUNK_SIZE", "8"))
+
+# Thread-Pool für Umbenennen, Löschen und Zeitstempel (--apply_workers); 0 oder 1 = nacheinander
+APPLY_WORKERS = int(os.getenv("APPLY_WORKERS", "0"))
+
+# Maximale Anzahl gleichzeitig bearbeiteter MSG-Dateien in der Verarbeitungskette (--pipeline_queue_size)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+
+# Eigener Prozess-Pool für die PDF-Erzeugung mit --generate_pdf (--pdf_workers); 0 = in der Verarbeitungskette
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0"))
+
+# Sammel-PDF-Dateien je Verzeichnis oder Versandmonat statt einer PDF-Datei je MSG-Datei (--pdf_consolidate: none, directory, month)
+PDF_CONSOLIDATE = os.getenv("PDF_CONSOLIDATE", "none")
+PDF_CONSOLIDATE_MAX_MESSAGES = int(os.getenv("PDF_CONSOLIDATE_MAX_MESSAGES", "500"))
+
+# Maximale Anzahl zitierter älterer E-Mails (Antwortkette) im PDF-Ausdruck (--pdf_max_quoted_emails); -1 = alle ausgeben
+PDF_MAX_QUOTED_EMAILS = int(os.getenv("PDF_MAX_QUOTED_EMAILS", "-1"))
+
+# Mindestabstand in Sekunden zwischen zwei Aktualisierungen der Fortschrittsanzeige auf der Konsole (ohne --verbose_console_output)
+CONSOLE_PROGRESS_INTERVAL_SECONDS = float(os.getenv("CONSOLE_PROGRESS_INTERVAL_SECONDS", "0.25"))
+
+# Anzahl der langsamsten MSG-Dateien im Sheet "Performance" der Excel-Log-Datei (--performance_timing)
+PERFORMANCE_TOP_FILES = int(os.getenv("PERFORMANCE_TOP_FILES", "20"))
+
+# Profiling der Verarbeitung (--profile): nur die ersten N MSG-Dateien (0 = ganzer Lauf) und Anzahl der Funktionen in der Textdatei
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "0"))
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "40"))
+
+# Micro-Benchmarks (msg_benchmark.py): Datei der Baseline und zulässige Verschlechterung gegenüber der Baseline in Prozent
+BENCHMARK_BASELINE_FILE = os.getenv("BENCHMARK_BASELINE_FILE", "./benchmarks/benchmark_baseline.json")
+BENCHMARK_THRESHOLD_PERCENT = float(os.getenv("BENCHMARK_THRESHOLD_PERCENT", "25"))
+
+# Überwachung neuer MSG-Dateien (--watch)
+WATCH_DEBOUNCE_SECONDS = float(os.getenv("WATCH_DEBOUNCE_SECONDS", "2"))
+WATCH_POLL_INTERVAL_SECONDS = float(os.getenv("WATCH_POLL_INTERVAL_SECONDS", "5"))
+WATCH_LOG_MAX_ENTRIES = int(os.getenv("WATCH_LOG_MAX_ENTRIES", "1000"))
+
+# Persistenter Verzeichnis-Index für inkrementelle Läufe (--incremental)
+DIRECTORY_INDEX_FILE = os.getenv("DIRECTORY_INDEX_FILE", "./msg_directory_index.sqlite")
+INDEX_FULL_SWEEP_DAYS = float(os.getenv("INDEX_FULL_SWEEP_DAYS", "7"))
+
+# Kooperativer Betrieb mehrerer Aufrufe über Lease-Dateien (--cooperative)
+LEASE_TIMEOUT_SECONDS = float(os.getenv("LEASE_TIMEOUT_SECONDS", "120"))
+LEASE_HEARTBEAT_SECONDS = float(os.getenv("LEASE_HEARTBEAT_SECONDS", "15"))
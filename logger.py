@@ -1,7 +1,53 @@
+"""
+logger.py
+
+Zentrales Logging in die Debug-Log-Datei für alle Module (initialize_logger).
+
+Hintergrund-Schreiber:
+Alle Logger übergeben ihre Einträge über einen gemeinsamen QueueHandler an eine Warteschlange. Ein QueueListener
+schreibt sie in einem Hintergrund-Thread über einen gepufferten FileHandler in die Datei; geleert wird der Puffer, wenn
+er voll ist oder keine weiteren Einträge warten, sowie am Programmende. Der aufrufende Thread wartet damit nicht auf
+das Dateisystem. Ist ein Level abgeschaltet (DEBUG_LEVEL), kostet ein Aufruf im %-Stil nur die Level-Prüfung:
+    app_logger.debug("Neuer Dateiname: '%s'", new_file_name)
+Aufwendige Argumente zusätzlich mit app_logger.isEnabledFor(logging.DEBUG) absichern.
+
+Mit LOG_BUFFER_SIZE=0 wird jeder Eintrag wie bisher sofort im aufrufenden Thread geschrieben.
+Argumente, die sich bis zum Schreiben ändern könnten (z.B. Listen), werden bereits im aufrufenden Thread eingesetzt.
+
+Kindprozesse (Prozess-Pools):
+Nur der Hauptprozess schreibt in die Debug-Log-Datei. Kindprozesse übergeben ihre Einträge fertig formatiert über eine
+multiprocessing-Warteschlange, die ein weiterer Hintergrund-Thread des Hauptprozesses in dieselbe Datei schreibt. Die
+Prozess-Pools richten das über ihren Initializer ein:
+    ProcessPoolExecutor(max_workers, initializer=initialize_child_process_logging, initargs=(child_process_log_queue(),))
+Einträge vor dem Initializer (z.B. beim Import der Module) werden im Kindprozess zurückgehalten und danach übergeben.
+Der Pfad der Debug-Log-Datei wird über die Umgebung (DEBUG_LOG_FILE_PATH) weitergegeben (spawn).
+
+Größenbegrenzung:
+Erreicht die Debug-Log-Datei LOG_MAX_FILE_SIZE_MB (in Bytes der Datei), wird sie als Teil "<Name>_001.txt" abgelegt und
+neu begonnen; ein Hintergrund-Thread komprimiert den Teil zu "<Name>_001.txt.gz". Je Lauf bleiben höchstens
+LOG_MAX_ROTATED_FILES Teile erhalten.
+
+Stichprobe (LOG_SAMPLE_EVERY bzw. --debug_log_sample):
+Mit log_file_context(path) bzw. set_log_file_context(path) werden die Einträge eines Threads einer MSG-Datei zugeordnet.
+DEBUG/TRACE-Einträge werden dann nur für jede N-te MSG-Datei geschrieben (Auswahl über eine Prüfsumme des Pfades, in allen
+Threads und Prozessen gleich). Für die übrigen Dateien werden sie zurückgehalten und nur geschrieben, wenn für die Datei
+eine Warnung oder ein Fehler protokolliert wird. INFO-Einträge und Einträge ohne Dateizuordnung werden immer geschrieben.
+"""
+import atexit
+import contextlib
+import gzip
 import logging
+import logging.handlers
+import multiprocessing
 import os
+import queue
+import re
+import shutil
+import threading
+import zlib
 from datetime import datetime
-from config import LOG_FILE_DIRECTORY, DEBUG_LEVEL, LOG_TO_CONSOLE, MAX_DEBUG_LOG_FILE_COUNT
+from config import LOG_FILE_DIRECTORY, DEBUG_LEVEL, LOG_TO_CONSOLE, MAX_DEBUG_LOG_FILE_COUNT, LOG_BUFFER_SIZE, LOG_MAX_FILE_SIZE_MB, \
+    LOG_MAX_ROTATED_FILES, LOG_SAMPLE_EVERY
 
 # DEBUG_LEVEL_TEXT hinzufügen
 DEBUG_LEVEL_TEXT = {0: "ERROR", 1: "WARNING", 2: "INFO", 3: "DEBUG", 4: "TRACE"}
@@ -19,32 +65,456 @@ current_time = datetime.now()
 debug_log_file_name = current_time.strftime("debug_log_file_%Y-%m-%d_%HUhr%M_%Ss.txt")
 prog_log_file_path = os.path.join(log_dir, debug_log_file_name)
 
+# Kindprozesse (spawn) importieren dieses Modul neu: Sie übernehmen den Pfad der Debug-Log-Datei des Hauptprozesses über die
+# Umgebung, statt einen eigenen Lauf anzulegen; geschrieben wird die Datei nur vom Hauptprozess.
+_LOG_FILE_PATH_ENVIRONMENT_VARIABLE = "DEBUG_LOG_FILE_PATH"
+_is_child_process = multiprocessing.current_process().name != "MainProcess"
+if _is_child_process and os.environ.get(_LOG_FILE_PATH_ENVIRONMENT_VARIABLE):
+    prog_log_file_path = os.environ[_LOG_FILE_PATH_ENVIRONMENT_VARIABLE]
+    debug_log_file_name = os.path.basename(prog_log_file_path)
+else:
+    os.environ[_LOG_FILE_PATH_ENVIRONMENT_VARIABLE] = prog_log_file_path
+
+# Gemeinsamer Schreiber für alle Logger: QueueHandler -> Warteschlange -> QueueListener (Thread) -> gepufferter FileHandler
+_file_handler = None
+_queue_handler = None
+_queue_listener = None
+
+# Einträge der Kindprozesse: multiprocessing-Warteschlange und Hintergrund-Thread des Hauptprozesses
+_child_process_log_queue = None
+_child_process_log_listener = None
+
+# Maximale Anzahl zurückgehaltener Einträge eines Kindprozesses vor dem Initializer
+_CHILD_PROCESS_MAX_PENDING_RECORDS = 1000
+
+# Debug-Log-Dateien eines Laufs: "debug_log_file_<Zeitstempel>.txt" und die komprimierten Teile "..._<n>.txt.gz"
+_DEBUG_LOG_FILE_PATTERN = re.compile(r"^(debug_log_file_.+?)(?:_\d{3,})?\.txt(?:\.gz)?$")
+
+# Stichprobe: jede N-te MSG-Datei mit DEBUG/TRACE-Einträgen; zugeordnete MSG-Datei je Thread
+_log_sample_every = max(1, LOG_SAMPLE_EVERY)
+_log_sample_state = threading.local()
+
+# Maximale Anzahl zurückgehaltener Einträge je MSG-Datei (begrenzter Speicherbedarf)
+_LOG_SAMPLE_MAX_RECORDS = 1000
+
+# Argumente dieser Typen ändern sich nicht bis zum Schreiben; alle anderen werden im aufrufenden Thread eingesetzt
+_IMMUTABLE_LOG_ARGUMENT_TYPES = (str, int, float, bytes, type(None))
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler mit Schreibpuffer: Einträge werden nicht einzeln geleert, sondern erst bei vollem Puffer oder über
+    flush() (durch den Hintergrund-Schreiber, wenn keine weiteren Einträge warten, und am Programmende).
+    Mit buffer_size=0 wird jeder Eintrag sofort geleert.
+
+    Mit max_bytes > 0 wird die Datei bei Erreichen der Größe (in Bytes der Datei, d.h. nach Kodierung und Zeilenende)
+    als Teil "<Name>_<n>.txt" abgelegt und neu begonnen; ein Hintergrund-Thread komprimiert den Teil zu "<Name>_<n>.txt.gz".
+    Lässt sich die Datei nicht umbenennen (unter Windows, solange ein anderes Programm sie geöffnet hat), wird ihr Inhalt
+    kopiert und die Datei geleert. max_rotated_files begrenzt die Anzahl der Teile.
+    """
+
+    def __init__(self, filename: str, buffer_size: int, max_bytes: int = 0, max_rotated_files: int = 0, mode: str = "a", encoding: str = "utf-8"):
+        self.buffer_size = buffer_size
+        self.max_bytes = max_bytes
+        self.max_rotated_files = max_rotated_files
+        self._written_bytes = 0
+        self._rotation_threshold = max_bytes  # Nach einer fehlgeschlagenen Ablage höher, damit nicht jeder Eintrag sie erneut versucht
+        self._rotated_count = 0
+        self._compression_thread = None
+        super().__init__(filename, mode=mode, encoding=encoding)
+
+    def _open(self):
+        try:
+            self._written_bytes = os.path.getsize(self.baseFilename)
+        except OSError:
+            self._written_bytes = 0
+        if self.buffer_size > 0:
+            return open(self.baseFilename, self.mode, encoding=self.encoding, buffering=self.buffer_size)
+        return super()._open()
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            text = self.format(record) + self.terminator
+            self.stream.write(text)
+            if self.buffer_size <= 0:
+                self.stream.flush()
+            self._written_bytes += self._encoded_length(text)
+            if self.max_bytes > 0 and self._written_bytes >= self._rotation_threshold:
+                self._rotate()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _encoded_length(self, text: str) -> int:
+        """
+        Länge des Eintrags in der Datei in Bytes (Kodierung; unter Windows wird jedes Zeilenende als CR LF geschrieben).
+        """
+        encoded_length = len(text) if text.isascii() else len(text.encode(self.encoding or "utf-8"))
+        if os.linesep != "\n":
+            encoded_length += text.count("\n") * (len(os.linesep) - 1)
+        return encoded_length
+
+    def _rotate(self):
+        """
+        Legt die aktuelle Datei als Teil ab und startet die Komprimierung; der nächste Eintrag beginnt eine neue Datei.
+        """
+        self.stream.close()
+        self.stream = None
+        segment_path = self._segment_path(self._rotated_count + 1)
+        try:
+            os.replace(self.baseFilename, segment_path)
+        except OSError:
+            # z.B. unter Windows, solange ein anderes Programm die Datei geöffnet hat: Inhalt kopieren und Datei leeren
+            try:
+                shutil.copyfile(self.baseFilename, segment_path)
+                with open(self.baseFilename, "w", encoding=self.encoding):
+                    pass
+            except OSError:
+                with contextlib.suppress(OSError):
+                    os.remove(segment_path)
+                # Weiterschreiben und nach einem weiteren Zehntel der Größe erneut versuchen
+                self._rotation_threshold = self._written_bytes + max(1, self.max_bytes // 10)
+                return
+        self._rotation_threshold = self.max_bytes
+        self._rotated_count += 1
+
+        # Höchstens eine Komprimierung gleichzeitig: Eine noch laufende wird zuerst abgewartet
+        if self._compression_thread is not None:
+            self._compression_thread.join()
+        self._compression_thread = threading.Thread(target=self._compress_segment, args=(segment_path, self._rotated_count),
+                                                    name="LogCompression")
+        self._compression_thread.start()
+
+    def _compress_segment(self, segment_path: str, rotated_count: int):
+        """
+        Komprimiert einen abgelegten Teil (Hintergrund-Thread) und entfernt den ältesten, wenn die Anzahl überschritten ist.
+        Schlägt die Komprimierung fehl, bleibt der Teil unkomprimiert erhalten.
+        """
+        try:
+            with open(segment_path, "rb") as segment_file, gzip.open(segment_path + ".gz", "wb") as compressed_file:
+                shutil.copyfileobj(segment_file, compressed_file)
+            os.remove(segment_path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(segment_path + ".gz")
+
+        # Ältesten Teil entfernen, wenn die maximale Anzahl überschritten ist
+        if 0 < self.max_rotated_files < rotated_count:
+            oldest_segment_path = self._segment_path(rotated_count - self.max_rotated_files)
+            for oldest_path in (oldest_segment_path + ".gz", oldest_segment_path):
+                with contextlib.suppress(OSError):
+                    os.remove(oldest_path)
+
+    def _segment_path(self, segment_number: int) -> str:
+        root, extension = os.path.splitext(self.baseFilename)
+        return f"{root}_{segment_number:03d}{extension}"
+
+    def close(self):
+        super().close()
+        # Laufende Komprimierung abwarten (Programmende)
+        compression_thread = self._compression_thread
+        if compression_thread is not None and compression_thread is not threading.current_thread():
+            compression_thread.join()
+
+
+class _LogWriterListener(logging.handlers.QueueListener):
+    """
+    QueueListener, der den Puffer der Handler leert, sobald keine weiteren Einträge warten.
+    """
+
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block)
+
+
+class _LogFileSample:
+    """
+    Zugeordnete MSG-Datei eines Threads mit den zurückgehaltenen DEBUG/TRACE-Einträgen (Stichprobe).
+    """
+    __slots__ = ("path_and_file_name", "is_full", "held_records")
+
+    def __init__(self, path_and_file_name: str, is_full: bool):
+        self.path_and_file_name = path_and_file_name
+        self.is_full = is_full
+        self.held_records = []
+
+
+class _BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler für eine Warteschlange im selben Prozess: Die Einträge werden erst im Hintergrund-Thread formatiert
+    (Zeitstempel, Traceback; Meldung mit unveränderlichen %-Argumenten wie Text und Zahlen). Veränderliche Argumente
+    (z.B. Listen, Dictionaries, Objekte) werden sofort eingesetzt, damit der geschriebene Eintrag ihren Stand beim
+    Aufruf zeigt. Bei aktiver Stichprobe werden DEBUG/TRACE-Einträge nicht ausgewählter MSG-Dateien zurückgehalten.
+    In Kindprozessen werden Meldung und Traceback vollständig eingesetzt, damit der Eintrag übertragen werden kann.
+    """
+
+    def prepare(self, record):
+        if _is_child_process:
+            return super().prepare(record)
+        if record.args:
+            log_arguments = record.args if isinstance(record.args, tuple) else (record.args,)
+            if not all(isinstance(log_argument, _IMMUTABLE_LOG_ARGUMENT_TYPES) for log_argument in log_arguments):
+                record.msg = record.getMessage()
+                record.args = None
+        return record
+
+    def emit(self, record):
+        try:
+            record = self.prepare(record)
+        except Exception:
+            self.handleError(record)
+            return
+        log_file_sample = getattr(_log_sample_state, "sample", None)
+        if log_file_sample is not None and not log_file_sample.is_full:
+            if record.levelno < logging.INFO:
+                if len(log_file_sample.held_records) < _LOG_SAMPLE_MAX_RECORDS:
+                    log_file_sample.held_records.append(record)
+                return
+            if record.levelno >= logging.WARNING:
+                # Warnung oder Fehler: zurückgehaltene Einträge der MSG-Datei nachträglich schreiben, danach alle Einträge
+                log_file_sample.is_full = True
+                for held_record in log_file_sample.held_records:
+                    super().emit(held_record)
+                log_file_sample.held_records = []
+        super().emit(record)
+
+
+class _DirectLogWriter:
+    """
+    Ersatz für die Warteschlange ohne Hintergrund-Thread: schreibt jeden Eintrag sofort (LOG_BUFFER_SIZE=0).
+    """
+
+    def __init__(self, handler: logging.Handler):
+        self.handler = handler
+
+    def put_nowait(self, record):
+        self.handler.handle(record)
+        self.handler.flush()
+
+
+class _PendingChildProcessLog:
+    """
+    Ersatz für die Warteschlange eines Kindprozesses bis zum Initializer: hält die Einträge zurück (höchstens
+    _CHILD_PROCESS_MAX_PENDING_RECORDS); initialize_child_process_logging übergibt sie danach an den Hauptprozess.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def put_nowait(self, record):
+        if len(self.records) < _CHILD_PROCESS_MAX_PENDING_RECORDS:
+            self.records.append(record)
+
+
+def _start_log_writer(log_level: int):
+    """
+    Richtet beim ersten Aufruf den gemeinsamen Schreiber ein: gepufferter FileHandler und Hintergrund-Thread.
+    """
+    global _file_handler, _queue_handler, _queue_listener
+    if _queue_handler is not None:
+        return
+
+    # Kindprozesse (spawn) öffnen die Datei nicht: Ihre Einträge schreibt der Hauptprozess (initialize_child_process_logging)
+    if _is_child_process:
+        _queue_handler = _BackgroundQueueHandler(_PendingChildProcessLog())
+        _queue_handler.setLevel(log_level)
+        return
+
+    # Richte den FileHandler ein, um Log-Einträge in eine Datei zu schreiben (mit Größenbegrenzung).
+    _file_handler = BufferedFileHandler(prog_log_file_path, LOG_BUFFER_SIZE, max_bytes=LOG_MAX_FILE_SIZE_MB * 1024 * 1024,
+                                        max_rotated_files=LOG_MAX_ROTATED_FILES)
+    _file_handler.setLevel(log_level) # Derselbe Level, wie im Logger konfiguriert.
+
+    # Formatierungsregeln für das Log: inklusive Zeitstempel, Modulname und Zeilennummer.
+    datefmt = "%Y-%m-%d %H:%M:%S"  # Ohne Millisekunden!
+    # MillisecondFormatter ergänzt Zeitstempel um Millisekunden
+    formatter = MillisecondFormatter(
+        fmt="[%(asctime)s] [%(levelname)s] [%(name)s:%(lineno)d] %(message)s",
+        datefmt=datefmt
+    )
+    _file_handler.setFormatter(formatter) # Füge den benutzerdefinierten Formatter hinzu.
+
+    if LOG_BUFFER_SIZE > 0:
+        _queue_handler = _BackgroundQueueHandler(queue.SimpleQueue())
+        _queue_listener = _LogWriterListener(_queue_handler.queue, _file_handler, respect_handler_level=True)
+        _queue_listener.start()
+        atexit.register(_stop_log_writer)
+    else:
+        _queue_handler = _BackgroundQueueHandler(_DirectLogWriter(_file_handler))
+    _queue_handler.setLevel(log_level)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent, after_in_child=_after_fork_in_child)
+
+
+def _stop_log_writer():
+    """
+    Schreibt alle wartenden Einträge, beendet den Hintergrund-Thread und schließt die Datei (Programmende).
+    """
+    global _queue_listener, _child_process_log_listener
+    if _child_process_log_listener is not None:
+        _child_process_log_listener.stop()
+        _child_process_log_listener = None
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+    if _file_handler is not None:
+        _file_handler.close()
+
+
+def _before_fork():
+    # Puffer vor fork leeren und bis danach sperren, damit der Kindprozess keine Einträge des Elternprozesses erneut schreibt
+    if _file_handler is not None:
+        _file_handler.acquire()
+        _file_handler.flush()
+
+
+def _after_fork_in_parent():
+    if _file_handler is not None:
+        _file_handler.release()
+
+
+def _after_fork_in_child():
+    # Die Hintergrund-Threads existieren im Kindprozess nicht, noch wartende Einträge gehören dem Elternprozess.
+    # Der Kindprozess schreibt nicht in die Datei, sondern hält die Einträge bis zu initialize_child_process_logging zurück.
+    global _is_child_process, _file_handler, _queue_listener, _child_process_log_listener
+    _is_child_process = True
+    _file_handler = None
+    _queue_listener = None
+    _child_process_log_listener = None
+    if _queue_handler is not None:
+        _queue_handler.createLock()
+        _queue_handler.queue = _PendingChildProcessLog()
+
+
+def child_process_log_queue():
+    """
+    Liefert die Warteschlange für die Einträge der Kindprozesse und startet beim ersten Aufruf den Hintergrund-Thread,
+    der sie in die Debug-Log-Datei schreibt. Wird im Hauptprozess beim Anlegen eines Prozess-Pools aufgerufen.
+
+    :return: multiprocessing-Warteschlange für initialize_child_process_logging (None in Kindprozessen).
+    """
+    global _child_process_log_queue, _child_process_log_listener
+    if _is_child_process or _file_handler is None:
+        return None
+    if _child_process_log_listener is None:
+        if _child_process_log_queue is None:
+            _child_process_log_queue = multiprocessing.Queue()
+        _child_process_log_listener = _LogWriterListener(_child_process_log_queue, _file_handler, respect_handler_level=True)
+        _child_process_log_listener.start()
+    return _child_process_log_queue
+
+
+def initialize_child_process_logging(log_queue):
+    """
+    Initializer der Prozess-Pools: Die Einträge des Kindprozesses gehen über log_queue an den Hauptprozess, der sie in die
+    Debug-Log-Datei schreibt. Bis dahin zurückgehaltene Einträge (z.B. beim Import der Module) werden zuerst übergeben.
+
+    :param log_queue: Warteschlange aus child_process_log_queue() (None = Einträge verwerfen).
+    """
+    if not _is_child_process or _queue_handler is None:
+        return
+    pending_log = _queue_handler.queue
+    if log_queue is None:
+        _queue_handler.queue = _PendingChildProcessLog()
+        return
+    if isinstance(pending_log, _PendingChildProcessLog):
+        for pending_record in pending_log.records:
+            log_queue.put_nowait(pending_record)
+    _queue_handler.queue = log_queue
+
+
+def _new_log_file_sample(path_and_file_name: str) -> _LogFileSample:
+    return _LogFileSample(path_and_file_name, is_full=is_sampled_log_file(path_and_file_name))
+
+
+def is_sampled_log_file(path_and_file_name: str) -> bool:
+    """
+    Prüft, ob für die MSG-Datei alle DEBUG/TRACE-Einträge geschrieben werden (jede N-te Datei laut Prüfsumme des Pfades).
+
+    :param path_and_file_name: Absoluter Dateiname der MSG-Datei.
+    :return: True, wenn die Datei zur Stichprobe gehört (bei LOG_SAMPLE_EVERY=1 immer).
+    """
+    return _log_sample_every <= 1 or zlib.crc32(path_and_file_name.encode("utf-8", "surrogatepass")) % _log_sample_every == 0
+
+
+def set_log_sampling(sample_every: int):
+    """
+    Setzt die Stichprobe für DEBUG/TRACE-Einträge (--debug_log_sample). Der Wert wird über die Umgebung auch an später
+    gestartete Prozesse (spawn) weitergegeben.
+
+    :param sample_every: Volle Details für jede N-te MSG-Datei (1 = alle Dateien).
+    """
+    global _log_sample_every
+    _log_sample_every = max(1, sample_every)
+    os.environ["LOG_SAMPLE_EVERY"] = str(_log_sample_every)
+
+
+def set_log_file_context(path_and_file_name):
+    """
+    Ordnet die folgenden Log-Einträge des aktuellen Threads einer MSG-Datei zu (Stichprobe). Zurückgehaltene Einträge
+    der bisher zugeordneten Datei werden verworfen.
+
+    :param path_and_file_name: Absoluter Dateiname der MSG-Datei oder None, um die Zuordnung aufzuheben.
+    """
+    if path_and_file_name is None or _log_sample_every <= 1:
+        _log_sample_state.sample = None
+    else:
+        _log_sample_state.sample = _new_log_file_sample(path_and_file_name)
+
+
+@contextlib.contextmanager
+def log_file_context(path_and_file_name: str):
+    """
+    Ordnet die Log-Einträge des aktuellen Threads innerhalb des with-Blocks einer MSG-Datei zu (Stichprobe).
+    Danach gilt wieder die vorherige Zuordnung; geschachtelte Aufrufe für dieselbe Datei behalten die Zuordnung bei.
+
+    :param path_and_file_name: Absoluter Dateiname der MSG-Datei.
+    """
+    previous_sample = getattr(_log_sample_state, "sample", None)
+    if _log_sample_every <= 1 or (previous_sample is not None and previous_sample.path_and_file_name == path_and_file_name):
+        yield
+        return
+    _log_sample_state.sample = _new_log_file_sample(path_and_file_name)
+    try:
+        yield
+    finally:
+        _log_sample_state.sample = previous_sample
+
 
 def clean_old_log_files(directory: str, max_file_count: int):
     """
     Entfernt ältere Log-Dateien im Verzeichnis, wenn die maximale Anzahl überschritten ist.
-    Gibt die Anzahl der gelöschten Dateien zurück.
+    Gezählt werden Läufe: Die komprimierten Teile ("..._001.txt.gz") gehören zur Log-Datei ihres Laufs und werden mit ihr gelöscht.
+    Gibt die Anzahl der gelöschten Läufe zurück.
 
     :param directory: Verzeichnis mit den Log-Dateien.
-    :param max_file_count: Maximale Anzahl von Log-Dateien, die aufbewahrt werden.
-    :return: Anzahl der gelöschten Log-Dateien.
+    :param max_file_count: Maximale Anzahl von Log-Dateien (Läufen), die aufbewahrt werden.
+    :return: Anzahl der gelöschten Log-Dateien (Läufe).
     """
     try:
-        # Log-Dateien im Verzeichnis suchen
-        log_files = [
-            os.path.join(directory, f)
-            for f in os.listdir(directory)
-            if f.startswith("debug_log_file_") and f.endswith(".txt")
-        ]
-
-        # Log-Dateien nach Erstellungsdatum sortieren
-        log_files.sort(key=os.path.getmtime)
-
-        # Soviele Log-Dateien löschen, bis die maximale Anzahl wieder eingehalten wird
-        if len(log_files) > max_file_count:
-            files_to_delete = len(log_files) - max_file_count
+        # Log-Dateien im Verzeichnis suchen und nach Lauf gruppieren
+        log_files_by_run = {}
+        for f in os.listdir(directory):
+            match = _DEBUG_LOG_FILE_PATTERN.match(f)
+            if match:
+                log_files_by_run.setdefault(match.group(1), []).append(os.path.join(directory, f))
+
+        # Läufe nach dem Änderungsdatum der jüngsten Datei sortieren
+        log_runs = sorted(log_files_by_run.values(), key=lambda run_files: max(os.path.getmtime(f) for f in run_files))
+
+        # Soviele Läufe löschen, bis die maximale Anzahl wieder eingehalten wird
+        if len(log_runs) > max_file_count:
+            files_to_delete = len(log_runs) - max_file_count
             for i in range(files_to_delete):
-                os.remove(log_files[i])
+                for log_file in log_runs[i]:
+                    os.remove(log_file)
             return files_to_delete
 
     except Exception as e:
@@ -110,21 +580,9 @@ def initialize_logger(module_name: str):
         # Setze die globale Log-Level-Konfiguration für den Logger.
         logger.setLevel(log_level)
 
-        # Richte den FileHandler ein, um Log-Einträge in eine Datei zu schreiben.
-        file_handler = logging.FileHandler(prog_log_file_path, mode="a", encoding="utf-8")
-        file_handler.setLevel(log_level) # Derselbe Level, wie im Logger konfiguriert.
-
-        # Formatierungsregeln für das Log: inklusive Zeitstempel, Modulname und Zeilennummer.
-        datefmt = "%Y-%m-%d %H:%M:%S"  # Ohne Millisekunden!
-        # MillisecondFormatter ergänzt Zeitstempel um Millisekunden
-        formatter = MillisecondFormatter(
-            fmt="[%(asctime)s] [%(levelname)s] [%(name)s:%(lineno)d] %(message)s",
-            datefmt=datefmt
-        )
-        file_handler.setFormatter(formatter) # Füge den benutzerdefinierten Formatter hinzu.
-
-        # Füge den FileHandler dem Logger hinzu.
-        logger.addHandler(file_handler)
+        # Gemeinsamen Schreiber (Warteschlange und Hintergrund-Thread) beim ersten Logger einrichten und anhängen.
+        _start_log_writer(log_level)
+        logger.addHandler(_queue_handler)
 
     # Markiere die Logger-Initialisierung als abgeschlossen.
     #_is_logger_initialized = True
@@ -139,7 +597,8 @@ def clean_logs_and_initialize():
     """
     global _is_logger_initialized
 
-    if not _is_logger_initialized:
+    # Kindprozesse (spawn) importieren das Hauptprogramm neu; die Bereinigung führt nur der Hauptprozess aus
+    if not _is_logger_initialized and not _is_child_process:
         deleted_files_count = clean_old_log_files(log_dir, MAX_DEBUG_LOG_FILE_COUNT)
         app_logger = initialize_logger("__main__")  # Logger für das Hauptprogramm
         app_logger.info(f"{deleted_files_count} alte Debug-Log-Datei(en) wurde(n) gelöscht.")
@@ -161,11 +620,17 @@ class MillisecondFormatter(logging.Formatter):
 
 def flush_log(logger):
     """
-    Erzwingt das Leeren des Log-Buffers aller FileHandler eines angegebenen Loggers.
+    Erzwingt das Schreiben aller wartenden Einträge und das Leeren des Log-Buffers der Debug-Log-Datei.
 
     :param logger: Ein Logger-Objekt, dessen Buffer geleert werden soll.
     """
     for handler in logger.handlers:
+        if handler is _queue_handler and _queue_listener is not None:
+            # Hintergrund-Thread anhalten (schreibt alle wartenden Einträge) und neu starten
+            _queue_listener.stop()
+            _queue_listener.start()
         if isinstance(handler, logging.FileHandler):
             handler.flush()
+    if _file_handler is not None:
+        _file_handler.flush()
 
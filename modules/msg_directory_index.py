@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+msg_directory_index.py
+
+Dieses Modul speichert zwischen zwei Läufen einen Index der durchsuchten Verzeichnisse und bearbeiteten MSG-Dateien
+in einer SQLite-Datenbank. Damit kann msg_file_renamer.py mit --incremental nur noch geänderte Teilbäume listen und
+nur neue oder geänderte MSG-Dateien bearbeiten, z.B. bei nächtlichen Läufen über sehr große Verzeichnisbäume.
+
+Ablauf eines inkrementellen Laufs:
+- Jedes Verzeichnis wird nur per stat geprüft. Hat sich die Änderungszeit (mtime) seit dem letzten Lauf nicht
+  geändert, wird es nicht gelistet; seine Unterverzeichnisse werden aus dem Index übernommen und weiter geprüft.
+- Geänderte oder neue Verzeichnisse werden gelistet. Es werden nur MSG-Dateien geliefert, deren Größe oder
+  Änderungszeit nicht dem Index entspricht.
+- Der Aufrufer meldet bearbeitete Dateien über acknowledge() zurück. Der Stand eines Verzeichnisses wird erst
+  gespeichert, wenn der Aufrufer das nächste Verzeichnis anfordert, also nach der Bearbeitung. Wurde eine gelieferte
+  Datei nicht zurückgemeldet (gesperrt, fehlerhaft), wird das Verzeichnis beim nächsten Lauf erneut gelistet.
+- Eine Änderung innerhalb einer Datei ändert die mtime des Verzeichnisses nicht. Deshalb wird in einem
+  einstellbaren Abstand (z.B. alle 7 Tage) ein vollständiger Lauf durchgeführt, der alle Verzeichnisse listet und
+  alle Dateien mit dem Index vergleicht.
+
+Funktionen und Klassen:
+- MsgDirectoryIndex: Persistenter Index (SQLite).
+    - is_full_sweep_due(root_directory, full_sweep_days): Prüft, ob ein vollständiger Lauf fällig ist.
+    - iter_changed_directories(root_directory, recursive, path_filter, full_sweep): Liefert je Verzeichnis die neuen oder geänderten MSG-Dateien.
+    - acknowledge(*paths): Merkt sich den Stand bearbeiteter Dateien.
+    - close(): Speichert offene Änderungen und schließt die Datenbank.
+
+Beispiel:
+    msg_index = MsgDirectoryIndex("msg_directory_index.sqlite")
+    full_sweep = msg_index.is_full_sweep_due(root_directory, full_sweep_days=7)
+    for msg_directory in msg_index.iter_changed_directories(root_directory, full_sweep=full_sweep):
+        for msg_entry in msg_directory.msg_entries:
+            ...
+            msg_index.acknowledge(msg_entry.path)
+    msg_index.close()
+"""
+import os
+import sqlite3
+import time
+from typing import Iterator, Optional
+
+from modules.msg_discovery import MsgDirectoryListing, MsgPathFilter, directory_key, is_msg_filename
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_directory_index' aktiviert.")
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL,
+    listed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS directories_parent ON directories (parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    processed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_directory ON files (directory);
+CREATE TABLE IF NOT EXISTS sweeps (
+    root TEXT PRIMARY KEY,
+    full_sweep_at REAL NOT NULL
+);
+"""
+
+
+class MsgDirectoryIndex:
+    """
+    Persistenter Index der Verzeichnisse (mtime, Unterverzeichnisse) und bearbeiteten MSG-Dateien (Größe, mtime).
+    """
+
+    def __init__(self, database_path, read_only: bool = False):
+        """
+        Parameter:
+        database_path (str | Path): Pfad der SQLite-Datei (wird bei Bedarf angelegt).
+        read_only (bool): Wenn True, wird der Index nur gelesen und nicht aktualisiert (z.B. bei einem Testlauf).
+        """
+        self.database_path = os.fspath(database_path)
+        self.read_only = read_only
+        self._connection = sqlite3.connect(self.database_path)
+        self._connection.executescript(INDEX_SCHEMA)
+        self._connection.commit()
+        self.listed_directory_count = 0
+        self.skipped_directory_count = 0
+        self.skipped_file_count = 0
+        # Gelieferte, noch nicht über acknowledge() zurückgemeldete Dateien des aktuellen Verzeichnisses
+        self._unacknowledged_paths = set()
+
+    def is_full_sweep_due(self, root_directory, full_sweep_days: float) -> bool:
+        """
+        Prüft, ob für das Startverzeichnis ein vollständiger Lauf fällig ist (noch nie oder vor mehr als full_sweep_days Tagen).
+
+        Parameter:
+        root_directory (str | Path): Das Startverzeichnis.
+        full_sweep_days (float): Abstand der vollständigen Läufe in Tagen (0 = immer vollständig).
+
+        Rückgabewert:
+        bool: True, wenn ein vollständiger Lauf durchgeführt werden soll.
+        """
+        row = self._connection.execute("SELECT full_sweep_at FROM sweeps WHERE root = ?", (os.fspath(root_directory),)).fetchone()
+        if row is None:
+            return True
+        return time.time() - row[0] >= full_sweep_days * 86400
+
+    def acknowledge(self, *paths):
+        """
+        Merkt sich den aktuellen Stand bearbeiteter Dateien. Nicht (mehr) vorhandene Dateien werden entfernt.
+        Die Änderungen werden zusammen mit dem Verzeichnis gespeichert.
+
+        Parameter:
+        paths (str): Die Pfade der bearbeiteten Dateien (z.B. alter und neuer Name, None wird ignoriert).
+        """
+        if self.read_only:
+            return
+        for path in paths:
+            if not path:
+                continue
+            self._unacknowledged_paths.discard(path)
+            try:
+                file_stat = os.stat(path)
+            except OSError:
+                self._connection.execute("DELETE FROM files WHERE path = ?", (path,))
+                continue
+            self._connection.execute(
+                "INSERT OR REPLACE INTO files (path, directory, size, mtime_ns, processed_at) VALUES (?, ?, ?, ?, ?)",
+                (path, os.path.dirname(path), file_stat.st_size, file_stat.st_mtime_ns, time.time()))
+
+    def iter_changed_directories(self, root_directory, recursive: bool = True, path_filter: Optional[MsgPathFilter] = None,
+                                 full_sweep: bool = False) -> Iterator[MsgDirectoryListing]:
+        """
+        Durchsucht das Startverzeichnis und liefert je gelistetem Verzeichnis die neuen oder geänderten MSG-Dateien.
+        Die Reihenfolge entspricht der sequentiellen Suche (os.walk(topdown=True)).
+
+        Parameter:
+        root_directory (str | Path): Das Startverzeichnis.
+        recursive (bool): Wenn True, werden alle Unterverzeichnisse durchsucht (Standard: True).
+        path_filter (MsgPathFilter | None): Optionaler Filter für Teilbäume, Dateien und Tiefe.
+        full_sweep (bool): Wenn True, werden alle Verzeichnisse gelistet und alle Dateien mit dem Index verglichen.
+
+        Rückgabewert:
+        Iterator[MsgDirectoryListing]: Ein Eintrag pro gelistetem Verzeichnis.
+        """
+        root_directory = os.fspath(root_directory)
+        visited_directories = set()
+        pending_directories = [(root_directory, "", 0)]
+        app_logger.info(f"Inkrementelle Suche in '{root_directory}' (vollständiger Lauf: {full_sweep}).")
+
+        while pending_directories:
+            directory_path, relative_path, depth = pending_directories.pop()
+
+            try:
+                directory_stat = os.stat(directory_path)
+            except OSError as e:
+                app_logger.warning(f"Verzeichnis kann nicht gelesen werden: '{directory_path}' ({e})")
+                self._forget_directory(directory_path)
+                continue
+
+            # Schutz vor Endlosschleifen durch symbolische Links oder Junctions
+            visited_key = directory_key(directory_path, directory_stat)
+            if visited_key in visited_directories:
+                continue
+            visited_directories.add(visited_key)
+
+            indexed_mtime_ns = self._indexed_directory_mtime(directory_path)
+            if not full_sweep and indexed_mtime_ns == directory_stat.st_mtime_ns:
+                # Verzeichnis unverändert: nicht listen, Unterverzeichnisse aus dem Index übernehmen
+                self.skipped_directory_count += 1
+                subdirectories = [(path, self._join_relative_path(relative_path, os.path.basename(path)))
+                                  for path in self._indexed_subdirectories(directory_path)]
+                msg_entries = None
+            else:
+                listed_directory = self._list_directory(directory_path, relative_path, depth, path_filter)
+                if listed_directory is None:
+                    continue
+                msg_entries, subdirectories, all_subdirectories = listed_directory
+                self.listed_directory_count += 1
+
+            if path_filter is not None:
+                subdirectories = [(path, relative_subdirectory_path) for path, relative_subdirectory_path in subdirectories
+                                  if path_filter.should_descend(relative_subdirectory_path, depth + 1)]
+
+            if recursive:
+                for subdirectory, relative_subdirectory_path in reversed(subdirectories):
+                    pending_directories.append((subdirectory, relative_subdirectory_path, depth + 1))
+
+            if msg_entries is None:
+                continue
+
+            self._unacknowledged_paths = {entry.path for entry in msg_entries}
+            if msg_entries:
+                yield MsgDirectoryListing(directory_path=directory_path, depth=depth, msg_entries=msg_entries, relative_path=relative_path)
+
+            # Der Aufrufer hat das Verzeichnis bearbeitet: Stand zum Zeitpunkt des Listens speichern.
+            # Eigene Umbenennungen ändern die mtime danach erneut; das Verzeichnis wird beim nächsten Lauf einmal
+            # gelistet, die Dateien sind dann aber bekannt und werden nicht erneut bearbeitet.
+            # Wurden Dateien nicht zurückgemeldet (gesperrt, schreibgeschützt, fehlerhaft), mtime 0 speichern, damit das
+            # Verzeichnis beim nächsten Lauf erneut gelistet und die Dateien erneut versucht werden.
+            stored_mtime_ns = directory_stat.st_mtime_ns
+            if self._unacknowledged_paths:
+                app_logger.debug(f"{len(self._unacknowledged_paths)} MSG-Dateien in '{directory_path}' nicht bearbeitet; Verzeichnis wird beim nächsten Lauf erneut gelistet.")
+                stored_mtime_ns = 0
+                self._unacknowledged_paths = set()
+            self._store_directory(directory_path, stored_mtime_ns, all_subdirectories)
+
+        if full_sweep and not self.read_only:
+            self._connection.execute("INSERT OR REPLACE INTO sweeps (root, full_sweep_at) VALUES (?, ?)", (root_directory, time.time()))
+        self._commit()
+        app_logger.info(f"Inkrementelle Suche abgeschlossen: {self.listed_directory_count} Verzeichnisse gelistet, "
+                        f"{self.skipped_directory_count} unverändert, {self.skipped_file_count} unveränderte MSG-Dateien übersprungen.")
+
+    def close(self):
+        """
+        Speichert offene Änderungen und schließt die Datenbank.
+        """
+        self._commit()
+        self._connection.close()
+
+    @staticmethod
+    def _join_relative_path(relative_directory_path: str, name: str) -> str:
+        return f"{relative_directory_path}/{name}" if relative_directory_path else name
+
+    def _list_directory(self, directory_path: str, relative_path: str, depth: int, path_filter: Optional[MsgPathFilter]):
+        """
+        Listet ein Verzeichnis und ermittelt die neuen oder geänderten MSG-Dateien.
+
+        Rückgabewert:
+        tuple | None: (geänderte MSG-Dateien, Unterverzeichnisse als (Pfad, relativer Pfad), alle Unterverzeichnispfade),
+        None wenn das Verzeichnis nicht gelistet werden kann.
+        """
+        try:
+            with os.scandir(directory_path) as directory_iterator:
+                directory_entries = list(directory_iterator)
+        except OSError as e:
+            app_logger.warning(f"Verzeichnis kann nicht gelistet werden: '{directory_path}' ({e})")
+            return None
+
+        indexed_files = {path: (size, mtime_ns) for path, size, mtime_ns in self._connection.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE directory = ?", (directory_path,))}
+
+        msg_entries = []
+        subdirectories = []
+        all_subdirectories = []
+        existing_files = set()
+        for entry in directory_entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    all_subdirectories.append(entry.path)
+                    subdirectories.append((entry.path, self._join_relative_path(relative_path, entry.name)))
+                elif is_msg_filename(entry.name) and entry.is_file(follow_symlinks=False):
+                    existing_files.add(entry.path)
+                    if path_filter is not None and not path_filter.accepts_file(self._join_relative_path(relative_path, entry.name)):
+                        continue
+                    entry_stat = entry.stat()
+                    if indexed_files.get(entry.path) == (entry_stat.st_size, entry_stat.st_mtime_ns):
+                        self.skipped_file_count += 1
+                        continue
+                    msg_entries.append(entry)
+            except OSError as e:
+                app_logger.warning(f"Eintrag kann nicht geprüft werden: '{entry.path}' ({e})")
+
+        # Nicht mehr vorhandene Dateien aus dem Index entfernen
+        if not self.read_only:
+            removed_files = [(path,) for path in indexed_files if path not in existing_files]
+            self._connection.executemany("DELETE FROM files WHERE path = ?", removed_files)
+
+        return msg_entries, subdirectories, all_subdirectories
+
+    def _indexed_directory_mtime(self, directory_path: str) -> Optional[int]:
+        row = self._connection.execute("SELECT mtime_ns FROM directories WHERE path = ?", (directory_path,)).fetchone()
+        return row[0] if row else None
+
+    def _indexed_subdirectories(self, directory_path: str) -> list[str]:
+        return sorted(row[0] for row in self._connection.execute("SELECT path FROM directories WHERE parent = ?", (directory_path,)))
+
+    def _store_directory(self, directory_path: str, mtime_ns: int, subdirectories: list[str]):
+        """
+        Speichert den Stand eines gelisteten Verzeichnisses und entfernt nicht mehr vorhandene Unterverzeichnisse.
+        """
+        if self.read_only:
+            return
+        existing_subdirectories = set(subdirectories)
+        for indexed_subdirectory in self._indexed_subdirectories(directory_path):
+            if indexed_subdirectory not in existing_subdirectories:
+                self._forget_directory(indexed_subdirectory)
+
+        # Neue Unterverzeichnisse mit mtime 0 eintragen, damit sie auch bei einem Abbruch beim nächsten Lauf gelistet werden
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO directories (path, parent, mtime_ns, listed_at) VALUES (?, ?, 0, 0)",
+            [(subdirectory, directory_path) for subdirectory in subdirectories])
+        self._connection.execute(
+            "INSERT INTO directories (path, parent, mtime_ns, listed_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns, listed_at = excluded.listed_at",
+            (directory_path, os.path.dirname(directory_path), mtime_ns, time.time()))
+        self._commit()
+
+    def _forget_directory(self, directory_path: str):
+        """
+        Entfernt ein Verzeichnis mit allen Unterverzeichnissen und Dateien aus dem Index.
+        """
+        if self.read_only:
+            return
+        for subdirectory in self._indexed_subdirectories(directory_path):
+            self._forget_directory(subdirectory)
+        self._connection.execute("DELETE FROM files WHERE directory = ?", (directory_path,))
+        self._connection.execute("DELETE FROM directories WHERE path = ?", (directory_path,))
+
+    def _commit(self):
+        if not self.read_only:
+            self._connection.commit()
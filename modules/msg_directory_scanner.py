@@ -21,6 +21,7 @@ python msg_directory_scanner.py -l
 import os
 import sys
 from utils.excel_handling import create_excel_list, save_excel_file
+from modules.msg_discovery import iter_msg_files
 from logger import initialize_logger
 
 # In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
@@ -31,19 +32,13 @@ def get_msg_files_from_directory(directory):
     """
     Durchsucht das angegebene Verzeichnis und alle Unterverzeichnisse nach MSG-Dateien.
 
-    Diese Funktion verwendet os.walk, um rekursiv durch das Verzeichnis zu navigieren
-    und alle Dateien mit der Endung '.msg' zu finden.
+    Diese Funktion verwendet die gemeinsame Suche aus msg_discovery (os.scandir), um rekursiv durch das
+    Verzeichnis zu navigieren und alle Dateien mit der Endung '.msg' (Groß-/Kleinschreibung egal) zu finden.
 
     :param directory: Das Verzeichnis, das durchsucht werden soll.
     :return: Eine Liste der gefundenen MSG-Dateien (vollständige Pfade).
     """
-    msg_files = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith(".msg"):
-                # Füge den vollständigen Pfad der gefundenen MSG-Datei zur Liste hinzu
-                msg_files.append(os.path.join(root, file))
-    return msg_files
+    return [msg_entry.path for msg_entry in iter_msg_files(directory)]
 
 if __name__ == "__main__":
     # Standardverzeichnisse für die Suche nach MSG-Dateien und die Ausgabe der Excel-Datei
@@ -0,0 +1,621 @@
+# -*- coding: utf-8 -*-
+"""
+msg_discovery.py
+
+Dieses Modul stellt die gemeinsame Suche nach MSG-Dateien für alle Einstiegspunkte bereit
+(msg_file_renamer.py, msg_directory_scanner.py).
+
+Die Suche basiert auf os.scandir und arbeitet als Generator:
+- Jedes Verzeichnis wird genau einmal gelistet. Die Liste wird vollständig eingelesen (Snapshot), bevor
+  sie an den Aufrufer übergeben wird. Der Aufrufer kann die Dateien des Verzeichnisses daher gefahrlos
+  umbenennen oder löschen, ohne dass sich die laufende Suche ändert.
+- Es werden os.DirEntry-Objekte zurückgegeben. Deren Typ- und Stat-Informationen stammen direkt aus der
+  Verzeichnisliste (unter Windows inklusive Größe und Zeitstempel), zusätzliche stat-Aufrufe pro Datei entfallen.
+- Die Endung ".msg" wird ohne Beachtung der Groß-/Kleinschreibung erkannt.
+- Verzeichnisse werden über (st_dev, st_ino) nur einmal besucht. Das schützt vor Endlosschleifen durch
+  symbolische Links oder Junctions. Liefert das Dateisystem st_ino 0 (manche Netz- und FAT-Dateisysteme), wird
+  stattdessen der aufgelöste Pfad verwendet.
+- Es wird immer nur ein Verzeichnis gleichzeitig im Speicher gehalten, der Speicherbedarf bleibt auch bei
+  sehr großen Verzeichnisbäumen konstant.
+
+Mit einem MsgPathFilter kann die Suche auf Teilbäume eingeschränkt werden (--include, --exclude, --max_depth).
+Ausgeschlossene Verzeichnisse werden verworfen, bevor sie gelistet werden; große, unerwünschte Teilbäume kosten
+daher keine Zeit. Alle Muster werden einmalig zu je einem regulären Ausdruck zusammengefasst.
+
+Mit MsgShard (--shard i/N) wird ein Lauf deterministisch auf N unabhängige Aufrufe (Prozesse oder Rechner) aufgeteilt.
+Jedes Verzeichnis der obersten Ebene (bzw. jede Datei) gehört über einen stabilen Hash des relativen Pfades zu
+genau einem Teil. Nicht zugehörige Teilbäume werden wie ausgeschlossene Verzeichnisse nicht gelistet.
+
+Für Netzlaufwerke (SMB/NFS), bei denen jedes Listen eines Verzeichnisses viele Millisekunden dauert, gibt es
+zusätzlich eine parallele Suche (iter_msg_directories_parallel). Die Verzeichnisse werden dabei über einen
+begrenzten Thread-Pool gelistet, während der Aufrufer bereits die ersten Ergebnisse bearbeitet:
+- ordered=False: Die Ergebnisse werden über eine begrenzte Warteschlange in der Reihenfolge ihrer Fertigstellung
+  geliefert (schnellster Start, Reihenfolge nicht deterministisch).
+- ordered=True: Die Ergebnisse werden in derselben Reihenfolge wie bei der sequentiellen Suche geliefert. Die Suche
+  läuft parallel voraus, aber nur für die nächsten queue_size Verzeichnisse in dieser Reihenfolge; weitere
+  Verzeichnisse werden erst gelistet, wenn der Aufrufer nachrückt (begrenzter Speicherbedarf).
+
+Funktionen und Klassen:
+- MsgDirectoryListing: Datenklasse mit den MSG-Dateien eines Verzeichnisses.
+- MsgShard: Aufteilung eines Laufs in N Teile (--shard i/N).
+- MsgPathFilter: Include-/Exclude-Muster, maximale Tiefe und Aufteilung für die Suche.
+- is_msg_filename(filename): Prüft die Dateiendung ".msg" (Groß-/Kleinschreibung egal).
+- directory_key(directory_path, directory_stat): Schlüssel eines Verzeichnisses für den Schutz vor Endlosschleifen.
+- iter_msg_directories(root_directory, recursive, follow_symlinks, path_filter): Liefert je Verzeichnis die gefundenen MSG-Dateien.
+- iter_msg_directories_parallel(root_directory, recursive, follow_symlinks, max_workers, ordered): Wie
+  iter_msg_directories, die Verzeichnisse werden aber parallel gelistet.
+- discover_msg_directories(root_directory, recursive, scan_workers, ordered, path_filter): Wählt abhängig von scan_workers
+  die sequentielle oder die parallele Suche.
+- iter_msg_files(root_directory, recursive, follow_symlinks): Liefert die gefundenen MSG-Dateien einzeln.
+
+Beispiel:
+    for msg_directory in iter_msg_directories(r"D:/Mails", recursive=True):
+        for msg_entry in msg_directory.msg_entries:
+            print(msg_entry.path, msg_entry.stat().st_size)
+"""
+import contextlib
+import hashlib
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Iterable, Iterator, Optional
+
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_discovery' aktiviert.")
+
+MSG_FILE_EXTENSION = ".msg"
+
+# Standardanzahl paralleler Threads für die parallele Suche (I/O-gebunden, daher mehr Threads als CPU-Kerne)
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Maximale Anzahl gelisteter, aber noch nicht abgeholter Verzeichnisse (ordered=False: Warteschlange, ordered=True: Vorlauf)
+DEFAULT_SCAN_QUEUE_SIZE = 1024
+
+
+@dataclass
+class MsgDirectoryListing:
+    """
+    MsgDirectoryListing
+
+    Diese Datenklasse enthält das Ergebnis der Suche in einem einzelnen Verzeichnis.
+
+    Attribute:
+    - directory_path: Der Pfad des Verzeichnisses.
+    - depth: Die Tiefe relativ zum Startverzeichnis (Startverzeichnis = 0).
+    - msg_entries: Die MSG-Dateien des Verzeichnisses als os.DirEntry-Objekte (Snapshot der Verzeichnisliste).
+    - relative_path: Der Pfad relativ zum Startverzeichnis mit "/" als Trenner (Startverzeichnis = "").
+    """
+    directory_path: str
+    depth: int
+    msg_entries: list = field(default_factory=list)
+    relative_path: str = ""
+
+
+class MsgShardMode(Enum):
+    SUBTREE = "subtree"
+    FILE = "file"
+
+
+@dataclass(frozen=True)
+class MsgShard:
+    """
+    MsgShard
+
+    Diese Datenklasse beschreibt einen Teil eines aufgeteilten Laufs (--shard i/N).
+
+    Die Zuordnung erfolgt über einen stabilen Hash (MD5) des Pfades relativ zum Startverzeichnis
+    ("/" als Trenner, Kleinschreibung). Sie ist damit auf allen Rechnern gleich, auch wenn die Freigabe
+    unter einem anderen Laufwerksbuchstaben eingebunden ist.
+    - MsgShardMode.SUBTREE: Jedes Verzeichnis der obersten Ebene gehört mit seinem gesamten Teilbaum zu einem Teil;
+      MSG-Dateien direkt im Startverzeichnis werden einzeln zugeordnet.
+    - MsgShardMode.FILE: Jede MSG-Datei wird einzeln zugeordnet (gleichmäßigere Verteilung, aber jeder Teil listet alle Verzeichnisse).
+
+    Attribute:
+    - index: Nummer des Teils (1 bis count).
+    - count: Anzahl der Teile.
+    - mode: Art der Zuordnung (Standard: MsgShardMode.SUBTREE).
+    """
+    index: int
+    count: int
+    mode: MsgShardMode = MsgShardMode.SUBTREE
+
+    @classmethod
+    def from_spec(cls, shard_spec: str, mode: MsgShardMode = MsgShardMode.SUBTREE) -> "MsgShard":
+        """
+        Erzeugt einen MsgShard aus einer Angabe der Form "i/N" (z.B. "2/4").
+
+        Wirft:
+        ValueError: Wenn die Angabe ungültig ist.
+        """
+        try:
+            index_text, count_text = shard_spec.split("/")
+            index, count = int(index_text), int(count_text)
+        except ValueError:
+            raise ValueError(f"Ungültige Angabe für --shard: '{shard_spec}' (erwartet i/N, z.B. 2/4)")
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"Ungültige Angabe für --shard: '{shard_spec}' (i muss zwischen 1 und N liegen)")
+        return cls(index=index, count=count, mode=mode)
+
+    @property
+    def label(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def owns(self, relative_path: str) -> bool:
+        """
+        Prüft, ob ein relativer Pfad zu diesem Teil gehört.
+        """
+        digest = hashlib.md5(relative_path.lower().encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % self.count == self.index - 1
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """
+    Übersetzt ein Glob-Muster in einen regulären Ausdruck, der "/" als Pfadtrenner beachtet.
+    "*" und "?" passen nur innerhalb eines Verzeichnisnamens, "**" passt über beliebig viele Ebenen.
+    """
+    regex_parts = []
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            regex_parts.append("(?:.*/)?")
+            index += 3
+        elif pattern.startswith("**", index):
+            regex_parts.append(".*")
+            index += 2
+        elif pattern[index] == "*":
+            regex_parts.append("[^/]*")
+            index += 1
+        elif pattern[index] == "?":
+            regex_parts.append("[^/]")
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 2:]:
+            closing_index = pattern.index("]", index + 2)
+            character_class = pattern[index + 1:closing_index].replace("\\", "\\\\")
+            if character_class.startswith("!"):
+                character_class = "^" + character_class[1:]
+            regex_parts.append(f"[{character_class}]")
+            index = closing_index + 1
+        else:
+            regex_parts.append(re.escape(pattern[index]))
+            index += 1
+    return "".join(regex_parts)
+
+
+def _normalize_pattern(pattern: str) -> str:
+    """
+    Vereinheitlicht ein Muster: "/" als Trenner, ohne führende/abschließende Trenner.
+    """
+    return pattern.replace("\\", "/").strip().strip("/")
+
+
+class MsgPathFilter:
+    """
+    Filter für die MSG-Suche mit Include-/Exclude-Mustern und maximaler Verzeichnistiefe.
+
+    Alle Muster beziehen sich auf den Pfad relativ zum Startverzeichnis ("/" als Trenner, Groß-/Kleinschreibung egal):
+    - Exclude: Ein Muster ohne "/" (z.B. "Archiv_alt", "~snapshot*") passt auf jeden Verzeichnis- oder Dateinamen
+      in beliebiger Tiefe, ein Muster mit "/" auf den gesamten relativen Pfad. Ausgeschlossene Verzeichnisse werden
+      nicht gelistet.
+    - Include: Sind Muster angegeben, werden nur Dateien bearbeitet, deren relativer Pfad (oder eines der
+      übergeordneten Verzeichnisse) passt, z.B. "Projekte/*/Mail". Verzeichnisse, die nicht auf dem Weg zu einem
+      passenden Pfad liegen, werden nicht gelistet. Ein Muster ohne "/" passt in beliebiger Tiefe.
+    - max_depth: Maximale Tiefe der gelisteten Verzeichnisse (Startverzeichnis = 0, None = unbegrenzt).
+    - shard: Optionaler Teil eines aufgeteilten Laufs; nicht zugehörige Verzeichnisse der obersten Ebene werden nicht gelistet.
+
+    Die Muster werden einmalig zu je einem regulären Ausdruck zusammengefasst.
+    """
+
+    def __init__(self, include_patterns: Iterable[str] = (), exclude_patterns: Iterable[str] = (), max_depth: Optional[int] = None,
+                 shard: Optional[MsgShard] = None):
+        """
+        Parameter:
+        include_patterns (Iterable[str]): Glob-Muster der zu bearbeitenden Teilbäume bzw. Dateien.
+        exclude_patterns (Iterable[str]): Glob-Muster der auszuschließenden Verzeichnisse bzw. Dateien.
+        max_depth (int | None): Maximale Verzeichnistiefe (Standard: None = unbegrenzt).
+        shard (MsgShard | None): Teil eines aufgeteilten Laufs (Standard: None = alles).
+        """
+        self.include_patterns = [_normalize_pattern(p) for p in include_patterns if _normalize_pattern(p)]
+        self.exclude_patterns = [_normalize_pattern(p) for p in exclude_patterns if _normalize_pattern(p)]
+        self.max_depth = max_depth
+        self.shard = shard
+
+        # Exclude: ein Ausdruck für alle Muster (Muster ohne "/" passen auf den Namen in beliebiger Tiefe)
+        exclude_regexes = []
+        for pattern in self.exclude_patterns:
+            prefix = "" if "/" in pattern else "(?:.*/)?"
+            exclude_regexes.append(prefix + _glob_to_regex(pattern))
+        self._exclude_matcher = re.compile("^(?:" + "|".join(exclude_regexes) + ")$", re.IGNORECASE) if exclude_regexes else None
+
+        # Include: ein Ausdruck für passende Pfade (inklusive allem darunter) und einer für die Wege dorthin
+        include_regexes = []
+        include_prefix_regexes = []
+        for pattern in self.include_patterns:
+            if "/" not in pattern and not pattern.startswith("**"):
+                pattern = "**/" + pattern
+            include_regexes.append(_glob_to_regex(pattern) + "(?:/.*)?")
+            include_prefix_regexes.append(self._prefix_regex(pattern))
+        self._include_matcher = re.compile("^(?:" + "|".join(include_regexes) + ")$", re.IGNORECASE) if include_regexes else None
+        self._include_prefix_matcher = re.compile("^(?:" + "|".join(include_prefix_regexes) + ")$", re.IGNORECASE) if include_prefix_regexes else None
+
+    @staticmethod
+    def _prefix_regex(pattern: str) -> str:
+        """
+        Erzeugt einen Ausdruck, der auf alle Verzeichnisse passt, die auf dem Weg zu einem Treffer liegen oder darunter.
+        Ab einem "**" ist keine Einschränkung mehr möglich.
+        """
+        segments = pattern.split("/")
+        regex = ""
+        for segment in reversed(segments):
+            if "**" in segment:
+                regex = ".*"
+            else:
+                regex = _glob_to_regex(segment) + (f"(?:/{regex})?" if regex else "(?:/.*)?")
+        return regex
+
+    @property
+    def is_active(self) -> bool:
+        return bool(self.include_patterns or self.exclude_patterns or self.max_depth is not None or self.shard is not None)
+
+    def is_excluded(self, relative_path: str) -> bool:
+        return self._exclude_matcher is not None and self._exclude_matcher.match(relative_path) is not None
+
+    def should_descend(self, relative_directory_path: str, depth: int) -> bool:
+        """
+        Prüft vor dem Listen, ob ein Unterverzeichnis durchsucht werden muss.
+
+        Parameter:
+        relative_directory_path (str): Pfad relativ zum Startverzeichnis ("/" als Trenner).
+        depth (int): Tiefe des Verzeichnisses (Startverzeichnis = 0).
+
+        Rückgabewert:
+        bool: True, wenn das Verzeichnis gelistet werden muss.
+        """
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        if self.shard is not None and self.shard.mode == MsgShardMode.SUBTREE and depth == 1 and not self.shard.owns(relative_directory_path):
+            return False
+        if self.is_excluded(relative_directory_path):
+            return False
+        if self._include_prefix_matcher is not None and self._include_prefix_matcher.match(relative_directory_path) is None:
+            return False
+        return True
+
+    def accepts_file(self, relative_file_path: str) -> bool:
+        """
+        Prüft, ob eine gefundene MSG-Datei bearbeitet werden soll.
+
+        Parameter:
+        relative_file_path (str): Pfad der Datei relativ zum Startverzeichnis ("/" als Trenner).
+
+        Rückgabewert:
+        bool: True, wenn die Datei bearbeitet werden soll.
+        """
+        if self.is_excluded(relative_file_path):
+            return False
+        if self.shard is not None:
+            top_level_name, separator, _ = relative_file_path.partition("/")
+            if self.shard.mode == MsgShardMode.SUBTREE and separator:
+                if not self.shard.owns(top_level_name):
+                    return False
+            elif not self.shard.owns(relative_file_path):
+                return False
+        if self._include_matcher is not None and self._include_matcher.match(relative_file_path) is None:
+            return False
+        return True
+
+    def __repr__(self) -> str:
+        shard_text = f", shard={self.shard.label} ({self.shard.mode.value})" if self.shard else ""
+        return f"MsgPathFilter(include={self.include_patterns}, exclude={self.exclude_patterns}, max_depth={self.max_depth}{shard_text})"
+
+
+def _join_relative_path(relative_directory_path: str, name: str) -> str:
+    return f"{relative_directory_path}/{name}" if relative_directory_path else name
+
+
+def is_msg_filename(filename: str) -> bool:
+    """
+    Prüft, ob der Dateiname die Endung ".msg" hat (Groß-/Kleinschreibung egal).
+
+    Parameter:
+    filename (str): Der Dateiname.
+
+    Rückgabewert:
+    bool: True, wenn es sich um eine MSG-Datei handelt.
+    """
+    return filename.lower().endswith(MSG_FILE_EXTENSION)
+
+
+def directory_key(directory_path: str, directory_stat: Optional[os.stat_result] = None) -> tuple:
+    """
+    Ermittelt einen eindeutigen Schlüssel (st_dev, st_ino) für ein Verzeichnis (Schutz vor Endlosschleifen über Links).
+    Unter Windows enthält der Stat-Cache von os.DirEntry keine Inode-Nummer, daher wird einmal pro Verzeichnis os.stat aufgerufen.
+    Manche Netz- und FAT-Dateisysteme liefern st_ino 0; dann wird der aufgelöste Pfad (Links und Junctions) verwendet,
+    sonst gälte jedes weitere Verzeichnis als bereits besucht.
+
+    Parameter:
+    directory_path (str): Pfad des Verzeichnisses.
+    directory_stat (os.stat_result | None): Bereits ermitteltes os.stat des Verzeichnisses.
+
+    Rückgabewert:
+    tuple: (st_dev, st_ino) bzw. (st_dev, aufgelöster Pfad).
+    """
+    if directory_stat is None:
+        directory_stat = os.stat(directory_path)
+    if directory_stat.st_ino == 0:
+        return directory_stat.st_dev, os.path.normcase(os.path.realpath(directory_path))
+    return directory_stat.st_dev, directory_stat.st_ino
+
+
+def _mark_directory_visited(directory_path: str, visited_directories: set, visited_lock: Optional[threading.Lock] = None) -> bool:
+    """
+    Merkt sich ein Verzeichnis als besucht. Bei paralleler Suche wird nur Prüfen und Eintragen mit visited_lock gesperrt,
+    nicht das os.stat (auf Netzlaufwerken ein Roundtrip je Verzeichnis).
+
+    Rückgabewert:
+    bool: False, wenn das Verzeichnis bereits besucht wurde oder nicht gelesen werden kann, sonst True.
+    """
+    try:
+        visited_key = directory_key(directory_path)
+    except OSError as e:
+        app_logger.warning(f"Verzeichnis kann nicht gelesen werden: '{directory_path}' ({e})")
+        return False
+    with visited_lock if visited_lock is not None else contextlib.nullcontext():
+        is_visited = visited_key in visited_directories
+        if not is_visited:
+            visited_directories.add(visited_key)
+    if is_visited:
+        app_logger.warning(f"Verzeichnis wurde bereits durchsucht (Schleife über Link?), wird übersprungen: '{directory_path}'")
+        return False
+    return True
+
+
+def _scan_directory(directory_path: str, relative_path: str, depth: int, follow_symlinks: bool,
+                    path_filter: Optional[MsgPathFilter] = None):
+    """
+    Listet ein einzelnes Verzeichnis (Snapshot) und trennt MSG-Dateien und Unterverzeichnisse.
+    Mit path_filter werden nicht gewünschte Dateien verworfen und Unterverzeichnisse, die nicht durchsucht
+    werden müssen, gar nicht erst zurückgegeben (und damit auch nicht gelistet).
+
+    Rückgabewert:
+    tuple[MsgDirectoryListing, list[tuple[str, str]]] | None: Das Ergebnis und die Unterverzeichnisse als
+    (Pfad, relativer Pfad), None wenn das Verzeichnis nicht gelistet werden kann.
+    """
+    # Snapshot der Verzeichnisliste erstellen, bevor der Aufrufer Dateien verändert
+    try:
+        with os.scandir(directory_path) as directory_iterator:
+            directory_entries = list(directory_iterator)
+    except OSError as e:
+        app_logger.warning(f"Verzeichnis kann nicht gelistet werden: '{directory_path}' ({e})")
+        return None
+
+    msg_entries = []
+    subdirectories = []
+    for entry in directory_entries:
+        try:
+            if entry.is_dir(follow_symlinks=follow_symlinks):
+                relative_subdirectory_path = _join_relative_path(relative_path, entry.name)
+                if path_filter is None or path_filter.should_descend(relative_subdirectory_path, depth + 1):
+                    subdirectories.append((entry.path, relative_subdirectory_path))
+                else:
+                    app_logger.debug(f"Verzeichnis durch Filter ausgeschlossen: '{entry.path}'")
+            elif is_msg_filename(entry.name) and entry.is_file(follow_symlinks=follow_symlinks):
+                if path_filter is None or path_filter.accepts_file(_join_relative_path(relative_path, entry.name)):
+                    msg_entries.append(entry)
+        except OSError as e:
+            app_logger.warning(f"Eintrag kann nicht geprüft werden: '{entry.path}' ({e})")
+
+    msg_directory = MsgDirectoryListing(directory_path=directory_path, depth=depth, msg_entries=msg_entries, relative_path=relative_path)
+    return msg_directory, subdirectories
+
+
+def iter_msg_directories(root_directory, recursive: bool = True, follow_symlinks: bool = False,
+                         path_filter: Optional[MsgPathFilter] = None) -> Iterator[MsgDirectoryListing]:
+    """
+    Durchsucht das Startverzeichnis (und optional alle Unterverzeichnisse) nach MSG-Dateien.
+
+    Die Verzeichnisse werden in derselben Reihenfolge wie bei os.walk(topdown=True) geliefert.
+    Verzeichnisse ohne Zugriffsrechte werden protokolliert und übersprungen.
+
+    Parameter:
+    root_directory (str | Path): Das Startverzeichnis.
+    recursive (bool): Wenn True, werden alle Unterverzeichnisse durchsucht (Standard: True).
+    follow_symlinks (bool): Wenn True, wird symbolischen Links auf Verzeichnisse gefolgt (Standard: False).
+    path_filter (MsgPathFilter | None): Optionaler Filter für Teilbäume, Dateien und Tiefe.
+
+    Rückgabewert:
+    Iterator[MsgDirectoryListing]: Ein Eintrag pro durchsuchtem Verzeichnis.
+    """
+    root_directory = os.fspath(root_directory)
+    visited_directories = set()
+    pending_directories = [(root_directory, "", 0)]
+
+    while pending_directories:
+        directory_path, relative_path, depth = pending_directories.pop()
+
+        # Schutz vor Endlosschleifen durch symbolische Links oder Junctions
+        if not _mark_directory_visited(directory_path, visited_directories):
+            continue
+
+        scanned_directory = _scan_directory(directory_path, relative_path, depth, follow_symlinks, path_filter)
+        if scanned_directory is None:
+            continue
+        msg_directory, subdirectories = scanned_directory
+
+        # Unterverzeichnisse in umgekehrter Reihenfolge ablegen, damit sie in Listenreihenfolge bearbeitet werden
+        if recursive:
+            for subdirectory, relative_subdirectory_path in reversed(subdirectories):
+                pending_directories.append((subdirectory, relative_subdirectory_path, depth + 1))
+
+        yield msg_directory
+
+
+def iter_msg_directories_parallel(root_directory, recursive: bool = True, follow_symlinks: bool = False,
+                                  max_workers: int = DEFAULT_SCAN_WORKERS, ordered: bool = False,
+                                  queue_size: int = DEFAULT_SCAN_QUEUE_SIZE,
+                                  path_filter: Optional[MsgPathFilter] = None) -> Iterator[MsgDirectoryListing]:
+    """
+    Durchsucht das Startverzeichnis wie iter_msg_directories, listet die Verzeichnisse aber parallel.
+
+    Bei ordered=False gibt jedes gelistete Verzeichnis seine Unterverzeichnisse sofort an den Thread-Pool weiter; die
+    Suche läuft bis zu queue_size Ergebnisse voraus. Bei ordered=True werden jeweils die nächsten queue_size Verzeichnisse
+    in der Reihenfolge der sequentiellen Suche gelistet; weitere erst, wenn der Aufrufer Ergebnisse abholt.
+
+    Parameter:
+    root_directory (str | Path): Das Startverzeichnis.
+    recursive (bool): Wenn True, werden alle Unterverzeichnisse durchsucht (Standard: True).
+    follow_symlinks (bool): Wenn True, wird symbolischen Links auf Verzeichnisse gefolgt (Standard: False).
+    max_workers (int): Anzahl paralleler Threads.
+    ordered (bool): Wenn True, werden die Verzeichnisse in derselben Reihenfolge wie bei iter_msg_directories geliefert.
+    queue_size (int): Begrenzung des Vorlaufs der Suche (gelistete, noch nicht abgeholte Verzeichnisse).
+    path_filter (MsgPathFilter | None): Optionaler Filter für Teilbäume, Dateien und Tiefe.
+
+    Rückgabewert:
+    Iterator[MsgDirectoryListing]: Ein Eintrag pro durchsuchtem Verzeichnis.
+    """
+    root_directory = os.fspath(root_directory)
+    visited_directories = set()
+    visited_lock = threading.Lock()
+    stop_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="msg_scan")
+
+    def scan_task(directory_path, relative_path, depth):
+        """
+        Listet ein Verzeichnis.
+        Rückgabewert: (MsgDirectoryListing oder None, Liste der Unterverzeichnisse als (Pfad, relativer Pfad))
+        """
+        if stop_event.is_set():
+            return None, []
+        if not _mark_directory_visited(directory_path, visited_directories, visited_lock):
+            return None, []
+
+        scanned_directory = _scan_directory(directory_path, relative_path, depth, follow_symlinks, path_filter)
+        if scanned_directory is None:
+            return None, []
+        msg_directory, subdirectories = scanned_directory
+        return msg_directory, subdirectories if recursive else []
+
+    if ordered:
+        lookahead = max(1, max_workers, queue_size)
+        try:
+            # Tiefensuche wie bei der sequentiellen Suche: Das Ende der Liste ist das nächste Verzeichnis. Je Eintrag
+            # [Pfad, relativer Pfad, Tiefe, Future]; gelistet werden nur die nächsten lookahead Verzeichnisse, damit
+            # höchstens so viele Ergebnisse (mit ihren DirEntry-Objekten) auf die Abholung warten.
+            # Die nächsten Verzeichnisse werden vor der Rückgabe eingereiht und laufen während der Bearbeitung durch den Aufrufer.
+            def submit_lookahead():
+                for pending_directory in pending_directories[-lookahead:]:
+                    if pending_directory[3] is None:
+                        pending_directory[3] = executor.submit(scan_task, *pending_directory[:3])
+
+            pending_directories = [[root_directory, "", 0, None]]
+            submit_lookahead()
+            while pending_directories:
+                _, _, depth, scan_future = pending_directories.pop()
+                msg_directory, subdirectories = scan_future.result()
+                for subdirectory, relative_subdirectory_path in reversed(subdirectories):
+                    pending_directories.append([subdirectory, relative_subdirectory_path, depth + 1, None])
+                submit_lookahead()
+                if msg_directory is not None:
+                    yield msg_directory
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+        return
+
+    # ordered=False: Ergebnisse über eine begrenzte Warteschlange in der Reihenfolge ihrer Fertigstellung liefern
+    result_queue = queue.Queue(maxsize=max(1, queue_size))
+    scan_finished = object()
+    in_flight_lock = threading.Lock()
+    in_flight_count = 0
+
+    def put_result(item):
+        # Blockiert bei voller Warteschlange (Gegendruck), bricht aber ab, sobald der Aufrufer die Suche beendet
+        while not stop_event.is_set():
+            try:
+                result_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def queued_scan_task(directory_path, relative_path, depth):
+        nonlocal in_flight_count
+        try:
+            msg_directory, subdirectories = scan_task(directory_path, relative_path, depth)
+            # Unterverzeichnisse sofort an den Thread-Pool weitergeben, die Suche läuft unabhängig von der Abholung weiter
+            if not stop_event.is_set():
+                for subdirectory, relative_subdirectory_path in subdirectories:
+                    submit(subdirectory, relative_subdirectory_path, depth + 1)
+            if msg_directory is not None:
+                put_result(msg_directory)
+        except Exception as e:
+            if not stop_event.is_set():  # Nach dem Abbruch durch den Aufrufer sind Fehler beim Einreihen erwartet
+                app_logger.error(f"Fehler bei der parallelen Suche in '{directory_path}': {e}")
+        finally:
+            with in_flight_lock:
+                in_flight_count -= 1
+                is_last_task = in_flight_count == 0
+            if is_last_task:
+                put_result(scan_finished)
+
+    def submit(directory_path, relative_path, depth):
+        nonlocal in_flight_count
+        with in_flight_lock:
+            in_flight_count += 1
+        return executor.submit(queued_scan_task, directory_path, relative_path, depth)
+
+    try:
+        submit(root_directory, "", 0)
+        while True:
+            item = result_queue.get()
+            if item is scan_finished:
+                break
+            yield item
+    finally:
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def discover_msg_directories(root_directory, recursive: bool = True, scan_workers: int = 0, ordered: bool = False,
+                             path_filter: Optional[MsgPathFilter] = None) -> Iterator[MsgDirectoryListing]:
+    """
+    Wählt abhängig von scan_workers die sequentielle oder die parallele Suche.
+
+    Parameter:
+    root_directory (str | Path): Das Startverzeichnis.
+    recursive (bool): Wenn True, werden alle Unterverzeichnisse durchsucht (Standard: True).
+    scan_workers (int): Anzahl paralleler Threads; 0 oder 1 = sequentielle Suche (Standard: 0).
+    ordered (bool): Nur bei paralleler Suche: Reihenfolge wie bei der sequentiellen Suche.
+    path_filter (MsgPathFilter | None): Optionaler Filter für Teilbäume, Dateien und Tiefe.
+
+    Rückgabewert:
+    Iterator[MsgDirectoryListing]: Ein Eintrag pro durchsuchtem Verzeichnis.
+    """
+    if scan_workers > 1 and recursive:
+        return iter_msg_directories_parallel(root_directory, recursive=recursive, max_workers=scan_workers, ordered=ordered,
+                                             path_filter=path_filter)
+    return iter_msg_directories(root_directory, recursive=recursive, path_filter=path_filter)
+
+
+def iter_msg_files(root_directory, recursive: bool = True, follow_symlinks: bool = False,
+                   path_filter: Optional[MsgPathFilter] = None) -> Iterator[os.DirEntry]:
+    """
+    Liefert alle gefundenen MSG-Dateien einzeln als os.DirEntry.
+
+    Parameter:
+    root_directory (str | Path): Das Startverzeichnis.
+    recursive (bool): Wenn True, werden alle Unterverzeichnisse durchsucht (Standard: True).
+    follow_symlinks (bool): Wenn True, wird symbolischen Links auf Verzeichnisse gefolgt (Standard: False).
+    path_filter (MsgPathFilter | None): Optionaler Filter für Teilbäume, Dateien und Tiefe.
+
+    Rückgabewert:
+    Iterator[os.DirEntry]: Die gefundenen MSG-Dateien.
+    """
+    for msg_directory in iter_msg_directories(root_directory, recursive=recursive, follow_symlinks=follow_symlinks,
+                                              path_filter=path_filter):
+        yield from msg_directory.msg_entries
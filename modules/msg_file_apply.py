@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+msg_file_apply.py
+
+Dieses Modul enthält die Dateioperationen für eine MSG-Datei, nachdem der neue Dateiname feststeht (Apply-Stufe):
+Prüfung auf Doublette, Löschen der Doublette bzw. Umbenennen und Setzen von Erstellungs- und Änderungsdatum.
+
+Die Funktion führt nur die Operationen aus und gibt deren Ergebnisse zurück. Zähler, Konsolenausgaben, zurückgestellte
+Wiederholungen und Logging übernimmt msg_file_renamer.py in der Reihenfolge der Dateien. Dadurch kann die Funktion
+für mehrere Dateien gleichzeitig in einem Thread-Pool laufen (utils.keyed_executor, --apply_workers).
+
+Funktionen und Klassen:
+- MsgApplyResult: Datenklasse mit den Ergebnissen der Dateioperationen.
+- apply_msg_file_changes(...): Führt die Dateioperationen für eine MSG-Datei aus.
+- apply_operation_keys(...): Schlüssel für KeyedThreadPoolExecutor (alter und neuer Dateiname).
+"""
+import datetime
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.file_handling import rename_file, delete_file, set_file_creation_date, set_file_modification_date, FileOperationResult
+from utils.keyed_executor import operation_key
+from utils.stage_timing import timed_stage, STAGE_RENAME, STAGE_TIMESTAMPS
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_file_apply' aktiviert.")
+
+
+@dataclass
+class MsgApplyResult:
+    """
+    MsgApplyResult
+
+    Diese Datenklasse enthält die Ergebnisse der Dateioperationen für eine MSG-Datei.
+
+    Attribute:
+    - is_name_unchanged: Alter und neuer Dateiname sind gleich.
+    - is_doublette: Eine Datei mit dem neuen Namen existiert bereits.
+    - delete_result: Ergebnis des Löschens der Doublette (None, wenn nicht versucht).
+    - rename_result: Ergebnis der Umbenennung (None, wenn nicht versucht).
+    - creation_date_result: Ergebnis von set_file_creation_date (None, wenn nicht versucht).
+    - modification_date_result: Ergebnis von set_file_modification_date (None, wenn nicht versucht).
+    - is_datetime_stamp_missing: Zeitstempel sollten gesetzt werden, aber kein Versanddatum ist bekannt.
+    """
+    is_name_unchanged: bool = False
+    is_doublette: bool = False
+    delete_result: Optional[FileOperationResult] = None
+    rename_result: Optional[FileOperationResult] = None
+    creation_date_result: Optional[FileOperationResult] = None
+    modification_date_result: Optional[FileOperationResult] = None
+    is_datetime_stamp_missing: bool = False
+
+
+def apply_operation_keys(old_path_and_file_name: str, new_path_and_file_name: str) -> set:
+    """
+    Liefert die Schlüssel der Dateioperationen einer MSG-Datei für KeyedThreadPoolExecutor.
+    Operationen, die denselben alten oder neuen Dateinamen berühren, werden damit in Übergabereihenfolge ausgeführt.
+
+    Parameter:
+    old_path_and_file_name (str): Alter absoluter Dateiname.
+    new_path_and_file_name (str): Neuer absoluter Dateiname.
+
+    Rückgabewert:
+    set: Schlüssel der beiden Dateinamen.
+    """
+    return {operation_key(old_path_and_file_name), operation_key(new_path_and_file_name)}
+
+
+def apply_msg_file_changes(old_path_and_file_name: str, new_path_and_file_name: str, datetime_stamp, test_run: bool = True,
+                           set_filedate: bool = False, max_console_output: bool = False, stage_seconds: Optional[dict] = None) -> MsgApplyResult:
+    """
+    Führt die Dateioperationen für eine MSG-Datei aus, deren neuer Dateiname feststeht.
+
+    - Gleicher Name: keine Umbenennung, nur ggf. Zeitstempel.
+    - Neuer Name existiert bereits: Doublette, wird gelöscht (außer im Testlauf).
+    - Sonst: Umbenennung (außer im Testlauf).
+    - Nach erfolgreicher Umbenennung bzw. bei gleichem Namen: Erstellungs- und Änderungsdatum auf das Versanddatum setzen.
+
+    Parameter:
+    old_path_and_file_name (str): Alter absoluter Dateiname.
+    new_path_and_file_name (str): Neuer absoluter Dateiname.
+    datetime_stamp (datetime | str): Versanddatum (oder "Unbekannt").
+    test_run (bool): Testlauf, es werden keine Dateien verändert.
+    set_filedate (bool): Erstellungs- und Änderungsdatum setzen.
+    max_console_output (bool): Ausführliche Ausgabe auf der Console (nur ohne Thread-Pool sinnvoll).
+    stage_seconds (dict): Laufzeiten der Datei; Umbenennen (inkl. Doublette) und Zeitstempel werden addiert (None = nicht messen).
+
+    Rückgabewert:
+    MsgApplyResult: Die Ergebnisse der Dateioperationen.
+    """
+    apply_result = MsgApplyResult()
+    is_msg_file_for_change_date_available = False
+
+    with timed_stage(stage_seconds, STAGE_RENAME):
+        if old_path_and_file_name == new_path_and_file_name:
+            apply_result.is_name_unchanged = True
+            is_msg_file_for_change_date_available = True
+        elif os.path.exists(new_path_and_file_name):
+            apply_result.is_doublette = True
+            if not test_run:
+                apply_result.delete_result = delete_file(old_path_and_file_name)
+        elif not test_run:
+            apply_result.rename_result = rename_file(old_path_and_file_name, new_path_and_file_name, max_console_output=max_console_output)
+            is_msg_file_for_change_date_available = apply_result.rename_result == FileOperationResult.SUCCESS
+
+    if is_msg_file_for_change_date_available and (not test_run) and set_filedate:
+        if datetime_stamp != "Unbekannt":
+            # Konvertiere ein datetime-Objekt in einen String im richtigen Format, sonst annehmen, dass es bereits ein String ist
+            if isinstance(datetime_stamp, datetime.datetime):
+                datetime_stamp_str = datetime_stamp.strftime("%Y-%m-%d %H:%M:%S")
+            else:
+                datetime_stamp_str = datetime_stamp
+            with timed_stage(stage_seconds, STAGE_TIMESTAMPS):
+                apply_result.creation_date_result = set_file_creation_date(new_path_and_file_name, datetime_stamp_str)
+                apply_result.modification_date_result = set_file_modification_date(new_path_and_file_name, datetime_stamp_str)
+        else:
+            apply_result.is_datetime_stamp_missing = True
+
+    return apply_result
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+msg_file_stages.py
+
+Dieses Modul enthält den Arbeitsauftrag je MSG-Datei und die Stufen der Verarbeitungskette von msg_file_renamer.py
+(utils.staged_pipeline):
+
+    Zugriff prüfen -> neuen Dateinamen erzeugen -> Dateioperationen (Apply) -> PDF erzeugen -> Auswertung und Logging
+
+Die Stufen verändern nur den Arbeitsauftrag und führen keine Zähler. Ihre Log-Einträge werden der MSG-Datei zugeordnet
+(Stichprobe der DEBUG/TRACE-Einträge, logger.log_file_context). Mit --performance_timing addieren sie ihre Laufzeiten
+zu task.stage_seconds (utils.stage_timing). Zähler, Konsolenausgaben, zurückgestellte
+Wiederholungen und das Excel-Log übernimmt msg_file_renamer.py in der Reihenfolge der Dateien.
+
+Funktionen und Klassen:
+- MsgFileTask: Datenklasse mit dem Arbeitsauftrag und den Ergebnissen der Stufen für eine MSG-Datei.
+- check_access_stage(task): Prüft den Schreib- und Lesezugriff.
+- generate_filename_stage(task, generate_filename, no_shorten_path_name): Erzeugt den neuen Dateinamen.
+- needs_apply(task): Prüft, ob Dateioperationen erforderlich sind (neuer Dateiname vorhanden).
+- apply_stage(task, test_run, set_filedate): Doublette prüfen, löschen bzw. umbenennen und Zeitstempel setzen.
+- needs_pdf(task): Prüft, ob für die Datei eine PDF-Datei erzeugt werden soll.
+- pdf_stage(task, overwrite_pdf, pdf_manifest, max_quoted_emails): Erzeugt die PDF-Datei (mit pdf_manifest nur, wenn sie fehlt oder veraltet ist).
+"""
+import functools
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from modules.msg_file_apply import apply_msg_file_changes, MsgApplyResult
+from modules.msg_generate_new_filename import MsgFilenameResult
+from utils.file_handling import test_file_access, FileAccessStatus
+from modules.msg_pdf_pool import generate_msg_pdf, MsgPdfStatus
+from modules.msg_pdf_manifest import PdfManifest, PdfFreshness
+from utils.stage_timing import timed_stage, STAGE_ACCESS, STAGE_PDF
+from logger import initialize_logger, log_file_context
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_file_stages' aktiviert.")
+
+
+@dataclass
+class MsgFileTask:
+    """
+    MsgFileTask
+
+    Diese Datenklasse enthält den Arbeitsauftrag für eine MSG-Datei und die Ergebnisse der einzelnen Stufen.
+
+    Attribute:
+    - directory_path: Verzeichnis der MSG-Datei.
+    - filename: Dateiname der MSG-Datei.
+    - path_and_file_name: Absoluter Dateiname.
+    - access_result: Ergebnis von test_file_access.
+    - new_msg_filename_collection: Ergebnis von generate_new_msg_filename (None ohne Schreibzugriff).
+    - new_file_name, new_path_and_file_name: Neuer Dateiname bzw. neuer absoluter Dateiname (None, wenn keiner erzeugt wurde).
+    - apply_result: Ergebnis der Dateioperationen (None, wenn keine ausgeführt wurden).
+    - pdf_path: Pfad der PDF-Datei (None, wenn keine PDF-Datei erzeugt werden soll).
+    - is_pdf_file_generated, is_pdf_file_skipped: PDF-Datei erzeugt bzw. übersprungen (bereits vorhanden).
+    - stage_seconds: Laufzeiten der Verarbeitungsschritte in Sekunden (None = nicht messen, siehe utils.stage_timing).
+    """
+    directory_path: str
+    filename: str
+    path_and_file_name: str
+    access_result: list = field(default_factory=list)
+    new_msg_filename_collection: Optional[MsgFilenameResult] = None
+    new_file_name: Optional[str] = None
+    new_path_and_file_name: Optional[str] = None
+    apply_result: Optional[MsgApplyResult] = None
+    pdf_path: Optional[str] = None
+    is_pdf_file_generated: bool = False
+    is_pdf_file_skipped: bool = False
+    stage_seconds: Optional[dict] = None
+
+
+def _in_log_file_context(stage: Callable) -> Callable:
+    """
+    Ordnet die Log-Einträge einer Stufe der MSG-Datei des Arbeitsauftrags zu (Stichprobe, siehe logger.log_file_context).
+    """
+    @functools.wraps(stage)
+    def stage_in_log_file_context(task: MsgFileTask, *args, **kwargs) -> MsgFileTask:
+        with log_file_context(task.path_and_file_name):
+            return stage(task, *args, **kwargs)
+    return stage_in_log_file_context
+
+
+def _timed(stage_name: str) -> Callable:
+    """
+    Addiert die Laufzeit einer Stufe zu task.stage_seconds (nur wenn gemessen wird, siehe utils.stage_timing).
+    """
+    def decorator(stage: Callable) -> Callable:
+        @functools.wraps(stage)
+        def timed_stage_function(task: MsgFileTask, *args, **kwargs) -> MsgFileTask:
+            with timed_stage(task.stage_seconds, stage_name):
+                return stage(task, *args, **kwargs)
+        return timed_stage_function
+    return decorator
+
+
+@_in_log_file_context
+@_timed(STAGE_ACCESS)
+def check_access_stage(task: MsgFileTask) -> MsgFileTask:
+    """
+    Stufe "Zugriff": Überprüft den Schreib- und Lesezugriff auf die MSG-Datei.
+    """
+    task.access_result = test_file_access(task.path_and_file_name)
+    if app_logger.isEnabledFor(logging.DEBUG):
+        app_logger.debug("Überprüfung Zugriff auf '%s': %s", task.filename, [s.value for s in task.access_result])  # Debugging-Ausgabe: Log-File
+    return task
+
+
+@_in_log_file_context
+def generate_filename_stage(task: MsgFileTask, generate_filename: Callable[[str], MsgFilenameResult], no_shorten_path_name: bool = False) -> MsgFileTask:
+    """
+    Stufe "Dateiname": Erzeugt den neuen Dateinamen, wenn die Datei schreibend geöffnet werden kann.
+
+    Parameter:
+    task (MsgFileTask): Der Arbeitsauftrag.
+    generate_filename (Callable): Funktion path -> MsgFilenameResult (generate_new_msg_filename bzw. MsgFilenamePool.result).
+    no_shorten_path_name (bool): Den nicht gekürzten Dateinamen verwenden.
+    """
+    if FileAccessStatus.WRITABLE not in task.access_result:
+        return task
+
+    task.new_msg_filename_collection = generate_filename(task.path_and_file_name)
+    if task.stage_seconds is not None and task.new_msg_filename_collection.stage_seconds:
+        task.stage_seconds.update(task.new_msg_filename_collection.stage_seconds)
+
+    # Nur wenn ein Dateiname erzeugt wurde; abhängig von no_shorten_path_name den gekürzten oder vollständigen Namen verwenden
+    if task.new_msg_filename_collection.new_truncated_msg_filename:
+        if no_shorten_path_name:
+            task.new_file_name = task.new_msg_filename_collection.new_msg_filename
+        else:
+            task.new_file_name = task.new_msg_filename_collection.new_truncated_msg_filename
+        task.new_path_and_file_name = os.path.join(task.directory_path, task.new_file_name)
+        app_logger.debug("Neuer absoluter Pfad: '%s'", task.new_path_and_file_name)  # Debugging-Ausgabe: Log-File
+    return task
+
+
+def needs_apply(task: MsgFileTask) -> bool:
+    """
+    Prüft, ob für den Arbeitsauftrag Dateioperationen erforderlich sind (neuer Dateiname vorhanden).
+    """
+    return task.new_path_and_file_name is not None
+
+
+@_in_log_file_context
+def apply_stage(task: MsgFileTask, test_run: bool = True, set_filedate: bool = False) -> MsgFileTask:
+    """
+    Stufe "Apply": Doublette prüfen, Doublette löschen bzw. umbenennen und Zeitstempel setzen (apply_msg_file_changes).
+    """
+    task.apply_result = apply_msg_file_changes(task.path_and_file_name, task.new_path_and_file_name, task.new_msg_filename_collection.datetime_stamp,
+                                               test_run=test_run, set_filedate=set_filedate, stage_seconds=task.stage_seconds)
+    return task
+
+
+def needs_pdf(task: MsgFileTask) -> bool:
+    """
+    Prüft, ob für den Arbeitsauftrag eine PDF-Datei erzeugt werden soll (neuer Dateiname vorhanden und keine Doublette).
+    """
+    return task.apply_result is not None and not task.apply_result.is_doublette
+
+
+@_in_log_file_context
+@_timed(STAGE_PDF)
+def pdf_stage(task: MsgFileTask, overwrite_pdf: bool = False, pdf_manifest: Optional[PdfManifest] = None, max_quoted_emails: Optional[int] = None) -> MsgFileTask:
+    """
+    Stufe "PDF": Erzeugt die PDF-Datei zur MSG-Datei. Eine vorhandene PDF-Datei wird nur mit overwrite_pdf überschrieben.
+    Mit pdf_manifest (--incremental_pdf) wird eine vorhandene PDF-Datei nur neu erzeugt, wenn sie veraltet ist.
+    Mit max_quoted_emails (--pdf_max_quoted_emails) werden ältere zitierte E-Mails der Antwortkette entfernt.
+    """
+    if pdf_manifest and not overwrite_pdf:
+        task.pdf_path = os.path.splitext(task.new_path_and_file_name)[0] + ".pdf"
+        pdf_freshness = pdf_manifest.check(task.new_path_and_file_name, task.pdf_path)
+        if pdf_freshness == PdfFreshness.UP_TO_DATE:
+            app_logger.info("PDF-Datei '%s' ist aktuell. Überspringe Erstellung.", task.pdf_path)
+            task.is_pdf_file_skipped = True
+            return task
+        app_logger.debug("PDF-Datei '%s': %s", task.pdf_path, pdf_freshness.value)  # Debugging-Ausgabe: Log-File
+
+    pdf_result = generate_msg_pdf(task.new_path_and_file_name, overwrite_pdf or pdf_manifest is not None, record_fingerprint=pdf_manifest is not None,
+                                  max_quoted_emails=max_quoted_emails)
+    if pdf_manifest and pdf_result.status == MsgPdfStatus.GENERATED:
+        pdf_manifest.record(pdf_result.msg_path_and_file_name, pdf_result.fingerprint, pdf_result.pdf_path_and_file_name)
+    task.pdf_path = pdf_result.pdf_path_and_file_name
+    task.is_pdf_file_skipped = pdf_result.status == MsgPdfStatus.SKIPPED
+    task.is_pdf_file_generated = pdf_result.status == MsgPdfStatus.GENERATED
+    return task
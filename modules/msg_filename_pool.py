@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+msg_filename_pool.py
+
+Dieses Modul führt das Einlesen der MSG-Dateien (get_msg_object) und die Erzeugung der neuen Dateinamen
+(generate_new_msg_filename) parallel in mehreren Prozessen aus (--workers).
+
+Beide Schritte sind CPU-gebunden und laufen sonst strikt nacheinander. Umbenennen, Löschen und Logging bleiben im
+Hauptprozess (Koordinator), damit sich das Verhalten bei Namenskollisionen und Doubletten nicht ändert: Der Koordinator
+fordert die Ergebnisse in derselben Reihenfolge an, in der die Dateien gefunden wurden.
+
+- Die Dateien werden in Blöcken (chunk_size) an den Prozess-Pool übergeben, um den Aufwand der Interprozess-
+  Kommunikation gering zu halten.
+- Es werden höchstens lookahead Dateien vor der aktuell bearbeiteten Datei eingelesen (begrenzter Speicherbedarf).
+- Mit prefetch_directories > 0 werden auch Dateien der folgenden Verzeichnisse vorab eingelesen, sodass viele kleine
+  Verzeichnisse die Prozesse auslasten. Bei 0 wird das nächste Verzeichnis erst angefordert, wenn der Koordinator
+  das aktuelle Verzeichnis abgeschlossen hat (erforderlich für --incremental und --cooperative).
+
+Funktionen und Klassen:
+- MsgFilenamePool: Prozess-Pool für die Dateinamens-Erzeugung.
+    - iter_directories(msg_directories): Reicht die Verzeichnisse durch und übergibt ihre Dateien an den Pool.
+    - result(path_and_file_name): Liefert das Ergebnis von generate_new_msg_filename für eine Datei.
+    - close(): Beendet den Prozess-Pool.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Iterable, Iterator
+
+from modules.msg_discovery import MsgDirectoryListing
+from modules.msg_generate_new_filename import generate_new_msg_filename, MsgFilenameResult
+from logger import initialize_logger, log_file_context, child_process_log_queue, initialize_child_process_logging
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_filename_pool' aktiviert.")
+
+# Standardwerte für --workers
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_CHUNK_SIZE = 8
+
+
+def _generate_msg_filename_chunk(msg_paths: tuple, generate_kwargs: dict) -> list[MsgFilenameResult]:
+    """
+    Erzeugt die neuen Dateinamen für einen Block von MSG-Dateien (läuft in einem Prozess des Pools).
+
+    Parameter:
+    msg_paths (tuple): Pfade der MSG-Dateien.
+    generate_kwargs (dict): Parameter für generate_new_msg_filename.
+
+    Rückgabewert:
+    list[MsgFilenameResult]: Die Ergebnisse in der Reihenfolge von msg_paths.
+    """
+    msg_filename_results = []
+    for msg_path in msg_paths:
+        with log_file_context(msg_path):
+            msg_filename_results.append(generate_new_msg_filename(msg_path, **generate_kwargs))
+    return msg_filename_results
+
+
+class MsgFilenamePool:
+    """
+    Erzeugt die neuen Dateinamen der MSG-Dateien in einem Prozess-Pool vorab, in der Reihenfolge der Suche.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, chunk_size: int = DEFAULT_CHUNK_SIZE, lookahead: int = 0,
+                 prefetch_directories: int = 0, **generate_kwargs):
+        """
+        Parameter:
+        max_workers (int): Anzahl der Prozesse.
+        chunk_size (int): Anzahl der Dateien je Auftrag an einen Prozess.
+        lookahead (int): Maximale Anzahl vorab eingelesener Dateien (Standard: 4 Blöcke je Prozess).
+        prefetch_directories (int): Anzahl der Verzeichnisse, deren Dateien vorab eingelesen werden dürfen.
+        generate_kwargs: Parameter für generate_new_msg_filename (max_console_output wird im Pool nicht verwendet).
+        """
+        self.max_workers = max(1, max_workers)
+        self.chunk_size = max(1, chunk_size)
+        self.lookahead = lookahead or self.max_workers * self.chunk_size * 4
+        self.prefetch_directories = max(0, prefetch_directories)
+        # Konsolenausgaben der Prozesse würden sich überlagern; ausgegeben wird nur im Koordinator
+        self.generate_kwargs = dict(generate_kwargs, max_console_output=False)
+        self._local_generate_kwargs = generate_kwargs
+
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=initialize_child_process_logging,
+                                             initargs=(child_process_log_queue(),))
+        self._unsubmitted_paths: deque[str] = deque()  # Dateien in Suchreihenfolge, noch nicht an den Pool übergeben
+        self._unsubmitted_path_set: set[str] = set()
+        self._results: dict[str, tuple[Future, int]] = {}  # Datei -> (Future des Blocks, Position im Block)
+        app_logger.info("Prozess-Pool für die Dateinamens-Erzeugung: %s Prozesse, Blockgröße %s, Vorlauf %s Dateien, %s Verzeichnis(se)",
+                        self.max_workers, self.chunk_size, self.lookahead, self.prefetch_directories)
+
+    def iter_directories(self, msg_directories: Iterable[MsgDirectoryListing]) -> Iterator[MsgDirectoryListing]:
+        """
+        Reicht die Verzeichnisse unverändert durch und übergibt deren MSG-Dateien vorab an den Prozess-Pool.
+
+        Parameter:
+        msg_directories (Iterable[MsgDirectoryListing]): Die gefundenen Verzeichnisse.
+
+        Rückgabewert:
+        Iterator[MsgDirectoryListing]: Dieselben Verzeichnisse in derselben Reihenfolge.
+        """
+        source_iterator = iter(msg_directories)
+        queued_directories: deque[MsgDirectoryListing] = deque()
+        source_exhausted = False
+
+        while True:
+            if not queued_directories:
+                if source_exhausted or not self._queue_next_directory(source_iterator, queued_directories):
+                    return
+            msg_directory = queued_directories.popleft()
+
+            # Folgende Verzeichnisse vorab einreihen, solange der Vorlauf nicht ausgeschöpft ist
+            while not source_exhausted and len(queued_directories) < self.prefetch_directories \
+                    and len(self._unsubmitted_paths) < self.lookahead:
+                source_exhausted = not self._queue_next_directory(source_iterator, queued_directories)
+            self._submit_pending()
+
+            yield msg_directory
+
+            # Nicht angeforderte Ergebnisse (z.B. gesperrte Dateien) des abgeschlossenen Verzeichnisses verwerfen
+            self._discard({msg_entry.path for msg_entry in msg_directory.msg_entries})
+
+    def result(self, path_and_file_name: str) -> MsgFilenameResult:
+        """
+        Liefert das Ergebnis von generate_new_msg_filename für eine Datei.
+        Dateien, die nicht über iter_directories eingereiht wurden, werden direkt im Koordinator bearbeitet.
+
+        Parameter:
+        path_and_file_name (str): Pfad der MSG-Datei.
+
+        Rückgabewert:
+        MsgFilenameResult: Das Ergebnis der Dateinamens-Erzeugung.
+        """
+        # Bis zur angeforderten Datei übergeben (z.B. wenn Dateien davor nicht angefordert wurden)
+        while path_and_file_name not in self._results and path_and_file_name in self._unsubmitted_path_set:
+            self._submit_chunk()
+
+        if path_and_file_name not in self._results:
+            return generate_new_msg_filename(path_and_file_name, **self._local_generate_kwargs)
+
+        future, chunk_position = self._results.pop(path_and_file_name)
+        self._submit_pending()
+        return future.result()[chunk_position]
+
+    def close(self):
+        """
+        Beendet den Prozess-Pool; noch nicht begonnene Aufträge werden verworfen.
+        """
+        self._unsubmitted_paths.clear()
+        self._unsubmitted_path_set.clear()
+        self._results.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _queue_next_directory(self, source_iterator: Iterator[MsgDirectoryListing], queued_directories: deque) -> bool:
+        try:
+            msg_directory = next(source_iterator)
+        except StopIteration:
+            return False
+        queued_directories.append(msg_directory)
+        for msg_entry in msg_directory.msg_entries:
+            self._unsubmitted_paths.append(msg_entry.path)
+            self._unsubmitted_path_set.add(msg_entry.path)
+        return True
+
+    def _submit_pending(self):
+        """
+        Übergibt Blöcke an den Pool, bis der Vorlauf ausgeschöpft ist.
+        """
+        while self._unsubmitted_paths and len(self._results) < self.lookahead:
+            self._submit_chunk()
+
+    def _submit_chunk(self):
+        chunk_paths = tuple(self._unsubmitted_paths.popleft() for _ in range(min(self.chunk_size, len(self._unsubmitted_paths))))
+        future = self._executor.submit(_generate_msg_filename_chunk, chunk_paths, self.generate_kwargs)
+        for chunk_position, msg_path in enumerate(chunk_paths):
+            self._unsubmitted_path_set.discard(msg_path)
+            self._results[msg_path] = (future, chunk_position)
+
+    def _discard(self, msg_paths: set):
+        """
+        Verwirft die Einträge eines abgeschlossenen Verzeichnisses; noch nicht übergebene Dateien stehen am Anfang der Warteschlange.
+        """
+        for msg_path in msg_paths:
+            self._results.pop(msg_path, None)
+        while self._unsubmitted_paths and self._unsubmitted_paths[0] in msg_paths:
+            self._unsubmitted_path_set.discard(self._unsubmitted_paths.popleft())
@@ -13,11 +13,14 @@ Importieren Sie dieses Modul in Ihr Skript, um neue Dateinamen für MSG-Dateien
 """
 
 import os
+import time
 from datetime import datetime  # Stellen Sie sicher, dass nur die Klasse datetime importiert wird
+from typing import Optional
 from modules.msg_handling import parse_sender_msg_file, \
     load_known_senders, convert_to_utc_naive, format_datetime, \
     custom_sanitize_text, truncate_filename_if_needed, MsgAccessStatus, get_msg_object
 from dataclasses import dataclass
+from utils.stage_timing import timed_stage, STAGE_MSG_READ, STAGE_FILENAME
 
 from logger import initialize_logger
 # In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
@@ -41,6 +44,7 @@ class MsgFilenameResult:
     - new_msg_filename: Der neu generierte Dateiname für die MSG-Datei.
     - new_truncated_msg_filename: Der gekürzte Dateiname, falls der ursprüngliche Dateiname die maximale Pfadlänge überschreitet.
     - is_msg_filename_truncated: Ein boolescher Wert, der angibt, ob der Dateiname gekürzt wurde.
+    - stage_seconds: Laufzeiten von Einlesen und Dateinamens-Erzeugung in Sekunden (None, wenn nicht gemessen).
 
     Verwendung:
     Diese Klasse wird verwendet, um die Ergebnisse der Funktion `generate_new_msg_filename` zu speichern und zurückzugeben.
@@ -54,13 +58,15 @@ class MsgFilenameResult:
     new_msg_filename: str
     new_truncated_msg_filename: str
     is_msg_filename_truncated: bool
+    stage_seconds: Optional[dict] = None
 
 # Liste der bekannten Email-Absender aus einer CSV-Datei
 LIST_OF_KNOWN_SENDERS = r'.\config\known_senders_private.csv'
 
 PRINT_RESULT = False
 
-def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=False, file_list_of_known_senders=LIST_OF_KNOWN_SENDERS, max_console_output=False, max_path_length=260):
+def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=False, file_list_of_known_senders=LIST_OF_KNOWN_SENDERS, max_console_output=False, max_path_length=260,
+                              measure_stages=False):
     """
     generate_new_msg_filename(msg_path_and_filename, max_path_length=260)
 
@@ -69,6 +75,7 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
     Parameter:
     - msg_path_and_filename: Der vollständige Pfad zur MSG-Datei, für die ein neuer Dateiname generiert werden soll.
     - max_path_length: Die maximale Länge des Dateipfads. Standardmäßig auf 260 Zeichen gesetzt.
+    - measure_stages: Laufzeiten von Einlesen und Dateinamens-Erzeugung messen (--performance_timing).
 
     Rückgabe:
     - Ein MsgFilenameResult-Objekt, das Informationen wie den Zeitstempel, den formatierten Zeitstempel, den Absendernamen, die Absender-E-Mail, den Betreff, den bereinigten Betreff, den neuen Dateinamen, den gekürzten Dateinamen (falls erforderlich) und einen Indikator, ob der Dateiname gekürzt wurde, enthält.
@@ -81,21 +88,23 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
     if max_console_output: print(f"\t*************************************************************")
 
     format_string = "%Y%m%d-%Huhr%M"  # Beispiel für das gewünschte Format für Zeitstempel
+    stage_seconds = {} if measure_stages else None
+    start_time = time.perf_counter() if measure_stages else 0.0
 
     # 0. Schritt: Laden der bekannten Sender aus der Tabelle der bekannten Email-Absender, wenn use_list_of_known_senders ist True
     if use_list_of_known_senders:
-        app_logger.debug(f"Schritt 0: Versuche Einlesen Liste bekannter Email-Absender aus CSV-Datei: {file_list_of_known_senders}'")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Schritt 0: Versuche Einlesen Liste bekannter Email-Absender aus CSV-Datei: %s'", file_list_of_known_senders)  # Debugging-Ausgabe: Log-File
         # Prüfen, ob die Datei existiert und lesbar ist
         if os.path.exists(file_list_of_known_senders) and os.access(file_list_of_known_senders, os.R_OK):
             if max_console_output: print(f"\tSchritt 0: Die Tabelle der bekannten Email-Absender '{file_list_of_known_senders}' ist zugänglich und lesbar.")
-            app_logger.debug(f"Schritt 0: Die Tabelle der bekannten Email-Absender '{file_list_of_known_senders}' ist zugänglich und lesbar.")  # Debugging-Ausgabe: Log-File
+            app_logger.debug("Schritt 0: Die Tabelle der bekannten Email-Absender '%s' ist zugänglich und lesbar.", file_list_of_known_senders)  # Debugging-Ausgabe: Log-File
 
             known_senders_df = load_known_senders(file_list_of_known_senders)  # Laden der bekannten Sender aus der CSV-Datei als Dataframe
-            app_logger.trace(f"Schritt 0: Liste der bekannten Email-Absender: {known_senders_df}'")  # Debugging-Ausgabe: Log-File
+            app_logger.trace("Schritt 0: Liste der bekannten Email-Absender: %s'", known_senders_df)  # Debugging-Ausgabe: Log-File
             exist_csv_file = True
         else:
             if max_console_output: print(f"\tSchritt 0: Die Tabelle der bekannten Email-Absender '{file_list_of_known_senders}' ist nicht zugänglich bzw. nicht lesbar.")
-            app_logger.warning(f"\tSchritt 0: Die Tabelle der bekannten Email-Absender '{file_list_of_known_senders}' ist nicht zugänglich bzw. nicht lesbar.")
+            app_logger.warning("\tSchritt 0: Die Tabelle der bekannten Email-Absender '%s' ist nicht zugänglich bzw. nicht lesbar.", file_list_of_known_senders)
             exist_csv_file = False
     else:
         if max_console_output: print(f"\tSchritt 0: Die Tabelle der bekannten Email-Absender wird nicht genutzt.")
@@ -103,14 +112,15 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
         exist_csv_file = False
 
     # Auslesen des msg-Objektes
-    app_logger.debug(f"Schritt 0: Jetzt versuche ich das MSG-Objekt aus der Datei '{msg_path_and_filename}' auzulesen.")  # Debugging-Ausgabe: Log-File
-    msg_object = get_msg_object(msg_path_and_filename)
+    app_logger.debug("Schritt 0: Jetzt versuche ich das MSG-Objekt aus der Datei '%s' auzulesen.", msg_path_and_filename)  # Debugging-Ausgabe: Log-File
+    with timed_stage(stage_seconds, STAGE_MSG_READ):
+        msg_object = get_msg_object(msg_path_and_filename)
 
     # 1. Schritt: Absender-String aus der MSG-Datei abrufen mit alternativer Methode
     if MsgAccessStatus.SUCCESS in msg_object["status"] and MsgAccessStatus.SENDER_MISSING not in msg_object["status"]:
         found_msg_sender_string = msg_object["sender"]  # Absender extrahieren
         if max_console_output: print(f"\tSchritt 1: In MSG-Datei gefundener Absender-String: {found_msg_sender_string}'") # Debugging-Ausgabe: Console
-        app_logger.debug(f"Schritt 1: In MSG-Datei gefundener Absender-String: {found_msg_sender_string}'")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Schritt 1: In MSG-Datei gefundener Absender-String: %s'", found_msg_sender_string)  # Debugging-Ausgabe: Log-File
     else:
         found_msg_sender_string = ""
         if max_console_output: print(f"\tSchritt 1: In MSG-Datei keinen Absender-String gefunden.")  # Debugging-Ausgabe: Console
@@ -123,7 +133,7 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
     if MsgAccessStatus.SUCCESS in msg_object["status"] and MsgAccessStatus.SENDER_MISSING not in msg_object["status"]:
         parsed_sender_email = parse_sender_msg_file(found_msg_sender_string)
         if max_console_output: print(f"\tSchritt 2: Absender-Email in Absender-String der MSG-Datei gefunden: '{parsed_sender_email['sender_email']}'")  # Debugging-Ausgabe: Console
-        app_logger.debug(f"Schritt 2: Absender-Email in Absender-String der MSG-Datei gefunden: '{parsed_sender_email['sender_email']}'")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Schritt 2: Absender-Email in Absender-String der MSG-Datei gefunden: '%s'", parsed_sender_email['sender_email'])  # Debugging-Ausgabe: Log-File
     else:
         if max_console_output: print(f"\tSchritt 2: Absender-String der MSG-Datei ist fehlerhaft oder unbekannt.")
         app_logger.debug(f"Schritt 2: Absender-String der MSG-Datei ist fehlerhaft oder unbekannt.")
@@ -138,14 +148,14 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
                 parsed_sender_email["sender_email"] = known_sender_row.iloc[0]["sender_email"]
                 parsed_sender_email["contains_sender_email"] = True
                 if max_console_output: print(f"\tSchritt 3: In Tabelle gefundene Absender-Email: '{parsed_sender_email['sender_email']}'")  # Debugging-Ausgabe: Console
-                app_logger.debug(f"Schritt 3: In Tabelle gefundene Absender-Email: '{parsed_sender_email['sender_email']}'")  # Debugging-Ausgabe: Log-File
+                app_logger.debug("Schritt 3: In Tabelle gefundene Absender-Email: '%s'", parsed_sender_email['sender_email'])  # Debugging-Ausgabe: Log-File
             else:
                 parsed_sender_email["contains_sender_email"] = False
                 if max_console_output: print(f"\tSchritt 3: In Tabelle keine Absender-Email für folgenden Absender-String gefunden: '{found_msg_sender_string}'")  # Debugging-Ausgabe: Console
-                app_logger.warning(f"Schritt 3: In Tabelle keine Absender-Email für folgenden Absender-String gefunden: '{found_msg_sender_string}'")  # Debugging-Ausgabe: Log-File
+                app_logger.warning("Schritt 3: In Tabelle keine Absender-Email für folgenden Absender-String gefunden: '%s'", found_msg_sender_string)  # Debugging-Ausgabe: Log-File
         else:
             if max_console_output: print(f"\tSchritt 3: Kein Suchen in der Tabelle der bekannten Email-Absender möglich: '{file_list_of_known_senders}'")  # Debugging-Ausgabe: Console
-            app_logger.debug(f"Schritt 3: Kein Suchen in Tabelle der bekannten Email-Absender möglich: '{file_list_of_known_senders}'")  # Debugging-Ausgabe: Log-File
+            app_logger.debug("Schritt 3: Kein Suchen in Tabelle der bekannten Email-Absender möglich: '%s'", file_list_of_known_senders)  # Debugging-Ausgabe: Log-File
 
     else:
         if max_console_output: print(f"\tSchritt 3: Kein Nachschlagen in der Tabelle der bekannten Email-Absender erforderlich bzw. gewünscht.")  # Debugging-Ausgabe: Console
@@ -156,7 +166,7 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
         datetime_stamp = msg_object['date']
         datetime_stamp = convert_to_utc_naive(datetime_stamp)  # Sicherstellen, dass der Zeitstempel zeitzonenunabhängig ist
         if max_console_output: print(f"\tSchritt 4: Versanddatum abrufen und konvertieren: '{datetime_stamp}'")  # Debugging-Ausgabe: Console
-        app_logger.debug(f"Schritt 4: Versanddatum abrufen und konvertieren: '{datetime_stamp}'")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Schritt 4: Versanddatum abrufen und konvertieren: '%s'", datetime_stamp)  # Debugging-Ausgabe: Log-File
 
         # 4a. Schritt: Formatiertes Versanddatum ermitteln
         try: 
@@ -165,25 +175,25 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
             datetime_stamp = ""
             formatted_timestamp = ""
             if max_console_output: print(f"\tSchritt 4: Kein Versanddatum gefunden, wegen Fehler: '{e}'")  # Debugging-Ausgabe: Console
-            app_logger.debug(f"Schritt 4a: Kein Versanddatum gefunden, wegen Fehler: '{e}'")  # Debugging-Ausgabe: Log-File
+            app_logger.debug("Schritt 4a: Kein Versanddatum gefunden, wegen Fehler: '%s'", e)  # Debugging-Ausgabe: Log-File
 
         if max_console_output: print(f"\tSchritt 4a: Formatiertes Versanddatum: '{formatted_timestamp}'")  # Debugging-Ausgabe: Console
-        app_logger.debug(f"Schritt 4a: Formatiertes Versanddatum: '{formatted_timestamp}'")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Schritt 4a: Formatiertes Versanddatum: '%s'", formatted_timestamp)  # Debugging-Ausgabe: Log-File
     else:
         datetime_stamp = ""
         formatted_timestamp = ""
         if max_console_output: print(f"\tSchritt 4a: Kein Versanddatum gefunden: '{msg_object['status']}'")  # Debugging-Ausgabe: Console
-        app_logger.debug(f"Schritt 4a: Kein Versanddatum gefunden: '{msg_object['status']}'")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Schritt 4a: Kein Versanddatum gefunden: '%s'", msg_object['status'])  # Debugging-Ausgabe: Log-File
 
     if MsgAccessStatus.SUCCESS in msg_object["status"] and MsgAccessStatus.SUBJECT_MISSING not in msg_object["status"]:
         msg_subject = msg_object["subject"]
         if max_console_output: print(f"\tSchritt 5: Ermittelter Betreff: '{msg_subject}'")  # Debugging-Ausgabe: Console
-        app_logger.debug(f"Schritt 5: Betreff ermitteln: '{msg_subject}'")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Schritt 5: Betreff ermitteln: '%s'", msg_subject)  # Debugging-Ausgabe: Log-File
 
         # 6. Schritt: Betreff bereinigen
         msg_subject_sanitized = custom_sanitize_text(msg_subject)  # Betreff bereinigen
         if max_console_output: print(f"\tSchritt 6: Bereinigten Betreff ermitteln: '{msg_subject_sanitized}'")  # Debugging-Ausgabe: Console
-        app_logger.debug(f"Schritt 6: Bereinigten Betreff ermitteln: '{msg_subject_sanitized}'")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Schritt 6: Bereinigten Betreff ermitteln: '%s'", msg_subject_sanitized)  # Debugging-Ausgabe: Log-File
 
     else:
         msg_subject = ""
@@ -193,11 +203,11 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
     new_msg_filename = f"{formatted_timestamp}_{parsed_sender_email['sender_email']}_{msg_subject_sanitized}.msg"
     msg_pathname = os.path.dirname(msg_path_and_filename)  # Verzeichnisname der MSG-Datei
     if max_console_output: print(f"\tSchritt 7: Neuer Dateiname: '{new_msg_filename}'")  # Debugging-Ausgabe: Console
-    app_logger.debug(f"Schritt 7: Neuer Dateiname: '{new_msg_filename}'")  # Debugging-Ausgabe: Log-File
+    app_logger.debug("Schritt 7: Neuer Dateiname: '%s'", new_msg_filename)  # Debugging-Ausgabe: Log-File
 
     new_msg_path_and_filename = os.path.join(msg_pathname, new_msg_filename)  # Neuer absoluter Dateipfad
     if max_console_output: print(f"\tSchritt 8: Neuer absoluter Dateiname: '{new_msg_path_and_filename}'")  # Debugging-Ausgabe: Console
-    app_logger.debug(f"Schritt 8: Neuer absoluter Dateiname: '{new_msg_path_and_filename}'")  # Debugging-Ausgabe: Log-File
+    app_logger.debug("Schritt 8: Neuer absoluter Dateiname: '%s'", new_msg_path_and_filename)  # Debugging-Ausgabe: Log-File
 
     # 9. Schritt: Kürzen des Dateinamens, falls nötig
     if len(new_msg_path_and_filename) > max_path_length:
@@ -205,7 +215,7 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
         new_truncated_msg_filename = os.path.basename(new_truncated_msg_path_and_filename)
         is_msg_filename_truncated = True
         if max_console_output: print(f"\tSchritt 9: Neuer gekürzter Dateiname: '{new_truncated_msg_filename}'")  # Debugging-Ausgabe: Console
-        app_logger.debug(f"Schritt 9: Neuer gekürzter Dateiname: '{new_truncated_msg_filename}'")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Schritt 9: Neuer gekürzter Dateiname: '%s'", new_truncated_msg_filename)  # Debugging-Ausgabe: Log-File
     else:
         new_truncated_msg_path_and_filename = new_msg_path_and_filename
         new_truncated_msg_filename = new_msg_filename
@@ -227,6 +237,10 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
         print(f"\tKürzung Dateiname erforderlich: {is_msg_filename_truncated}")
         print(f"\tNeuer gekürzter Dateiname: {new_truncated_msg_filename}\n")
 
+    # Dateinamens-Erzeugung = Gesamtzeit ohne das Einlesen der MSG-Datei
+    if stage_seconds is not None:
+        stage_seconds[STAGE_FILENAME] = time.perf_counter() - start_time - stage_seconds[STAGE_MSG_READ]
+
     # Rückgabe der gewünschten Informationen als MsgFilenameResult
     return MsgFilenameResult(
         datetime_stamp=datetime_stamp,
@@ -237,5 +251,6 @@ def generate_new_msg_filename(msg_path_and_filename, use_list_of_known_senders=F
         msg_subject_sanitized=msg_subject_sanitized,
         new_msg_filename=new_msg_filename,
         new_truncated_msg_filename=new_truncated_msg_filename,
-        is_msg_filename_truncated=is_msg_filename_truncated
+        is_msg_filename_truncated=is_msg_filename_truncated,
+        stage_seconds=stage_seconds
     )
\ No newline at end of file
@@ -25,9 +25,12 @@ Beispiel:
     from modules.msg_handling import get_msg_object
     msg_data = get_msg_object('example.msg')
 """
+import contextlib
 import extract_msg
 import re
 import os
+import signal
+import threading
 import pandas as pd
 from datetime import datetime
 from enum import Enum
@@ -102,7 +105,7 @@ def get_msg_object(msg_file: str) -> dict:
     }
 
     try:
-        app_logger.debug(f"Öffne MSG-Datei: {msg_file}")  # Debugging-Ausgabe
+        app_logger.debug("Öffne MSG-Datei: %s", msg_file)  # Debugging-Ausgabe
 
         # Sicherstellen, dass die Datei mit `with` geöffnet und automatisch geschlossen wird
         with extract_msg.Message(msg_file) as msg_object:
@@ -118,7 +121,7 @@ def get_msg_object(msg_file: str) -> dict:
                 if msg_object.subject:
                     msg_data["subject"] = msg_object.subject
                     msg_data["status"] = [MsgAccessStatus.SUCCESS]  # Setze SUCCESS, wenn Betreff erfolgreich extrahiert
-                    app_logger.debug(f"'subject' aus der MSG-Datei erfolgreich extrahiert: {msg_data['subject']}")  # Debugging-Ausgabe
+                    app_logger.debug("'subject' aus der MSG-Datei erfolgreich extrahiert: %s", msg_data['subject'])  # Debugging-Ausgabe
                 else:
                     msg_data["status"].append(MsgAccessStatus.SUBJECT_MISSING)
                     app_logger.warning(f"'subject' konnte nicht aus der MSG-Datei extrahiert werden.")
@@ -130,7 +133,7 @@ def get_msg_object(msg_file: str) -> dict:
                 if msg_object.sender:
                     msg_data["sender"] = msg_object.sender
                     msg_data["status"] = [MsgAccessStatus.SUCCESS]  # Setze SUCCESS, wenn Sender erfolgreich extrahiert
-                    app_logger.debug(f"'sender' aus der MSG-Datei erfolgreich extrahiert: {msg_data['sender']}")  # Debugging-Ausgabe
+                    app_logger.debug("'sender' aus der MSG-Datei erfolgreich extrahiert: %s", msg_data['sender'])  # Debugging-Ausgabe
                 else:
                     msg_data["status"].append(MsgAccessStatus.SENDER_MISSING)
                     app_logger.warning(f"'sender' konnte nicht aus der MSG-Datei extrahiert werden.")
@@ -142,7 +145,7 @@ def get_msg_object(msg_file: str) -> dict:
                 if msg_object.recipients:
                     msg_data["recipient"] = msg_object.to
                     msg_data["status"] = [MsgAccessStatus.SUCCESS]  # Setze SUCCESS, wenn Sender erfolgreich extrahiert
-                    app_logger.debug(f"'recipient' aus der MSG-Datei erfolgreich extrahiert: {msg_data['recipient']}")  # Debugging-Ausgabe
+                    app_logger.debug("'recipient' aus der MSG-Datei erfolgreich extrahiert: %s", msg_data['recipient'])  # Debugging-Ausgabe
                 else:
                     msg_data["status"].append(MsgAccessStatus.NO_RECIPIENT_FOUND)
                     app_logger.warning(f"'recipient' konnte nicht aus der MSG-Datei extrahiert werden.")
@@ -154,7 +157,7 @@ def get_msg_object(msg_file: str) -> dict:
                 if msg_object.date:
                     msg_data["date"] = msg_object.date
                     msg_data["status"] = [MsgAccessStatus.SUCCESS]  # Setze SUCCESS, wenn Datum erfolgreich extrahiert
-                    app_logger.debug(f"'date' aus der MSG-Datei erfolgreich extrahiert: {msg_data['date']}")  # Debugging-Ausgabe
+                    app_logger.debug("'date' aus der MSG-Datei erfolgreich extrahiert: %s", msg_data['date'])  # Debugging-Ausgabe
                 else:
                     msg_data["status"].append(MsgAccessStatus.DATE_MISSING)
                     app_logger.warning(f"'date' konnte nicht aus der MSG-Datei extrahiert werden.")
@@ -166,7 +169,7 @@ def get_msg_object(msg_file: str) -> dict:
                 if msg_object.body:
                     msg_data["body"] = msg_object.body
                     msg_data["status"] = [MsgAccessStatus.SUCCESS]  # Setze SUCCESS, wenn Body erfolgreich extrahiert
-                    app_logger.debug(f"'body' aus der MSG-Datei erfolgreich extrahiert mit Anzahl Zeichen: {len(msg_data['body'])}")  # Debugging-Ausgabe {msg_data}")  # Debugging-Ausgabe
+                    app_logger.debug("'body' aus der MSG-Datei erfolgreich extrahiert mit Anzahl Zeichen: %s", len(msg_data['body']))  # Debugging-Ausgabe {msg_data}")  # Debugging-Ausgabe
                 else:
                     msg_data["status"].append(MsgAccessStatus.BODY_MISSING)
                     app_logger.warning(f"'body' konnte nicht aus der MSG-Datei extrahiert werden.")
@@ -181,7 +184,7 @@ def get_msg_object(msg_file: str) -> dict:
                 if msg_object.attachments:
                     msg_data["attachments"] = [att.longFilename or att.shortFilename or "unbenannt" for att in msg_object.attachments]
                     #msg_data["attachments"] = msg_object.attachments
-                    app_logger.debug(f"'attachments' aus der MSG-Datei erfolgreich extrahiert mit Anzahl Zeichen: {len(msg_data['attachments'])}")
+                    app_logger.debug("'attachments' aus der MSG-Datei erfolgreich extrahiert mit Anzahl Zeichen: %s", len(msg_data['attachments']))
                 else:
                     msg_data["status"].append(MsgAccessStatus.ATTACHMENTS_MISSING)
                     app_logger.warning(f"'attachments' konnte nicht aus der MSG-Datei extrahiert werden bzw. keine vorhanden.")
@@ -240,7 +243,7 @@ def create_log_file(base_name, directory, table_header):
 
     try:
         df.to_excel(log_file_path, index=False)
-        app_logger.debug(f"Logging Excel-Datei erfolgreich erstellt: {log_file_path}")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Logging Excel-Datei erfolgreich erstellt: %s", log_file_path)  # Debugging-Ausgabe: Log-File
         return log_file_path
     except Exception as e:
         app_logger.error(f"Fehler beim Erstellen der Logdatei: {e}")  # Debugging-Ausgabe: Log-File
@@ -251,7 +254,7 @@ def create_log_file_neu(base_name, directory, table_header, sheet_name="Log"):
     Erstellt ein Logfile im Excel-Format mit Zeitstempel und optionalem Sheetnamen.
 
     Parameter:
-    base_name (str): Der Basisname der Logdatei.
+    base_name (str): Der Basisname der Logdatei (z.B. "excel_log_file_", Zeitstempel und ".xlsx" werden angehängt).
     directory (str): Das Zielverzeichnis für die Datei.
     table_header (list): Die Spaltenüberschriften für die leere Tabelle.
     sheet_name (str): Der Name des Sheets (Standard: "Log").
@@ -260,7 +263,7 @@ def create_log_file_neu(base_name, directory, table_header, sheet_name="Log"):
     str: Der Pfad zur erstellten Logdatei.
     """
     current_time = datetime.now()
-    excel_log_file_name = current_time.strftime("excel_log_file_%Y-%m-%d_%HUhr%M_%Ss.xlsx")
+    excel_log_file_name = f"{base_name}{current_time.strftime('%Y-%m-%d_%HUhr%M_%Ss.xlsx')}"
     excel_log_file_path = os.path.join(directory, excel_log_file_name)
 
     # Leeres DataFrame mit Header erstellen
@@ -269,7 +272,7 @@ def create_log_file_neu(base_name, directory, table_header, sheet_name="Log"):
     try:
         with pd.ExcelWriter(excel_log_file_path, engine="openpyxl", mode="w") as writer:
             df.to_excel(writer, sheet_name=sheet_name, index=False)
-        app_logger.debug(f"Logging Excel-Datei erfolgreich erstellt: {excel_log_file_path}")
+        app_logger.debug("Logging Excel-Datei erfolgreich erstellt: %s", excel_log_file_path)
         return excel_log_file_path
     except Exception as e:
         app_logger.error(f"Fehler beim Erstellen der Logdatei: {e}")
@@ -307,6 +310,25 @@ def log_entry(log_file_path, entry):
         # Speichern des aktualisierten DataFrames in die Logdatei
         df.to_excel(log_file_path, index=False)
 
+@contextlib.contextmanager
+def _deferred_keyboard_interrupt():
+    """
+    Hält Strg+C (SIGINT) während des with-Blocks zurück und löst KeyboardInterrupt erst danach aus, damit eine
+    Excel-Datei nicht halb geschrieben wird. Außerhalb des Hauptthreads wirkungslos.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    received_signals = []
+    previous_handler = signal.signal(signal.SIGINT, lambda signal_number, frame: received_signals.append(signal_number))
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    if received_signals:
+        raise KeyboardInterrupt
+
+
 def log_entry_neu(log_file_path, entry, sheet_name="Log"):
     """
     Fügt einen oder mehrere Einträge in das Logfile (Excel) hinzu.
@@ -354,13 +376,14 @@ def log_entry_neu(log_file_path, entry, sheet_name="Log"):
     else:
         df_neu = new_entry_df
 
-    # Schreiben (bestehendes Sheet ersetzen)
-    try:
-        with pd.ExcelWriter(log_file_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-            df_neu.to_excel(writer, sheet_name=sheet_name, index=False)
-    except FileNotFoundError:
-        with pd.ExcelWriter(log_file_path, engine="openpyxl", mode="w") as writer:
-            df_neu.to_excel(writer, sheet_name=sheet_name, index=False)
+    # Schreiben (bestehendes Sheet ersetzen); ein Abbruch mit Strg+C wirkt erst nach dem Schreiben
+    with _deferred_keyboard_interrupt():
+        try:
+            with pd.ExcelWriter(log_file_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+                df_neu.to_excel(writer, sheet_name=sheet_name, index=False)
+        except FileNotFoundError:
+            with pd.ExcelWriter(log_file_path, engine="openpyxl", mode="w") as writer:
+                df_neu.to_excel(writer, sheet_name=sheet_name, index=False)
 
 def convert_to_utc_naive(datetime_stamp):
     """
@@ -375,7 +398,7 @@ def convert_to_utc_naive(datetime_stamp):
     try:
         if datetime_stamp.tzinfo is not None:
             new_datetime_stamp = datetime_stamp.replace(tzinfo=None)
-            app_logger.debug(f"Konvertierter Zeitstempel in ein UTC-naives Datetime-Objekt: {new_datetime_stamp}")  # Debugging-Ausgabe: Log-File
+            app_logger.debug("Konvertierter Zeitstempel in ein UTC-naives Datetime-Objekt: %s", new_datetime_stamp)  # Debugging-Ausgabe: Log-File
             return datetime_stamp.replace(tzinfo=None)  # Entfernen der Zeitzone
 
         app_logger.error(f"Kein Zeitstempel zum Konvertieren vorhanden.")  # Debugging-Ausgabe: Log-File
@@ -553,11 +576,11 @@ def parse_sender_msg_file(msg_absender_str: str) -> dict:
     if email_match:
         sender_email = email_match.group(1)
         contains_sender_email = True
-        app_logger.debug(f"Im Absender der MSG-Datei ist folgende Email enthalten: {sender_email}")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Im Absender der MSG-Datei ist folgende Email enthalten: %s", sender_email)  # Debugging-Ausgabe: Log-File
     else:
         sender_email = ""
         contains_sender_email = False
-        app_logger.debug(f"Im Absender der MSG-Datei ist keine Email enthalten: {msg_absender_str}")  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Im Absender der MSG-Datei ist keine Email enthalten: %s", msg_absender_str)  # Debugging-Ausgabe: Log-File
 
     # Entferne die E-Mail-Adresse aus dem Sender-String
     sender_name = re.sub(email_pattern, '', msg_absender_str).strip()
@@ -584,39 +607,76 @@ def load_known_senders(file_path):
     return pd.read_csv(file_path)
 
 
+# Kopfzeilen zitierter E-Mails (Outlook, deutsch und englisch): erste Zeile, weitere Kopfzeilen und Betreff-Zeile.
+# Die Muster werden nur am Zeilenanfang angewendet (re.match je Zeile) und enthalten keine verschachtelten Wiederholungen.
+_QUOTE_HEADER_FROM_PATTERN = re.compile(r"[>\s*]*(?:von|from)\s*:", re.IGNORECASE)
+_QUOTE_HEADER_FIELD_PATTERN = re.compile(r"[>\s*]*(?:gesendet|sent|datum|date|an|to|cc|bcc|wichtigkeit|importance|anlagen|attachments)\s*:", re.IGNORECASE)
+_QUOTE_HEADER_SUBJECT_PATTERN = re.compile(r"[>\s*]*(?:betreff|subject)\s*:", re.IGNORECASE)
+# Trennzeile vor der Kopfzeile, z.B. "-----Ursprüngliche Nachricht-----", "-----Original Message-----" oder "________"
+_QUOTE_SEPARATOR_PATTERN = re.compile(r"[>\s]*(?:-{3,}\s*(?:urspr\S*ngliche nachricht|original message)\s*-{3,}|_{10,})\s*$", re.IGNORECASE)
+# Maximale Anzahl von Zeilen zwischen "Von:" und "Betreff:" (Kopfzeilen mit Umbruch, z.B. lange Empfängerlisten)
+_QUOTE_HEADER_MAX_LINES = 12
+
+
+def _find_quote_header_lines(lines: list[str]) -> list[int]:
+    """
+    Liefert die Zeilennummern, an denen eine zitierte ältere E-Mail beginnt (Kopfzeile "Von:/From:" bzw. die Trennzeile
+    davor). Eine Kopfzeile zählt nur, wenn innerhalb von _QUOTE_HEADER_MAX_LINES Zeilen eine Betreff-Zeile folgt.
+    Jede Zeile wird höchstens einmal als Anfang und einmal als Kopfzeile geprüft (linear in der Textlänge).
+    """
+    header_lines = []
+    line_index = 0
+    while line_index < len(lines):
+        if not _QUOTE_HEADER_FROM_PATTERN.match(lines[line_index]):
+            line_index += 1
+            continue
+        # Bis zur Betreff-Zeile dürfen nur Kopfzeilen oder deren Fortsetzungen (nicht leer) folgen
+        subject_index = None
+        for look_ahead_index in range(line_index + 1, min(line_index + 1 + _QUOTE_HEADER_MAX_LINES, len(lines))):
+            look_ahead_line = lines[look_ahead_index]
+            if _QUOTE_HEADER_SUBJECT_PATTERN.match(look_ahead_line):
+                subject_index = look_ahead_index
+                break
+            if not look_ahead_line.strip() or _QUOTE_HEADER_FROM_PATTERN.match(look_ahead_line):
+                break
+        if subject_index is None:
+            line_index += 1
+            continue
+        start_index = line_index
+        if start_index > 0 and _QUOTE_SEPARATOR_PATTERN.match(lines[start_index - 1]):
+            start_index -= 1
+        header_lines.append(start_index)
+        line_index = subject_index + 1
+    return header_lines
+
+
 def reduce_thread_in_msg_message(email_text, max_older_emails=2) -> dict:
     """
     Reduziert die Anzahl der angehängten älteren E-Mails auf max_older_emails.
-    Ältere E-Mails werden anhand der typischen Kopfzeilen (Von, Gesendet, An, Cc, Betreff) erkannt.
+    Ältere E-Mails werden anhand der Kopfzeilen von Outlook erkannt, deutsch (Von, Gesendet, An, Cc, Betreff) und
+    englisch (From, Sent, To, Cc, Subject), ggf. mit Trennzeile davor. Der Text wird zeilenweise in einem Durchlauf
+    geprüft; die Laufzeit wächst linear mit der Länge des Textes, auch bei vielen zitierten Kopfzeilen.
 
     :param email_text: Der vollständige Text der E-Mail
     :param max_older_emails: die maximale Anzahl an beizubehaltenden alten E-Mails
     :return: ein Dictionary mit dem bereinigten E-Mail-Text und der Anzahl der gelöschten alten E-Mails
     """
-
-    # Regulärer Ausdruck für eine typische E-Mail-Kopfzeile
-    email_header_pattern = re.compile(
-        r"(Von: .+?Betreff: .+?)(\n\n|\r\n\r\n)", re.DOTALL | re.IGNORECASE
-    )
-
-    # Alle gefundenen älteren E-Mails identifizieren
-    older_emails_text = email_header_pattern.split(email_text)
+    lines = email_text.splitlines(keepends=True)
+    header_lines = _find_quote_header_lines(lines)
 
     # Anzahl der gefundenen älteren E-Mails
-    total_older_emails = (len(older_emails_text) // 3) - 1  # Abzüglich der ursprünglichen Nachricht
+    total_older_emails = len(header_lines)
 
     if total_older_emails <= max_older_emails:
         return {"new_email_text": email_text, "deleted_count": 0}  # Keine Kürzung nötig
 
-    # Behalten der neuesten E-Mail + der maximal erlaubten Anzahl alter E-Mails
-    new_email_text = older_emails_text[0]  # Original-Nachricht ohne Anhang
-    for i in range(1, min((max_older_emails * 3) + 1, len(older_emails_text)), 3):
-        new_email_text += older_emails_text[i] + older_emails_text[i + 1]
+    # Behalten der neuesten E-Mail + der maximal erlaubten Anzahl alter E-Mails (jeweils Kopfzeilen und Inhalt)
+    new_email_text = "".join(lines[:header_lines[max_older_emails]]).rstrip()
 
     # Berechnung der Anzahl der gelöschten E-Mails
     deleted_count = total_older_emails - max_older_emails
 
     # Hinzufügen eines Hinweises für entfernte ältere E-Mails
-    new_email_text += "\n\n--- deleted_count ältere E-Mails wurden entfernt. Vollständige E-Mail-Kette im Projektpostfach einsehbar. ---\n"
+    new_email_text += f"\n\n--- {deleted_count} ältere E-Mails wurden entfernt. Vollständige E-Mail-Kette im Projektpostfach einsehbar. ---\n"
 
     return {"new_email_text": new_email_text, "deleted_count": deleted_count}
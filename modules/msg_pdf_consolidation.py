@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+msg_pdf_consolidation.py
+
+Dieses Modul erzeugt Sammel-PDF-Dateien (--pdf_consolidate): Statt einer PDF-Datei je MSG-Datei werden alle E-Mails
+eines Verzeichnisses bzw. eines Versandmonats innerhalb eines Verzeichnisses in eine PDF-Datei ausgegeben, mit einem
+Lesezeichen je E-Mail (utils.pdf_generation.generate_consolidated_pdf_from_msgs). Das verringert die Anzahl der Dateien
+auf dem Ablage-Laufwerk deutlich.
+
+Die Zuordnung zu den Sammel-PDF-Dateien erfolgt über die MSG-Dateien, die beim Abschluss eines Verzeichnisses dort liegen,
+also unabhängig davon, welche Dateien im aktuellen Lauf bearbeitet wurden (z.B. bei --incremental). Der Versandmonat wird
+aus dem Präfix des Dateinamens gelesen ("YYYYMMDD-HHuhrMM_..."); Dateien ohne dieses Präfix kommen in die Gruppe "Unbekannt".
+Sehr große Gruppen werden auf mehrere Teile mit höchstens max_messages E-Mails aufgeteilt (begrenzter Speicherbedarf).
+
+Sammel-PDF-Dateien im Verzeichnis, die die aktuelle Gruppierung nicht mehr erzeugt (z.B. "_Teil2" nach dem Zusammenlegen
+der Teile, "Sammel-PDF_<Verzeichnisname>.pdf" nach dem Aufteilen oder Versandmonate ohne MSG-Dateien), werden gelöscht.
+Mit bucket_states (Überwachung mit --watch) werden Sammel-PDF-Dateien übersprungen, deren MSG-Dateien (Name, Größe,
+Änderungszeit) sich seit der letzten erfolgreichen Erzeugung nicht geändert haben.
+
+Funktionen und Klassen:
+- MsgPdfConsolidationMode: Enum mit der Art der Zusammenfassung (none, directory, month).
+- MsgPdfBucket: Datenklasse mit einer Sammel-PDF-Datei und ihren MSG-Dateien.
+- MsgConsolidatedPdfResult: Datenklasse mit dem Ergebnis einer Sammel-PDF-Datei.
+- msg_month_bucket(file_name): Versandmonat "YYYY-MM" aus dem Dateinamen bzw. "Unbekannt".
+- consolidation_buckets(directory_path, mode, max_messages): Gruppiert die MSG-Dateien eines Verzeichnisses.
+- stale_consolidated_pdfs(directory_path, buckets): Sammel-PDF-Dateien des Verzeichnisses, die nicht mehr erzeugt werden.
+- generate_consolidated_pdfs(directory_path, mode, max_messages, max_length_senderlist, max_quoted_emails, bucket_states):
+  Erzeugt die Sammel-PDF-Dateien und löscht nicht mehr erzeugte.
+"""
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
+
+from utils.pdf_generation import generate_consolidated_pdf_from_msgs
+from utils.file_handling import delete_file, FileOperationResult
+from modules.msg_pdf_pool import MAX_LENGTH_SENDERLIST
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_pdf_consolidation' aktiviert.")
+
+# Präfix der Sammel-PDF-Dateien
+CONSOLIDATED_PDF_PREFIX = "Sammel-PDF"
+
+# Gruppe für MSG-Dateien ohne Versanddatum im Dateinamen
+UNKNOWN_MONTH_BUCKET = "Unbekannt"
+
+# Präfix der umbenannten MSG-Dateien mit dem Versandzeitpunkt (Format "%Y%m%d-%Huhr%M" in msg_generate_new_filename)
+_MSG_TIMESTAMP_PREFIX_PATTERN = re.compile(r"^(\d{4})(\d{2})\d{2}-\d{2}uhr\d{2}_")
+
+
+class MsgPdfConsolidationMode(Enum):
+    NONE = "none"
+    DIRECTORY = "directory"
+    MONTH = "month"
+
+
+@dataclass
+class MsgPdfBucket:
+    """
+    MsgPdfBucket
+
+    Diese Datenklasse enthält eine Sammel-PDF-Datei und die MSG-Dateien, die darin ausgegeben werden.
+
+    Attribute:
+    - pdf_path_and_file_name: Absoluter Dateiname der Sammel-PDF-Datei.
+    - msg_path_and_file_names: Absolute Dateinamen der MSG-Dateien (sortiert nach Dateiname, d.h. nach Versandzeitpunkt).
+    """
+    pdf_path_and_file_name: str
+    msg_path_and_file_names: list[str] = field(default_factory=list)
+
+
+@dataclass
+class MsgConsolidatedPdfResult:
+    """
+    MsgConsolidatedPdfResult
+
+    Diese Datenklasse enthält das Ergebnis einer Sammel-PDF-Datei.
+
+    Attribute:
+    - pdf_path_and_file_name: Absoluter Dateiname der Sammel-PDF-Datei.
+    - msg_count: Anzahl der zugeordneten MSG-Dateien.
+    - written_count: Anzahl der ausgegebenen E-Mails (0, wenn keine Datei erzeugt wurde).
+    - failed_msg_files: MSG-Dateien, die nicht gelesen werden konnten.
+    - seconds: Dauer der Erzeugung in Sekunden.
+    - error: Fehlermeldung, wenn die Sammel-PDF-Datei nicht erzeugt bzw. gelöscht werden konnte.
+    - skipped: True, wenn die Sammel-PDF-Datei unverändert ist und nicht neu erzeugt wurde (bucket_states).
+    - removed: True, wenn die Sammel-PDF-Datei nicht mehr erzeugt wird und gelöscht wurde bzw. gelöscht werden sollte.
+    """
+    pdf_path_and_file_name: str
+    msg_count: int
+    written_count: int = 0
+    failed_msg_files: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+    error: Optional[str] = None
+    skipped: bool = False
+    removed: bool = False
+
+
+def msg_month_bucket(file_name: str) -> str:
+    """
+    Liefert den Versandmonat einer umbenannten MSG-Datei aus dem Präfix des Dateinamens.
+
+    Parameter:
+    file_name (str): Dateiname der MSG-Datei (ohne Verzeichnis).
+
+    Rückgabewert:
+    str: Versandmonat im Format "YYYY-MM" bzw. "Unbekannt".
+    """
+    match = _MSG_TIMESTAMP_PREFIX_PATTERN.match(file_name)
+    if not match:
+        return UNKNOWN_MONTH_BUCKET
+    return f"{match.group(1)}-{match.group(2)}"
+
+
+def consolidation_buckets(directory_path: str, mode: MsgPdfConsolidationMode, max_messages: int) -> list[MsgPdfBucket]:
+    """
+    Gruppiert die MSG-Dateien eines Verzeichnisses für die Sammel-PDF-Dateien.
+
+    - directory: eine Sammel-PDF-Datei "Sammel-PDF_<Verzeichnisname>.pdf"
+    - month: je Versandmonat eine Sammel-PDF-Datei "Sammel-PDF_<YYYY-MM>.pdf"
+    Gruppen mit mehr als max_messages MSG-Dateien werden auf Teile "..._Teil<n>.pdf" aufgeteilt.
+
+    Parameter:
+    directory_path (str): Verzeichnis der MSG-Dateien.
+    mode (MsgPdfConsolidationMode): Art der Zusammenfassung.
+    max_messages (int): Maximale Anzahl von E-Mails je Sammel-PDF-Datei (0 = unbegrenzt).
+
+    Rückgabewert:
+    list[MsgPdfBucket]: Die Sammel-PDF-Dateien mit ihren MSG-Dateien (leer bei mode NONE oder ohne MSG-Dateien).
+    """
+    if mode == MsgPdfConsolidationMode.NONE:
+        return []
+    try:
+        with os.scandir(directory_path) as entries:
+            msg_file_names = sorted(entry.name for entry in entries if entry.is_file() and entry.name.lower().endswith(".msg"))
+    except OSError as e:
+        app_logger.warning("Verzeichnis '%s' konnte für die Sammel-PDF-Dateien nicht gelesen werden: %s", directory_path, e)
+        return []
+
+    # Gruppen in der Reihenfolge der Dateinamen (dict behält die Einfügereihenfolge)
+    groups: dict[str, list[str]] = {}
+    for msg_file_name in msg_file_names:
+        if mode == MsgPdfConsolidationMode.MONTH:
+            group_name = msg_month_bucket(msg_file_name)
+        else:
+            group_name = os.path.basename(os.path.normpath(directory_path))
+        groups.setdefault(group_name, []).append(os.path.join(directory_path, msg_file_name))
+
+    buckets = []
+    for group_name, msg_path_and_file_names in groups.items():
+        part_size = max_messages if max_messages > 0 else len(msg_path_and_file_names)
+        parts = [msg_path_and_file_names[index:index + part_size] for index in range(0, len(msg_path_and_file_names), part_size)]
+        for part_number, part in enumerate(parts, start=1):
+            part_suffix = f"_Teil{part_number}" if len(parts) > 1 else ""
+            pdf_file_name = f"{CONSOLIDATED_PDF_PREFIX}_{group_name}{part_suffix}.pdf"
+            buckets.append(MsgPdfBucket(os.path.join(directory_path, pdf_file_name), part))
+    return buckets
+
+
+def stale_consolidated_pdfs(directory_path: str, buckets: list[MsgPdfBucket]) -> list[str]:
+    """
+    Liefert die Sammel-PDF-Dateien ("Sammel-PDF_*.pdf") eines Verzeichnisses, die die Gruppierung buckets nicht erzeugt.
+
+    Parameter:
+    directory_path (str): Verzeichnis der MSG-Dateien.
+    buckets (list[MsgPdfBucket]): Aktuelle Gruppierung (consolidation_buckets).
+
+    Rückgabewert:
+    list[str]: Absolute Dateinamen der nicht mehr erzeugten Sammel-PDF-Dateien (leer, wenn das Verzeichnis nicht lesbar ist).
+    """
+    current_pdf_file_names = {os.path.normcase(os.path.basename(bucket.pdf_path_and_file_name)) for bucket in buckets}
+    try:
+        with os.scandir(directory_path) as entries:
+            return sorted(entry.path for entry in entries
+                          if entry.is_file() and entry.name.startswith(f"{CONSOLIDATED_PDF_PREFIX}_") and entry.name.lower().endswith(".pdf")
+                          and os.path.normcase(entry.name) not in current_pdf_file_names)
+    except OSError as e:
+        app_logger.warning("Verzeichnis '%s' konnte nicht nach alten Sammel-PDF-Dateien durchsucht werden: %s", directory_path, e)
+        return []
+
+
+def _bucket_state(bucket: MsgPdfBucket) -> Optional[tuple]:
+    """
+    Liefert den Stand der MSG-Dateien einer Sammel-PDF-Datei (Name, Größe, Änderungszeit) bzw. None, wenn eine Datei fehlt.
+    """
+    bucket_state = []
+    for msg_path_and_file_name in bucket.msg_path_and_file_names:
+        try:
+            stat_result = os.stat(msg_path_and_file_name)
+        except OSError:
+            return None
+        bucket_state.append((msg_path_and_file_name, stat_result.st_size, stat_result.st_mtime_ns))
+    return tuple(bucket_state)
+
+
+def generate_consolidated_pdfs(directory_path: str, mode: MsgPdfConsolidationMode, max_messages: int,
+                               max_length_senderlist: int = MAX_LENGTH_SENDERLIST, max_quoted_emails: Optional[int] = None,
+                               bucket_states: Optional[dict[str, tuple]] = None) -> list[MsgConsolidatedPdfResult]:
+    """
+    Erzeugt die Sammel-PDF-Dateien eines Verzeichnisses neu und löscht die Sammel-PDF-Dateien, die die aktuelle Gruppierung
+    nicht mehr erzeugt. Fehler werden im Ergebnis zurückgegeben.
+
+    Parameter:
+    directory_path (str): Verzeichnis der MSG-Dateien.
+    mode (MsgPdfConsolidationMode): Art der Zusammenfassung.
+    max_messages (int): Maximale Anzahl von E-Mails je Sammel-PDF-Datei (0 = unbegrenzt).
+    max_length_senderlist (int): Maximale Länge der Empfängerliste im PDF.
+    max_quoted_emails (int): Maximale Anzahl zitierter älterer E-Mails je E-Mail (None = alle ausgeben).
+    bucket_states (dict): Stand der MSG-Dateien je erfolgreich erzeugter Sammel-PDF-Datei über mehrere Aufrufe (z.B. bei --watch);
+        unveränderte Sammel-PDF-Dateien werden übersprungen. None = immer neu erzeugen.
+
+    Rückgabewert:
+    list[MsgConsolidatedPdfResult]: Ergebnis je Sammel-PDF-Datei (erzeugt, übersprungen oder gelöscht).
+    """
+    consolidated_results = []
+    buckets = consolidation_buckets(directory_path, mode, max_messages)
+    for bucket in buckets:
+        consolidated_result = MsgConsolidatedPdfResult(bucket.pdf_path_and_file_name, len(bucket.msg_path_and_file_names))
+        bucket_state = _bucket_state(bucket) if bucket_states is not None else None
+        if bucket_state is not None and bucket_states.get(bucket.pdf_path_and_file_name) == bucket_state \
+                and os.path.isfile(bucket.pdf_path_and_file_name):
+            consolidated_result.skipped = True
+            app_logger.debug("Sammel-PDF '%s' unverändert, nicht neu erzeugt", bucket.pdf_path_and_file_name)
+            consolidated_results.append(consolidated_result)
+            continue
+        start_time = time.perf_counter()
+        try:
+            consolidated_result.written_count, consolidated_result.failed_msg_files = generate_consolidated_pdf_from_msgs(
+                bucket.msg_path_and_file_names, bucket.pdf_path_and_file_name, max_length_senderlist, max_quoted_emails)
+        except Exception as e:
+            consolidated_result.error = str(e)
+            app_logger.warning("Sammel-PDF '%s' konnte nicht erzeugt werden: %s", bucket.pdf_path_and_file_name, e)
+        consolidated_result.seconds = time.perf_counter() - start_time
+        app_logger.info("Sammel-PDF '%s': %s von %s E-Mails in %.1f s", bucket.pdf_path_and_file_name,
+                        consolidated_result.written_count, consolidated_result.msg_count, consolidated_result.seconds)
+        # Nur vollständig erzeugte Sammel-PDF-Dateien vormerken; nicht lesbare MSG-Dateien werden beim nächsten Mal erneut versucht
+        if bucket_states is not None:
+            if bucket_state is not None and consolidated_result.written_count and not consolidated_result.failed_msg_files:
+                bucket_states[bucket.pdf_path_and_file_name] = bucket_state
+            else:
+                bucket_states.pop(bucket.pdf_path_and_file_name, None)
+        consolidated_results.append(consolidated_result)
+
+    # Nicht mehr erzeugte Sammel-PDF-Dateien erst nach dem Erzeugen der neuen löschen
+    for stale_pdf_path_and_file_name in stale_consolidated_pdfs(directory_path, buckets):
+        consolidated_result = MsgConsolidatedPdfResult(stale_pdf_path_and_file_name, 0, removed=True)
+        delete_result = delete_file(stale_pdf_path_and_file_name)
+        if delete_result not in (FileOperationResult.SUCCESS, FileOperationResult.FILE_NOT_FOUND):
+            consolidated_result.error = f"Löschen fehlgeschlagen: {delete_result.name}"
+            app_logger.warning("Nicht mehr erzeugte Sammel-PDF '%s' konnte nicht gelöscht werden: %s", stale_pdf_path_and_file_name, delete_result.name)
+        else:
+            app_logger.info("Nicht mehr erzeugte Sammel-PDF '%s' gelöscht", stale_pdf_path_and_file_name)
+        if bucket_states is not None:
+            bucket_states.pop(stale_pdf_path_and_file_name, None)
+        consolidated_results.append(consolidated_result)
+    return consolidated_results
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+msg_pdf_manifest.py
+
+Dieses Modul verwaltet je Verzeichnis eine Manifest-Datei (Sidecar), in der für jede erzeugte PDF-Datei der Stand der
+zugehörigen MSG-Datei gespeichert ist: Größe, Änderungszeit (mtime) und ein Fingerabdruck des Inhalts (SHA-256).
+Damit kann msg_file_renamer.py mit --incremental_pdf nur fehlende oder veraltete PDF-Dateien neu erzeugen.
+
+Prüfung, ob eine PDF-Datei aktuell ist:
+- PDF-Datei fehlt: neu erzeugen.
+- Größe und mtime der MSG-Datei entsprechen dem Manifest: aktuell (nur stat, die MSG-Datei wird nicht gelesen).
+- Größe oder mtime weichen ab: Fingerabdruck berechnen. Stimmt er überein (z.B. nur das Änderungsdatum wurde mit
+  --set_filedate gesetzt), ist die PDF-Datei aktuell und der Eintrag wird aktualisiert; sonst neu erzeugen.
+- Kein Eintrag im Manifest (PDF-Datei aus einem früheren Lauf): Ist die PDF-Datei jünger als die MSG-Datei, wird sie
+  übernommen und der Stand der MSG-Datei eingetragen; sonst neu erzeugen.
+
+Funktionen und Klassen:
+- PDF_MANIFEST_FILE_NAME: Name der Manifest-Datei im Verzeichnis der PDF-Dateien.
+- PdfFreshness: Enum mit dem Ergebnis der Prüfung.
+- MsgFileFingerprint: Datenklasse mit Größe, mtime und Fingerabdruck einer MSG-Datei.
+- fingerprint_msg_file(msg_path_and_file_name): Ermittelt den Stand einer MSG-Datei.
+- PdfManifest: Manifest-Dateien aller bearbeiteten Verzeichnisse.
+    - check(msg_path_and_file_name, pdf_path_and_file_name): Prüft, ob die PDF-Datei aktuell ist.
+    - record(msg_path_and_file_name, fingerprint): Trägt den Stand der MSG-Datei einer neu erzeugten PDF-Datei ein.
+    - save(): Schreibt geänderte Manifest-Dateien.
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, asdict
+from enum import Enum
+from typing import Optional
+
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_pdf_manifest' aktiviert.")
+
+# Name der Manifest-Datei im Verzeichnis der PDF-Dateien
+PDF_MANIFEST_FILE_NAME = ".msg_pdf_manifest.json"
+
+# Blockgröße für die Berechnung des Fingerabdrucks
+FINGERPRINT_BLOCK_SIZE = 1024 * 1024
+
+
+class PdfFreshness(Enum):
+    UP_TO_DATE = "Aktuell"
+    MISSING = "PDF fehlt"
+    STALE = "Veraltet"
+
+
+@dataclass
+class MsgFileFingerprint:
+    """
+    MsgFileFingerprint
+
+    Diese Datenklasse enthält den Stand einer MSG-Datei.
+
+    Attribute:
+    - size: Größe in Bytes.
+    - mtime_ns: Änderungszeit in Nanosekunden.
+    - sha256: Fingerabdruck des Inhalts (hexadezimal).
+    """
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+def _hash_file(path_and_file_name: str) -> str:
+    file_hash = hashlib.sha256()
+    with open(path_and_file_name, "rb") as msg_file:
+        for block in iter(lambda: msg_file.read(FINGERPRINT_BLOCK_SIZE), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def fingerprint_msg_file(msg_path_and_file_name: str) -> MsgFileFingerprint:
+    """
+    Ermittelt Größe, Änderungszeit und Fingerabdruck einer MSG-Datei.
+
+    Parameter:
+    msg_path_and_file_name (str): Absoluter Dateiname der MSG-Datei.
+
+    Rückgabewert:
+    MsgFileFingerprint: Der Stand der MSG-Datei.
+    """
+    stat_result = os.stat(msg_path_and_file_name)
+    return MsgFileFingerprint(stat_result.st_size, stat_result.st_mtime_ns, _hash_file(msg_path_and_file_name))
+
+
+class PdfManifest:
+    """
+    Manifest-Dateien (je Verzeichnis) mit dem Stand der MSG-Dateien, aus denen die PDF-Dateien erzeugt wurden.
+    Die Methoden können aus mehreren Threads aufgerufen werden (Stufe "PDF", Ergebnis-Thread des PDF-Pools).
+    """
+
+    def __init__(self, read_only: bool = False):
+        """
+        Parameter:
+        read_only (bool): Wenn True, werden die Manifest-Dateien nur gelesen und nicht geschrieben (z.B. bei einem Testlauf).
+        """
+        self.read_only = read_only
+        self._entries_by_directory: dict[str, dict] = {}  # Verzeichnis -> {MSG-Dateiname: Eintrag}
+        self._dirty_directories: set[str] = set()
+        self._lock = threading.Lock()
+
+    def check(self, msg_path_and_file_name: str, pdf_path_and_file_name: str) -> PdfFreshness:
+        """
+        Prüft, ob die PDF-Datei zum aktuellen Stand der MSG-Datei passt.
+
+        Parameter:
+        msg_path_and_file_name (str): Absoluter Dateiname der MSG-Datei.
+        pdf_path_and_file_name (str): Absoluter Dateiname der PDF-Datei.
+
+        Rückgabewert:
+        PdfFreshness: UP_TO_DATE, MISSING oder STALE.
+        """
+        try:
+            pdf_stat = os.stat(pdf_path_and_file_name)
+        except OSError:
+            return PdfFreshness.MISSING
+        try:
+            msg_stat = os.stat(msg_path_and_file_name)
+        except OSError:
+            return PdfFreshness.STALE
+
+        directory, msg_file_name = os.path.split(msg_path_and_file_name)
+        with self._lock:
+            entry = self._load_directory(directory).get(msg_file_name)
+
+        # Eintrag vorhanden und MSG-Datei unverändert laut stat: aktuell, ohne die MSG-Datei zu lesen
+        if entry and entry["size"] == msg_stat.st_size and entry["mtime_ns"] == msg_stat.st_mtime_ns \
+                and entry["pdf"] == os.path.basename(pdf_path_and_file_name):
+            return PdfFreshness.UP_TO_DATE
+
+        # Ohne Eintrag: PDF-Datei aus einem früheren Lauf übernehmen, wenn sie jünger als die MSG-Datei ist
+        if not entry:
+            if pdf_stat.st_mtime_ns < msg_stat.st_mtime_ns:
+                return PdfFreshness.STALE
+            self.record(msg_path_and_file_name, fingerprint_msg_file(msg_path_and_file_name), pdf_path_and_file_name)
+            return PdfFreshness.UP_TO_DATE
+
+        # Größe oder mtime geändert: über den Fingerabdruck entscheiden
+        if entry["size"] == msg_stat.st_size and entry["sha256"] == _hash_file(msg_path_and_file_name):
+            self.record(msg_path_and_file_name, MsgFileFingerprint(msg_stat.st_size, msg_stat.st_mtime_ns, entry["sha256"]), pdf_path_and_file_name)
+            return PdfFreshness.UP_TO_DATE
+        return PdfFreshness.STALE
+
+    def record(self, msg_path_and_file_name: str, fingerprint: MsgFileFingerprint, pdf_path_and_file_name: Optional[str] = None):
+        """
+        Trägt den Stand der MSG-Datei ein, aus der die PDF-Datei erzeugt wurde.
+
+        Parameter:
+        msg_path_and_file_name (str): Absoluter Dateiname der MSG-Datei.
+        fingerprint (MsgFileFingerprint): Stand der MSG-Datei bei der PDF-Erzeugung.
+        pdf_path_and_file_name (str): Absoluter Dateiname der PDF-Datei (Standard: MSG-Dateiname mit Endung .pdf).
+        """
+        if pdf_path_and_file_name is None:
+            pdf_path_and_file_name = os.path.splitext(msg_path_and_file_name)[0] + ".pdf"
+        directory, msg_file_name = os.path.split(msg_path_and_file_name)
+        with self._lock:
+            self._load_directory(directory)[msg_file_name] = dict(asdict(fingerprint), pdf=os.path.basename(pdf_path_and_file_name))
+            self._dirty_directories.add(directory)
+
+    def save(self):
+        """
+        Schreibt die geänderten Manifest-Dateien. Einträge, deren MSG-Datei nicht mehr existiert (z.B. umbenannt), werden entfernt.
+        Danach werden alle Einträge aus dem Speicher verworfen und bei Bedarf neu gelesen (begrenzter Speicherbedarf).
+        """
+        with self._lock:
+            dirty_directories, self._dirty_directories = self._dirty_directories, set()
+            if self.read_only:
+                return
+            loaded_entries, self._entries_by_directory = self._entries_by_directory, {}
+            for directory in dirty_directories:
+                entries = loaded_entries[directory]
+                for msg_file_name in [name for name in entries if not os.path.exists(os.path.join(directory, name))]:
+                    del entries[msg_file_name]
+                manifest_path = os.path.join(directory, PDF_MANIFEST_FILE_NAME)
+                try:
+                    # Zuerst in eine temporäre Datei schreiben, damit ein Abbruch kein unvollständiges Manifest hinterlässt
+                    with open(manifest_path + ".tmp", "w", encoding="utf-8") as manifest_file:
+                        json.dump(entries, manifest_file, ensure_ascii=False, indent=1)
+                    os.replace(manifest_path + ".tmp", manifest_path)
+                except OSError as e:
+                    app_logger.warning("Manifest '%s' konnte nicht geschrieben werden: %s", manifest_path, e)
+
+    def _load_directory(self, directory: str) -> dict:
+        """
+        Liefert die Einträge eines Verzeichnisses; die Manifest-Datei wird beim ersten Zugriff gelesen.
+        """
+        entries = self._entries_by_directory.get(directory)
+        if entries is None:
+            entries = {}
+            manifest_path = os.path.join(directory, PDF_MANIFEST_FILE_NAME)
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+                    entries = json.load(manifest_file)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                app_logger.warning("Manifest '%s' konnte nicht gelesen werden und wird neu angelegt: %s", manifest_path, e)
+            self._entries_by_directory[directory] = entries
+        return entries
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+msg_pdf_pool.py
+
+Dieses Modul erzeugt die PDF-Dateien der MSG-Dateien in einem eigenen Prozess-Pool (--pdf_workers), getrennt von
+Umbenennen, Löschen und Logging.
+
+Die PDF-Erzeugung (Einlesen der MSG-Datei, Layout mit fpdf2, Einbetten der Schriftarten, Ausgabe) dauert ein
+Vielfaches der Umbenennung. Im Pool wartet die Hauptschleife nicht auf die PDF-Datei: Bereits umbenannte Dateien
+werden mit ihren Metadaten (Betreff, Absender, Versanddatum) in die Warteschlange des Pools gestellt und die
+Umbenennung läuft mit voller Geschwindigkeit weiter. Die PDF-Dateien werden parallel nachgeholt; die Ergebnisse
+werden am Ende des Laufs gesammelt und ins Excel-Log übernommen.
+
+Funktionen und Klassen:
+- MsgPdfStatus: Enum mit dem Ergebnis der PDF-Erzeugung.
+- MsgPdfResult: Datenklasse mit dem Ergebnis der PDF-Erzeugung für eine MSG-Datei.
+- MsgPdfProgress: Datenklasse mit den Zählern des Pools.
+- generate_msg_pdf(msg_path_and_file_name, overwrite_pdf, ...): Erzeugt die PDF-Datei zu einer MSG-Datei.
+- MsgPdfPool: Prozess-Pool für die PDF-Erzeugung.
+    - submit(msg_path_and_file_name, **metadata): Stellt eine MSG-Datei in die Warteschlange.
+    - progress(): Liefert die aktuellen Zähler.
+    - is_progress_due(): Prüft, ob die nächste Fortschrittsausgabe fällig ist.
+    - report_progress(force): Gibt den Fortschritt in Abständen auf der Console aus.
+    - results(): Wartet auf alle PDF-Dateien und liefert die Ergebnisse in der Reihenfolge der Übergabe.
+    - close(): Beendet den Prozess-Pool.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
+
+from modules.msg_pdf_manifest import MsgFileFingerprint, PdfManifest, fingerprint_msg_file
+from utils.pdf_generation import generate_pdf_from_msg
+from logger import initialize_logger, log_file_context, child_process_log_queue, initialize_child_process_logging
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_pdf_pool' aktiviert.")
+
+# Maximale Länge der Empfängerliste im PDF (wie bisher in msg_file_renamer.py)
+MAX_LENGTH_SENDERLIST = 800
+
+# Standardwert für den Abstand der Fortschrittsausgabe in Sekunden
+DEFAULT_PROGRESS_INTERVAL_SECONDS = 10.0
+
+
+class MsgPdfStatus(Enum):
+    GENERATED = "Erzeugt"
+    SKIPPED = "Übersprungen (vorhanden)"
+    FAILED = "Fehlgeschlagen"
+
+
+@dataclass
+class MsgPdfResult:
+    """
+    MsgPdfResult
+
+    Diese Datenklasse enthält das Ergebnis der PDF-Erzeugung für eine MSG-Datei.
+
+    Attribute:
+    - msg_path_and_file_name: Absoluter Dateiname der (umbenannten) MSG-Datei.
+    - pdf_path_and_file_name: Absoluter Dateiname der PDF-Datei.
+    - status: Ergebnis der PDF-Erzeugung.
+    - seconds: Dauer der PDF-Erzeugung in Sekunden.
+    - error: Fehlermeldung bei status FAILED.
+    - metadata: Metadaten der MSG-Datei aus der Dateinamens-Erzeugung (z.B. Betreff, Absender, Versanddatum).
+    - fingerprint: Stand der MSG-Datei bei der PDF-Erzeugung (nur mit record_fingerprint, für --incremental_pdf).
+    """
+    msg_path_and_file_name: str
+    pdf_path_and_file_name: str
+    status: MsgPdfStatus
+    seconds: float = 0.0
+    error: str = ""
+    metadata: dict = field(default_factory=dict)
+    fingerprint: Optional[MsgFileFingerprint] = None
+
+
+@dataclass
+class MsgPdfProgress:
+    """
+    MsgPdfProgress
+
+    Diese Datenklasse enthält die Zähler des PDF-Pools.
+
+    Attribute:
+    - submitted_count: Anzahl der übergebenen MSG-Dateien.
+    - generated_count, skipped_count, failed_count: Anzahl der erzeugten, übersprungenen bzw. fehlgeschlagenen PDF-Dateien.
+    """
+    submitted_count: int = 0
+    generated_count: int = 0
+    skipped_count: int = 0
+    failed_count: int = 0
+
+    @property
+    def finished_count(self) -> int:
+        return self.generated_count + self.skipped_count + self.failed_count
+
+    def __str__(self):
+        return (f"{self.finished_count}/{self.submitted_count} bearbeitet ({self.generated_count} erzeugt, "
+                f"{self.skipped_count} übersprungen, {self.failed_count} fehlgeschlagen)")
+
+
+def generate_msg_pdf(msg_path_and_file_name: str, overwrite_pdf: bool = False, max_length_senderlist: int = MAX_LENGTH_SENDERLIST,
+                     metadata: dict = None, record_fingerprint: bool = False, max_quoted_emails: Optional[int] = None) -> MsgPdfResult:
+    """
+    Erzeugt die PDF-Datei zu einer MSG-Datei. Eine vorhandene PDF-Datei wird nur mit overwrite_pdf überschrieben.
+    Die Funktion löst keine Ausnahme aus, Fehler werden im Ergebnis zurückgegeben (läuft ggf. in einem Prozess des Pools).
+
+    Parameter:
+    msg_path_and_file_name (str): Absoluter Dateiname der MSG-Datei.
+    overwrite_pdf (bool): Vorhandene PDF-Datei überschreiben.
+    max_length_senderlist (int): Maximale Länge der Empfängerliste im PDF.
+    metadata (dict): Metadaten der MSG-Datei, werden unverändert ins Ergebnis übernommen.
+    record_fingerprint (bool): Stand der MSG-Datei vor der PDF-Erzeugung ermitteln (für das PDF-Manifest).
+    max_quoted_emails (int): Maximale Anzahl zitierter älterer E-Mails im Inhalt (None = alle ausgeben).
+
+    Rückgabewert:
+    MsgPdfResult: Das Ergebnis der PDF-Erzeugung.
+    """
+    with log_file_context(msg_path_and_file_name):
+        pdf_path_and_file_name = os.path.splitext(msg_path_and_file_name)[0] + ".pdf"
+        result = MsgPdfResult(msg_path_and_file_name, pdf_path_and_file_name, MsgPdfStatus.GENERATED, metadata=metadata or {})
+
+        if not overwrite_pdf and os.path.exists(pdf_path_and_file_name):
+            app_logger.info("PDF-Datei '%s' existiert bereits und -opdf ist False. Überspringe Erstellung.", pdf_path_and_file_name)
+            result.status = MsgPdfStatus.SKIPPED
+            return result
+
+        start_time = time.perf_counter()
+        try:
+            if record_fingerprint:
+                result.fingerprint = fingerprint_msg_file(msg_path_and_file_name)
+            generate_pdf_from_msg(msg_path_and_file_name, max_length_senderlist, max_quoted_emails)
+        except Exception as e:
+            app_logger.error(f"Fehler bei der Erzeugung der PDF-Datei '{pdf_path_and_file_name}': {e}")
+            result.status = MsgPdfStatus.FAILED
+            result.error = str(e)
+        result.seconds = time.perf_counter() - start_time
+
+        # generate_pdf_from_msg meldet nicht jeden Fehler über den Rückgabewert; maßgeblich ist die erzeugte Datei
+        if result.status == MsgPdfStatus.GENERATED and not os.path.exists(pdf_path_and_file_name):
+            result.status = MsgPdfStatus.FAILED
+            result.error = "PDF-Datei wurde nicht erzeugt"
+            app_logger.warning("PDF-Datei '%s' wurde nicht erzeugt.", pdf_path_and_file_name)
+        if result.status == MsgPdfStatus.GENERATED:
+            app_logger.info("PDF-Datei '%s' erzeugt.", pdf_path_and_file_name)
+        return result
+
+
+class MsgPdfPool:
+    """
+    Erzeugt die PDF-Dateien der MSG-Dateien in einem eigenen Prozess-Pool, während die Hauptschleife weiterläuft.
+    """
+
+    def __init__(self, max_workers: int, overwrite_pdf: bool = False, progress_interval_seconds: float = DEFAULT_PROGRESS_INTERVAL_SECONDS,
+                 pdf_manifest: Optional[PdfManifest] = None, max_quoted_emails: Optional[int] = None):
+        """
+        Parameter:
+        max_workers (int): Anzahl der Prozesse.
+        overwrite_pdf (bool): Vorhandene PDF-Dateien überschreiben.
+        progress_interval_seconds (float): Mindestabstand der Fortschrittsausgaben in Sekunden.
+        pdf_manifest (PdfManifest): Manifest, in das erzeugte PDF-Dateien eingetragen werden (--incremental_pdf).
+        max_quoted_emails (int): Maximale Anzahl zitierter älterer E-Mails im Inhalt (None = alle ausgeben).
+        """
+        self.max_workers = max(1, max_workers)
+        self.overwrite_pdf = overwrite_pdf
+        self.pdf_manifest = pdf_manifest
+        self.max_quoted_emails = max_quoted_emails
+        self.progress_interval_seconds = progress_interval_seconds
+
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=initialize_child_process_logging,
+                                             initargs=(child_process_log_queue(),))
+        self._futures: list[tuple[str, Future]] = []  # (MSG-Datei, Future) in der Reihenfolge der Übergabe
+        self._progress = MsgPdfProgress()
+        self._lock = threading.Lock()  # Zähler werden aus dem Ergebnis-Thread des Pools aktualisiert
+        self._result_counted = threading.Condition(self._lock)
+        self._last_progress_time = time.monotonic()
+        app_logger.info("Prozess-Pool für die PDF-Erzeugung: %s Prozesse", self.max_workers)
+
+    def submit(self, msg_path_and_file_name: str, **metadata) -> Future:
+        """
+        Stellt eine (bereits umbenannte) MSG-Datei in die Warteschlange des Pools.
+
+        Parameter:
+        msg_path_and_file_name (str): Absoluter Dateiname der MSG-Datei.
+        metadata: Metadaten der MSG-Datei für das Excel-Log (z.B. Betreff, Absender, Versanddatum).
+
+        Rückgabewert:
+        Future: Liefert das MsgPdfResult.
+        """
+        future = self._executor.submit(generate_msg_pdf, msg_path_and_file_name, self.overwrite_pdf, MAX_LENGTH_SENDERLIST, metadata,
+                                       self.pdf_manifest is not None, self.max_quoted_emails)
+        with self._lock:
+            self._progress.submitted_count += 1
+        self._futures.append((msg_path_and_file_name, future))
+        future.add_done_callback(lambda done_future, msg_path=msg_path_and_file_name: self._count_result(done_future, msg_path))
+        return future
+
+    def progress(self) -> MsgPdfProgress:
+        """
+        Liefert eine Kopie der aktuellen Zähler.
+        """
+        with self._lock:
+            return MsgPdfProgress(**vars(self._progress))
+
+    def is_progress_due(self) -> bool:
+        """
+        Prüft, ob seit der letzten Fortschrittsausgabe progress_interval_seconds Sekunden vergangen sind.
+        """
+        return time.monotonic() - self._last_progress_time >= self.progress_interval_seconds
+
+    def report_progress(self, force: bool = False):
+        """
+        Gibt den Fortschritt auf der Console und im Log aus, höchstens alle progress_interval_seconds Sekunden.
+
+        Parameter:
+        force (bool): Unabhängig vom Abstand ausgeben.
+        """
+        if not force and not self.is_progress_due():
+            return
+        self._last_progress_time = time.monotonic()
+        progress = self.progress()
+        print(f"PDF-Erzeugung: {progress}")
+        app_logger.info("PDF-Erzeugung: %s", progress)
+
+    def results(self) -> list[MsgPdfResult]:
+        """
+        Wartet auf alle übergebenen PDF-Dateien (mit Fortschrittsausgabe) und liefert die Ergebnisse.
+
+        Rückgabewert:
+        list[MsgPdfResult]: Die Ergebnisse in der Reihenfolge der Übergabe.
+        """
+        pending_count = self._pending_count()
+        if pending_count:
+            print(f"\nWarten auf {pending_count} PDF-Datei(en) ...")
+        # Gewartet wird auf die ausgewerteten Ergebnisse (Zähler, Manifest), nicht nur auf die Futures
+        while pending_count:
+            with self._result_counted:
+                self._result_counted.wait(timeout=self.progress_interval_seconds)
+            self.report_progress()
+            pending_count = self._pending_count()
+        self.report_progress(force=True)
+        return [self._future_result(future, msg_path) for msg_path, future in self._futures]
+
+    def close(self):
+        """
+        Beendet den Prozess-Pool; noch nicht begonnene PDF-Dateien werden verworfen.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _pending_count(self) -> int:
+        with self._lock:
+            return self._progress.submitted_count - self._progress.finished_count
+
+    def _count_result(self, future: Future, msg_path_and_file_name: str):
+        if future.cancelled():
+            return
+        pdf_result = self._future_result(future, msg_path_and_file_name)
+        status = pdf_result.status
+        if self.pdf_manifest and status == MsgPdfStatus.GENERATED and pdf_result.fingerprint:
+            self.pdf_manifest.record(pdf_result.msg_path_and_file_name, pdf_result.fingerprint, pdf_result.pdf_path_and_file_name)
+        with self._lock:
+            if status == MsgPdfStatus.GENERATED:
+                self._progress.generated_count += 1
+            elif status == MsgPdfStatus.SKIPPED:
+                self._progress.skipped_count += 1
+            else:
+                self._progress.failed_count += 1
+            self._result_counted.notify_all()
+
+    @staticmethod
+    def _future_result(future: Future, msg_path_and_file_name: str) -> MsgPdfResult:
+        """
+        Ergebnis eines Futures; ein abgestürzter Prozess wird als fehlgeschlagene PDF-Erzeugung gewertet.
+        """
+        try:
+            return future.result()
+        except Exception as e:
+            return MsgPdfResult(msg_path_and_file_name, os.path.splitext(msg_path_and_file_name)[0] + ".pdf", MsgPdfStatus.FAILED, error=str(e))
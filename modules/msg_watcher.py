@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+msg_watcher.py
+
+Dieses Modul überwacht ein Verzeichnis (optional mit Unterverzeichnissen) auf neue oder geänderte MSG-Dateien,
+z.B. wenn E-Mails aus Outlook per Drag & Drop in Projektordner gezogen werden. Damit kann msg_file_renamer.py
+mit --watch dauerhaft laufen und nur die neuen Dateien bearbeiten, statt den gesamten Verzeichnisbaum erneut
+zu durchsuchen und alle MSG-Dateien erneut einzulesen.
+
+Ablauf:
+- Beim Start wird einmalig der aktuelle Stand (Größe und Änderungszeit aller MSG-Dateien) aufgenommen.
+- Änderungen werden über die Windows-Benachrichtigungen für Verzeichnisse (ReadDirectoryChangesW, pywin32)
+  erkannt. Steht das nicht zur Verfügung oder ist die Polling-Variante gewünscht, wird der Verzeichnisbaum im
+  festen Abstand gelistet und mit dem bekannten Stand verglichen (ohne die MSG-Dateien zu öffnen).
+- Dateien, die noch geschrieben werden, werden erst bearbeitet, wenn sich Größe und Änderungszeit für die
+  Dauer der Entprellzeit (debounce) nicht mehr geändert haben.
+- Der Aufrufer meldet bearbeitete Dateien (alter und neuer Name) über acknowledge() zurück. Eigene Änderungen
+  (Umbenennen, Zeitstempel) lösen dadurch keine erneute Bearbeitung aus.
+
+Funktionen und Klassen:
+- MsgWatchBackend: Enum mit den verfügbaren Verfahren (auto, native, polling).
+- MsgDirectoryWatcher: Überwachung eines Verzeichnisses.
+    - start(): Nimmt den aktuellen Stand auf und startet die Überwachung.
+    - acknowledge(*paths): Merkt sich den Stand bearbeiteter Dateien.
+    - iter_changed_directories(on_idle): Liefert die bereiten Dateien je Verzeichnis, bis Strg+C gedrückt wird.
+    - stop(): Beendet die Überwachung.
+
+Beispiel:
+    watcher = MsgDirectoryWatcher(r"D:/Projekte", recursive=True)
+    watcher.start()
+    for msg_directory in watcher.iter_changed_directories():
+        for msg_entry in msg_directory.msg_entries:
+            ...
+            watcher.acknowledge(msg_entry.path)
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Iterator, Optional
+
+from modules.msg_discovery import MsgDirectoryListing, MsgPathFilter, is_msg_filename, iter_msg_directories
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_watcher' aktiviert.")
+
+# Konstanten für ReadDirectoryChangesW (winnt.h)
+FILE_LIST_DIRECTORY = 0x0001
+FILE_ACTION_ADDED = 1
+FILE_ACTION_MODIFIED = 3
+FILE_ACTION_RENAMED_NEW_NAME = 5
+NOTIFY_BUFFER_SIZE = 64 * 1024
+
+
+class MsgWatchBackend(Enum):
+    AUTO = "auto"
+    NATIVE = "native"
+    POLLING = "polling"
+
+
+@dataclass
+class _PendingFile:
+    """
+    Eine geänderte Datei, die auf das Ende der Entprellzeit wartet.
+    """
+    last_event_at: float
+    last_stat: Optional[tuple] = None
+
+
+def _file_signature(path: str) -> Optional[tuple]:
+    """
+    Ermittelt (Größe, Änderungszeit in ns) einer Datei, None wenn sie nicht (mehr) existiert.
+    """
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    return file_stat.st_size, file_stat.st_mtime_ns
+
+
+class MsgDirectoryWatcher:
+    """
+    Überwacht ein Verzeichnis auf neue oder geänderte MSG-Dateien und liefert sie entprellt je Verzeichnis.
+    """
+
+    def __init__(self, root_directory, recursive: bool = True, path_filter: Optional[MsgPathFilter] = None,
+                 debounce_seconds: float = 2.0, poll_interval_seconds: float = 5.0,
+                 backend: MsgWatchBackend = MsgWatchBackend.AUTO,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Parameter:
+        root_directory (str | Path): Das überwachte Verzeichnis.
+        recursive (bool): Wenn True, werden auch alle Unterverzeichnisse überwacht (Standard: True).
+        path_filter (MsgPathFilter | None): Optionaler Filter für Teilbäume, Dateien und Tiefe.
+        debounce_seconds (float): Ruhezeit, nach der eine geänderte Datei als vollständig geschrieben gilt.
+        poll_interval_seconds (float): Abstand zwischen zwei Listen des Verzeichnisbaums im Polling-Betrieb.
+        backend (MsgWatchBackend): Verfahren für die Erkennung von Änderungen (Standard: auto).
+        clock, sleep: Zeitquelle und Wartefunktion (austauschbar, z.B. für Tests).
+        """
+        self.root_directory = os.fspath(root_directory)
+        self.recursive = recursive
+        self.path_filter = path_filter
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.backend = backend
+        self._clock = clock
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._known_files: dict[str, tuple] = {}
+        self._pending_files: dict[str, _PendingFile] = {}
+        self._stop_event = threading.Event()
+        self._rescan_required = False
+        self._next_poll_at = 0.0
+        self._native_thread: Optional[threading.Thread] = None
+        self.active_backend: Optional[MsgWatchBackend] = None
+
+    def start(self):
+        """
+        Nimmt den aktuellen Stand aller MSG-Dateien auf und startet die Überwachung.
+        """
+        self._known_files = self._snapshot()
+        app_logger.info(f"Überwachung: {len(self._known_files)} vorhandene MSG-Dateien in '{self.root_directory}' erfasst.")
+
+        self.active_backend = MsgWatchBackend.POLLING
+        if self.backend in (MsgWatchBackend.AUTO, MsgWatchBackend.NATIVE):
+            if self._start_native_watcher():
+                self.active_backend = MsgWatchBackend.NATIVE
+            elif self.backend == MsgWatchBackend.NATIVE:
+                app_logger.warning("Native Überwachung nicht verfügbar, es wird Polling verwendet.")
+
+        self._next_poll_at = self._clock() + self.poll_interval_seconds
+        app_logger.info(f"Überwachung gestartet (Verfahren: {self.active_backend.value}).")
+
+    def stop(self):
+        """
+        Beendet die Überwachung.
+        """
+        self._stop_event.set()
+
+    def acknowledge(self, *paths):
+        """
+        Merkt sich den aktuellen Stand bearbeiteter Dateien, damit eigene Änderungen keine erneute Bearbeitung auslösen.
+        Nicht (mehr) vorhandene Dateien werden aus dem bekannten Stand entfernt.
+
+        Parameter:
+        paths (str): Die Pfade der bearbeiteten Dateien (z.B. alter und neuer Name, None wird ignoriert).
+        """
+        with self._lock:
+            for path in paths:
+                if not path:
+                    continue
+                signature = _file_signature(path)
+                if signature is None:
+                    self._known_files.pop(path, None)
+                else:
+                    self._known_files[path] = signature
+
+    def iter_changed_directories(self, on_idle: Optional[Callable[[], None]] = None) -> Iterator[MsgDirectoryListing]:
+        """
+        Liefert die neuen oder geänderten MSG-Dateien je Verzeichnis, sobald sie vollständig geschrieben sind.
+        Die Schleife läuft, bis stop() aufgerufen oder Strg+C gedrückt wird.
+
+        Parameter:
+        on_idle (Callable | None): Wird bei jedem Durchlauf aufgerufen (z.B. für fällige Wiederholungen).
+
+        Rückgabewert:
+        Iterator[MsgDirectoryListing]: Ein Eintrag pro Verzeichnis mit bereiten Dateien.
+        """
+        tick_seconds = max(0.1, min(0.5, self.debounce_seconds / 2))
+        try:
+            while not self._stop_event.is_set():
+                now = self._clock()
+                if self.active_backend == MsgWatchBackend.POLLING and now >= self._next_poll_at:
+                    self._poll()
+                    self._next_poll_at = now + self.poll_interval_seconds
+                elif self._rescan_required:
+                    # Benachrichtigungen gingen verloren (Pufferüberlauf), daher einmal vollständig vergleichen
+                    self._rescan_required = False
+                    self._poll()
+
+                for msg_directory in self._collect_ready_directories():
+                    yield msg_directory
+
+                if on_idle is not None:
+                    on_idle()
+                self._sleep(tick_seconds)
+        except KeyboardInterrupt:
+            app_logger.info("Überwachung durch Benutzer beendet.")
+        finally:
+            self.stop()
+
+    def _note_event(self, path: str):
+        """
+        Vermerkt eine Änderung an einer Datei; die Entprellzeit beginnt von vorn.
+        """
+        if not self._is_watched_file(path):
+            return
+        now = self._clock()
+        with self._lock:
+            pending_file = self._pending_files.get(path)
+            if pending_file is None:
+                self._pending_files[path] = _PendingFile(last_event_at=now)
+            else:
+                pending_file.last_event_at = now
+
+    def _is_watched_file(self, path: str) -> bool:
+        """
+        Prüft, ob eine Datei zur Überwachung gehört (Endung, Rekursion und Filter).
+        """
+        if not is_msg_filename(os.path.basename(path)):
+            return False
+        relative_path = os.path.relpath(path, self.root_directory).replace(os.sep, "/")
+        if relative_path.startswith("../"):
+            return False
+        relative_parts = relative_path.split("/")
+        if not self.recursive and len(relative_parts) > 1:
+            return False
+        if self.path_filter is None:
+            return True
+        for depth in range(1, len(relative_parts)):
+            if not self.path_filter.should_descend("/".join(relative_parts[:depth]), depth):
+                return False
+        return self.path_filter.accepts_file(relative_path)
+
+    def _snapshot(self) -> dict:
+        """
+        Listet alle überwachten MSG-Dateien und ermittelt deren Größe und Änderungszeit (ohne sie zu öffnen).
+        """
+        snapshot = {}
+        for msg_directory in iter_msg_directories(self.root_directory, recursive=self.recursive, path_filter=self.path_filter):
+            for msg_entry in msg_directory.msg_entries:
+                try:
+                    entry_stat = msg_entry.stat()
+                except OSError:
+                    continue
+                snapshot[msg_entry.path] = (entry_stat.st_size, entry_stat.st_mtime_ns)
+        return snapshot
+
+    def _poll(self):
+        """
+        Vergleicht den aktuellen Stand mit dem bekannten Stand und vermerkt neue oder geänderte Dateien.
+        """
+        current_files = self._snapshot()
+        with self._lock:
+            changed_paths = [path for path, signature in current_files.items()
+                             if self._known_files.get(path) != signature and path not in self._pending_files]
+            for removed_path in set(self._known_files) - set(current_files):
+                del self._known_files[removed_path]
+        for path in changed_paths:
+            self._note_event(path)
+
+    def _collect_ready_directories(self) -> list[MsgDirectoryListing]:
+        """
+        Ermittelt die Dateien, deren Entprellzeit abgelaufen ist, und listet deren Verzeichnisse (Snapshot).
+        """
+        now = self._clock()
+        ready_paths = []
+        with self._lock:
+            for path, pending_file in list(self._pending_files.items()):
+                signature = _file_signature(path)
+                if signature is None:
+                    del self._pending_files[path]  # Datei wurde inzwischen verschoben oder gelöscht
+                elif signature != pending_file.last_stat:
+                    pending_file.last_stat = signature  # Datei wird noch geschrieben
+                    pending_file.last_event_at = now
+                elif now - pending_file.last_event_at >= self.debounce_seconds:
+                    del self._pending_files[path]
+                    if self._known_files.get(path) != signature:
+                        ready_paths.append(path)
+
+        # Bereite Dateien je Verzeichnis zusammenfassen und als os.DirEntry aus einer frischen Verzeichnisliste liefern
+        ready_names_by_directory: dict[str, set] = {}
+        for path in ready_paths:
+            ready_names_by_directory.setdefault(os.path.dirname(path), set()).add(os.path.basename(path))
+
+        ready_directories = []
+        for directory_path, ready_names in ready_names_by_directory.items():
+            try:
+                with os.scandir(directory_path) as directory_iterator:
+                    msg_entries = [entry for entry in directory_iterator if entry.name in ready_names]
+            except OSError as e:
+                app_logger.warning(f"Verzeichnis kann nicht gelistet werden: '{directory_path}' ({e})")
+                continue
+            if not msg_entries:
+                continue
+            relative_path = os.path.relpath(directory_path, self.root_directory).replace(os.sep, "/")
+            relative_path = "" if relative_path == "." else relative_path
+            depth = 0 if not relative_path else relative_path.count("/") + 1
+            app_logger.info(f"Überwachung: {len(msg_entries)} neue oder geänderte MSG-Datei(en) in '{directory_path}'.")
+            ready_directories.append(MsgDirectoryListing(directory_path=directory_path, depth=depth, msg_entries=msg_entries,
+                                                         relative_path=relative_path))
+        return ready_directories
+
+    def _start_native_watcher(self) -> bool:
+        """
+        Startet die Überwachung über ReadDirectoryChangesW in einem Hintergrund-Thread.
+
+        Rückgabewert:
+        bool: True, wenn die native Überwachung gestartet wurde.
+        """
+        try:
+            import win32con
+            import win32file
+        except ImportError:
+            return False
+
+        try:
+            directory_handle = win32file.CreateFile(
+                self.root_directory,
+                FILE_LIST_DIRECTORY,
+                win32con.FILE_SHARE_READ | win32con.FILE_SHARE_WRITE | win32con.FILE_SHARE_DELETE,
+                None,
+                win32con.OPEN_EXISTING,
+                win32con.FILE_FLAG_BACKUP_SEMANTICS,
+                None,
+            )
+        except Exception as e:
+            app_logger.warning(f"Native Überwachung für '{self.root_directory}' nicht möglich: {e}")
+            return False
+
+        notify_filter = (win32con.FILE_NOTIFY_CHANGE_FILE_NAME | win32con.FILE_NOTIFY_CHANGE_SIZE
+                         | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE)
+
+        def native_watch_loop():
+            try:
+                while not self._stop_event.is_set():
+                    changes = win32file.ReadDirectoryChangesW(directory_handle, NOTIFY_BUFFER_SIZE, self.recursive,
+                                                              notify_filter, None, None)
+                    if not changes:
+                        self._rescan_required = True  # Pufferüberlauf, Änderungen sind verloren gegangen
+                        continue
+                    for action, relative_name in changes:
+                        if action in (FILE_ACTION_ADDED, FILE_ACTION_MODIFIED, FILE_ACTION_RENAMED_NEW_NAME):
+                            self._note_event(os.path.join(self.root_directory, relative_name))
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    app_logger.error(f"Native Überwachung abgebrochen, es wird Polling verwendet: {e}")
+                    self.active_backend = MsgWatchBackend.POLLING
+            finally:
+                directory_handle.Close()
+
+        self._native_thread = threading.Thread(target=native_watch_loop, name="msg_watch", daemon=True)
+        self._native_thread.start()
+        return True
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+msg_work_leases.py
+
+Dieses Modul verteilt die Arbeit mehrerer gleichzeitig laufender Aufrufe von msg_file_renamer.py (auch auf
+verschiedenen Rechnern) dynamisch über Lease-Dateien auf der gemeinsamen Freigabe (--cooperative).
+
+Anders als bei der festen Aufteilung mit --shard bleibt kein Aufruf untätig, wenn ein Teilbaum deutlich größer ist
+als die anderen: Jedes Verzeichnis mit MSG-Dateien ist eine Arbeitseinheit, die sich der erste freie Aufruf nimmt.
+
+Ablauf:
+- Alle Aufrufe durchsuchen den Verzeichnisbaum. Vor der Bearbeitung eines Verzeichnisses wird eine Lease-Datei
+  exklusiv angelegt (os.O_CREAT | os.O_EXCL). Das gelingt auch auf Netzlaufwerken nur genau einem Aufruf.
+- Solange ein Aufruf ein Verzeichnis bearbeitet, aktualisiert ein Hintergrund-Thread regelmäßig die Änderungszeit
+  der Lease-Datei (Heartbeat).
+- Nach der Bearbeitung wird eine Erledigt-Markierung angelegt und die Lease-Datei gelöscht.
+- Eine Lease-Datei ohne Heartbeat innerhalb der Ablaufzeit gilt als verwaist (Aufruf abgestürzt). Sie wird durch
+  atomares Umbenennen übernommen, das ebenfalls nur einem Aufruf gelingt, und das Verzeichnis wird erneut bearbeitet.
+  Ist die umbenannte Lease inzwischen eine neue, aktive Lease eines anderen Aufrufs, wird sie zurück umbenannt.
+- Am Ende seiner Suche wartet jeder Aufruf auf die Verzeichnisse, die andere Aufrufe gerade bearbeiten, und
+  übernimmt sie, falls deren Lease abläuft. So bleibt die Bearbeitung vollständig, auch wenn ein Aufruf ausfällt.
+
+Die Uhren der beteiligten Rechner müssen synchron laufen (z.B. über die Windows-Zeitsynchronisation), da die
+Ablaufzeit über die Änderungszeit der Lease-Dateien bestimmt wird.
+
+Funktionen und Klassen:
+- WorkLeaseStatistics: Datenklasse mit der Statistik eines Aufrufs.
+- CooperativeWorkDistributor: Verteilung der Verzeichnisse über Lease-Dateien.
+    - iter_claimed_directories(msg_directories): Liefert nur die Verzeichnisse, die dieser Aufruf bearbeiten soll.
+    - close(): Beendet den Heartbeat und gibt offene Leases frei.
+"""
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
+
+from modules.msg_discovery import MsgDirectoryListing, MsgPathFilter, is_msg_filename, _join_relative_path
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_work_leases' aktiviert.")
+
+# Standardname des Lease-Verzeichnisses im Such-Verzeichnis
+DEFAULT_LEASE_DIRECTORY_NAME = ".msg_leases"
+
+LEASE_FILE_EXTENSION = ".lease"
+DONE_FILE_EXTENSION = ".done"
+
+
+@dataclass
+class WorkLeaseStatistics:
+    """
+    WorkLeaseStatistics
+
+    Diese Datenklasse enthält die Statistik eines Aufrufs im kooperativen Betrieb.
+
+    Attribute:
+    - claimed_count: Anzahl der von diesem Aufruf bearbeiteten Verzeichnisse.
+    - done_by_others_count: Anzahl der Verzeichnisse, die bereits von anderen Aufrufen erledigt waren.
+    - waited_count: Anzahl der Verzeichnisse, auf deren Bearbeitung durch andere Aufrufe gewartet wurde.
+    - taken_over_count: Anzahl der übernommenen Verzeichnisse mit abgelaufener Lease.
+    """
+    claimed_count: int = 0
+    done_by_others_count: int = 0
+    waited_count: int = 0
+    taken_over_count: int = 0
+
+
+class CooperativeWorkDistributor:
+    """
+    Verteilt Verzeichnisse mit MSG-Dateien über Lease-Dateien auf mehrere gleichzeitig laufende Aufrufe.
+    """
+
+    def __init__(self, lease_directory, lease_timeout_seconds: float = 120.0, heartbeat_interval_seconds: float = 15.0,
+                 path_filter: Optional[MsgPathFilter] = None, worker_id: Optional[str] = None,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        """
+        Parameter:
+        lease_directory (str | Path): Verzeichnis für Lease-Dateien und Erledigt-Markierungen (gemeinsam für alle Aufrufe eines Laufs).
+        lease_timeout_seconds (float): Zeit ohne Heartbeat, nach der eine Lease als verwaist gilt.
+        heartbeat_interval_seconds (float): Abstand der Heartbeats für gehaltene Leases.
+        path_filter (MsgPathFilter | None): Filter der Suche (wird beim erneuten Listen übernommener Verzeichnisse benötigt).
+        worker_id (str | None): Kennung dieses Aufrufs (Standard: Rechnername, Prozess-ID und Zufallswert).
+        clock, sleep: Zeitquelle (Wanduhr, vergleichbar mit Datei-Zeitstempeln) und Wartefunktion.
+        """
+        self.lease_directory = os.fspath(lease_directory)
+        self.lease_timeout_seconds = lease_timeout_seconds
+        self.heartbeat_interval_seconds = heartbeat_interval_seconds
+        self.path_filter = path_filter
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.statistics = WorkLeaseStatistics()
+        self._clock = clock
+        self._sleep = sleep
+
+        self._held_leases: set[str] = set()
+        self._held_leases_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        os.makedirs(self.lease_directory, exist_ok=True)
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="msg_lease_heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+        app_logger.info(f"Kooperativer Betrieb als '{self.worker_id}', Lease-Verzeichnis '{self.lease_directory}'.")
+
+    def iter_claimed_directories(self, msg_directories: Iterable[MsgDirectoryListing]) -> Iterator[MsgDirectoryListing]:
+        """
+        Liefert aus den gefundenen Verzeichnissen nur diejenigen, deren Lease dieser Aufruf erhalten hat.
+        Ein Verzeichnis gilt als erledigt, sobald der Aufrufer das nächste Verzeichnis anfordert.
+        Nach der Suche wird auf Verzeichnisse anderer Aufrufe gewartet und bei abgelaufener Lease übernommen.
+
+        Parameter:
+        msg_directories (Iterable[MsgDirectoryListing]): Die gefundenen Verzeichnisse (z.B. aus discover_msg_directories).
+
+        Rückgabewert:
+        Iterator[MsgDirectoryListing]: Die von diesem Aufruf zu bearbeitenden Verzeichnisse.
+        """
+        busy_directories = []  # Verzeichnisse, die gerade von anderen Aufrufen bearbeitet werden
+
+        for msg_directory in msg_directories:
+            if not msg_directory.msg_entries:
+                continue  # Verzeichnisse ohne MSG-Dateien sind keine Arbeitseinheit
+            work_key = self._work_key(msg_directory.directory_path)
+            if self._is_done(work_key):
+                self.statistics.done_by_others_count += 1
+                continue
+            if self._try_claim(work_key, msg_directory.directory_path):
+                self.statistics.claimed_count += 1
+                yield msg_directory
+                self._complete(work_key)
+            elif self._is_done(work_key):
+                self.statistics.done_by_others_count += 1
+            else:
+                busy_directories.append(msg_directory)
+
+        # Auf die Verzeichnisse anderer Aufrufe warten; verwaiste Leases übernehmen
+        if busy_directories:
+            self.statistics.waited_count += len(busy_directories)
+            app_logger.info(f"Warte auf {len(busy_directories)} Verzeichnis(se), die von anderen Aufrufen bearbeitet werden.")
+        while busy_directories:
+            still_busy = []
+            for msg_directory in busy_directories:
+                work_key = self._work_key(msg_directory.directory_path)
+                if self._is_done(work_key):
+                    continue
+                if self._try_claim(work_key, msg_directory.directory_path):
+                    self.statistics.taken_over_count += 1
+                    app_logger.warning(f"Verzeichnis nach abgelaufener Lease übernommen: '{msg_directory.directory_path}'")
+                    relisted_directory = self._relist(msg_directory)
+                    if relisted_directory is not None:
+                        yield relisted_directory
+                    self._complete(work_key)
+                else:
+                    still_busy.append(msg_directory)
+            busy_directories = still_busy
+            if busy_directories:
+                self._sleep(min(self.heartbeat_interval_seconds, self.lease_timeout_seconds / 4))
+
+    def close(self):
+        """
+        Beendet den Heartbeat und gibt noch gehaltene Leases frei (z.B. nach einem Abbruch).
+        """
+        self._stop_event.set()
+        with self._held_leases_lock:
+            held_leases = list(self._held_leases)
+            self._held_leases.clear()
+        for lease_path in held_leases:
+            try:
+                os.remove(lease_path)
+            except OSError:
+                pass
+        app_logger.info(f"Kooperativer Betrieb beendet: {self.statistics}")
+
+    def _work_key(self, directory_path: str) -> str:
+        """
+        Stabiler Schlüssel eines Verzeichnisses für die Dateinamen im Lease-Verzeichnis.
+        """
+        normalized_path = os.path.normcase(os.path.abspath(directory_path))
+        return hashlib.md5(normalized_path.encode("utf-8")).hexdigest()
+
+    def _lease_path(self, work_key: str) -> str:
+        return os.path.join(self.lease_directory, work_key + LEASE_FILE_EXTENSION)
+
+    def _done_path(self, work_key: str) -> str:
+        return os.path.join(self.lease_directory, work_key + DONE_FILE_EXTENSION)
+
+    def _is_done(self, work_key: str) -> bool:
+        return os.path.exists(self._done_path(work_key))
+
+    def _try_claim(self, work_key: str, directory_path: str) -> bool:
+        """
+        Versucht, die Lease für ein Verzeichnis exklusiv anzulegen. Eine verwaiste Lease wird vorher übernommen.
+
+        Rückgabewert:
+        bool: True, wenn dieser Aufruf die Lease erhalten hat.
+        """
+        lease_path = self._lease_path(work_key)
+        for _ in range(2):  # Zweiter Versuch nach dem Entfernen einer verwaisten Lease
+            try:
+                lease_descriptor = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._remove_expired_lease(lease_path):
+                    return False
+                continue
+            except OSError as e:
+                app_logger.error(f"Lease-Datei kann nicht angelegt werden: '{lease_path}' ({e})")
+                return False
+
+            lease_info = {"worker_id": self.worker_id, "directory": directory_path, "claimed_at": self._clock()}
+            with os.fdopen(lease_descriptor, "w", encoding="utf-8") as lease_file:
+                json.dump(lease_info, lease_file)
+            with self._held_leases_lock:
+                self._held_leases.add(lease_path)
+            # Ein anderer Aufruf kann das Verzeichnis zwischen Prüfung und Anlegen erledigt haben
+            if self._is_done(work_key):
+                self._release(lease_path)
+                return False
+            app_logger.debug(f"Lease erhalten für '{directory_path}'")
+            return True
+        return False
+
+    def _remove_expired_lease(self, lease_path: str) -> bool:
+        """
+        Entfernt eine verwaiste Lease (ohne Heartbeat innerhalb der Ablaufzeit) durch atomares Umbenennen.
+
+        Zwischen Prüfung und Umbenennen kann ein anderer Aufruf dieselbe verwaiste Lease entfernt und eine neue angelegt
+        haben. Daher werden Änderungszeit und Inhalt (worker_id, claimed_at) nach dem Umbenennen erneut geprüft; ist die
+        umbenannte Lease nicht die geprüfte oder nicht mehr abgelaufen, wird sie zurück umbenannt.
+
+        Rückgabewert:
+        bool: True, wenn die Lease von diesem Aufruf entfernt wurde.
+        """
+        try:
+            lease_age_seconds = self._clock() - os.stat(lease_path).st_mtime
+        except FileNotFoundError:
+            return True  # Lease wurde inzwischen freigegeben
+        except OSError:
+            return False
+        if lease_age_seconds < self.lease_timeout_seconds:
+            return False
+        checked_lease_owner = self._lease_owner(self._read_lease_info(lease_path))
+
+        expired_path = f"{lease_path}.expired-{self.worker_id}"
+        try:
+            os.rename(lease_path, expired_path)  # Gelingt nur einem Aufruf
+        except OSError:
+            return False
+        expired_info = self._read_lease_info(expired_path)
+        try:
+            lease_age_seconds = self._clock() - os.stat(expired_path).st_mtime
+        except OSError:
+            lease_age_seconds = 0.0
+        if lease_age_seconds < self.lease_timeout_seconds or self._lease_owner(expired_info) != checked_lease_owner:
+            # Inzwischen neu angelegte bzw. aktive Lease eines anderen Aufrufs: zurück umbenennen, nicht übernehmen
+            self._restore_lease(expired_path, lease_path)
+            return False
+        app_logger.warning(f"Verwaiste Lease von '{expired_info.get('worker_id', 'unbekannt')}' für "
+                           f"'{expired_info.get('directory', lease_path)}' nach {lease_age_seconds:.0f} s entfernt.")
+        try:
+            os.remove(expired_path)
+        except OSError:
+            pass
+        return True
+
+    @staticmethod
+    def _read_lease_info(lease_path: str) -> dict:
+        """
+        Liest den Inhalt einer Lease-Datei (leer, wenn sie fehlt, gerade angelegt wird oder ungültig ist).
+        """
+        try:
+            with open(lease_path, encoding="utf-8") as lease_file:
+                lease_info = json.load(lease_file)
+        except (OSError, ValueError):
+            return {}
+        return lease_info if isinstance(lease_info, dict) else {}
+
+    @staticmethod
+    def _lease_owner(lease_info: dict) -> tuple:
+        return lease_info.get("worker_id"), lease_info.get("claimed_at")
+
+    def _restore_lease(self, expired_path: str, lease_path: str):
+        """
+        Benennt eine irrtümlich umbenannte, aktive Lease zurück, ohne eine inzwischen angelegte Lease zu überschreiben.
+        """
+        try:
+            if os.name == "nt":
+                os.rename(expired_path, lease_path)  # Unter Windows nie überschreibend
+            else:
+                os.link(expired_path, lease_path)  # Schlägt fehl, wenn die Lease-Datei bereits existiert
+                os.remove(expired_path)
+        except OSError as e:
+            app_logger.error(f"Aktive Lease konnte nicht zurück umbenannt werden: '{expired_path}' -> '{lease_path}' ({e})")
+            return
+        app_logger.info(f"Aktive Lease nach gleichzeitiger Übernahme zurück umbenannt: '{lease_path}'")
+
+    def _complete(self, work_key: str):
+        """
+        Legt die Erledigt-Markierung an und gibt die Lease frei.
+        """
+        try:
+            with open(self._done_path(work_key), "w", encoding="utf-8") as done_file:
+                json.dump({"worker_id": self.worker_id, "done_at": self._clock()}, done_file)
+        except OSError as e:
+            app_logger.error(f"Erledigt-Markierung kann nicht angelegt werden: '{self._done_path(work_key)}' ({e})")
+        self._release(self._lease_path(work_key))
+
+    def _release(self, lease_path: str):
+        with self._held_leases_lock:
+            self._held_leases.discard(lease_path)
+        try:
+            os.remove(lease_path)
+        except OSError as e:
+            app_logger.warning(f"Lease-Datei kann nicht gelöscht werden: '{lease_path}' ({e})")
+
+    def _relist(self, msg_directory: MsgDirectoryListing) -> Optional[MsgDirectoryListing]:
+        """
+        Listet ein übernommenes Verzeichnis erneut, da der abgebrochene Aufruf Dateien bereits umbenannt haben kann.
+        """
+        try:
+            with os.scandir(msg_directory.directory_path) as directory_iterator:
+                directory_entries = list(directory_iterator)
+        except OSError as e:
+            app_logger.warning(f"Verzeichnis kann nicht gelistet werden: '{msg_directory.directory_path}' ({e})")
+            return None
+
+        msg_entries = []
+        for entry in directory_entries:
+            if not is_msg_filename(entry.name) or not entry.is_file(follow_symlinks=False):
+                continue
+            relative_file_path = _join_relative_path(msg_directory.relative_path, entry.name)
+            if self.path_filter is None or self.path_filter.accepts_file(relative_file_path):
+                msg_entries.append(entry)
+        return MsgDirectoryListing(directory_path=msg_directory.directory_path, depth=msg_directory.depth,
+                                   msg_entries=msg_entries, relative_path=msg_directory.relative_path)
+
+    def _heartbeat_loop(self):
+        """
+        Aktualisiert regelmäßig die Änderungszeit aller gehaltenen Leases.
+        """
+        while not self._stop_event.wait(self.heartbeat_interval_seconds):
+            with self._held_leases_lock:
+                held_leases = list(self._held_leases)
+            for lease_path in held_leases:
+                try:
+                    os.utime(lease_path)
+                except OSError as e:
+                    app_logger.warning(f"Heartbeat für Lease-Datei fehlgeschlagen: '{lease_path}' ({e})")
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+msg_benchmark.py
+
+Dieses Modul misst die Laufzeit der zeitkritischen Funktionen von msg_file_renamer.py (Micro-Benchmarks,
+utils.micro_benchmark) und vergleicht sie mit einer gespeicherten Baseline. Ist eine Funktion um mehr als die
+Schwelle langsamer geworden, endet das Programm mit dem Rückgabewert 1. So lässt sich die Wirkung einer Änderung
+messen, statt sie zu schätzen.
+
+Gemessen werden get_msg_object, generate_new_msg_filename, custom_sanitize_text, parse_sender_msg_file,
+truncate_filename_if_needed, log_entry_neu, clean_email_text und generate_pdf_from_msg. Die MSG-Dateien für die
+Messung werden mit utils.msg_file_writer in einem temporären Verzeichnis erzeugt (eine kleine und eine große Nachricht
+mit Antwortkette und Anhängen), dazu die Beispieldatei aus SOURCE_DIRECTORY_TEST_DATA, wenn vorhanden.
+
+Die Baseline ist rechnerabhängig: Sie sollte auf dem Rechner erzeugt werden, auf dem auch verglichen wird.
+
+Kommandozeilenargumente:
+--baseline <Datei>
+    JSON-Datei mit der Baseline (Standard: BENCHMARK_BASELINE_FILE).
+--save_baseline
+    Die Ergebnisse als neue Baseline speichern (Schwellen je Benchmark aus der bisherigen Baseline bleiben erhalten).
+--output <Datei>
+    Die Ergebnisse zusätzlich in diese JSON-Datei schreiben.
+--threshold <Prozent>
+    Zulässige Verschlechterung in Prozent (Standard: BENCHMARK_THRESHOLD_PERCENT).
+--compare_stat <Kennwert>
+    Verglichener Kennwert: min, median oder mean (Standard: median).
+--filter <Text>
+    Nur Benchmarks, deren Name den Text enthält.
+--max_time <Sekunden>
+    Messdauer je Benchmark (Standard: 1.0).
+--min_rounds <Anzahl>
+    Mindestanzahl der Runden je Benchmark (Standard: 5).
+
+Beispielaufruf:
+python msg_benchmark.py --save_baseline
+python msg_benchmark.py -t 20
+python msg_benchmark.py -k get_msg_object -mt 3
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from config import BENCHMARK_BASELINE_FILE, BENCHMARK_THRESHOLD_PERCENT, SOURCE_DIRECTORY_TEST_DATA
+from modules.msg_generate_new_filename import generate_new_msg_filename
+from modules.msg_handling import get_msg_object, custom_sanitize_text, parse_sender_msg_file, truncate_filename_if_needed, log_entry_neu
+from modules.msg_pdf_pool import MAX_LENGTH_SENDERLIST
+from utils.pdf_generation import clean_email_text, remove_unsupported_chars, generate_pdf_from_msg
+from utils.pdf_text_golden import PDF_TEXT_GOLDEN_FILE, clean_email_text_reference, remove_unsupported_chars_reference, check_golden_file, write_golden_file
+from utils.msg_file_writer import MsgMessage, MsgAttachment, write_msg_file
+from utils.micro_benchmark import (BenchmarkCase, BenchmarkStatus, COMPARE_STATISTICS, DEFAULT_MAX_TIME_SECONDS, DEFAULT_MIN_ROUNDS,
+                                   run_benchmark, save_benchmark_results, load_benchmark_results, compare_benchmark_results)
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_benchmark' aktiviert.")
+
+# Anzahl der Zeilen der Excel-Log-Datei, an die log_entry_neu einen Eintrag anhängt
+LOG_ENTRY_EXISTING_ROWS = 100
+
+
+def _message_body(paragraph_count: int, quoted_email_count: int) -> str:
+    """
+    Nachrichtentext mit paragraph_count Absätzen und quoted_email_count zitierten älteren E-Mails.
+    """
+    paragraph = ("Vielen Dank für Ihre Anfrage. Anbei erhalten Sie die Unterlagen zum Projekt; bitte prüfen Sie die\r\n"
+                 "Änderungen bis zur nächsten Woche und geben Sie uns eine kurze Rückmeldung.\t&nbsp;\r\n\r\n\r\n")
+    parts = ["Hallo Frau Muster,\r\n\r\n", paragraph * paragraph_count, "Viele Grüße\r\nMax Müller\r\n"]
+    for quote_number in range(quoted_email_count):
+        parts.append(f"\r\n-----Ursprüngliche Nachricht-----\r\nVon: Erika Muster <erika@example.com>\r\n"
+                     f"Gesendet: 0{quote_number + 1}.07.2024 12:30\r\nAn: Max Müller <max@example.de>\r\n"
+                     f"Betreff: {'AW: ' * quote_number}Angebot 2024\r\n\r\n{paragraph * (paragraph_count // 4 + 1)}")
+    return "".join(parts)
+
+
+def create_benchmark_files(directory: str) -> dict:
+    """
+    Erzeugt die MSG-Dateien und die Excel-Log-Datei für die Benchmarks.
+
+    Parameter:
+    directory (str): Temporäres Verzeichnis.
+
+    Rückgabewert:
+    dict: Name -> Pfad ("klein", "gross", ggf. "beispiel" und "excel_log").
+    """
+    sent_time = datetime(2024, 7, 1, 12, 30, tzinfo=timezone.utc)
+    small_message = MsgMessage(subject="AW: Angebot 2024 / Rückfrage", sender_name="Max Müller", sender_email="max@example.de",
+                               recipients=[("Erika Muster", "erika@example.com")], sent_time=sent_time,
+                               body=_message_body(4, 0), message_id="klein@example.de")
+    large_message = MsgMessage(subject="WG: AW: AW: Projektbesprechung <Protokoll> 50% | Teil 2?", sender_name="Müller, Jörg",
+                               sender_email="joerg.mueller@example.de",
+                               recipients=[(f"Empfänger {number}", f"empfaenger{number}@example.com") for number in range(40)],
+                               sent_time=sent_time - timedelta(days=400), body=_message_body(120, 4),
+                               attachments=[MsgAttachment(f"Anlage_{number}.pdf", bytes(range(256)) * 2000, "application/pdf") for number in range(3)],
+                               message_id="gross@example.de")
+
+    benchmark_files = {"klein": os.path.join(directory, "klein.msg"), "gross": os.path.join(directory, "gross.msg")}
+    write_msg_file(benchmark_files["klein"], small_message)
+    write_msg_file(benchmark_files["gross"], large_message)
+
+    sample_file_names = sorted(file_name for file_name in os.listdir(SOURCE_DIRECTORY_TEST_DATA)
+                               if file_name.lower().endswith(".msg")) if os.path.isdir(SOURCE_DIRECTORY_TEST_DATA) else []
+    if sample_file_names:
+        benchmark_files["beispiel"] = os.path.join(directory, "beispiel.msg")
+        shutil.copyfile(os.path.join(SOURCE_DIRECTORY_TEST_DATA, sample_file_names[0]), benchmark_files["beispiel"])
+
+    benchmark_files["excel_log"] = os.path.join(directory, "excel_log.xlsx")
+    log_entry_neu(benchmark_files["excel_log"], [_log_entry(benchmark_files["klein"], row_number) for row_number in range(LOG_ENTRY_EXISTING_ROWS)])
+    return benchmark_files
+
+
+def _log_entry(path_and_file_name: str, row_number: int) -> dict:
+    """
+    Eintrag der Excel-Log-Datei wie in msg_file_renamer.py.
+    """
+    return {"Fortlaufende Nummer": row_number + 1, "Verzeichnisname": os.path.dirname(path_and_file_name),
+            "Original-Filename": os.path.basename(path_and_file_name), "Alter absoluter Dateiname": path_and_file_name,
+            "Alte Pfadlänge": len(path_and_file_name), "Versanddatum": "2024-07-01 12:30:00",
+            "Formatiertes Versanddatum": "2024-07-01_12h30", "Gefundener Absender": "Max Müller",
+            "Gefundener Email-Absender": "max@example.de", "Betreff": "AW: Angebot 2024 / Rückfrage",
+            "Bereinigter Betreff": "AW_Angebot_2024_Rueckfrage", "Doublette": False, "PDF erstellt": True}
+
+
+def build_benchmark_cases(benchmark_files: dict) -> list[BenchmarkCase]:
+    """
+    Stellt die Benchmarks zusammen.
+
+    Parameter:
+    benchmark_files (dict): Ergebnis von create_benchmark_files.
+
+    Rückgabewert:
+    list[BenchmarkCase]: Die Benchmarks (Name = "<Funktion>[<Fall>]").
+    """
+    msg_files = {name: path for name, path in benchmark_files.items() if name != "excel_log"}
+    small_body = get_msg_object(benchmark_files["klein"])["body"]
+    large_body = get_msg_object(benchmark_files["gross"])["body"]
+    long_path = os.path.join(os.path.dirname(benchmark_files["klein"]), "20240701-12uhr30_max@example.de_" + "Sehr_langer_Betreff_" * 15 + ".msg")
+    log_copy_number = [0]
+
+    def copy_excel_log() -> tuple:
+        # Jeder Aufruf hängt an eine frische Kopie mit LOG_ENTRY_EXISTING_ROWS Zeilen an
+        log_copy_number[0] += 1
+        copy_path = os.path.join(os.path.dirname(benchmark_files["excel_log"]), f"excel_log_{log_copy_number[0] % 2}.xlsx")
+        shutil.copyfile(benchmark_files["excel_log"], copy_path)
+        return (copy_path, _log_entry(benchmark_files["klein"], LOG_ENTRY_EXISTING_ROWS)), {}
+
+    cases = []
+    for name, path in msg_files.items():
+        cases.append(BenchmarkCase(f"get_msg_object[{name}]", get_msg_object, (path,), group="get_msg_object"))
+    for name, path in msg_files.items():
+        cases.append(BenchmarkCase(f"generate_new_msg_filename[{name}]", generate_new_msg_filename, (path,), group="generate_new_msg_filename"))
+    cases += [
+        BenchmarkCase("custom_sanitize_text[betreff]", custom_sanitize_text, ("AW: WG: Angebot <Müller> / Rückfrage: 50% | Teil 2?",), group="custom_sanitize_text"),
+        BenchmarkCase("custom_sanitize_text[lang]", custom_sanitize_text, ("Re: Fwd: Projektbesprechung \"Änderungen\" – Protokoll / Teil 1 " * 10,), group="custom_sanitize_text"),
+        BenchmarkCase("parse_sender_msg_file[name_email]", parse_sender_msg_file, ("Müller, Jörg <joerg.mueller@example.de>",), group="parse_sender_msg_file"),
+        BenchmarkCase("parse_sender_msg_file[nur_name]", parse_sender_msg_file, ("Jörg Müller",), group="parse_sender_msg_file"),
+        BenchmarkCase("truncate_filename_if_needed[kuerzen]", truncate_filename_if_needed, (long_path, 260, "...msg"), group="truncate_filename_if_needed"),
+        BenchmarkCase("truncate_filename_if_needed[unveraendert]", truncate_filename_if_needed, (benchmark_files["klein"], 260, "...msg"), group="truncate_filename_if_needed"),
+        BenchmarkCase(f"log_entry_neu[{LOG_ENTRY_EXISTING_ROWS}_zeilen]", log_entry_neu, setup=copy_excel_log, group="log_entry_neu"),
+        BenchmarkCase("clean_email_text[klein]", clean_email_text, (small_body,), group="clean_email_text"),
+        BenchmarkCase("clean_email_text[gross]", clean_email_text, (large_body,), group="clean_email_text"),
+        BenchmarkCase("clean_email_text_bisher[klein]", clean_email_text_reference, (small_body,), group="clean_email_text"),
+        BenchmarkCase("clean_email_text_bisher[gross]", clean_email_text_reference, (large_body,), group="clean_email_text"),
+        BenchmarkCase("remove_unsupported_chars[gross]", remove_unsupported_chars, (large_body,), group="remove_unsupported_chars"),
+        BenchmarkCase("remove_unsupported_chars_bisher[gross]", remove_unsupported_chars_reference, (large_body,), group="remove_unsupported_chars"),
+    ]
+    for name, path in msg_files.items():
+        cases.append(BenchmarkCase(f"generate_pdf_from_msg[{name}]", generate_pdf_from_msg, (path, MAX_LENGTH_SENDERLIST), group="generate_pdf_from_msg"))
+    return cases
+
+
+def _format_milliseconds(seconds) -> str:
+    return "" if seconds is None else f"{seconds * 1000:.4f}"
+
+
+if __name__ == '__main__':
+    # Argumente des Programmaufrufs über die Kommandozeile auswerten
+    parser = argparse.ArgumentParser(description="Micro-Benchmarks der zeitkritischen Funktionen mit Vergleich zur Baseline")
+    parser.add_argument("-b", "--baseline", type=str, default=BENCHMARK_BASELINE_FILE, help=f"JSON-Datei mit der Baseline (Default='{BENCHMARK_BASELINE_FILE}')")
+    parser.add_argument("-sb", "--save_baseline", action="store_true", help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument("-o", "--output", type=str, default="", help="Ergebnisse zusätzlich in diese JSON-Datei schreiben")
+    parser.add_argument("-t", "--threshold", type=float, default=BENCHMARK_THRESHOLD_PERCENT, help=f"Zulässige Verschlechterung in Prozent (Default={BENCHMARK_THRESHOLD_PERCENT})")
+    parser.add_argument("-cs", "--compare_stat", type=str, choices=COMPARE_STATISTICS, default="median", help="Verglichener Kennwert (Default='median')")
+    parser.add_argument("-k", "--filter", type=str, default="", help="Nur Benchmarks, deren Name den Text enthält")
+    parser.add_argument("-mt", "--max_time", type=float, default=DEFAULT_MAX_TIME_SECONDS, help=f"Messdauer je Benchmark in Sekunden (Default={DEFAULT_MAX_TIME_SECONDS})")
+    parser.add_argument("-mr", "--min_rounds", type=int, default=DEFAULT_MIN_ROUNDS, help=f"Mindestanzahl der Runden je Benchmark (Default={DEFAULT_MIN_ROUNDS})")
+    parser.add_argument("-wg", "--write_golden", action="store_true", help="Goldene Testfälle der Textbereinigung aus der bisherigen Umsetzung neu schreiben und beenden")
+    args = parser.parse_args()
+
+    # Goldene Testfälle: Die beschleunigte Textbereinigung muss dieselben Ergebnisse liefern wie die bisherige Umsetzung
+    if args.write_golden:
+        print(f"{write_golden_file()} goldene Testfälle geschrieben: {PDF_TEXT_GOLDEN_FILE}")
+        sys.exit(0)
+    try:
+        golden_mismatches = check_golden_file()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Goldene Testfälle können nicht gelesen werden: {e}")
+        app_logger.error(f"Goldene Testfälle können nicht gelesen werden: {e}")
+        sys.exit(1)
+    if golden_mismatches:
+        print(f"{len(golden_mismatches)} Abweichung(en) der Textbereinigung von den goldenen Testfällen ({PDF_TEXT_GOLDEN_FILE}):")
+        for golden_mismatch in golden_mismatches[:10]:
+            print(f"\t{golden_mismatch}")
+        app_logger.error(f"{len(golden_mismatches)} Abweichung(en) von den goldenen Testfällen")
+        sys.exit(1)
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        try:
+            baseline = load_benchmark_results(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"Baseline kann nicht gelesen werden: {e}")
+            app_logger.error(f"Baseline kann nicht gelesen werden: {e}")
+            sys.exit(1)
+
+    with tempfile.TemporaryDirectory(prefix="msg_benchmark_") as temporary_directory:
+        cases = [case for case in build_benchmark_cases(create_benchmark_files(temporary_directory)) if args.filter in case.name]
+        if not cases:
+            print(f"Keine Benchmarks für den Filter '{args.filter}'")
+            sys.exit(1)
+
+        # Je Benchmark eine Zeile, sobald er gemessen ist
+        print(f"{'Benchmark':<45} {'Median (ms)':>12} {'Min (ms)':>12} {'Runden':>7} {'Baseline (ms)':>14} {'Änderung':>9}  Status")
+        results = []
+        comparisons = []
+        for case in cases:
+            result = run_benchmark(case, min_rounds=args.min_rounds, max_time_seconds=args.max_time)
+            comparison = compare_benchmark_results([result], baseline, args.threshold, args.compare_stat)[0]
+            results.append(result)
+            comparisons.append(comparison)
+            change_text = "" if comparison.change_percent is None else f"{comparison.change_percent:+.1f}%"
+            print(f"{result.name:<45} {_format_milliseconds(result.median):>12} {_format_milliseconds(result.min):>12} {result.rounds:>7} "
+                  f"{_format_milliseconds(comparison.baseline_seconds):>14} {change_text:>9}  {comparison.status.value}")
+
+    if args.output:
+        save_benchmark_results(args.output, results)
+        print(f"Ergebnisse gespeichert: {args.output}")
+
+    regressions = [comparison for comparison in comparisons if comparison.status == BenchmarkStatus.REGRESSION]
+    if args.save_baseline:
+        # Nicht gemessene Benchmarks (--filter) und eigene Schwellen aus der bisherigen Baseline bleiben erhalten
+        thresholds = {name: entry["options"]["threshold_percent"] for name, entry in baseline.items() if "threshold_percent" in entry.get("options", {})}
+        save_benchmark_results(args.baseline, results, thresholds, kept_benchmarks=[entry for name, entry in baseline.items()
+                                                                                       if name not in {result.name for result in results}])
+        print(f"Baseline gespeichert: {args.baseline}")
+    elif not baseline:
+        print(f"Keine Baseline vorhanden ('{args.baseline}'); speichern mit --save_baseline")
+    elif regressions:
+        print(f"{len(regressions)} Benchmark(s) um mehr als die Schwelle ({args.compare_stat}) langsamer: "
+              + ", ".join(f"{comparison.name} ({comparison.change_percent:+.1f}% > {comparison.threshold_percent:g}%)" for comparison in regressions))
+        app_logger.warning("Benchmarks langsamer als die Baseline: %s", [comparison.name for comparison in regressions])
+        sys.exit(1)
+    else:
+        print(f"Keine Verschlechterung über {args.threshold:g}% ({args.compare_stat}) gegenüber der Baseline.")
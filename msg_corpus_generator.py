@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+msg_corpus_generator.py
+
+Dieses Modul erzeugt einen synthetischen Bestand von MSG-Dateien für Benchmarks und Lasttests von msg_file_renamer.py
+(utils.msg_corpus). Outlook ist nicht erforderlich; das Programm läuft auch offline unter Linux. Derselbe --seed
+liefert denselben Bestand.
+
+Kommandozeilenargumente:
+<Zielverzeichnis>
+    Verzeichnis, in dem die MSG-Dateien erzeugt werden (wird angelegt; muss leer sein).
+--count <Anzahl>
+    Anzahl der MSG-Dateien einschließlich Doubletten (Standard: 1000).
+--files_per_directory <Anzahl>
+    Anzahl der MSG-Dateien je Verzeichnis (Standard: 100).
+--directory_fanout <Anzahl>
+    Anzahl der Unterverzeichnisse je Ebene des Verzeichnisbaums (Standard: 10).
+--body_size <Zeichen>
+    Median der Länge des Nachrichtentexts (Standard: 2000).
+--body_size_sigma <Streuung>
+    Streuung der logarithmischen Normalverteilung der Textlänge (Standard: 1.0, 0 = alle gleich lang).
+--body_size_max <Zeichen>
+    Maximale Länge des Nachrichtentexts (Standard: 1000000).
+--attachment_ratio <Anteil>
+    Anteil der Nachrichten mit Anhängen (Standard: 0.3).
+--attachment_count_max <Anzahl>
+    Maximale Anzahl der Anhänge einer Nachricht (Standard: 3).
+--attachment_size <Byte>
+    Median der Größe eines Anhangs (Standard: 50000).
+--attachment_size_max <Byte>
+    Maximale Größe eines Anhangs (Standard: 10000000).
+--duplicate_ratio <Anteil>
+    Anteil der Doubletten (byte-gleiche Kopien im selben Verzeichnis, Standard: 0.02).
+--missing_field_ratio <Anteil>
+    Anteil der Nachrichten ohne Betreff, Absender, Versanddatum, Empfänger oder Nachrichtentext (Standard: 0.05).
+--pathological_ratio <Anteil>
+    Anteil der Nachrichten mit pathologischen Namen (Standard: 0.05).
+--seed <Zahl>
+    Startwert der Zufallsgeneratoren (Standard: 0).
+--workers <Anzahl>
+    Anzahl paralleler Prozesse (Standard: 1).
+--verify <Anzahl>
+    Die ersten N erzeugten MSG-Dateien mit extract_msg einlesen und das Ergebnis ausgeben (Standard: 0).
+
+Beispielaufruf:
+python msg_corpus_generator.py "/tmp/korpus" -n 100000 -w 8 --seed 1
+python msg_file_renamer.py -sd "/tmp/korpus" -rs -pt
+"""
+import argparse
+import os
+import sys
+from collections import Counter
+
+from utils.msg_corpus import MsgCorpusOptions, generate_msg_corpus
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_corpus_generator' aktiviert.")
+
+
+def verify_msg_files(target_directory: str, max_files: int) -> Counter:
+    """
+    Liest die ersten max_files MSG-Dateien des Zielverzeichnisses mit get_msg_object ein und zählt die Status und die
+    fehlenden Felder.
+
+    Parameter:
+    target_directory (str): Verzeichnis mit den erzeugten MSG-Dateien.
+    max_files (int): Anzahl der einzulesenden Dateien.
+
+    Rückgabewert:
+    Counter: Anzahl der Dateien je Status (MsgAccessStatus.value) bzw. fehlendem Feld.
+    """
+    from modules.msg_handling import get_msg_object
+
+    status_counts = Counter()
+    file_count = 0
+    for directory_path, directory_names, file_names in os.walk(target_directory):
+        directory_names.sort()
+        for file_name in sorted(file_names):
+            if file_count >= max_files:
+                return status_counts
+            msg_data = get_msg_object(os.path.join(directory_path, file_name))
+            status_counts.update(status.value for status in msg_data["status"])
+            status_counts.update(f"'{key}' fehlt" for key in ("subject", "sender", "recipient", "date") if msg_data[key] == "Unbekannt")
+            file_count += 1
+    return status_counts
+
+
+if __name__ == '__main__':
+    # Argumente des Programmaufrufs über die Kommandozeile auswerten
+    default_options = MsgCorpusOptions()
+    parser = argparse.ArgumentParser(description="Synthetische MSG-Dateien für Benchmarks und Lasttests erzeugen")
+    parser.add_argument("target_directory", help="Zielverzeichnis (wird angelegt; muss leer sein)")
+    parser.add_argument("-n", "--count", type=int, default=default_options.file_count, help=f"Anzahl der MSG-Dateien (Default={default_options.file_count})")
+    parser.add_argument("-fpd", "--files_per_directory", type=int, default=default_options.files_per_directory, help=f"MSG-Dateien je Verzeichnis (Default={default_options.files_per_directory})")
+    parser.add_argument("-fo", "--directory_fanout", type=int, default=default_options.directory_fanout, help=f"Unterverzeichnisse je Ebene (Default={default_options.directory_fanout})")
+    parser.add_argument("-bs", "--body_size", type=int, default=default_options.body_size_median, help=f"Median der Länge des Nachrichtentexts in Zeichen (Default={default_options.body_size_median})")
+    parser.add_argument("-bss", "--body_size_sigma", type=float, default=default_options.body_size_sigma, help=f"Streuung der Textlänge (Default={default_options.body_size_sigma})")
+    parser.add_argument("-bsm", "--body_size_max", type=int, default=default_options.body_size_max, help=f"Maximale Länge des Nachrichtentexts (Default={default_options.body_size_max})")
+    parser.add_argument("-ar", "--attachment_ratio", type=float, default=default_options.attachment_ratio, help=f"Anteil der Nachrichten mit Anhängen (Default={default_options.attachment_ratio})")
+    parser.add_argument("-acm", "--attachment_count_max", type=int, default=default_options.attachment_count_max, help=f"Maximale Anzahl der Anhänge (Default={default_options.attachment_count_max})")
+    parser.add_argument("-as", "--attachment_size", type=int, default=default_options.attachment_size_median, help=f"Median der Größe eines Anhangs in Byte (Default={default_options.attachment_size_median})")
+    parser.add_argument("-asm", "--attachment_size_max", type=int, default=default_options.attachment_size_max, help=f"Maximale Größe eines Anhangs in Byte (Default={default_options.attachment_size_max})")
+    parser.add_argument("-dr", "--duplicate_ratio", type=float, default=default_options.duplicate_ratio, help=f"Anteil der Doubletten (Default={default_options.duplicate_ratio})")
+    parser.add_argument("-mr", "--missing_field_ratio", type=float, default=default_options.missing_field_ratio, help=f"Anteil der Nachrichten mit fehlendem Feld (Default={default_options.missing_field_ratio})")
+    parser.add_argument("-pr", "--pathological_ratio", type=float, default=default_options.pathological_ratio, help=f"Anteil pathologischer Namen (Default={default_options.pathological_ratio})")
+    parser.add_argument("-s", "--seed", type=int, default=default_options.seed, help=f"Startwert der Zufallsgeneratoren (Default={default_options.seed})")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Anzahl paralleler Prozesse (Default=1)")
+    parser.add_argument("-v", "--verify", type=int, default=0, help="Die ersten N MSG-Dateien mit extract_msg einlesen (Default=0)")
+    args = parser.parse_args()
+
+    options = MsgCorpusOptions(file_count=args.count, files_per_directory=args.files_per_directory, directory_fanout=args.directory_fanout,
+                               body_size_median=args.body_size, body_size_sigma=args.body_size_sigma, body_size_max=args.body_size_max,
+                               attachment_ratio=args.attachment_ratio, attachment_count_max=args.attachment_count_max,
+                               attachment_size_median=args.attachment_size, attachment_size_max=args.attachment_size_max,
+                               duplicate_ratio=args.duplicate_ratio, missing_field_ratio=args.missing_field_ratio,
+                               pathological_ratio=args.pathological_ratio, seed=args.seed)
+
+    print(f"Erzeuge {options.file_count} MSG-Dateien in '{args.target_directory}' (seed={options.seed}, workers={args.workers})")
+
+    def print_progress(relative_directory: str, file_count: int):
+        # Überschriebene Zeile nur auf der Console (nicht bei Umleitung in eine Datei)
+        if sys.stdout.isatty():
+            print(f"\r{file_count}/{options.file_count} MSG-Dateien ({relative_directory or '.'})", end="", flush=True)
+
+    try:
+        result = generate_msg_corpus(args.target_directory, options, workers=args.workers, on_directory_done=print_progress)
+    except FileExistsError as e:
+        print(e)
+        app_logger.error(e)
+        exit(1)
+
+    if sys.stdout.isatty():
+        print()
+    print(f"{result.file_count} MSG-Dateien ({result.duplicate_count} Doubletten) in {result.directory_count} Verzeichnissen, "
+          f"{result.total_bytes / 1024 ** 2:.1f} MB in {result.seconds:.1f} s")
+
+    if args.verify > 0:
+        status_counts = verify_msg_files(args.target_directory, args.verify)
+        print(f"Prüfung der ersten {min(args.verify, result.file_count)} MSG-Dateien mit extract_msg:")
+        for status_value, count in status_counts.most_common():
+            print(f"\t{status_value}: {count}")
@@ -66,8 +66,125 @@ Kommandozeilenargumente:
     Gibt an, ob vorhandene PDF-Dateien überschrieben werden sollen.
     Bei True wird eine ggf. schon vorhandene, gleichnamige PDF-Datei überschrieben,
     bei False bleibt die bestehende PDF-Datei erhalten.
+--incremental_pdf
+    Vorhandene PDF-Dateien nur neu erzeugen, wenn sie veraltet sind. Je Verzeichnis wird in einer Manifest-Datei
+    (.msg_pdf_manifest.json) der Stand der MSG-Datei (Größe, Änderungszeit, Fingerabdruck) gespeichert, aus der die
+    PDF-Datei erzeugt wurde. Für unveränderte MSG-Dateien genügt ein stat, die MSG-Datei wird nicht gelesen.
+    --overwrite_pdf hat Vorrang. (Standard: False)
+--pdf_consolidate <none|directory|month>
+    Mit --generate_pdf statt einer PDF-Datei je MSG-Datei Sammel-PDF-Dateien erzeugen: je Verzeichnis (directory) oder
+    je Versandmonat innerhalb eines Verzeichnisses (month), mit einem Lesezeichen je E-Mail. Die Sammel-PDF-Dateien eines
+    Verzeichnisses werden am Ende des Verzeichnisses neu erzeugt (nicht im Testlauf).
+    (Standard: PDF_CONSOLIDATE aus der env-Datei bzw. none)
+--pdf_consolidate_max_messages <Anzahl>
+    Maximale Anzahl von E-Mails je Sammel-PDF-Datei; größere Gruppen werden auf Teile aufgeteilt, 0 = unbegrenzt.
+    (Standard: PDF_CONSOLIDATE_MAX_MESSAGES aus der env-Datei bzw. 500)
+--pdf_max_quoted_emails <Anzahl>
+    Lange Antwortketten im PDF-Ausdruck kürzen: Nach der eigentlichen Nachricht werden höchstens so viele zitierte ältere
+    E-Mails ausgegeben (erkannt an den Outlook-Kopfzeilen Von/From ... Betreff/Subject), -1 = alle ausgeben.
+    (Standard: PDF_MAX_QUOTED_EMAILS aus der env-Datei bzw. -1)
 --max_console_output
     Reduzierte Ausgabe des Vorgangs auf der Console
+--verbose_console_output
+    Ausgabe je MSG-Datei (Dateiname und Ergebnis) wie in früheren Versionen. Ohne diese Option zeigt die Console nur
+    eine Fortschrittszeile (Dateien/s, geschätzte Restzeit, Zähler je Ergebnis, aktuelles Verzeichnis), die höchstens
+    alle CONSOLE_PROGRESS_INTERVAL_SECONDS (env-Datei, Standard 0.25) aktualisiert wird. Mit --max_console_output immer aktiv.
+--retry_deadline <Sekunden>
+    Gesperrte Dateien (z.B. durch Outlook oder Virenscanner) werden nicht blockierend wiederholt, sondern
+    zurückgestellt und am Ende des Verzeichnisses bzw. des Laufs mit wachsendem Abstand erneut versucht.
+    Nach Ablauf dieser Frist wird aufgegeben und dies im Log vermerkt.
+    (Standard: RETRY_DEADLINE_SECONDS aus der env-Datei bzw. 60)
+--include <Muster>
+    Glob-Muster (relativ zum Such-Verzeichnis) der Teilbäume bzw. Dateien, die bearbeitet werden sollen, z.B. "Projekte/*/Mail".
+    Kann mehrfach angegeben werden. Verzeichnisse außerhalb der Muster werden nicht gelistet.
+--exclude <Muster>
+    Glob-Muster der Verzeichnisse bzw. Dateien, die ausgeschlossen werden sollen, z.B. "Archiv_alt" oder "~snapshot*".
+    Muster ohne "/" passen auf Namen in beliebiger Tiefe. Kann mehrfach angegeben werden.
+    Ausgeschlossene Verzeichnisse werden nicht gelistet.
+--max_depth <Tiefe>
+    Maximale Tiefe der durchsuchten Unterverzeichnisse bei --recursive_search (Such-Verzeichnis = 0).
+    (Standard: unbegrenzt)
+--incremental
+    Inkrementeller Lauf über einen persistenten Index (SQLite) der Verzeichnisse und bearbeiteten MSG-Dateien.
+    Nur Verzeichnisse, deren Änderungszeit sich seit dem letzten Lauf geändert hat, werden gelistet, und nur neue
+    oder geänderte MSG-Dateien werden bearbeitet. Bei einem Testlauf wird der Index nur gelesen.
+    (Standard: False)
+--index_file <Pfad>
+    SQLite-Datei für den Index von --incremental.
+    (Standard: DIRECTORY_INDEX_FILE aus der env-Datei bzw. ./msg_directory_index.sqlite)
+--index_full_sweep_days <Tage>
+    Abstand in Tagen, nach dem bei --incremental ein vollständiger Lauf alle Verzeichnisse listet und alle
+    MSG-Dateien mit dem Index vergleicht (erkennt auch Änderungen innerhalb von Dateien).
+    (Standard: INDEX_FULL_SWEEP_DAYS aus der env-Datei bzw. 7)
+--index_full_sweep
+    Erzwingt bei --incremental einen vollständigen Lauf.
+    (Standard: False)
+--watch
+    Nach dem ersten Durchlauf läuft das Programm weiter und bearbeitet neue oder geänderte MSG-Dateien, sobald sie
+    vollständig geschrieben sind (z.B. per Drag & Drop aus Outlook). Beenden mit Strg+C.
+    Die Excel-Log-Datei wird dabei täglich bzw. nach WATCH_LOG_MAX_ENTRIES Einträgen neu begonnen.
+    (Standard: False)
+--watch_backend <auto|native|polling>
+    Verfahren für die Überwachung: native Windows-Benachrichtigungen (ReadDirectoryChangesW) oder Polling.
+    auto verwendet native Benachrichtigungen, wenn verfügbar.
+    (Standard: auto)
+--watch_debounce <Sekunden>
+    Ruhezeit, nach der eine neue oder geänderte Datei als vollständig geschrieben gilt.
+    (Standard: WATCH_DEBOUNCE_SECONDS aus der env-Datei bzw. 2)
+--watch_poll_interval <Sekunden>
+    Abstand zwischen zwei Vergleichen des Verzeichnisbaums im Polling-Betrieb.
+    (Standard: WATCH_POLL_INTERVAL_SECONDS aus der env-Datei bzw. 5)
+--shard <i/N>
+    Teilt den Lauf deterministisch auf N unabhängige Aufrufe auf (z.B. auf mehreren Kernen oder Rechnern gegen dieselbe
+    Freigabe); dieser Aufruf bearbeitet Teil i (1 bis N). Jeder Teil schreibt eine eigene Excel-Log-Datei
+    (excel_log_shard<i>of<N>_...), die mit msg_log_merge.py zu einem Bericht zusammengeführt werden können.
+--shard_mode <subtree|file>
+    subtree: jedes Verzeichnis der obersten Ebene gehört mit seinem Teilbaum zu genau einem Teil (nicht zugehörige
+    Teilbäume werden nicht gelistet). file: jede MSG-Datei wird einzeln über einen stabilen Hash zugeordnet.
+    (Standard: subtree)
+--cooperative
+    Kooperativer Betrieb mehrerer gleichzeitiger Aufrufe (auch auf verschiedenen Rechnern) gegen dieselbe Freigabe.
+    Jedes Verzeichnis mit MSG-Dateien wird über eine exklusiv angelegte Lease-Datei genau einem Aufruf zugeteilt;
+    Leases abgestürzter Aufrufe laufen ohne Heartbeat ab und werden von anderen Aufrufen übernommen.
+    (Standard: False)
+--lease_directory <Verzeichnis>
+    Gemeinsames Verzeichnis für Lease-Dateien und Erledigt-Markierungen.
+    (Standard: Unterverzeichnis ".msg_leases" im Such-Verzeichnis; wird von der Suche ausgeschlossen)
+--lease_run <Name>
+    Name des gemeinsamen Laufs; alle kooperierenden Aufrufe müssen denselben Namen verwenden.
+    (Standard: aktuelles Datum, z.B. 2025-01-31)
+--lease_timeout <Sekunden>
+    Zeit ohne Heartbeat, nach der eine Lease als verwaist gilt und übernommen wird.
+    (Standard: LEASE_TIMEOUT_SECONDS aus der env-Datei bzw. 120)
+--workers <Anzahl>
+    Anzahl der Prozesse, die die MSG-Dateien parallel einlesen und die neuen Dateinamen erzeugen (CPU-gebunden).
+    Umbenennen, Löschen und Logging bleiben im Hauptprozess, in unveränderter Reihenfolge. 0 = im Hauptprozess.
+    (Standard: WORKERS aus der env-Datei bzw. 0)
+--worker_chunk_size <Anzahl>
+    Anzahl der MSG-Dateien je Auftrag an einen Prozess bei --workers.
+    (Standard: WORKER_CHUNK_SIZE aus der env-Datei bzw. 8)
+--apply_workers <Anzahl>
+    Anzahl der Threads, die Umbenennen, Löschen von Doubletten und Setzen der Zeitstempel für mehrere Dateien eines
+    Verzeichnisses gleichzeitig ausführen (verdeckt die Latenz von Netzlaufwerken). Operationen auf denselben alten oder
+    neuen Dateinamen werden in der Reihenfolge der Dateien nacheinander ausgeführt. 0 oder 1 = nacheinander.
+    (Standard: APPLY_WORKERS aus der env-Datei bzw. 0)
+--pdf_workers <Anzahl>
+    Anzahl der Prozesse für die PDF-Erzeugung mit --generate_pdf. Die umbenannten Dateien werden in die Warteschlange
+    eines eigenen Prozess-Pools gestellt, die Umbenennung wartet nicht auf die PDF-Dateien. Der Fortschritt wird
+    regelmäßig ausgegeben; die Ergebnisse stehen am Ende im Sheet "PDF" des Excel-Logs. 0 = PDF-Erzeugung in der
+    Verarbeitungskette. (Standard: PDF_WORKERS aus der env-Datei bzw. 0)
+--pipeline_queue_size <Anzahl>
+    Maximale Anzahl gleichzeitig bearbeiteter MSG-Dateien in der Verarbeitungskette (Zugriff -> Dateiname -> Apply -> PDF).
+    Begrenzt den Speicherbedarf: Ist die Kette voll, werden keine weiteren Dateien angenommen.
+    (Standard: PIPELINE_QUEUE_SIZE aus der env-Datei bzw. 64)
+--scan_workers <Anzahl>
+    Anzahl paralleler Threads für das Listen der Verzeichnisse bei --recursive_search (z.B. für Netzlaufwerke).
+    Die Suche läuft dabei parallel zur Bearbeitung der MSG-Dateien. 0 oder 1 = sequentielle Suche.
+    (Standard: SCAN_WORKERS aus der env-Datei bzw. 0)
+--scan_ordered
+    Bei paralleler Suche werden die Verzeichnisse in derselben Reihenfolge wie bei der sequentiellen Suche bearbeitet.
+    Ohne dieses Flag in der Reihenfolge, in der sie gelistet wurden.
+    (Standard: False)
 
 Kommandozeilenargumente speziell zu Testzwecken
 --debug_mode
@@ -78,9 +195,34 @@ Kommandozeilenargumente speziell zu Testzwecken
     (Standard: False)
 --init_testdata
     Wenn dieses Flag gesetzt ist, dann werden alle Dateien aus dem Verzeichnis SOURCE_DIRECTORY_TEST_DATA in das Verzeichnis TARGET_DIRECTORY_TEST_DATA kopiert.
+--testdata_copy_mode <copy|reflink|hardlink>
+    Kopierverfahren für --init_testdata. Gelöscht und kopiert wird parallel über einen Thread-Pool.
+    reflink: Copy-on-Write-Klon, falls das Dateisystem es unterstützt (sonst normale Kopie).
+    hardlink: Hardlink-Snapshot ohne Datenkopie (nicht zusammen mit --set_filedate).
+    (Standard: copy)
+--copy_workers <Anzahl>
+    Anzahl paralleler Threads für --init_testdata.
 --debug_log_directory <Zielpfad>
     Gibt den Dateinamen an, in den die Log-Nachrichten geschrieben werden sollen.
     Wird kein Pfad angegeben, wird das gleiche Verzeichnis verwendet, wo auch die Python-Datei liegt.
+--debug_log_sample <N>
+    Stichprobe für die Debug-Log-Datei: DEBUG/TRACE-Einträge werden nur für jede N-te MSG-Datei geschrieben, für die
+    übrigen Dateien nur, wenn eine Warnung oder ein Fehler auftritt. INFO-Einträge werden immer geschrieben.
+    Die Debug-Log-Datei wird ab LOG_MAX_FILE_SIZE_MB als komprimierter Teil abgelegt (env-Datei).
+    (Standard: LOG_SAMPLE_EVERY aus der env-Datei bzw. 1 = alle Dateien)
+--performance_timing
+    Laufzeiten je MSG-Datei messen (Suche, Zugriff, MSG einlesen, Dateiname, Umbenennen, Zeitstempel, PDF, Excel-Log),
+    je Datei in die Debug-Log-Datei schreiben und im Sheet "Performance" der Excel-Log-Datei auswerten: Summe, Anteil,
+    Perzentile je Schritt, Durchsatz und die PERFORMANCE_TOP_FILES langsamsten Dateien (env-Datei, Standard 20).
+--profile <Verfahren>
+    Profiling der Verarbeitung, auch in der ausgelieferten exe: none, cprofile (deterministisch, Hauptthread und Stufen
+    der Verarbeitungskette) oder sampling (Stichproben der Aufrufstapel aller Threads, kaum langsamer). Neben der
+    Excel-Log-Datei werden <Excel-Log>_profile.prof (pstats-Format) und <Excel-Log>_profile.txt (Funktionen nach
+    kumulierter und eigener Zeit) geschrieben. Prozess-Pools (--workers, --pdf_workers) sind nicht enthalten.
+    (Standard: none)
+--profile_max_files <Anzahl>
+    Profiling nach den ersten N MSG-Dateien beenden und das Ergebnis sofort schreiben, 0 = ganzer Lauf.
+    (Standard: PROFILE_MAX_FILES aus der env-Datei bzw. 0)
 
 Verwendung:
 Das Modul kann verwendet werden, um MSG-Dateien schnell und effizient umzubenennen sowie deren Organisation zu verbessern.
@@ -114,21 +256,47 @@ Dieses Modul benötigt einige zusätzliche Python-Pakete, die für bestimmte Fun
 """
 import os
 import datetime
+import itertools
+import functools
+import socket
 import argparse
 import sys
 import importlib.util
 from pathlib import Path
 
 from modules.msg_generate_new_filename import generate_new_msg_filename
-from utils.file_handling import rename_file, test_file_access, FileAccessStatus, set_file_creation_date, set_file_modification_date, FileOperationResult
+from utils.file_handling import rename_file, delete_file, FileAccessStatus, set_file_creation_date, set_file_modification_date, FileOperationResult
+from utils.retry_queue import DeferredRetryQueue, DeferredRetryStatus
+from utils.keyed_executor import KeyedThreadPoolExecutor
+from utils.staged_pipeline import PipelineStage, StagedPipeline
 from modules.msg_handling import log_entry_neu, create_log_file_neu
+from modules.msg_discovery import discover_msg_directories, MsgPathFilter, MsgShard, MsgShardMode
+from modules.msg_watcher import MsgDirectoryWatcher, MsgWatchBackend
+from modules.msg_directory_index import MsgDirectoryIndex
+from modules.msg_filename_pool import MsgFilenamePool
+from modules.msg_file_apply import apply_operation_keys
+from modules.msg_file_stages import MsgFileTask, check_access_stage, generate_filename_stage, apply_stage, needs_apply, pdf_stage, needs_pdf
+from modules.msg_pdf_pool import MsgPdfPool, MsgPdfStatus
+from modules.msg_pdf_manifest import PdfManifest, PdfFreshness
+from modules.msg_pdf_consolidation import MsgPdfConsolidationMode, generate_consolidated_pdfs
+from modules.msg_generate_new_filename import MsgFilenameResult
+from modules.msg_work_leases import CooperativeWorkDistributor, DEFAULT_LEASE_DIRECTORY_NAME
 from utils.excel_handling import clean_old_excel_files
 from utils.testset_preparation import prepare_test_directory
-from utils.pdf_generation import generate_pdf_from_msg
+from utils.fast_copy import CopyMode, DEFAULT_COPY_WORKERS
+from utils.console_progress import ConsoleProgress
+from utils.run_profiler import RunProfiler, ProfilerMode
+from utils.stage_timing import PerformanceStatistics, timed_stage, STAGE_DISCOVERY, STAGE_PDF, STAGE_CONSOLIDATED_PDF, STAGE_EXCEL_LOG
 from config import SOURCE_DIRECTORY_TEST_DATA, TARGET_DIRECTORY_TEST_DATA, MAX_PATH_LENGTH, DEBUG_LEVEL, LOG_FILE_DIRECTORY, MAX_EXCEL_LOG_FILE_COUNT, ENV_LIST_OF_KNOWN_SENDERS
+from config import RETRY_DEADLINE_SECONDS, RETRY_INITIAL_DELAY_MS, RETRY_MAX_DELAY_MS
+from config import WORKERS, WORKER_CHUNK_SIZE, APPLY_WORKERS, PIPELINE_QUEUE_SIZE, PDF_WORKERS, SCAN_WORKERS, WATCH_DEBOUNCE_SECONDS, WATCH_POLL_INTERVAL_SECONDS, WATCH_LOG_MAX_ENTRIES
+from config import DIRECTORY_INDEX_FILE, INDEX_FULL_SWEEP_DAYS
+from config import PDF_CONSOLIDATE, PDF_CONSOLIDATE_MAX_MESSAGES, PDF_MAX_QUOTED_EMAILS
+from config import LOG_SAMPLE_EVERY, LOG_MAX_FILE_SIZE_MB, CONSOLE_PROGRESS_INTERVAL_SECONDS, PERFORMANCE_TOP_FILES, PROFILE_MAX_FILES, PROFILE_TOP_FUNCTIONS
+from config import LEASE_TIMEOUT_SECONDS, LEASE_HEARTBEAT_SECONDS
 
 #import optimierter Logger
-from logger import initialize_logger, clean_logs_and_initialize, DEBUG_LEVEL_TEXT, prog_log_file_path
+from logger import initialize_logger, clean_logs_and_initialize, DEBUG_LEVEL_TEXT, prog_log_file_path, set_log_sampling, set_log_file_context
 
 # Initialisierung im Hauptprogramm
 clean_logs_and_initialize()
@@ -177,6 +345,25 @@ def check_module_installed(module_name: str, install_text: str):
     else:
         app_logger.debug(f"Das Modul '{module_name}' ist installiert.")
 
+def deferred_rename_file(current_name: str, new_name: str) -> FileOperationResult:
+    """
+    Wiederholt eine zurückgestellte Umbenennung.
+
+    Im Unterschied zu rename_file wird vorher geprüft, ob der neue Dateiname inzwischen belegt ist,
+    z.B. durch eine später verarbeitete Datei mit gleichem Namen. In diesem Fall ist die Datei eine
+    Doublette und wird nicht überschrieben.
+
+    Parameter:
+    - current_name (str): Der aktuelle Dateiname.
+    - new_name (str): Der neue Dateiname.
+
+    Rückgabewert:
+    - FileOperationResult: Enum-Wert, der den Erfolg oder Fehler beschreibt.
+    """
+    if os.path.exists(new_name):
+        return FileOperationResult.DESTINATION_EXISTS
+    return rename_file(current_name, new_name)
+
 if __name__ == '__main__':
 
     app_logger.info(f"Programm Logdatei: {LOG_FILE_DIRECTORY}")
@@ -202,13 +389,49 @@ if __name__ == '__main__':
     parser.add_argument("-elb", "--excel_log_basename", type=str, default="excel_log_file", help="Dateiname-Anfang für Excel-Log-Aufzeichnung (Default='excel_log_file')")
     parser.add_argument("-elf", "--excel_log_directory", type=str, default="./", help="Verzeichnis für Excel-Log-Aufzeichnung (Default='./')")
     parser.add_argument("-dlf", "--debug_log_directory", type=str, default="./", help="Verzeichnis für Debug-Log-Aufzeichnung (Default='./')")
+    parser.add_argument("-dls", "--debug_log_sample", type=int, default=LOG_SAMPLE_EVERY, help=f"DEBUG/TRACE-Einträge nur für jede N-te MSG-Datei und für Dateien mit Warnungen oder Fehlern, 1 = alle (Default={LOG_SAMPLE_EVERY})")
+    parser.add_argument("-pt", "--performance_timing", default=False, action="store_true", help="Laufzeiten je MSG-Datei und Verarbeitungsschritt messen, Sheet 'Performance' im Excel-Log (Default=False)")
+    parser.add_argument("-prf", "--profile", type=str, default=ProfilerMode.NONE.value, choices=[mode.value for mode in ProfilerMode], help="Profiling der Verarbeitung: none, cprofile oder sampling; .prof- und Textdatei neben der Excel-Log-Datei (Default=none)")
+    parser.add_argument("-prfn", "--profile_max_files", type=int, default=PROFILE_MAX_FILES, help=f"Profiling nach den ersten N MSG-Dateien beenden, 0 = ganzer Lauf (Default={PROFILE_MAX_FILES})")
     parser.add_argument("-spn", "--no_shorten_path_name", default=False, action="store_true", help="True/False für kein Kürzen des Pfades bei Überlänge (Default=False)")
     parser.add_argument("-pdf", "--generate_pdf", default=False, action="store_true", help="True/False für Generieren eines PDF-Files aus MSG-Dateien (Default=False)")
+    parser.add_argument("-ipdf", "--incremental_pdf", default=False, action="store_true", help="Vorhandene PDF-Dateien nur neu erzeugen, wenn die MSG-Datei geändert wurde (Default=False)")
+    parser.add_argument("-pdc", "--pdf_consolidate", type=str, default=PDF_CONSOLIDATE, choices=[mode.value for mode in MsgPdfConsolidationMode], help=f"Sammel-PDF-Dateien je Verzeichnis oder Versandmonat: none, directory oder month (Default='{PDF_CONSOLIDATE}')")
+    parser.add_argument("-pdcm", "--pdf_consolidate_max_messages", type=int, default=PDF_CONSOLIDATE_MAX_MESSAGES, help=f"Maximale Anzahl von E-Mails je Sammel-PDF-Datei, 0 = unbegrenzt (Default={PDF_CONSOLIDATE_MAX_MESSAGES})")
+    parser.add_argument("-pdq", "--pdf_max_quoted_emails", type=int, default=PDF_MAX_QUOTED_EMAILS, help=f"Maximale Anzahl zitierter älterer E-Mails im PDF-Ausdruck, -1 = alle (Default={PDF_MAX_QUOTED_EMAILS})")
     parser.add_argument("-opdf", "--overwrite_pdf", default=False, action="store_true", help="True/False für Überschreiben eines bereits existierende PDF-Files aus MSG-Dateien (Default=False)")
     parser.add_argument("-rs", "--recursive_search", default=False, action="store_true", help="True/False für die rekursive Suche nach MSG-Dateien (Default=False)"),
     parser.add_argument("-ucf", "--use_knownsender_file", default=False, action="store_true", help="True/False für die Nutzung des Config-Files (Default=False)"),
     parser.add_argument("-cf", "--knownsender_file", type=str, default=ENV_LIST_OF_KNOWN_SENDERS, help="CSV-Datei mit Liste der bekannten Absender")
     parser.add_argument("-mco", "--max_console_output", default=False, action="store_true", help="Maximale Consolen-Ausgabe aktivieren (Default=False)")
+    parser.add_argument("-vco", "--verbose_console_output", default=False, action="store_true", help="Ausgabe je MSG-Datei statt Fortschrittszeile auf der Console (Default=False)")
+    parser.add_argument("-tcm", "--testdata_copy_mode", type=str, default=CopyMode.COPY.value, choices=[mode.value for mode in CopyMode], help="Kopierverfahren für --init_testdata: copy, reflink oder hardlink (Default='copy')")
+    parser.add_argument("-cw", "--copy_workers", type=int, default=DEFAULT_COPY_WORKERS, help=f"Anzahl paralleler Threads für --init_testdata (Default={DEFAULT_COPY_WORKERS})")
+    parser.add_argument("-inc", "--include", action="append", default=[], help="Glob-Muster der zu bearbeitenden Teilbäume bzw. Dateien, mehrfach möglich (Default=alle)")
+    parser.add_argument("-exc", "--exclude", action="append", default=[], help="Glob-Muster der auszuschließenden Verzeichnisse bzw. Dateien, mehrfach möglich (Default=keine)")
+    parser.add_argument("-mxd", "--max_depth", type=int, default=None, help="Maximale Tiefe der rekursiven Suche, Such-Verzeichnis = 0 (Default=unbegrenzt)")
+    parser.add_argument("-ix", "--incremental", default=False, action="store_true", help="True/False für inkrementellen Lauf über den Verzeichnis-Index (Default=False)")
+    parser.add_argument("-ixf", "--index_file", type=str, default=DIRECTORY_INDEX_FILE, help=f"SQLite-Datei für den Verzeichnis-Index (Default='{DIRECTORY_INDEX_FILE}')")
+    parser.add_argument("-ixd", "--index_full_sweep_days", type=float, default=INDEX_FULL_SWEEP_DAYS, help=f"Abstand in Tagen für einen vollständigen Lauf bei --incremental (Default={INDEX_FULL_SWEEP_DAYS})")
+    parser.add_argument("-ixs", "--index_full_sweep", default=False, action="store_true", help="True/False für erzwungenen vollständigen Lauf bei --incremental (Default=False)")
+    parser.add_argument("-w", "--watch", default=False, action="store_true", help="True/False für dauerhafte Überwachung auf neue MSG-Dateien (Default=False)")
+    parser.add_argument("-wb", "--watch_backend", type=str, default=MsgWatchBackend.AUTO.value, choices=[backend.value for backend in MsgWatchBackend], help="Verfahren für --watch: auto, native oder polling (Default='auto')")
+    parser.add_argument("-wdb", "--watch_debounce", type=float, default=WATCH_DEBOUNCE_SECONDS, help=f"Ruhezeit in Sekunden, bis eine neue Datei bearbeitet wird (Default={WATCH_DEBOUNCE_SECONDS})")
+    parser.add_argument("-wpi", "--watch_poll_interval", type=float, default=WATCH_POLL_INTERVAL_SECONDS, help=f"Abstand in Sekunden zwischen zwei Vergleichen im Polling-Betrieb (Default={WATCH_POLL_INTERVAL_SECONDS})")
+    parser.add_argument("-sh", "--shard", type=str, default="", help="Teil i von N eines aufgeteilten Laufs, z.B. 2/4 (Default='' = keine Aufteilung)")
+    parser.add_argument("-shm", "--shard_mode", type=str, default=MsgShardMode.SUBTREE.value, choices=[mode.value for mode in MsgShardMode], help="Zuordnung bei --shard: subtree oder file (Default='subtree')")
+    parser.add_argument("-co", "--cooperative", default=False, action="store_true", help="True/False für kooperativen Betrieb mehrerer Aufrufe über Lease-Dateien (Default=False)")
+    parser.add_argument("-lsd", "--lease_directory", type=str, default="", help=f"Gemeinsames Verzeichnis für Lease-Dateien (Default='<Such-Verzeichnis>/{DEFAULT_LEASE_DIRECTORY_NAME}')")
+    parser.add_argument("-lsr", "--lease_run", type=str, default="", help="Name des gemeinsamen Laufs bei --cooperative (Default=aktuelles Datum)")
+    parser.add_argument("-lst", "--lease_timeout", type=float, default=LEASE_TIMEOUT_SECONDS, help=f"Zeit in Sekunden ohne Heartbeat, nach der eine Lease übernommen wird (Default={LEASE_TIMEOUT_SECONDS})")
+    parser.add_argument("-wk", "--workers", type=int, default=WORKERS, help=f"Anzahl der Prozesse für Einlesen und Dateinamens-Erzeugung, 0 = Hauptprozess (Default={WORKERS})")
+    parser.add_argument("-wcs", "--worker_chunk_size", type=int, default=WORKER_CHUNK_SIZE, help=f"Anzahl der MSG-Dateien je Auftrag bei --workers (Default={WORKER_CHUNK_SIZE})")
+    parser.add_argument("-aw", "--apply_workers", type=int, default=APPLY_WORKERS, help=f"Anzahl der Threads für Umbenennen, Löschen und Zeitstempel, 0 = nacheinander (Default={APPLY_WORKERS})")
+    parser.add_argument("-pdw", "--pdf_workers", type=int, default=PDF_WORKERS, help=f"Anzahl der Prozesse für die PDF-Erzeugung, 0 = in der Verarbeitungskette (Default={PDF_WORKERS})")
+    parser.add_argument("-pqs", "--pipeline_queue_size", type=int, default=PIPELINE_QUEUE_SIZE, help=f"Maximale Anzahl gleichzeitig bearbeiteter MSG-Dateien in der Verarbeitungskette (Default={PIPELINE_QUEUE_SIZE})")
+    parser.add_argument("-sw", "--scan_workers", type=int, default=SCAN_WORKERS, help=f"Anzahl paralleler Threads für die Verzeichnissuche, 0 = sequentiell (Default={SCAN_WORKERS})")
+    parser.add_argument("-so", "--scan_ordered", default=False, action="store_true", help="True/False für deterministische Reihenfolge bei paralleler Verzeichnissuche (Default=False)")
+    parser.add_argument("-rdl", "--retry_deadline", type=float, default=RETRY_DEADLINE_SECONDS, help=f"Frist in Sekunden für erneute Versuche bei gesperrten Dateien (Default={RETRY_DEADLINE_SECONDS})")
     args, unknown = parser.parse_known_args()
 
     # Unbekannte Parameter ausgeben und Programm beenden
@@ -225,32 +448,112 @@ if __name__ == '__main__':
     # Argumente des Programmaufrufs an die Variablen übergeben
     DEBUG_MODE = args.debug_mode
     MAX_CONSOLE_OUTPUT = args.max_console_output
+    VERBOSE_CONSOLE_OUTPUT = args.verbose_console_output or MAX_CONSOLE_OUTPUT  # Sonst nur die Fortschrittszeile
     USE_KNOWNSENDER_FILE = args.use_knownsender_file
     KNOWNSENDER_FILE = args.knownsender_file
     INIT_TESTDATA = args.init_testdata
+    TESTDATA_COPY_MODE = CopyMode(args.testdata_copy_mode)
+    COPY_WORKERS = args.copy_workers
     TEST_RUN = not args.no_test_run
     RECURSIVE_SEARCH = args.recursive_search
     NO_SHORTEN_PATH_NAME = args.no_shorten_path_name
     SET_FILEDATE = args.set_filedate
     GENERATE_PDF = args.generate_pdf
     OVERWRITE_PDF = args.overwrite_pdf
+    INCREMENTAL_PDF = args.incremental_pdf and not OVERWRITE_PDF
+    PDF_CONSOLIDATE_MODE = MsgPdfConsolidationMode(args.pdf_consolidate)
+    PDF_CONSOLIDATE_MAX_MESSAGES = args.pdf_consolidate_max_messages
+    PDF_MAX_QUOTED_EMAILS = args.pdf_max_quoted_emails if args.pdf_max_quoted_emails >= 0 else None  # None = Antwortkette nicht kürzen
+    CONSOLIDATE_PDF = GENERATE_PDF and PDF_CONSOLIDATE_MODE != MsgPdfConsolidationMode.NONE  # Sammel-PDF statt PDF je MSG-Datei
+    RETRY_DEADLINE = args.retry_deadline
+    DEBUG_LOG_SAMPLE = max(1, args.debug_log_sample)
+    set_log_sampling(DEBUG_LOG_SAMPLE)  # Vor dem Start der Prozess-Pools, damit die Kindprozesse dieselbe Stichprobe verwenden
+    PERFORMANCE_TIMING = args.performance_timing
+    PROFILE_MODE = ProfilerMode(args.profile)
+    PROFILE_MAX_FILES = args.profile_max_files
+    WORKERS = args.workers
+    WORKER_CHUNK_SIZE = args.worker_chunk_size
+    APPLY_WORKERS = args.apply_workers
+    PIPELINE_QUEUE_SIZE = args.pipeline_queue_size
+    PDF_WORKERS = args.pdf_workers
+    SCAN_WORKERS = args.scan_workers
+    SCAN_ORDERED = args.scan_ordered
+    INCLUDE_PATTERNS = args.include
+    EXCLUDE_PATTERNS = args.exclude
+    MAX_DEPTH = args.max_depth
+    # Aufteilung des Laufs (--shard i/N) auswerten
+    SHARD = None
+    if args.shard:
+        try:
+            SHARD = MsgShard.from_spec(args.shard, MsgShardMode(args.shard_mode))
+        except ValueError as e:
+            app_logger.error(str(e))
+            print(f"Fehler: {e}")
+            exit(1)
+    INCREMENTAL_MODE = args.incremental
+    INDEX_FILE = args.index_file
+    INDEX_SWEEP_INTERVAL_DAYS = args.index_full_sweep_days
+    INDEX_FULL_SWEEP = args.index_full_sweep
+    WATCH_MODE = args.watch
+    WATCH_BACKEND = MsgWatchBackend(args.watch_backend)
+    WATCH_DEBOUNCE = args.watch_debounce
+    WATCH_POLL_INTERVAL = args.watch_poll_interval
+    COOPERATIVE_MODE = args.cooperative
+    LEASE_DIRECTORY = args.lease_directory
+    LEASE_RUN = args.lease_run or datetime.date.today().isoformat()
+    LEASE_TIMEOUT = args.lease_timeout
 
     app_logger.debug(f"Argumente:")
     # Alles mit Fokus Debug
     app_logger.info(f"DEBUG_MODE = {DEBUG_MODE}")
     app_logger.info(f"MAX_CONSOLE_OUTPUT = {MAX_CONSOLE_OUTPUT}")
+    app_logger.info(f"VERBOSE_CONSOLE_OUTPUT = {VERBOSE_CONSOLE_OUTPUT}")
     # Known-Sender-File
     app_logger.info(f"USE_KNOWSENDER_FILE = {USE_KNOWNSENDER_FILE}")
     app_logger.info(f"KNOWSENDER_FILE = {KNOWNSENDER_FILE}")
     # Test-Initialisierung
     app_logger.info(f"INIT_TESTDATA = {INIT_TESTDATA}")
     app_logger.info(f"TEST_RUN = {TEST_RUN}")
+    app_logger.info(f"TESTDATA_COPY_MODE = {TESTDATA_COPY_MODE.value}")
+    app_logger.info(f"COPY_WORKERS = {COPY_WORKERS}")
     # Ablaufsteuerung
     app_logger.info(f"RECURSIVE_SEARCH = {RECURSIVE_SEARCH}")
+    app_logger.info(f"WORKERS = {WORKERS}")
+    app_logger.info(f"WORKER_CHUNK_SIZE = {WORKER_CHUNK_SIZE}")
+    app_logger.info(f"APPLY_WORKERS = {APPLY_WORKERS}")
+    app_logger.info(f"PIPELINE_QUEUE_SIZE = {PIPELINE_QUEUE_SIZE}")
+    app_logger.info(f"PDF_WORKERS = {PDF_WORKERS}")
+    app_logger.info(f"SCAN_WORKERS = {SCAN_WORKERS}")
+    app_logger.info(f"SCAN_ORDERED = {SCAN_ORDERED}")
+    app_logger.info(f"INCLUDE_PATTERNS = {INCLUDE_PATTERNS}")
+    app_logger.info(f"EXCLUDE_PATTERNS = {EXCLUDE_PATTERNS}")
+    app_logger.info(f"MAX_DEPTH = {MAX_DEPTH}")
+    app_logger.info(f"SHARD = {f'{SHARD.label} ({SHARD.mode.value})' if SHARD else None}")
+    app_logger.info(f"INCREMENTAL_MODE = {INCREMENTAL_MODE}")
+    app_logger.info(f"INDEX_FILE = {INDEX_FILE}")
+    app_logger.info(f"INDEX_SWEEP_INTERVAL_DAYS = {INDEX_SWEEP_INTERVAL_DAYS}")
+    app_logger.info(f"INDEX_FULL_SWEEP = {INDEX_FULL_SWEEP}")
+    app_logger.info(f"WATCH_MODE = {WATCH_MODE}")
+    app_logger.info(f"WATCH_BACKEND = {WATCH_BACKEND.value}")
+    app_logger.info(f"WATCH_DEBOUNCE = {WATCH_DEBOUNCE}")
+    app_logger.info(f"WATCH_POLL_INTERVAL = {WATCH_POLL_INTERVAL}")
+    app_logger.info(f"COOPERATIVE_MODE = {COOPERATIVE_MODE}")
+    app_logger.info(f"LEASE_DIRECTORY = {LEASE_DIRECTORY}")
+    app_logger.info(f"LEASE_RUN = {LEASE_RUN}")
+    app_logger.info(f"LEASE_TIMEOUT = {LEASE_TIMEOUT}")
     app_logger.info(f"NO_SHORTEN_PATH_NAME = {NO_SHORTEN_PATH_NAME}")
     app_logger.info(f"SET_FILEDATE = {SET_FILEDATE}")
     app_logger.info(f"GENERATE_PDF = {GENERATE_PDF}")
     app_logger.info(f"OVERWRITE_PDF = {OVERWRITE_PDF}")
+    app_logger.info(f"INCREMENTAL_PDF = {INCREMENTAL_PDF}")
+    app_logger.info(f"PDF_CONSOLIDATE_MODE = {PDF_CONSOLIDATE_MODE.value}")
+    app_logger.info(f"PDF_CONSOLIDATE_MAX_MESSAGES = {PDF_CONSOLIDATE_MAX_MESSAGES}")
+    app_logger.info(f"PDF_MAX_QUOTED_EMAILS = {PDF_MAX_QUOTED_EMAILS}")
+    app_logger.info(f"RETRY_DEADLINE = {RETRY_DEADLINE}")
+    app_logger.info(f"DEBUG_LOG_SAMPLE = {DEBUG_LOG_SAMPLE}")
+    app_logger.info(f"PERFORMANCE_TIMING = {PERFORMANCE_TIMING}")
+    app_logger.info(f"PROFILE_MODE = {PROFILE_MODE.value}")
+    app_logger.info(f"PROFILE_MAX_FILES = {PROFILE_MAX_FILES}")
 
     # Start Ausgabe auf Console
     if MAX_CONSOLE_OUTPUT: print(f"\nTestlauf: {TEST_RUN}\nTestverzeichnis initialisieren: {INIT_TESTDATA}\nZeitstempel der MSG-dateien anpassen: {SET_FILEDATE}\nDebug-Modus: {DEBUG_MODE}")
@@ -258,6 +561,10 @@ if __name__ == '__main__':
     # Excel-Log-Datei
     EXCEL_LOG_DIRECTORY = args.excel_log_directory # Verzeichnis für die Excel-Log-Datei
     excel_log_basename = "excel_log_file_" # Basisname für die Excel-Log-Datei
+    if SHARD:
+        excel_log_basename = f"excel_log_shard{SHARD.index}of{SHARD.count}_" # Eigene Excel-Log-Datei je Teil
+    if COOPERATIVE_MODE:
+        excel_log_basename = f"excel_log_coop_{socket.gethostname()}_{os.getpid()}_" # Eigene Excel-Log-Datei je kooperierendem Aufruf
     excel_log_file_path = os.path.join(EXCEL_LOG_DIRECTORY, excel_log_basename) # Pfad und Dateiname für die Excel-Log-Datei
     app_logger.info(f"EXCEL_LOG_DIRECTORY = {EXCEL_LOG_DIRECTORY}")
 
@@ -278,11 +585,13 @@ if __name__ == '__main__':
 
     # Excel-Logdatei erstellen und den Pfad ausgeben
     excel_log_file_path = create_log_file_neu(excel_log_basename, EXCEL_LOG_DIRECTORY, LOG_TABLE_HEADER, sheet_name="Log")
+    excel_log_file_date = datetime.date.today()  # Für den täglichen Wechsel der Excel-Logdatei bei --watch
+    excel_log_entry_count = 0
     if MAX_CONSOLE_OUTPUT: print(f"Excel-Logdatei erstellt: {excel_log_file_path}")
     app_logger.info(f"Excel-Logdatei = {excel_log_file_path}")
 
     # Ältere Excel-Logdatei löschen
-    deleted_excel_file_count = clean_old_excel_files(EXCEL_LOG_DIRECTORY, MAX_EXCEL_LOG_FILE_COUNT, "excel_log_file_")
+    deleted_excel_file_count = clean_old_excel_files(EXCEL_LOG_DIRECTORY, MAX_EXCEL_LOG_FILE_COUNT, excel_log_basename)
 
     if INIT_TESTDATA:
         if MAX_CONSOLE_OUTPUT: print(f"Prüfung ob Zielverzeichnis für Testdaten bereits existiert: {TARGET_DIRECTORY_TEST_DATA}") # Debugging-Ausgabe: Console
@@ -297,8 +606,14 @@ if __name__ == '__main__':
             if MAX_CONSOLE_OUTPUT: print(f"Zielverzeichnis existiert bereits: {TARGET_DIRECTORY_TEST_DATA}")
             app_logger.debug(f"Zielverzeichnis existiert bereits: {TARGET_DIRECTORY_TEST_DATA}")
 
+        # Ein Hardlink-Snapshot teilt sich die Dateien mit der Quelle, geänderte Zeitstempel würden die Quelle verändern
+        if TESTDATA_COPY_MODE == CopyMode.HARDLINK and SET_FILEDATE and not TEST_RUN:
+            print("Warnung: Hardlink-Snapshot zusammen mit --set_filedate würde die Testdaten-Quelle verändern. Es wird kopiert.")
+            app_logger.warning("Hardlink-Snapshot zusammen mit --set_filedate nicht möglich, Kopierverfahren 'copy' wird verwendet.")
+            TESTDATA_COPY_MODE = CopyMode.COPY
+
         # Bereite das Zielverzeichnis vor und überprüfe den Erfolg
-        success = prepare_test_directory(SOURCE_DIRECTORY_TEST_DATA, TARGET_DIRECTORY_TEST_DATA)
+        success = prepare_test_directory(SOURCE_DIRECTORY_TEST_DATA, TARGET_DIRECTORY_TEST_DATA, copy_mode=TESTDATA_COPY_MODE, max_workers=COPY_WORKERS)
         if success:
             if MAX_CONSOLE_OUTPUT: print("Vorbereitung des Testverzeichnisses erfolgreich abgeschlossen.") # Debugging-Ausgabe: Console
             app_logger.debug("\tVorbereitung des Testverzeichnisses erfolgreich abgeschlossen.")  # Debugging-Ausgabe: Log-File
@@ -327,6 +642,20 @@ if __name__ == '__main__':
     msg_file_same_name_count = 0
     pdf_file_generated = 0
     pdf_file_skipped = 0
+    consolidated_pdf_generated = 0
+    consolidated_pdf_failed = 0
+    consolidated_pdf_message_count = 0
+    consolidated_pdf_unchanged = 0
+    consolidated_pdf_removed = 0
+    consolidated_pdf_entries = []
+    # Bei --watch den Stand der MSG-Dateien je Sammel-PDF-Datei merken, unveränderte Sammel-PDF-Dateien nicht neu erzeugen
+    consolidated_pdf_bucket_states = {} if WATCH_MODE else None
+    msg_file_deferred_count = 0
+    msg_file_deferred_given_up_count = 0
+
+    # Warteschlange für Umbenennungen und Löschungen gesperrter Dateien
+    retry_queue = DeferredRetryQueue(deadline_seconds=RETRY_DEADLINE, initial_delay_ms=RETRY_INITIAL_DELAY_MS, max_delay_ms=RETRY_MAX_DELAY_MS)
+    finished_deferred_operations = []
 
     # Sicherstellen das TARGET_DIRECTORY ein Pfad ist
     TARGET_DIRECTORY = Path(TARGET_DIRECTORY)
@@ -335,220 +664,395 @@ if __name__ == '__main__':
     TARGET_DIRECTORY = f"\\\\?\\{os.path.abspath(TARGET_DIRECTORY)}"
     app_logger.debug(f"TARGET_DIRECTORY (Windows Long Path Format) = '{TARGET_DIRECTORY}'")  # Debugging-Ausgabe: Log-File
 
-    for pathname, dirs, files in os.walk(TARGET_DIRECTORY):
-
-        # filename = Dateiname
-        for filename in files:
-
-            app_logger.debug(f"**************************BEARBEITUNG NÄCHSTE MSG DAIEI************************************")  # Debugging-Ausgabe: Log-File
-
-            # Initialisierung der Variable
-            is_msg_file_name_unchanged = False
-            is_msg_file_doublette = False
-            is_msg_file_doublette_deleted = False
-            is_pdf_file_skipped = False
-            is_pdf_file_generated = False
-            rename_msg_file_result = None
-
-            # Überprüfen, ob die Datei die Endung .msg hat
-            if filename.lower().endswith('.msg'):
-                print(f"MSG-Datei: '{filename}'")  # Debugging-Ausgabe: Console
-                app_logger.debug(f"Aktuelle MSG-Datei zur Bearbeitung: '{filename}'")  # Debugging-Ausgabe: Log-File
-
-                # Absoluter Pfadname der MSG-Datei
-                path_and_file_name = os.path.join(pathname, filename)
-
-                # Pfadlänge ermitteln
+    # Verzeichnisse durchsuchen (mit --scan_workers parallel); die Liste jedes Verzeichnisses wird vor der Bearbeitung vollständig eingelesen
+    # Include-/Exclude-Muster und maximale Tiefe einmalig übersetzen; ausgeschlossene Verzeichnisse werden nicht gelistet
+    if COOPERATIVE_MODE and not LEASE_DIRECTORY:
+        # Standard-Lease-Verzeichnis im Such-Verzeichnis, damit alle Rechner es über die Freigabe erreichen; von der Suche ausschließen
+        LEASE_DIRECTORY = os.path.join(TARGET_DIRECTORY, DEFAULT_LEASE_DIRECTORY_NAME)
+        EXCLUDE_PATTERNS = EXCLUDE_PATTERNS + [DEFAULT_LEASE_DIRECTORY_NAME]
+    msg_path_filter = MsgPathFilter(INCLUDE_PATTERNS, EXCLUDE_PATTERNS, MAX_DEPTH, shard=SHARD)
+    app_logger.debug(f"Filter für die Suche: {msg_path_filter}")  # Debugging-Ausgabe: Log-File
+
+    msg_directory_index = None
+    if INCREMENTAL_MODE:
+        # Inkrementeller Lauf: nur geänderte Verzeichnisse listen, nur neue oder geänderte MSG-Dateien bearbeiten (Testlauf: Index nur lesen)
+        if SHARD:
+            # Eigene Index-Datei je Teil, da SQLite auf Netzlaufwerken keine gleichzeitigen Schreiber verträgt
+            index_file_root, index_file_extension = os.path.splitext(INDEX_FILE)
+            INDEX_FILE = f"{index_file_root}_shard{SHARD.index}of{SHARD.count}{index_file_extension}"
+        msg_directory_index = MsgDirectoryIndex(INDEX_FILE, read_only=TEST_RUN)
+        index_full_sweep = INDEX_FULL_SWEEP or msg_directory_index.is_full_sweep_due(TARGET_DIRECTORY, INDEX_SWEEP_INTERVAL_DAYS)
+        print(f"Inkrementeller Lauf über Index '{INDEX_FILE}' (vollständiger Lauf: {index_full_sweep})")
+        app_logger.info(f"Inkrementeller Lauf über Index '{INDEX_FILE}' (vollständiger Lauf: {index_full_sweep})")
+        if SCAN_WORKERS > 1:
+            app_logger.info("Bei --incremental wird die Verzeichnissuche sequentiell durchgeführt, --scan_workers wird ignoriert.")
+        msg_directories = msg_directory_index.iter_changed_directories(TARGET_DIRECTORY, recursive=RECURSIVE_SEARCH, full_sweep=index_full_sweep,
+                                                                       path_filter=msg_path_filter if msg_path_filter.is_active else None)
+    else:
+        msg_directories = discover_msg_directories(TARGET_DIRECTORY, recursive=RECURSIVE_SEARCH, scan_workers=SCAN_WORKERS, ordered=SCAN_ORDERED,
+                                                   path_filter=msg_path_filter if msg_path_filter.is_active else None)
+
+    # Bei --cooperative nur die Verzeichnisse bearbeiten, deren Lease dieser Aufruf erhält (gemeinsames Lease-Verzeichnis je Lauf)
+    work_distributor = None
+    if COOPERATIVE_MODE:
+        work_distributor = CooperativeWorkDistributor(os.path.join(LEASE_DIRECTORY, LEASE_RUN), lease_timeout_seconds=LEASE_TIMEOUT,
+                                                      heartbeat_interval_seconds=min(LEASE_HEARTBEAT_SECONDS, LEASE_TIMEOUT / 4),
+                                                      path_filter=msg_path_filter if msg_path_filter.is_active else None)
+        print(f"Kooperativer Betrieb als '{work_distributor.worker_id}' (Lauf '{LEASE_RUN}', Lease-Verzeichnis '{LEASE_DIRECTORY}')")
+        msg_directories = work_distributor.iter_claimed_directories(msg_directories)
+
+    # Bei --performance_timing die Laufzeiten je MSG-Datei sammeln; die Suche wird als Wartezeit auf das nächste Verzeichnis gemessen
+    performance_statistics = None
+    if PERFORMANCE_TIMING:
+        performance_statistics = PerformanceStatistics(PERFORMANCE_TOP_FILES)
+        msg_directories = performance_statistics.timed_iteration(msg_directories, STAGE_DISCOVERY)
+
+    # Fortschrittszeile statt Ausgabe je MSG-Datei; gezählt werden die gefundenen Dateien (auch die vorab eingelesenen)
+    console_progress = None
+    if not VERBOSE_CONSOLE_OUTPUT:
+        console_progress = ConsoleProgress(CONSOLE_PROGRESS_INTERVAL_SECONDS)
+        msg_directories = console_progress.count_discovered(msg_directories)
+
+    def console_outcome_counts() -> dict:
+        # Zähler je Ergebnis für die Fortschrittszeile (Zähler mit 0 werden nicht angezeigt)
+        return {"umbenannt": msg_file_renamed_count, "unverändert": msg_file_same_name_count, "Doubletten": msg_file_doublette_count,
+                "zurückgestellt": msg_file_deferred_count, "PDF": pdf_file_generated,
+                "Probleme": msg_file_problem_count + msg_file_doublette_deleted_problem_count}
+
+    def process_finished_deferred_operations():
+        # Ergebnisse abgeschlossener zurückgestellter Operationen auswerten (Zähler, Zeitstempel, Sheet "Wiederholungen").
+        # Aufruf nach jedem Verzeichnis und bei --watch im Leerlauf, damit Ergebnisse nicht bis zum Programmende warten.
+        global msg_file_renamed_count, msg_file_file_creation_date_count, msg_file_creation_date_problem_count, msg_file_modification_date_count, \
+            msg_file_modification_date_problem_count, msg_file_doublette_count, msg_file_problem_count, msg_file_doublette_deleted_count, \
+            msg_file_doublette_deleted_problem_count, msg_file_deferred_given_up_count
+        if not finished_deferred_operations:
+            return
+        if console_progress:
+            console_progress.clear()
+        deferred_entries = []
+        for deferred_operation in finished_deferred_operations:
+            if deferred_operation.operation_name == "rename":
+                if deferred_operation.status == DeferredRetryStatus.SUCCESS:
+                    msg_file_renamed_count += 1
+                    print(f"\tZurückgestellte Umbenennung erfolgreich: '{deferred_operation.target}'")
+
+                    # Zeitstempel der umbenannten Datei nachträglich setzen
+                    datetime_stamp = deferred_operation.context.get("datetime_stamp")
+                    if SET_FILEDATE and isinstance(datetime_stamp, datetime.datetime):
+                        datetime_stamp_str = datetime_stamp.strftime("%Y-%m-%d %H:%M:%S")
+                        if set_file_creation_date(deferred_operation.target, datetime_stamp_str) == FileOperationResult.SUCCESS:
+                            msg_file_file_creation_date_count += 1
+                        else:
+                            msg_file_creation_date_problem_count += 1
+                        if set_file_modification_date(deferred_operation.target, datetime_stamp_str) == FileOperationResult.SUCCESS:
+                            msg_file_modification_date_count += 1
+                        else:
+                            msg_file_modification_date_problem_count += 1
+                elif deferred_operation.last_result == FileOperationResult.DESTINATION_EXISTS:
+                    msg_file_doublette_count += 1
+                else:
+                    msg_file_problem_count += 1
+            elif deferred_operation.operation_name == "delete":
+                if deferred_operation.status == DeferredRetryStatus.SUCCESS:
+                    msg_file_doublette_deleted_count += 1
+                    print(f"\tZurückgestelltes Löschen der Doublette erfolgreich: '{deferred_operation.path}'")
+                else:
+                    msg_file_doublette_deleted_problem_count += 1
+
+            if deferred_operation.status == DeferredRetryStatus.GIVEN_UP:
+                msg_file_deferred_given_up_count += 1
+                print(f"\tDatei nach Ablauf der Frist weiterhin gesperrt, Vorgang aufgegeben: '{deferred_operation.path}'")
+
+            deferred_entries.append({
+                "Operation": deferred_operation.operation_name,
+                "Datei": deferred_operation.path,
+                "Ziel": deferred_operation.target,
+                "Versuche": deferred_operation.attempts,
+                "Ergebnis": deferred_operation.status.value,
+                "Letzter Status": deferred_operation.last_result.value
+            })
+        finished_deferred_operations.clear()
+        log_entry_neu(excel_log_file_path, deferred_entries, sheet_name="Wiederholungen")
+
+    def run_due_deferred_operations():
+        # Leerlauf bei --watch: fällige Wiederholungen ausführen und die Ergebnisse sofort auswerten
+        if len(retry_queue):
+            finished_deferred_operations.extend(retry_queue.run_due())
+            process_finished_deferred_operations()
+
+    # Bei --workers die MSG-Dateien vorab in einem Prozess-Pool einlesen und die neuen Dateinamen erzeugen.
+    # Bei --incremental und --cooperative wird das nächste Verzeichnis erst nach Abschluss des aktuellen angefordert.
+    msg_filename_pool = None
+    if WORKERS > 1:
+        msg_filename_pool = MsgFilenamePool(WORKERS, WORKER_CHUNK_SIZE, prefetch_directories=0 if (INCREMENTAL_MODE or COOPERATIVE_MODE) else WORKERS * 4,
+                                            use_list_of_known_senders=USE_KNOWNSENDER_FILE, file_list_of_known_senders=KNOWNSENDER_FILE, max_console_output=MAX_CONSOLE_OUTPUT,
+                                            measure_stages=PERFORMANCE_TIMING)
+        print(f"Einlesen und Dateinamens-Erzeugung mit {WORKERS} Prozessen")
+        msg_directories = msg_filename_pool.iter_directories(msg_directories)
+
+    # Verarbeitungskette je Verzeichnis: Zugriff -> Dateiname -> Apply -> PDF, verbunden über begrenzte Warteschlangen (Backpressure).
+    # Zugriff und Apply sind reine Wartezeit auf das Dateisystem (--apply_workers Threads); die Dateinamen werden mit --workers im
+    # Prozess-Pool erzeugt und hier in Reihenfolge abgeholt. Apply beginnt die Dateien in Reihenfolge; Operationen auf denselben
+    # alten oder neuen Dateinamen laufen nacheinander, damit Doubletten und Namenskollisionen wie bei serieller Bearbeitung erkannt werden.
+    apply_executor = KeyedThreadPoolExecutor(APPLY_WORKERS)
+    if msg_filename_pool:
+        generate_filename = msg_filename_pool.result
+    else:
+        generate_filename = functools.partial(generate_new_msg_filename, use_list_of_known_senders=USE_KNOWNSENDER_FILE, file_list_of_known_senders=KNOWNSENDER_FILE,
+                                              measure_stages=PERFORMANCE_TIMING)
+    msg_pipeline_stages = [
+        PipelineStage("Zugriff", check_access_stage, concurrency=max(1, APPLY_WORKERS)),
+        PipelineStage("Dateiname", functools.partial(generate_filename_stage, generate_filename=generate_filename, no_shorten_path_name=NO_SHORTEN_PATH_NAME),
+                      concurrency=1, ordered=True),
+        PipelineStage("Apply", functools.partial(apply_stage, test_run=TEST_RUN, set_filedate=SET_FILEDATE), concurrency=max(1, APPLY_WORKERS), ordered=True,
+                      submit=(lambda fn, task: apply_executor.submit(apply_operation_keys(task.path_and_file_name, task.new_path_and_file_name), fn, task))
+                      if APPLY_WORKERS > 1 else None,
+                      skip=lambda task: not needs_apply(task))
+    ]
+    # Bei --pdf_workers werden die PDF-Dateien in einem eigenen Prozess-Pool erzeugt, die Umbenennung wartet nicht darauf
+    # Bei --incremental_pdf werden vorhandene PDF-Dateien nur neu erzeugt, wenn sie laut Manifest veraltet sind
+    # Bei --pdf_consolidate entfallen die PDF-Dateien je MSG-Datei, die Sammel-PDF-Dateien werden am Ende jedes Verzeichnisses erzeugt
+    pdf_manifest = PdfManifest(read_only=TEST_RUN) if GENERATE_PDF and INCREMENTAL_PDF and not CONSOLIDATE_PDF else None
+    msg_pdf_pool = None
+    if CONSOLIDATE_PDF:
+        print(f"Sammel-PDF-Dateien je {'Verzeichnis' if PDF_CONSOLIDATE_MODE == MsgPdfConsolidationMode.DIRECTORY else 'Versandmonat'}")
+    elif GENERATE_PDF and PDF_WORKERS > 0:
+        msg_pdf_pool = MsgPdfPool(PDF_WORKERS, overwrite_pdf=OVERWRITE_PDF or INCREMENTAL_PDF, pdf_manifest=pdf_manifest,
+                                   max_quoted_emails=PDF_MAX_QUOTED_EMAILS)
+        print(f"PDF-Erzeugung mit {PDF_WORKERS} Prozessen")
+    elif GENERATE_PDF:
+        msg_pipeline_stages.append(PipelineStage("PDF", functools.partial(pdf_stage, overwrite_pdf=OVERWRITE_PDF, pdf_manifest=pdf_manifest,
+                                                                                   max_quoted_emails=PDF_MAX_QUOTED_EMAILS), concurrency=1,
+                                                 skip=lambda task: not needs_pdf(task)))
+    # Bei --profile die Ergebnisse neben der Excel-Log-Datei ablegen; die Stufen laufen in eigenen Threads und werden dort profiliert
+    run_profiler = None
+    if PROFILE_MODE != ProfilerMode.NONE:
+        run_profiler = RunProfiler(os.path.splitext(excel_log_file_path)[0] + "_profile", PROFILE_MODE, max_files=PROFILE_MAX_FILES,
+                                   top_function_count=PROFILE_TOP_FUNCTIONS)
+        for msg_pipeline_stage in msg_pipeline_stages:
+            msg_pipeline_stage.handler = run_profiler.wrap(msg_pipeline_stage.handler)
+    msg_pipeline = StagedPipeline(msg_pipeline_stages, max_in_flight=PIPELINE_QUEUE_SIZE)
+    EMPTY_MSG_FILENAME_RESULT = MsgFilenameResult("", "", "", "", "", "", "", "", False) # Log-Eintrag für Dateien ohne Schreibzugriff
+
+    # Bei --watch die Überwachung vor dem ersten Durchlauf starten, damit währenddessen abgelegte Dateien nicht verloren gehen.
+    # Nach dem ersten Durchlauf werden nur noch neue oder geänderte Dateien geliefert.
+    msg_watcher = None
+    if WATCH_MODE:
+        msg_watcher = MsgDirectoryWatcher(TARGET_DIRECTORY, recursive=RECURSIVE_SEARCH, path_filter=msg_path_filter if msg_path_filter.is_active else None,
+                                          debounce_seconds=WATCH_DEBOUNCE, poll_interval_seconds=WATCH_POLL_INTERVAL, backend=WATCH_BACKEND)
+        msg_watcher.start()
+        print(f"Überwachung aktiv (Verfahren: {msg_watcher.active_backend.value}). Beenden mit Strg+C.")
+        app_logger.info(f"Überwachung aktiv (Verfahren: {msg_watcher.active_backend.value}).")
+        msg_directories = itertools.chain(msg_directories, msg_watcher.iter_changed_directories(on_idle=run_due_deferred_operations))
+
+    if run_profiler:
+        run_profiler.start()  # Ab Python 3.12 mit sampling statt cprofile
+        print(f"Profiling ({run_profiler.mode.value}){f' der ersten {PROFILE_MAX_FILES} MSG-Dateien' if PROFILE_MAX_FILES else ''}: '{run_profiler.profile_path}'")
+        if run_profiler.mode != PROFILE_MODE:
+            print(f"Hinweis: Ab Python 3.12 ist '{PROFILE_MODE.value}' nicht für mehrere Threads möglich, es wird '{run_profiler.mode.value}' verwendet.")
+        if WORKERS > 1 or PDF_WORKERS > 0:
+            print("Hinweis: Die Prozess-Pools (--workers, --pdf_workers) werden nicht profiliert.")
+
+    # Strg+C (Beenden von --watch, Abbruch während der Bearbeitung): die Schleife verlassen und den Lauf regulär abschließen
+    # (Wiederholungen, PDF-Pool, Manifest, Index, Zusammenfassung und Excel-Sheets)
+    try:
+        for msg_directory in msg_directories:
+            pathname = msg_directory.directory_path
+
+            # Bei --watch die Excel-Logdatei täglich bzw. nach WATCH_LOG_MAX_ENTRIES Einträgen neu beginnen (rollierendes Log)
+            if WATCH_MODE and (excel_log_file_date != datetime.date.today() or excel_log_entry_count >= WATCH_LOG_MAX_ENTRIES):
+                excel_log_file_path = create_log_file_neu(excel_log_basename, EXCEL_LOG_DIRECTORY, LOG_TABLE_HEADER, sheet_name="Log")
+                excel_log_file_date = datetime.date.today()
+                excel_log_entry_count = 0
+                clean_old_excel_files(EXCEL_LOG_DIRECTORY, MAX_EXCEL_LOG_FILE_COUNT, excel_log_basename)
+                app_logger.info(f"Neue Excel-Logdatei = {excel_log_file_path}")
+
+            # Arbeitsaufträge des Verzeichnisses durch die Verarbeitungskette führen (Zugriff -> Dateiname -> Apply -> PDF).
+            # Die Stufen arbeiten gleichzeitig an verschiedenen Dateien; die Ergebnisse werden hier in der Reihenfolge der
+            # Dateien ausgewertet (Zähler, Konsolenausgabe, zurückgestellte Wiederholungen, Excel-Log).
+            # msg_entry = os.DirEntry der MSG-Datei (Endung .msg, Groß-/Kleinschreibung egal)
+            msg_file_tasks = [MsgFileTask(pathname, msg_entry.name, msg_entry.path, stage_seconds={} if PERFORMANCE_TIMING else None)
+                              for msg_entry in msg_directory.msg_entries]
+            for msg_file_task in msg_pipeline.process(msg_file_tasks):
+                filename = msg_file_task.filename
+                set_log_file_context(msg_file_task.path_and_file_name)  # Stichprobe der DEBUG/TRACE-Einträge (--debug_log_sample)
+
+                app_logger.debug(f"**************************BEARBEITUNG NÄCHSTE MSG DAIEI************************************")  # Debugging-Ausgabe: Log-File
+
+                # Initialisierung der Variable
+                is_msg_file_name_unchanged = False
+                is_msg_file_doublette = False
+                is_msg_file_doublette_deleted = False
+                is_msg_file_deferred = False
+                rename_msg_file_result = None
+                file_has_new_creation_date = False
+                file_has_new_modification_date = False
+                new_msg_filename_collection = msg_file_task.new_msg_filename_collection or EMPTY_MSG_FILENAME_RESULT # Ohne Schreibzugriff wird kein neuer Dateiname erzeugt
+                new_file_name = msg_file_task.new_file_name
+                new_path_and_file_name = msg_file_task.new_path_and_file_name
+                new_path_and_file_name_length = len(new_path_and_file_name) if new_path_and_file_name else None
+                access_result = msg_file_task.access_result
+
+                if VERBOSE_CONSOLE_OUTPUT: print(f"MSG-Datei: '{filename}'")  # Debugging-Ausgabe: Console
+                app_logger.debug("Aktuelle MSG-Datei zur Bearbeitung: '%s'", filename)  # Debugging-Ausgabe: Log-File
+
+                # Absoluter Pfadname der MSG-Datei und Pfadlänge
+                path_and_file_name = msg_file_task.path_and_file_name
                 path_and_file_name_length = len(path_and_file_name)
-                app_logger.debug(f"Pfadlänge aktuelle MSG-Datei: '{path_and_file_name_length}'")  # Debugging-Ausgabe: Log-File
+                app_logger.debug("Pfadlänge aktuelle MSG-Datei: '%s'", path_and_file_name_length)  # Debugging-Ausgabe: Log-File
 
                 if MAX_CONSOLE_OUTPUT: print(f"\tAktuelles Verzeichnis: '{os.path.dirname(path_and_file_name)}'")  # Debugging-Ausgabe: Console
-                app_logger.debug(f"Aktuelles Verzeichnis: '{os.path.dirname(path_and_file_name)}'")  # Debugging-Ausgabe: Log-File
+                app_logger.debug("Aktuelles Verzeichnis: '%s'", os.path.dirname(path_and_file_name))  # Debugging-Ausgabe: Log-File
 
                 msg_file_count += 1 # Zähler erhöhen, MSG-Datei gefunden
 
-                # Überprüfen den Schreib- und Lesezugriff auf die MSG-Datei
-                access_result = test_file_access(path_and_file_name)
-
                 if MAX_CONSOLE_OUTPUT: print(f"\tÜberprüfung Zugriff auf aktuelle MSG-Date: {[s.value for s in access_result]}'")  # Debugging-Ausgabe: Console
-                app_logger.debug(f"Überprüfung Zugriff auf aktuelle MSG-Date: {[s.value for s in access_result]}'")  # Debugging-Ausgabe: Log-File
 
                 # Nur wenn die MSG-Datei schreibend geöffnet werden kann, ist ein Umbenennen möglich
                 if FileAccessStatus.WRITABLE in access_result:
                     if MAX_CONSOLE_OUTPUT: print(f"\tSchreibender Zugriff auf die Datei ist möglich.")  # Debugging-Ausgabe: Console
-                    app_logger.debug(f"Schreibender Zugriff auf die Datei ist möglich: {filename}")  # Debugging-Ausgabe: Log-File
-
-                    # Neuen Dateinamen erzeugen
-                    app_logger.debug(f"Versuche neuen Dateinamen fzu erzeugen.")  # Debugging-Ausgabe: Log-File
-                    new_msg_filename_collection = generate_new_msg_filename(path_and_file_name, use_list_of_known_senders=USE_KNOWNSENDER_FILE, file_list_of_known_senders=KNOWNSENDER_FILE, max_console_output=MAX_CONSOLE_OUTPUT)
-
-                    # Überprüfen, ob new_msg_filename_collection nicht Leer (True) ist
-                    if new_msg_filename_collection.new_truncated_msg_filename:
-
-                        # Datei für Anpassung Erstellungs- und Änderungsdatum verfügbar?
-                        is_msg_file_for_change_date_available = False
+                    app_logger.debug("Schreibender Zugriff auf die Datei ist möglich: %s", filename)  # Debugging-Ausgabe: Log-File
 
-                        # Alter und neuer Name
-                        old_path_and_file_name = path_and_file_name
-
-                        # Neuen Filenamen setzen in Abhängigkeit von NO_SHORTEN_PATH_NAME
-                        if NO_SHORTEN_PATH_NAME:
-                            new_file_name = new_msg_filename_collection.new_msg_filename
-                        else:
-                            new_file_name = new_msg_filename_collection.new_truncated_msg_filename
-                            if new_msg_filename_collection.is_msg_filename_truncated:
-                                msg_file_shorted_name_count += 1
-                                if MAX_CONSOLE_OUTPUT: print(f"\tNeuer gekürzter Dateiname: '{new_file_name}'")
-                                app_logger.debug(f"Neuer gekürzter Dateiname: '{new_file_name}'")  # Debugging-Ausgabe: Log-File
-
-                        # Neuen absoluten Pfad erzeugen
-                        new_path_and_file_name = os.path.join(pathname, new_file_name)
+                    # Dateioperationen wurden nur ausgeführt, wenn ein neuer Dateiname erzeugt wurde
+                    if msg_file_task.apply_result:
+                        apply_result = msg_file_task.apply_result
 
+                        if not NO_SHORTEN_PATH_NAME and new_msg_filename_collection.is_msg_filename_truncated:
+                            msg_file_shorted_name_count += 1
+                            if MAX_CONSOLE_OUTPUT: print(f"\tNeuer gekürzter Dateiname: '{new_file_name}'")
+                            app_logger.debug("Neuer gekürzter Dateiname: '%s'", new_file_name)  # Debugging-Ausgabe: Log-File
                         if MAX_CONSOLE_OUTPUT: print(f"\tNeuer absoluter Pfad: '{new_path_and_file_name}'")
-                        app_logger.debug(f"Neuer absoluter Pfad: '{new_path_and_file_name}'")  # Debugging-Ausgabe: Log-File
-
-                        # Pfadlänge ermitteln
-                        new_path_and_file_name_length = len(new_path_and_file_name)
                         if MAX_CONSOLE_OUTPUT: print(f"\tPfadlänge neue MSG-Datei: '{new_path_and_file_name_length}'")
-                        app_logger.debug(f"Pfadlänge neue MSG-Datei: '{new_path_and_file_name_length}'")  # Debugging-Ausgabe: Log-File
+                        app_logger.debug("Pfadlänge neue MSG-Datei: '%s'", new_path_and_file_name_length)  # Debugging-Ausgabe: Log-File
 
-                        # Prüfen, ob Alter und neuer Name gleich sind, dann keine Änderung erforderlich
-                        if old_path_and_file_name == new_path_and_file_name:
-                            print(f"\tAlter und neuer Dateiname sind gleich.")
-                            app_logger.debug(f"Alter und neuer Dateiname sind gleich: '{filename}'")  # Debugging-Ausgabe: Log-File
+                        # Alter und neuer Name gleich, dann keine Änderung erforderlich
+                        if apply_result.is_name_unchanged:
+                            if VERBOSE_CONSOLE_OUTPUT: print(f"\tAlter und neuer Dateiname sind gleich.")
+                            app_logger.debug("Alter und neuer Dateiname sind gleich: '%s'", filename)  # Debugging-Ausgabe: Log-File
                             msg_file_same_name_count += 1  # Erfolgszähler erhöhen
                             is_msg_file_name_unchanged = True # Kennzeichnung keine Änderung des Dateinamens erforderlich
-                            is_msg_file_for_change_date_available = True # Kennzeichnung für Anpassung Erstellungs- und Änderungsdatum
-                        else:
-                            # Prüfen, ob die Datei mit neuem Namen bereits existiert, also Doublette
-                            if os.path.exists(new_path_and_file_name):
-                                print(f"\tDatei ist eine Doublette: '{filename}'")
-                                app_logger.debug(f"Datei ist eine Doublette: '{filename}'")  # Debugging-Ausgabe: Log-File
+
+                        # Die Datei mit neuem Namen existiert bereits, also Doublette
+                        elif apply_result.is_doublette:
+                            if VERBOSE_CONSOLE_OUTPUT: print(f"\tDatei ist eine Doublette: '{filename}'")
+                            app_logger.debug("Datei ist eine Doublette: '%s'", filename)  # Debugging-Ausgabe: Log-File
+                            msg_file_doublette_count += 1  # Erfolgszähler erhöhen
+                            is_msg_file_doublette = True # MSG-Datei mit gleichem neuen Namen existiert bereits - also Doublette
+
+                            # Ergebnis des Löschens der Doublette (nicht bei Testlauf)
+                            delete_msg_file_result = apply_result.delete_result
+                            if delete_msg_file_result == FileOperationResult.SUCCESS:
+                                if VERBOSE_CONSOLE_OUTPUT: print(f"\tDoublette gelöscht: '{filename}'")
+                                app_logger.debug("Doublette gelöscht: '%s'", filename)  # Debugging-Ausgabe: Log-File
+                                msg_file_doublette_deleted_count += 1  # Löschzähler erhöhen
+                                is_msg_file_doublette_deleted = True
+                            elif delete_msg_file_result == FileOperationResult.PERMISSION_DENIED:
+                                # Datei ist gesperrt: Löschen zurückstellen, die Verarbeitung läuft weiter
+                                if VERBOSE_CONSOLE_OUTPUT: print(f"\tDoublette ist gesperrt, Löschen wird später erneut versucht: '{filename}'")
+                                retry_queue.park("delete", path_and_file_name, delete_file, path_and_file_name)
+                                msg_file_deferred_count += 1
+                                is_msg_file_deferred = True
+                            elif delete_msg_file_result is not None:
+                                if VERBOSE_CONSOLE_OUTPUT: print(f"\tDoublette konnte nicht gelöscht werden: '{filename}'. Fehler: {delete_msg_file_result.value}")
+                                app_logger.error(f"Doublette konnte nicht gelöscht werden: '{filename}'. Fehler: {delete_msg_file_result.value}")  # Debugging-Ausgabe: Log-File
+                                msg_file_doublette_deleted_problem_count += 1  # Problemzähler erhöhen
+
+                        # Ergebnis der Umbenennung (nicht bei Testlauf)
+                        elif apply_result.rename_result is not None:
+                            if MAX_CONSOLE_OUTPUT: print(f"\t****************************************************")
+                            if MAX_CONSOLE_OUTPUT: print(f"\t* Wenn erforderlich, dann Umbenennung der MSG-Datei.")
+                            if MAX_CONSOLE_OUTPUT: print(f"\t****************************************************")
+
+                            # Zähler und Parameter abhängig von erfolgreicher Umbenennung setzen
+                            rename_msg_file_result = apply_result.rename_result
+                            if rename_msg_file_result == FileOperationResult.SUCCESS:
+                                if VERBOSE_CONSOLE_OUTPUT: print(f"\tErfolgreiche Umbenennung der Datei in '{new_file_name}'")
+                                app_logger.debug("Erfolgreiche Umbenennung der Datei '%s' in '%s'", filename, new_file_name)  # Debugging-Ausgabe: Log-File
+                                msg_file_renamed_count += 1  # Erfolgszähler erhöhen
+                            elif rename_msg_file_result == FileOperationResult.DESTINATION_EXISTS:
+                                if VERBOSE_CONSOLE_OUTPUT: print(f"\tDatei ist eine Doublette: '{filename}'")
+                                app_logger.debug("Datei ist eine Doublette: '%s'", filename)  # Debugging-Ausgabe: Log-File
                                 msg_file_doublette_count += 1  # Erfolgszähler erhöhen
-                                is_msg_file_doublette = True # MSG-Datei mit gleichem neuen Namen existiert bereits - also Doublette
-                                is_msg_file_for_change_date_available = False  # Kennzeichnung für Anpassung Erstellungs- und Änderungsdatum
-
-                                # Versuche Doublette zu löschen, wenn nicht Test
-                                if not TEST_RUN:
-                                    # Versuche, die Datei zu löschen
-                                    try:
-                                        os.remove(old_path_and_file_name)  # Versuche, die Datei zu löschen
-                                        print(f"\tDoublette gelöscht: '{filename}'")
-                                        app_logger.debug(f"Doublette gelöscht: '{filename}'")  # Debugging-Ausgabe: Log-File
-                                        msg_file_doublette_deleted_count += 1  # Löschzähler erhöhen
-                                        is_msg_file_doublette_deleted = True
-                                    except Exception as e:
-                                        print(f"\tDoublette konnte nicht gelöscht werden: '{filename}'. Fehler: {str(e)}")
-                                        app_logger.error(f"Doublette konnte nicht gelöscht werden: '{filename}'. Fehler: {str(e)}")  # Debugging-Ausgabe: Log-File
-                                        msg_file_doublette_deleted_problem_count += 1  # Problemzähler erhöhen
+                            elif rename_msg_file_result == FileOperationResult.PERMISSION_DENIED:
+                                # Datei ist gesperrt: Umbenennung zurückstellen, die Verarbeitung läuft weiter; Zeitstempel werden nach erfolgreicher Wiederholung gesetzt
+                                if VERBOSE_CONSOLE_OUTPUT: print(f"\tDatei ist gesperrt, Umbenennung wird später erneut versucht: '{filename}'")
+                                app_logger.debug("Datei ist gesperrt, Umbenennung von '%s' zurückgestellt.", filename)  # Debugging-Ausgabe: Log-File
+                                retry_queue.park("rename", path_and_file_name, deferred_rename_file, path_and_file_name, new_path_and_file_name,
+                                                 target=new_path_and_file_name, context={"datetime_stamp": new_msg_filename_collection.datetime_stamp})
+                                msg_file_deferred_count += 1
+                                is_msg_file_deferred = True
                             else:
-                                # Wenn kein Testlauf
-                                if (not TEST_RUN) and (not is_msg_file_doublette):
-
-                                    if MAX_CONSOLE_OUTPUT: print(f"\t****************************************************")
-                                    if MAX_CONSOLE_OUTPUT: print(f"\t* Wenn erforderlich, dann Umbenennung der MSG-Datei.")
-                                    if MAX_CONSOLE_OUTPUT: print(f"\t****************************************************")
-
-                                    # Umbenennen der MSG-Datei
-                                    rename_msg_file_result = rename_file(old_path_and_file_name, new_path_and_file_name, max_console_output=MAX_CONSOLE_OUTPUT)
-
-                                    # Zähler und Parameter abhängig von erfolgreicher Umbenennung setzen 
-                                    if rename_msg_file_result.SUCCESS:
-                                        print(f"\tErfolgreiche Umbenennung der Datei in '{new_file_name}'")
-                                        app_logger.debug(f"Erfolgreiche Umbenennung der Datei '{filename}' in '{new_file_name}'")  # Debugging-Ausgabe: Log-File
-                                        msg_file_renamed_count += 1  # Erfolgszähler erhöhen
-                                        is_msg_file_for_change_date_available = True  # Kennzeichnung für Anpassung Erstellungs- und Änderungsdatum
-                                    elif rename_msg_file_result.DESTINATION_EXISTS:
-                                        print(f"\tDatei ist eine Doublette: '{filename}'")
-                                        app_logger.debug(f"Datei ist eine Doublette: '{filename}'")  # Debugging-Ausgabe: Log-File
-                                        msg_file_doublette_count += 1  # Erfolgszähler erhöhen
-                                        is_msg_file_for_change_date_available = False  # Kennzeichnung für Anpassung Erstellungs- und Änderungsdatum
-                                    else:
-                                        print(f"\tUmbenennen der Datei fehlgeschlagen: '{rename_msg_file_result}'")
-                                        app_logger.debug(f"Umbenennen der Datei '{filename}' fehlgeschlagen: '{rename_msg_file_result}'")  # Debugging-Ausgabe: Log-File
-                                        msg_file_problem_count += 1  # Problemzähler erhöhen
-                                        is_msg_file_for_change_date_available = False
-
-                        # Wenn die Datei erfolgreich umbenannt wurde oder die Datei bereits mit korrekten Namen existiert und kein Testlauf durchgeführt wird
-                        # dann soll das Erstellungsdatum auf das Versanddatum gesetzt werden
-                        file_has_new_creation_date = False
-                        file_has_new_modification_date = False
-
-                        if is_msg_file_for_change_date_available and (not TEST_RUN) and SET_FILEDATE and (not is_msg_file_doublette):
+                                if VERBOSE_CONSOLE_OUTPUT: print(f"\tUmbenennen der Datei fehlgeschlagen: '{rename_msg_file_result}'")
+                                app_logger.error("Umbenennen der Datei '%s' fehlgeschlagen: '%s'", filename, rename_msg_file_result)  # Debugging-Ausgabe: Log-File
+                                msg_file_problem_count += 1  # Problemzähler erhöhen
 
+                        # Wenn die Datei erfolgreich umbenannt wurde oder die Datei bereits mit korrekten Namen existiert und kein Testlauf durchgeführt wird,
+                        # dann wurde das Erstellungs- und Änderungsdatum auf das Versanddatum gesetzt
+                        if apply_result.creation_date_result is not None or apply_result.is_datetime_stamp_missing:
                             if MAX_CONSOLE_OUTPUT: print(f"\t*************************************************************")
                             if MAX_CONSOLE_OUTPUT: print(f"\t* Wenn erforderlich, dann Zeitstempel der MSG-Datei anpassen.")
                             if MAX_CONSOLE_OUTPUT: print(f"\t*************************************************************")
 
-                            # Setze das Erstelldatum auf das Versanddatum
-                            if new_msg_filename_collection.datetime_stamp != "Unbekannt":
-                                # Überprüfen, ob datetime_stamp ein datetime-Objekt ist
-                                if isinstance(new_msg_filename_collection.datetime_stamp, datetime.datetime):
-                                    # Konvertiere das datetime-Objekt in einen String im richtigen Format
-                                    datetime_stamp_str = new_msg_filename_collection.datetime_stamp.strftime("%Y-%m-%d %H:%M:%S")
-                                else:
-                                    datetime_stamp_str = new_msg_filename_collection.datetime_stamp  # Annehmen, dass es bereits ein String ist
-
-                                # Jetzt das Erstellungsdatum auf das Versanddatum setzen
-                                set_creation_result = set_file_creation_date(new_path_and_file_name, datetime_stamp_str)
-
-                                if set_creation_result == FileOperationResult.SUCCESS:
-                                    msg_file_file_creation_date_count += 1
-                                    file_has_new_creation_date = True
-                                    if MAX_CONSOLE_OUTPUT: print(f"\tNeues Erstellungsdatum erfolgreich gesetzt.")  # Ausgabe des Ergebnisses
-                                    app_logger.debug(f"Neues Erstellungsdatum für '{new_file_name}' erfolgreich gesetzt.")  # Debugging-Ausgabe: Log-File
-                                elif set_creation_result == FileOperationResult.TIMESTAMP_MATCH :
-                                    msg_file_creation_date_unchanged_count += 1
-                                    if MAX_CONSOLE_OUTPUT: print(f"\tSetzen des Erstellungsdatum nicht erforderlich.")  # Ausgabe des Ergebnisses
-                                    app_logger.debug(f"Setzen des Erstellungsdatum für '{new_file_name}' nicht erforderlich.")  # Debugging-Ausgabe: Log-File
-                                else:
-                                    msg_file_creation_date_problem_count += 1
-                                    if MAX_CONSOLE_OUTPUT: print(f"\tFehler beim Setzen des Erstellungsdatum: '{set_creation_result}'")  # Ausgabe des Ergebnisses
-                                    app_logger.debug(f"Fehler beim Setzen des Erstellungsdatum für '{new_file_name}': '{set_creation_result}'")  # Debugging-Ausgabe: Log-File
-
-                                # Setze das Änderungsdatum auf das Versanddatum
-                                set_modification_result = set_file_modification_date(new_path_and_file_name, datetime_stamp_str)
-                                if set_modification_result == FileOperationResult.SUCCESS:
-                                    msg_file_modification_date_count += 1
-                                    file_has_new_modification_date = True
-                                    if MAX_CONSOLE_OUTPUT: print(f"\tNeues Änderungsdatum erfolgreich gesetzt.")  # Ausgabe des Ergebnisses
-                                    app_logger.debug(f"Neues Änderungsdatum für '{new_file_name}' erfolgreich gesetzt.")  # Debugging-Ausgabe: Log-File
-                                elif set_creation_result == FileOperationResult.TIMESTAMP_MATCH :
-                                    msg_file_modification_date_unchanged_count += 1
-                                    if MAX_CONSOLE_OUTPUT: print(f"\tSetzen des Änderungsdatum nicht erforderlich.")  # Ausgabe des Ergebnisses
-                                    app_logger.debug(f"Setzen des Änderungsdatum für '{new_file_name}' nicht erforderlich.")  # Debugging-Ausgabe: Log-File
-                                else:
-                                    msg_file_modification_date_problem_count += 1
-                                    if MAX_CONSOLE_OUTPUT: print(
-                                        f"\tFehler beim Setzen des Änderungsdatum: '{set_creation_result}'")  # Ausgabe des Ergebnisses
-                                    app_logger.debug(
-                                        f"Fehler beim Setzen des Änderungsdatum für '{new_file_name}': '{set_creation_result}'")  # Debugging-Ausgabe: Log-File
+                        if apply_result.creation_date_result is not None:
+                            set_creation_result = apply_result.creation_date_result
+                            if set_creation_result == FileOperationResult.SUCCESS:
+                                msg_file_file_creation_date_count += 1
+                                file_has_new_creation_date = True
+                                if MAX_CONSOLE_OUTPUT: print(f"\tNeues Erstellungsdatum erfolgreich gesetzt.")  # Ausgabe des Ergebnisses
+                                app_logger.debug("Neues Erstellungsdatum für '%s' erfolgreich gesetzt.", new_file_name)  # Debugging-Ausgabe: Log-File
+                            elif set_creation_result == FileOperationResult.TIMESTAMP_MATCH :
+                                msg_file_creation_date_unchanged_count += 1
+                                if MAX_CONSOLE_OUTPUT: print(f"\tSetzen des Erstellungsdatum nicht erforderlich.")  # Ausgabe des Ergebnisses
+                                app_logger.debug("Setzen des Erstellungsdatum für '%s' nicht erforderlich.", new_file_name)  # Debugging-Ausgabe: Log-File
                             else:
                                 msg_file_creation_date_problem_count += 1
+                                if MAX_CONSOLE_OUTPUT: print(f"\tFehler beim Setzen des Erstellungsdatum: '{set_creation_result}'")  # Ausgabe des Ergebnisses
+                                app_logger.warning("Fehler beim Setzen des Erstellungsdatum für '%s': '%s'", new_file_name, set_creation_result)  # Debugging-Ausgabe: Log-File
+
+                            set_modification_result = apply_result.modification_date_result
+                            if set_modification_result == FileOperationResult.SUCCESS:
                                 msg_file_modification_date_count += 1
-                                if MAX_CONSOLE_OUTPUT: print(f"\tKein Versanddatum der MSG-Datei verfügbar.")  # Ausgabe des Ergebnisses
-                                app_logger.debug(f"Kein Versanddatum der MSG-Datei verfügbar.")  # Debugging-Ausgabe: Log-File
+                                file_has_new_modification_date = True
+                                if MAX_CONSOLE_OUTPUT: print(f"\tNeues Änderungsdatum erfolgreich gesetzt.")  # Ausgabe des Ergebnisses
+                                app_logger.debug("Neues Änderungsdatum für '%s' erfolgreich gesetzt.", new_file_name)  # Debugging-Ausgabe: Log-File
+                            elif set_creation_result == FileOperationResult.TIMESTAMP_MATCH :
+                                msg_file_modification_date_unchanged_count += 1
+                                if MAX_CONSOLE_OUTPUT: print(f"\tSetzen des Änderungsdatum nicht erforderlich.")  # Ausgabe des Ergebnisses
+                                app_logger.debug("Setzen des Änderungsdatum für '%s' nicht erforderlich.", new_file_name)  # Debugging-Ausgabe: Log-File
+                            else:
+                                msg_file_modification_date_problem_count += 1
+                                if MAX_CONSOLE_OUTPUT: print(
+                                    f"\tFehler beim Setzen des Änderungsdatum: '{set_creation_result}'")  # Ausgabe des Ergebnisses
+                                app_logger.warning(
+                                    "Fehler beim Setzen des Änderungsdatum für '%s': '%s'", new_file_name, set_creation_result)  # Debugging-Ausgabe: Log-File
+                        elif apply_result.is_datetime_stamp_missing:
+                            msg_file_creation_date_problem_count += 1
+                            msg_file_modification_date_count += 1
+                            if MAX_CONSOLE_OUTPUT: print(f"\tKein Versanddatum der MSG-Datei verfügbar.")  # Ausgabe des Ergebnisses
+                            app_logger.warning("Kein Versanddatum der MSG-Datei '%s' verfügbar.", filename)  # Debugging-Ausgabe: Log-File
 
                         # Wenn GENERATE_PDF True ist, wird eine PDF-Datei aus der MSG-Datei erstellt
-                        if GENERATE_PDF and (not is_msg_file_doublette):
+                        if GENERATE_PDF and (not CONSOLIDATE_PDF) and (not is_msg_file_doublette):
                             if MAX_CONSOLE_OUTPUT: print(f"\t***********************************************************")
                             if MAX_CONSOLE_OUTPUT: print(f"\t* Wenn erforderlich, PDF-Datei erzeugen.")
                             if MAX_CONSOLE_OUTPUT: print(f"\t***********************************************************")
 
-                            pdf_path = os.path.splitext(new_path_and_file_name)[0] + ".pdf"
-
-                            # Wenn der -opdf Flag False ist und die PDF-Datei bereits existiert, wird sie nicht überschrieben
-                            if not OVERWRITE_PDF and os.path.exists(pdf_path):
-                                if MAX_CONSOLE_OUTPUT: print(f"\tPDF-Datei '{pdf_path}' existiert bereits und -opdf ist False. Überspringe Erstellung.")
-                                app_logger.info(f"PDF-Datei '{pdf_path}' existiert bereits und -opdf ist False. Überspringe Erstellung.")
+                            # Bei --pdf_workers die umbenannte Datei mit ihren Metadaten an den PDF-Pool übergeben (Ergebnis am Ende des Laufs)
+                            if msg_pdf_pool and pdf_manifest and pdf_manifest.check(new_path_and_file_name, os.path.splitext(new_path_and_file_name)[0] + ".pdf") == PdfFreshness.UP_TO_DATE:
+                                if MAX_CONSOLE_OUTPUT: print(f"\tPDF-Datei ist aktuell. Überspringe Erstellung.")
                                 pdf_file_skipped += 1
-                                is_pdf_file_skipped = True
-                            else:
-                                generate_pdf_from_msg(new_path_and_file_name, 800)
-                                if MAX_CONSOLE_OUTPUT: print(f"\tPDF-Datei '{pdf_path}' erzeugt.")
-                                app_logger.info(f"PDF-Datei '{pdf_path}' erzeugt.")
+                            elif msg_pdf_pool:
+                                msg_pdf_pool.submit(new_path_and_file_name, original_file_name=filename, msg_subject=new_msg_filename_collection.msg_subject,
+                                                    sender_name=new_msg_filename_collection.sender_name, formatted_timestamp=new_msg_filename_collection.formatted_timestamp)
+                                if MAX_CONSOLE_OUTPUT: print(f"\tPDF-Datei wird im Hintergrund erzeugt.")
+
+                            # Die PDF-Datei wurde in der Stufe "PDF" erzeugt bzw. übersprungen, wenn sie bereits existiert und -opdf False ist
+                            elif msg_file_task.is_pdf_file_skipped:
+                                if MAX_CONSOLE_OUTPUT: print(f"\tPDF-Datei '{msg_file_task.pdf_path}' existiert bereits und -opdf ist False. Überspringe Erstellung.")
+                                pdf_file_skipped += 1
+                            elif msg_file_task.is_pdf_file_generated:
+                                if MAX_CONSOLE_OUTPUT: print(f"\tPDF-Datei '{msg_file_task.pdf_path}' erzeugt.")
                                 pdf_file_generated += 1
-                                is_pdf_file_generated = True
 
                 elif FileAccessStatus.READABLE in access_result:
                     if MAX_CONSOLE_OUTPUT: print(f"\tNur lesender Zugriff auf die Datei möglich.")
@@ -557,7 +1061,7 @@ if __name__ == '__main__':
 
                 else:
                     if MAX_CONSOLE_OUTPUT: print(f"\tWeder lesender noch schreibender Zugriff auf die Datei möglich: '{[s.value for s in access_result]}'")
-                    app_logger.info(f"Weder lesender noch schreibender Zugriff auf die Datei möglich: '{[s.value for s in access_result]}'")
+                    app_logger.info("Weder lesender noch schreibender Zugriff auf die Datei möglich: '%s'", [s.value for s in access_result])
                     msg_file_problem_count += 1  # Problemzähler erhöhen
 
                 # Logeintrag erstellen
@@ -582,15 +1086,161 @@ if __name__ == '__main__':
                     "Neues Änderungsdatum": file_has_new_modification_date,
                     "Doublette": is_msg_file_doublette,
                     "Doublette gelöscht": is_msg_file_doublette_deleted,
-                    "PDF erstellt": is_pdf_file_generated,
-                    "PDF übersprungen": is_pdf_file_skipped
+                    "PDF erstellt": None if msg_pdf_pool or CONSOLIDATE_PDF else msg_file_task.is_pdf_file_generated, # Bei --pdf_workers im Sheet "PDF"
+                    "PDF übersprungen": None if msg_pdf_pool or CONSOLIDATE_PDF else msg_file_task.is_pdf_file_skipped,
+                    "Zurückgestellt (gesperrt)": is_msg_file_deferred
                 }
 
                 # Eintrag ins Logfile hinzufügen
-                log_entry_neu(excel_log_file_path, entry, sheet_name="Log")
-
-        # Wenn keine rekursive Suche gewünscht ist, wird die Schleife beendet
-        if not RECURSIVE_SEARCH: break
+                with timed_stage(msg_file_task.stage_seconds, STAGE_EXCEL_LOG):
+                    log_entry_neu(excel_log_file_path, entry, sheet_name="Log")
+                excel_log_entry_count += 1
+                if performance_statistics:
+                    performance_statistics.add_file(path_and_file_name, msg_file_task.stage_seconds)
+
+                # Bearbeiteten Stand (alter und neuer Name) an die Überwachung melden, damit eigene Änderungen nicht erneut bearbeitet werden
+                if msg_watcher:
+                    msg_watcher.acknowledge(path_and_file_name, new_path_and_file_name)
+
+                # Im Index nur vollständig bearbeitete Dateien vermerken; gesperrte oder fehlerhafte Dateien werden beim nächsten Lauf erneut versucht
+                if msg_directory_index and FileAccessStatus.WRITABLE in access_result and not is_msg_file_deferred \
+                        and rename_msg_file_result in (None, FileOperationResult.SUCCESS, FileOperationResult.DESTINATION_EXISTS):
+                    msg_directory_index.acknowledge(path_and_file_name, new_path_and_file_name)
+
+                # Bei --profile_max_files das Profiling nach den ersten N Dateien beenden, der Lauf geht ohne Profiling weiter
+                if run_profiler and run_profiler.file_done():
+                    if console_progress:
+                        console_progress.clear()
+                    print(f"Profiling nach {run_profiler.file_count} MSG-Dateien beendet: '{run_profiler.summary_path}'")
+
+                if console_progress:
+                    console_progress.update(pathname, console_outcome_counts())
+
+            set_log_file_context(None)
+
+            # Am Ende des Verzeichnisses fällige Wiederholungen für gesperrte Dateien ausführen (nicht blockierend)
+            if len(retry_queue):
+                finished_deferred_operations += retry_queue.run_due()
+            process_finished_deferred_operations()
+
+            # Sammel-PDF-Dateien des Verzeichnisses neu erzeugen (alle MSG-Dateien, die jetzt im Verzeichnis liegen)
+            # und nicht mehr erzeugte Sammel-PDF-Dateien löschen
+            if CONSOLIDATE_PDF and msg_file_tasks and not TEST_RUN:
+                for consolidated_result in generate_consolidated_pdfs(pathname, PDF_CONSOLIDATE_MODE, PDF_CONSOLIDATE_MAX_MESSAGES,
+                                                                      max_quoted_emails=PDF_MAX_QUOTED_EMAILS,
+                                                                      bucket_states=consolidated_pdf_bucket_states):
+                    if consolidated_result.skipped:
+                        consolidated_pdf_unchanged += 1
+                        continue
+                    if consolidated_result.removed:
+                        if not consolidated_result.error:
+                            consolidated_pdf_removed += 1
+                            if MAX_CONSOLE_OUTPUT: print(f"\tNicht mehr erzeugte Sammel-PDF '{consolidated_result.pdf_path_and_file_name}' gelöscht.")
+                        consolidated_pdf_entries.append({
+                            "Sammel-PDF": consolidated_result.pdf_path_and_file_name,
+                            "MSG-Dateien": 0,
+                            "Ausgegebene E-Mails": 0,
+                            "Nicht lesbare MSG-Dateien": "",
+                            "Dauer (s)": 0,
+                            "Fehler": consolidated_result.error or "Gelöscht (wird nicht mehr erzeugt)"
+                        })
+                        continue
+                    if performance_statistics:
+                        performance_statistics.add_stage(STAGE_CONSOLIDATED_PDF, consolidated_result.seconds)
+                    if consolidated_result.written_count:
+                        consolidated_pdf_generated += 1
+                        consolidated_pdf_message_count += consolidated_result.written_count
+                        if MAX_CONSOLE_OUTPUT: print(f"\tSammel-PDF '{consolidated_result.pdf_path_and_file_name}' mit {consolidated_result.written_count} E-Mails erzeugt.")
+                    else:
+                        consolidated_pdf_failed += 1
+                    consolidated_pdf_entries.append({
+                        "Sammel-PDF": consolidated_result.pdf_path_and_file_name,
+                        "MSG-Dateien": consolidated_result.msg_count,
+                        "Ausgegebene E-Mails": consolidated_result.written_count,
+                        "Nicht lesbare MSG-Dateien": ", ".join(os.path.basename(path) for path in consolidated_result.failed_msg_files),
+                        "Dauer (s)": round(consolidated_result.seconds, 3),
+                        "Fehler": consolidated_result.error
+                    })
+
+            # Fortschritt der PDF-Erzeugung in Abständen ausgeben und geänderte PDF-Manifeste speichern
+            if msg_pdf_pool and msg_pdf_pool.is_progress_due():
+                if console_progress:
+                    console_progress.clear()
+                msg_pdf_pool.report_progress()
+            if pdf_manifest:
+                pdf_manifest.save()
+    except KeyboardInterrupt:
+        if console_progress:
+            console_progress.clear()
+        print("\nAbbruch durch Benutzer, der Lauf wird abgeschlossen ...")
+        app_logger.info("Abbruch durch Benutzer (Strg+C), der Lauf wird abgeschlossen.")
+
+    if console_progress:
+        console_progress.finish(outcome_counts=console_outcome_counts())
+
+    # Am Ende des Laufs alle noch offenen Wiederholungen bis zum Erfolg oder Ablauf der Frist ausführen
+    if len(retry_queue):
+        print(f"\nErneuter Versuch für {len(retry_queue)} gesperrte Datei(en), maximal {RETRY_DEADLINE} Sekunden ...")
+        finished_deferred_operations += retry_queue.drain()
+        process_finished_deferred_operations()
+
+    # Verarbeitungskette, Prozess-Pool und Apply-Stufe beenden
+    msg_pipeline.close()
+    if msg_filename_pool:
+        msg_filename_pool.close()
+    apply_executor.shutdown()
+    for stage_statistics in msg_pipeline.statistics:
+        app_logger.info(f"Pipeline-Stufe '{stage_statistics.name}': {stage_statistics.processed_count} bearbeitet, {stage_statistics.skipped_count} übersprungen, "
+                        f"{stage_statistics.busy_seconds:.1f} s, maximale Warteschlange {stage_statistics.max_queue_length}")
+
+    # Auf die noch ausstehenden PDF-Dateien warten und die Ergebnisse des PDF-Pools übernehmen
+    pdf_file_failed = 0
+    pdf_entries = []
+    if msg_pdf_pool:
+        for pdf_result in msg_pdf_pool.results():
+            if performance_statistics:
+                performance_statistics.add_stage(STAGE_PDF, pdf_result.seconds)  # Im Prozess-Pool gemessen, nicht in der Summe je MSG-Datei
+            if pdf_result.status == MsgPdfStatus.GENERATED:
+                pdf_file_generated += 1
+            elif pdf_result.status == MsgPdfStatus.SKIPPED:
+                pdf_file_skipped += 1
+            else:
+                pdf_file_failed += 1
+                app_logger.warning(f"PDF-Datei '{pdf_result.pdf_path_and_file_name}' konnte nicht erzeugt werden: {pdf_result.error}")
+            pdf_entries.append({
+                "MSG-Datei": pdf_result.msg_path_and_file_name,
+                "Original-Filename": pdf_result.metadata.get("original_file_name"),
+                "Versanddatum": pdf_result.metadata.get("formatted_timestamp"),
+                "Absender": pdf_result.metadata.get("sender_name"),
+                "Betreff": pdf_result.metadata.get("msg_subject"),
+                "PDF-Datei": pdf_result.pdf_path_and_file_name,
+                "Ergebnis": pdf_result.status.value,
+                "Dauer (s)": round(pdf_result.seconds, 3),
+                "Fehler": pdf_result.error
+            })
+        msg_pdf_pool.close()
+    if pdf_manifest:
+        pdf_manifest.save()
+
+    # Heartbeat beenden und ggf. noch gehaltene Leases freigeben
+    if work_distributor:
+        work_distributor.close()
+
+    # Index speichern und schließen
+    if msg_directory_index:
+        msg_directory_index.close()
+
+    # Profiling beenden (falls nicht bereits nach --profile_max_files Dateien geschehen)
+    if run_profiler and run_profiler.is_active:
+        run_profiler.stop()
+        print(f"Profiling beendet: '{run_profiler.profile_path}', '{run_profiler.summary_path}'")
+
+    if pdf_entries:
+        log_entry_neu(excel_log_file_path, pdf_entries, sheet_name="PDF")
+    if consolidated_pdf_entries:
+        log_entry_neu(excel_log_file_path, consolidated_pdf_entries, sheet_name="Sammel-PDF")
+    if performance_statistics:
+        log_entry_neu(excel_log_file_path, performance_statistics.performance_entries(), sheet_name="Performance")
 
     # Ausgabe der wichtigsten Konfigurationen
     print(f"\nÜbersicht der Konfigurationen:")
@@ -606,6 +1256,12 @@ if __name__ == '__main__':
     app_logger.info(f"Verzeichnis für die Suche nach MSG-Dateien: {TARGET_DIRECTORY}")
     print(f"Rekursive Suche? {RECURSIVE_SEARCH}")
     app_logger.info(f"Rekursive Suche? {RECURSIVE_SEARCH}")
+    if SHARD:
+        print(f"Teil des aufgeteilten Laufs: {SHARD.label} ({SHARD.mode.value})")
+        app_logger.info(f"Teil des aufgeteilten Laufs: {SHARD.label} ({SHARD.mode.value})")
+    if msg_path_filter.is_active:
+        print(f"Filter für die Suche: {msg_path_filter}")
+        app_logger.info(f"Filter für die Suche: {msg_path_filter}")
     print(f"Bei Bedarf in der Tabelle der bekannten Email-Absender? {USE_KNOWNSENDER_FILE}")
     app_logger.info(f"Bei Bedarf in der Tabelle der bekannten Email-Absender? {USE_KNOWNSENDER_FILE}")
     if USE_KNOWNSENDER_FILE:
@@ -618,10 +1274,22 @@ if __name__ == '__main__':
         app_logger.info(f"PDF-Dateien erzeugen? {GENERATE_PDF}")
         print(f"Existierende PDF-Dateien überschreiben? {OVERWRITE_PDF}")
         app_logger.info(f"Existierende PDF-Dateien überschreiben? {OVERWRITE_PDF}")
+        print(f"Nur veraltete PDF-Dateien neu erzeugen? {INCREMENTAL_PDF}")
+        app_logger.info(f"Nur veraltete PDF-Dateien neu erzeugen? {INCREMENTAL_PDF}")
+        print(f"Sammel-PDF-Dateien? {PDF_CONSOLIDATE_MODE.value}")
+        app_logger.info(f"Sammel-PDF-Dateien? {PDF_CONSOLIDATE_MODE.value}")
+        print(f"Maximale Anzahl zitierter älterer E-Mails im PDF? {PDF_MAX_QUOTED_EMAILS if PDF_MAX_QUOTED_EMAILS is not None else 'alle'}")
+        app_logger.info(f"Maximale Anzahl zitierter älterer E-Mails im PDF? {PDF_MAX_QUOTED_EMAILS if PDF_MAX_QUOTED_EMAILS is not None else 'alle'}")
     print(f"Debug-Mode? {DEBUG_MODE}")
     app_logger.info(f"Debug-Mode? {DEBUG_MODE}")
     print(f"Debug-Datei: {prog_log_file_path}")
     app_logger.info(f"Debug-Datei: {prog_log_file_path}")
+    if DEBUG_LOG_SAMPLE > 1:
+        print(f"Stichprobe der Debug-Log-Datei: jede {DEBUG_LOG_SAMPLE}. MSG-Datei")
+        app_logger.info(f"Stichprobe der Debug-Log-Datei: jede {DEBUG_LOG_SAMPLE}. MSG-Datei")
+    if run_profiler:
+        print(f"Profiling ({run_profiler.mode.value}): {run_profiler.summary_path}")
+        app_logger.info(f"Profiling ({run_profiler.mode.value}): {run_profiler.summary_path}")
     print(f"Excel-Log-Datei: {excel_log_file_path}")
     app_logger.info(f"Excel-Log-Datei: {excel_log_file_path}")
 
@@ -633,11 +1301,29 @@ if __name__ == '__main__':
         { "Konfiguration": "Bei Bedarf in der Tabelle der bekannten Email-Absender?", "Wert": RECURSIVE_SEARCH },
         { "Konfiguration": "Rekursive Suche?", "Wert": USE_KNOWNSENDER_FILE },
         { "Konfiguration": "Pfad zur Datei der bekannten Email-Absender", "Wert": KNOWNSENDER_FILE },
+        { "Konfiguration": "Include-Muster", "Wert": ", ".join(INCLUDE_PATTERNS) },
+        { "Konfiguration": "Exclude-Muster", "Wert": ", ".join(EXCLUDE_PATTERNS) },
+        { "Konfiguration": "Maximale Tiefe", "Wert": MAX_DEPTH if MAX_DEPTH is not None else "unbegrenzt" },
+        { "Konfiguration": "Teil (--shard)", "Wert": f"{SHARD.label} ({SHARD.mode.value})" if SHARD else "" },
+        { "Konfiguration": "Inkrementeller Lauf (--incremental)?", "Wert": INCREMENTAL_MODE },
+        { "Konfiguration": "Kooperativer Betrieb (--cooperative)", "Wert": f"{work_distributor.worker_id} (Lauf '{LEASE_RUN}')" if work_distributor else COOPERATIVE_MODE },
+        { "Konfiguration": "Überwachung (--watch)?", "Wert": f"{WATCH_MODE} ({msg_watcher.active_backend.value})" if msg_watcher else WATCH_MODE },
+        { "Konfiguration": "Prozesse für Einlesen und Dateinamens-Erzeugung (--workers)", "Wert": WORKERS },
+        { "Konfiguration": "Threads für Umbenennen, Löschen und Zeitstempel (--apply_workers)", "Wert": APPLY_WORKERS },
+        { "Konfiguration": "Maximale Dateien in der Verarbeitungskette (--pipeline_queue_size)", "Wert": PIPELINE_QUEUE_SIZE },
+        { "Konfiguration": "Prozesse für die PDF-Erzeugung (--pdf_workers)", "Wert": PDF_WORKERS },
         { "Konfiguration": "Zeitstempel der MSG-Dateien anpassen?", "Wert": SET_FILEDATE },
         { "Konfiguration": "PDF-Dateien erzeugen?", "Wert": GENERATE_PDF },
         { "Konfiguration": "Existierende PDF-Dateien überschreiben?", "Wert": OVERWRITE_PDF },
+        { "Konfiguration": "Nur veraltete PDF-Dateien neu erzeugen (--incremental_pdf)?", "Wert": INCREMENTAL_PDF },
+        { "Konfiguration": "Sammel-PDF-Dateien (--pdf_consolidate)", "Wert": f"{PDF_CONSOLIDATE_MODE.value} (max. {PDF_CONSOLIDATE_MAX_MESSAGES} E-Mails)" },
+        { "Konfiguration": "Maximale Anzahl zitierter älterer E-Mails im PDF (--pdf_max_quoted_emails)", "Wert": PDF_MAX_QUOTED_EMAILS if PDF_MAX_QUOTED_EMAILS is not None else "alle" },
+        { "Konfiguration": "Ausgabe je MSG-Datei auf der Console (--verbose_console_output)?", "Wert": VERBOSE_CONSOLE_OUTPUT },
         { "Konfiguration": "Debug-Mode?", "Wert": DEBUG_MODE },
         { "Konfiguration": "Debug-Datei", "Wert": prog_log_file_path },
+        { "Konfiguration": "Stichprobe der Debug-Log-Datei (--debug_log_sample)", "Wert": f"jede {DEBUG_LOG_SAMPLE}. MSG-Datei (max. {LOG_MAX_FILE_SIZE_MB} MB je Teil)" },
+        { "Konfiguration": "Laufzeitmessung (--performance_timing)?", "Wert": f"{PERFORMANCE_TIMING} (langsamste {PERFORMANCE_TOP_FILES} Dateien)" if PERFORMANCE_TIMING else PERFORMANCE_TIMING },
+        { "Konfiguration": "Profiling (--profile)", "Wert": f"{run_profiler.mode.value} ({run_profiler.file_count} MSG-Dateien, {run_profiler.profile_path})" if run_profiler else PROFILE_MODE.value },
         { "Konfiguration": "Excel-Log-Datei", "Wert": excel_log_file_path }
     ]
     log_entry_neu(excel_log_file_path, entry, sheet_name="Konfiguration")
@@ -664,6 +1350,35 @@ if __name__ == '__main__':
     ]
     log_entry_neu(excel_log_file_path, entry, sheet_name="Zusammenfassung")
 
+    if performance_statistics:
+        performance_summary = performance_statistics.summary()
+        print(f"Laufzeiten: {performance_summary}")
+        app_logger.info(f"Laufzeiten: {performance_summary}")
+
+    if msg_directory_index:
+        print(f"Inkrementeller Lauf: {msg_directory_index.listed_directory_count} Verzeichnisse gelistet, {msg_directory_index.skipped_directory_count} unverändert, "
+              f"{msg_directory_index.skipped_file_count} unveränderte MSG-Dateien übersprungen")
+        app_logger.info(f"Inkrementeller Lauf: {msg_directory_index.listed_directory_count} Verzeichnisse gelistet, {msg_directory_index.skipped_directory_count} unverändert, "
+                        f"{msg_directory_index.skipped_file_count} unveränderte MSG-Dateien übersprungen")
+        entry = [
+            { "Ergebnis": "Inkrementell: gelistete Verzeichnisse", "Wert": msg_directory_index.listed_directory_count },
+            { "Ergebnis": "Inkrementell: unveränderte Verzeichnisse", "Wert": msg_directory_index.skipped_directory_count },
+            { "Ergebnis": "Inkrementell: übersprungene unveränderte MSG-Dateien", "Wert": msg_directory_index.skipped_file_count }
+        ]
+        log_entry_neu(excel_log_file_path, entry, sheet_name="Zusammenfassung")
+
+    if work_distributor:
+        lease_statistics = work_distributor.statistics
+        print(f"Kooperativer Betrieb: {lease_statistics.claimed_count} Verzeichnisse bearbeitet, {lease_statistics.done_by_others_count} von anderen erledigt, "
+              f"{lease_statistics.taken_over_count} nach abgelaufener Lease übernommen")
+        app_logger.info(f"Kooperativer Betrieb: {lease_statistics}")
+        entry = [
+            { "Ergebnis": "Kooperativ: bearbeitete Verzeichnisse", "Wert": lease_statistics.claimed_count },
+            { "Ergebnis": "Kooperativ: von anderen Aufrufen erledigte Verzeichnisse", "Wert": lease_statistics.done_by_others_count },
+            { "Ergebnis": "Kooperativ: übernommene Verzeichnisse (abgelaufene Lease)", "Wert": lease_statistics.taken_over_count }
+        ]
+        log_entry_neu(excel_log_file_path, entry, sheet_name="Zusammenfassung")
+
     if not TEST_RUN:
         print(f"\nErgebnisse der Anpassungen:")
         app_logger.info(f"Ergebnisse der Anpassungen:")
@@ -676,13 +1391,19 @@ if __name__ == '__main__':
         app_logger.info(f"Anzahl gelöschter Doubletten: {msg_file_doublette_deleted_count}")
         print(f"Anzahl nicht gelöschter Doubletten: {msg_file_doublette_deleted_problem_count}")
         app_logger.info(f"Anzahl nicht gelöschter Doubletten: {msg_file_doublette_deleted_problem_count}")
+        print(f"Anzahl zurückgestellter Vorgänge (gesperrte Dateien): {msg_file_deferred_count}")
+        app_logger.info(f"Anzahl zurückgestellter Vorgänge (gesperrte Dateien): {msg_file_deferred_count}")
+        print(f"Anzahl nach Ablauf der Frist aufgegebener Vorgänge: {msg_file_deferred_given_up_count}")
+        app_logger.info(f"Anzahl nach Ablauf der Frist aufgegebener Vorgänge: {msg_file_deferred_given_up_count}")
 
         # Schreibe Zusammenfassung Sheet Teil 2
         entry = [
             { "Ergebnis": "Anzahl der umbenannten Dateien", "Wert": msg_file_renamed_count },
             { "Ergebnis": "Anzahl gefundener Doubletten", "Wert": msg_file_doublette_count },
             { "Ergebnis": "Anzahl gelöschter Doubletten", "Wert": msg_file_doublette_deleted_count },
-            { "Ergebnis": "Anzahl nicht gelöschter Doubletten", "Wert": msg_file_doublette_deleted_problem_count }
+            { "Ergebnis": "Anzahl nicht gelöschter Doubletten", "Wert": msg_file_doublette_deleted_problem_count },
+            { "Ergebnis": "Anzahl zurückgestellter Vorgänge (gesperrte Dateien)", "Wert": msg_file_deferred_count },
+            { "Ergebnis": "Anzahl nach Ablauf der Frist aufgegebener Vorgänge", "Wert": msg_file_deferred_given_up_count }
         ]
         log_entry_neu(excel_log_file_path, entry, sheet_name="Zusammenfassung")
 
@@ -714,7 +1435,32 @@ if __name__ == '__main__':
             ]
             log_entry_neu(excel_log_file_path, entry, sheet_name="Zusammenfassung")
 
-        if GENERATE_PDF:
+        if CONSOLIDATE_PDF:
+            print(f"\nErgebnis der PDF-Erzeugung:")
+            app_logger.info(f"Ergebnis der PDF-Erzeugung:")
+            print(f"****************************")
+            print(f"Anzahl der erzeugten Sammel-PDF-Dateien: {consolidated_pdf_generated}")
+            app_logger.info(f"Anzahl der erzeugten Sammel-PDF-Dateien: {consolidated_pdf_generated}")
+            print(f"Anzahl der E-Mails in Sammel-PDF-Dateien: {consolidated_pdf_message_count}")
+            app_logger.info(f"Anzahl der E-Mails in Sammel-PDF-Dateien: {consolidated_pdf_message_count}")
+            print(f"Anzahl der fehlgeschlagenen Sammel-PDF-Dateien: {consolidated_pdf_failed}")
+            app_logger.info(f"Anzahl der fehlgeschlagenen Sammel-PDF-Dateien: {consolidated_pdf_failed}")
+            print(f"Anzahl der unveränderten Sammel-PDF-Dateien (--watch): {consolidated_pdf_unchanged}")
+            app_logger.info(f"Anzahl der unveränderten Sammel-PDF-Dateien (--watch): {consolidated_pdf_unchanged}")
+            print(f"Anzahl der gelöschten, nicht mehr erzeugten Sammel-PDF-Dateien: {consolidated_pdf_removed}")
+            app_logger.info(f"Anzahl der gelöschten, nicht mehr erzeugten Sammel-PDF-Dateien: {consolidated_pdf_removed}")
+
+            # Schreibe Zusammenfassung Sheet Teil 4
+            entry = [
+                { "Ergebnis": "Anzahl der erzeugten Sammel-PDF-Dateien", "Wert": consolidated_pdf_generated },
+                { "Ergebnis": "Anzahl der E-Mails in Sammel-PDF-Dateien", "Wert": consolidated_pdf_message_count },
+                { "Ergebnis": "Anzahl der fehlgeschlagenen Sammel-PDF-Dateien", "Wert": consolidated_pdf_failed },
+                { "Ergebnis": "Anzahl der unveränderten Sammel-PDF-Dateien (--watch)", "Wert": consolidated_pdf_unchanged },
+                { "Ergebnis": "Anzahl der gelöschten, nicht mehr erzeugten Sammel-PDF-Dateien", "Wert": consolidated_pdf_removed }
+            ]
+            log_entry_neu(excel_log_file_path, entry, sheet_name="Zusammenfassung")
+
+        elif GENERATE_PDF:
             print(f"\nErgebnis der PDF-Erzeugung:")
             app_logger.info(f"Ergebnis der PDF-Erzeugung:")
             print(f"****************************")
@@ -722,11 +1468,16 @@ if __name__ == '__main__':
             app_logger.info(f"Anzahl der erzeugten PDF-Dateien: {pdf_file_generated}")
             print(f"Anzahl der übersprungenen PDF-Dateien: {pdf_file_skipped}")
             app_logger.info(f"Anzahl der übersprungenen PDF-Dateien: {pdf_file_skipped}")
+            if msg_pdf_pool:
+                print(f"Anzahl der fehlgeschlagenen PDF-Dateien: {pdf_file_failed}")
+                app_logger.info(f"Anzahl der fehlgeschlagenen PDF-Dateien: {pdf_file_failed}")
 
             # Schreibe Zusammenfassung Sheet Teil 4
             entry = [
                 { "Ergebnis": "Anzahl der erzeugten PDF-Dateien", "Wert": pdf_file_generated },
                 { "Ergebnis": "Anzahl der übersprungenen PDF-Dateien", "Wert": pdf_file_skipped }
             ]
+            if msg_pdf_pool:
+                entry.append({ "Ergebnis": "Anzahl der fehlgeschlagenen PDF-Dateien", "Wert": pdf_file_failed })
             log_entry_neu(excel_log_file_path, entry, sheet_name="Zusammenfassung")
 
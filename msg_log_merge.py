@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+msg_log_merge.py
+
+Dieses Modul führt die Excel-Log-Dateien mehrerer Aufrufe von msg_file_renamer.py zu einem Bericht zusammen,
+z.B. die Teile eines mit --shard i/N aufgeteilten Laufs.
+
+- "Log" und alle weiteren Tabellen werden untereinander zusammengefügt (Spalte "Quelle" = Name der Log-Datei).
+- "Zusammenfassung": Zahlenwerte mit gleichem "Ergebnis" werden addiert.
+- "Konfiguration": Eine Spalte je Log-Datei.
+
+Kommandozeilenargumente:
+<Dateien>
+    Die zusammenzuführenden Excel-Log-Dateien (alternativ --log_directory und --pattern).
+--log_directory <Verzeichnis>
+    Verzeichnis, in dem die Excel-Log-Dateien gesucht werden.
+--pattern <Muster>
+    Glob-Muster der Excel-Log-Dateien im Verzeichnis (Standard: "excel_log_shard*.xlsx").
+--output <Datei>
+    Pfad der zusammengeführten Excel-Datei (Standard: "excel_log_merged_<Zeitstempel>.xlsx" im Log-Verzeichnis).
+
+Beispielaufruf:
+python msg_log_merge.py -ld "D:/Logs" -o "D:/Logs/bericht.xlsx"
+oder
+python msg_log_merge.py "D:/Logs/excel_log_shard1of2_2025-01-01_22Uhr00_00s.xlsx" "D:/Logs/excel_log_shard2of2_2025-01-01_22Uhr00_01s.xlsx"
+"""
+import argparse
+import glob
+import os
+from datetime import datetime
+
+from utils.excel_handling import merge_excel_log_files
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_log_merge' aktiviert.")
+
+if __name__ == '__main__':
+    # Argumente des Programmaufrufs über die Kommandozeile auswerten
+    parser = argparse.ArgumentParser(description="Excel-Log-Dateien von msg_file_renamer.py zusammenführen")
+    parser.add_argument("files", nargs="*", help="Zusammenzuführende Excel-Log-Dateien")
+    parser.add_argument("-ld", "--log_directory", type=str, default="./", help="Verzeichnis mit den Excel-Log-Dateien (Default='./')")
+    parser.add_argument("-p", "--pattern", type=str, default="excel_log_shard*.xlsx", help="Glob-Muster der Excel-Log-Dateien (Default='excel_log_shard*.xlsx')")
+    parser.add_argument("-o", "--output", type=str, default="", help="Pfad der zusammengeführten Excel-Datei")
+    args = parser.parse_args()
+
+    input_file_paths = args.files or sorted(glob.glob(os.path.join(args.log_directory, args.pattern)))
+    if not input_file_paths:
+        print(f"Keine Excel-Log-Dateien gefunden: '{os.path.join(args.log_directory, args.pattern)}'")
+        app_logger.error(f"Keine Excel-Log-Dateien gefunden: '{os.path.join(args.log_directory, args.pattern)}'")
+        exit(1)
+
+    output_file = args.output or os.path.join(args.log_directory, datetime.now().strftime("excel_log_merged_%Y-%m-%d_%HUhr%M_%Ss.xlsx"))
+
+    print(f"Zusammenführen von {len(input_file_paths)} Excel-Log-Datei(en):")
+    for input_file_path in input_file_paths:
+        print(f"\t{input_file_path}")
+
+    merged_count = merge_excel_log_files(input_file_paths, output_file)
+    print(f"{merged_count} Excel-Log-Datei(en) zusammengeführt in: {output_file}")
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+console_progress.py
+
+Dieses Modul stellt eine einzeilige Fortschrittsanzeige für die Konsole bereit. Statt mehrerer Zeilen je Datei wird eine
+Zeile höchstens alle refresh_interval_seconds überschrieben (Wagenrücklauf "\\r"). Ausgaben auf die Windows-Konsole sind
+langsam; bei vielen kleinen Dateien bremsen sie sonst die Verarbeitung spürbar.
+
+Angezeigt werden: bearbeitete und gefundene Dateien, Dateien pro Sekunde, geschätzte Restzeit (ETA), die vom Aufrufer
+übergebenen Zähler je Ergebnis und das aktuelle Verzeichnis. Solange die Suche noch läuft, ist die Anzahl der gefundenen
+Dateien eine Untergrenze; die Restzeit wird dann als Mindestwert (">") angezeigt.
+
+Ist die Ausgabe keine Konsole (z.B. Umleitung in eine Datei), wird statt der überschriebenen Zeile höchstens alle
+NON_TERMINAL_REFRESH_INTERVAL_SECONDS eine vollständige Zeile ausgegeben.
+
+Funktionen und Klassen:
+- ConsoleProgress: Die Fortschrittsanzeige.
+    - count_discovered(directories): Zählt die gefundenen Dateien der durchlaufenen Verzeichnisse (Generator).
+    - update(directory_path, outcome_counts): Zählt eine bearbeitete Datei und aktualisiert die Anzeige bei Bedarf.
+    - clear(): Löscht die Zeile vor einer anderen Konsolenausgabe.
+    - finish(): Gibt die Zeile abschließend aus.
+
+Verwendung:
+    console_progress = ConsoleProgress()
+    for directory in console_progress.count_discovered(directories):
+        for file in directory.msg_entries:
+            ...
+            console_progress.update(directory.directory_path, {"umbenannt": renamed_count, "Probleme": problem_count})
+    console_progress.finish()
+"""
+import shutil
+import sys
+import time
+from typing import Iterable, Iterator, Optional, TextIO
+
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'console_progress' aktiviert.")
+
+# Standard-Abstand zwischen zwei Aktualisierungen der Zeile in Sekunden
+DEFAULT_REFRESH_INTERVAL_SECONDS = 0.25
+
+# Abstand zwischen zwei Zeilen, wenn die Ausgabe keine Konsole ist
+NON_TERMINAL_REFRESH_INTERVAL_SECONDS = 10.0
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+class ConsoleProgress:
+    """
+    Einzeilige Fortschrittsanzeige mit begrenzter Aktualisierungsrate.
+    """
+
+    def __init__(self, refresh_interval_seconds: float = DEFAULT_REFRESH_INTERVAL_SECONDS, stream: Optional[TextIO] = None):
+        """
+        Parameter:
+        refresh_interval_seconds (float): Mindestabstand zwischen zwei Aktualisierungen der Zeile in Sekunden.
+        stream (TextIO): Ausgabe (Standard: sys.stdout).
+        """
+        self.stream = stream or sys.stdout
+        self.is_terminal = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.refresh_interval_seconds = refresh_interval_seconds if self.is_terminal else max(refresh_interval_seconds, NON_TERMINAL_REFRESH_INTERVAL_SECONDS)
+        self.processed_count = 0
+        self.discovered_count = 0
+        self.is_discovery_complete = False
+        self._start_time = time.monotonic()
+        self._next_refresh_time = self._start_time
+        self._line_length = 0  # Länge der aktuell angezeigten Zeile (0 = keine Zeile angezeigt)
+        self._last_line = ""
+
+    def count_discovered(self, directories: Iterable) -> Iterator:
+        """
+        Reicht die Verzeichnisse (MsgDirectoryListing) unverändert weiter und zählt ihre MSG-Dateien als gefunden.
+        Ist der Generator erschöpft, ist die Suche abgeschlossen und die Restzeit wird genau geschätzt.
+        """
+        for directory in directories:
+            self.discovered_count += len(directory.msg_entries)
+            yield directory
+        self.is_discovery_complete = True
+
+    def update(self, directory_path: str, outcome_counts: dict):
+        """
+        Zählt eine bearbeitete Datei und aktualisiert die Zeile, wenn der Mindestabstand verstrichen ist.
+
+        Parameter:
+        directory_path (str): Aktuelles Verzeichnis.
+        outcome_counts (dict): Zähler je Ergebnis in Anzeigereihenfolge, z.B. {"umbenannt": 10, "Probleme": 1}.
+        """
+        self.processed_count += 1
+        now = time.monotonic()
+        if now >= self._next_refresh_time:
+            self._next_refresh_time = now + self.refresh_interval_seconds
+            self._show(self._format_line(directory_path, outcome_counts, now))
+
+    def clear(self):
+        """
+        Löscht die angezeigte Zeile, damit eine andere Konsolenausgabe nicht dahinter beginnt.
+        Die nächste Aktualisierung zeigt die Zeile wieder an.
+        """
+        if self.is_terminal and self._line_length:
+            self.stream.write("\r" + " " * self._line_length + "\r")
+            self.stream.flush()
+            self._line_length = 0
+        self._next_refresh_time = 0.0
+
+    def finish(self, directory_path: str = "", outcome_counts: Optional[dict] = None):
+        """
+        Gibt die Zeile mit dem Endstand aus und beendet sie mit einem Zeilenumbruch.
+
+        Parameter:
+        directory_path (str): Zuletzt bearbeitetes Verzeichnis.
+        outcome_counts (dict): Zähler je Ergebnis (wie bei update).
+        """
+        if not self.processed_count:
+            return
+        self._show(self._format_line(directory_path, outcome_counts or {}, time.monotonic()))
+        if self.is_terminal:
+            self.stream.write("\n")
+            self.stream.flush()
+        self._line_length = 0
+
+    def _format_line(self, directory_path: str, outcome_counts: dict, now: float) -> str:
+        elapsed_seconds = max(now - self._start_time, 1e-6)
+        files_per_second = self.processed_count / elapsed_seconds
+        total_count = max(self.discovered_count, self.processed_count)
+        parts = [f"{self.processed_count}/{total_count if self.is_discovery_complete else f'{total_count}+'} Dateien",
+                 f"{files_per_second:.1f}/s"]
+        if files_per_second > 0:
+            remaining_seconds = (total_count - self.processed_count) / files_per_second
+            parts.append(f"ETA {'' if self.is_discovery_complete else '>'}{_format_duration(remaining_seconds)}")
+        outcome_text = ", ".join(f"{label} {count}" for label, count in outcome_counts.items() if count)
+        if outcome_text:
+            parts.append(outcome_text)
+        line = " | ".join(parts)
+
+        # Das Verzeichnis am Ende, bei Platzmangel von links gekürzt; in der Konsole höchstens eine Zeile (kein Umbruch)
+        width = (shutil.get_terminal_size().columns - 1) if self.is_terminal else 200
+        if directory_path:
+            available_length = width - len(line) - 3
+            if available_length >= 10:
+                if len(directory_path) > available_length:
+                    directory_path = "..." + directory_path[-(available_length - 3):]
+                line += " | " + directory_path
+        return line[:width] if self.is_terminal else line
+
+    def _show(self, line: str):
+        if self.is_terminal:
+            self.stream.write("\r" + line.ljust(self._line_length))
+            self._line_length = len(line)
+        elif line != self._last_line:
+            self.stream.write(line + "\n")
+        self._last_line = line
+        self.stream.flush()
@@ -10,6 +10,8 @@ einer Liste von MSG-Dateien sowie das Speichern dieser Liste in einer Excel-Date
 Funktionen:
 - create_excel_list(msg_files): Erstellt eine Excel-Liste aus den gefundenen MSG-Dateien.
 - save_excel_file(excel_list, output_file): Speichert die Excel-Liste in einer angegebenen Datei.
+- clean_old_excel_files(directory, max_file_count, name_contains): Entfernt ältere Excel-Log-Dateien.
+- merge_excel_log_files(input_file_paths, output_file): Führt mehrere Excel-Log-Dateien (z.B. aus --shard) zu einem Bericht zusammen.
 """
 import os
 import pandas as pd
@@ -99,3 +101,53 @@ def clean_old_excel_files(directory: str, max_file_count: int, name_contains: st
         app_logger.error(f"Fehler beim Bereinigen der Excel-Logdateien: {e}")
         return 0
     return 0
+
+
+def merge_excel_log_files(input_file_paths, output_file):
+    """
+    Führt mehrere Excel-Log-Dateien von msg_file_renamer.py (z.B. die Teile eines mit --shard aufgeteilten Laufs)
+    zu einem Bericht zusammen.
+
+    - "Log" und alle weiteren Tabellen (z.B. "Wiederholungen") werden untereinander zusammengefügt; die Spalte
+      "Quelle" enthält den Namen der jeweiligen Log-Datei.
+    - "Zusammenfassung": Zahlenwerte mit gleichem "Ergebnis" werden addiert.
+    - "Konfiguration": Eine Spalte je Log-Datei.
+
+    :param input_file_paths: Die Pfade der Excel-Log-Dateien.
+    :param output_file: Der Pfad der zusammengeführten Excel-Datei.
+    :return: Die Anzahl der zusammengeführten Log-Dateien.
+    """
+    sheets = {}  # Tabellenname -> Liste von DataFrames
+    source_count = 0
+
+    for input_file_path in input_file_paths:
+        source_name = os.path.basename(input_file_path)
+        try:
+            with pd.ExcelFile(input_file_path) as xls:
+                for sheet_name in xls.sheet_names:
+                    df = pd.read_excel(xls, sheet_name=sheet_name)
+                    df.insert(0, "Quelle", source_name)
+                    sheets.setdefault(sheet_name, []).append(df)
+            source_count += 1
+        except Exception as e:
+            print(f"Fehler beim Lesen der Excel-Log-Datei '{input_file_path}': {e}")
+            app_logger.error(f"Fehler beim Lesen der Excel-Log-Datei '{input_file_path}': {e}")
+
+    with pd.ExcelWriter(output_file, engine="openpyxl", mode="w") as writer:
+        for sheet_name, data_frames in sheets.items():
+            merged_df = pd.concat(data_frames, ignore_index=True)
+
+            if sheet_name == "Zusammenfassung" and {"Ergebnis", "Wert"}.issubset(merged_df.columns):
+                # Zahlenwerte addieren, Reihenfolge des ersten Auftretens beibehalten
+                numeric_values = pd.to_numeric(merged_df["Wert"], errors="coerce")
+                summary_df = merged_df.assign(Wert=numeric_values).groupby("Ergebnis", sort=False)["Wert"].sum(min_count=1).reset_index()
+                summary_df.insert(1, "Anzahl Quellen", merged_df.groupby("Ergebnis", sort=False)["Quelle"].nunique().values)
+                summary_df.to_excel(writer, sheet_name=sheet_name, index=False)
+            elif sheet_name == "Konfiguration" and {"Konfiguration", "Wert"}.issubset(merged_df.columns):
+                configuration_df = merged_df.pivot_table(index="Konfiguration", columns="Quelle", values="Wert", aggfunc="first", sort=False)
+                configuration_df.to_excel(writer, sheet_name=sheet_name)
+            else:
+                merged_df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+    app_logger.info(f"{source_count} Excel-Log-Datei(en) zusammengeführt in '{output_file}'.")
+    return source_count
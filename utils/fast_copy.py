@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+fast_copy.py
+
+Dieses Modul enthält eine schnelle Kopier- und Lösch-Engine für große Verzeichnisbäume,
+z.B. zum Zurücksetzen des Testverzeichnisses mit --init_testdata.
+
+Statt Datei für Datei sequentiell mit shutil.copy2/copytree zu arbeiten, werden die einzelnen Dateien
+über einen Thread-Pool parallel kopiert bzw. gelöscht. Beim Kopieren werden, soweit das Dateisystem
+es unterstützt, schnellere Verfahren verwendet:
+- CopyMode.COPY: Kopie der Daten; unter Linux über os.copy_file_range (Kopie im Kernel, auf Btrfs/XFS
+  ggf. automatisch als Reflink), sonst über shutil.copyfile.
+- CopyMode.REFLINK: Copy-on-Write-Klon der Datei (Linux: ioctl FICLONE). Ist das nicht möglich
+  (z.B. NTFS oder anderes Dateisystem), wird automatisch normal kopiert.
+- CopyMode.HARDLINK: Hardlink-Snapshot, es werden keine Daten kopiert. Achtung: Quelle und Ziel teilen sich
+  die Datei. Umbenennen und Löschen im Ziel sind unkritisch, Änderungen an Zeitstempeln (--set_filedate)
+  wirken sich aber auch auf die Quelle aus. Ist kein Hardlink möglich (z.B. anderes Laufwerk), wird kopiert.
+
+Symbolische Links und NTFS-Junctions werden nicht verfolgt: Beim Kopieren wird der Link mit demselben Ziel neu
+angelegt (ist das nicht möglich, z.B. ohne Berechtigung für symbolische Links unter Windows, wird er mit einer Warnung
+übersprungen), beim Löschen wird nur der Link selbst entfernt, nie der Inhalt seines Ziels.
+
+Funktionen und Klassen:
+- CopyMode: Enum mit den verfügbaren Kopierverfahren.
+- CopyStatistics: Datenklasse mit der Statistik eines Kopier- bzw. Löschvorgangs.
+- parallel_copy_directory_contents(source_directory_path, target_directory_path, copy_mode, max_workers): Kopiert den Inhalt eines Verzeichnisses parallel.
+- parallel_delete_directory_contents(directory_path, max_workers): Löscht den Inhalt eines Verzeichnisses parallel.
+"""
+import os
+import shutil
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'fast_copy' aktiviert.")
+
+# ioctl-Code für FICLONE unter Linux (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+# Standardanzahl paralleler Threads (I/O-gebunden, daher mehr Threads als CPU-Kerne)
+DEFAULT_COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+class CopyMode(Enum):
+    COPY = "copy"
+    REFLINK = "reflink"
+    HARDLINK = "hardlink"
+
+
+@dataclass
+class CopyStatistics:
+    """
+    CopyStatistics
+
+    Diese Datenklasse enthält die Statistik eines parallelen Kopier- bzw. Löschvorgangs.
+
+    Attribute:
+    - file_count: Anzahl der bearbeiteten Dateien.
+    - directory_count: Anzahl der bearbeiteten Verzeichnisse.
+    - byte_count: Anzahl der kopierten Bytes (bei Hardlinks und Reflinks die logische Dateigröße).
+    - reflinked_count: Anzahl der als Reflink geklonten Dateien.
+    - hardlinked_count: Anzahl der als Hardlink angelegten Dateien.
+    - copied_count: Anzahl der tatsächlich kopierten Dateien.
+    - link_count: Anzahl der neu angelegten bzw. entfernten symbolischen Links und Junctions.
+    """
+    file_count: int = 0
+    directory_count: int = 0
+    byte_count: int = 0
+    reflinked_count: int = 0
+    hardlinked_count: int = 0
+    copied_count: int = 0
+    link_count: int = 0
+
+
+def _is_link(entry: os.DirEntry) -> bool:
+    """
+    Prüft, ob ein Verzeichniseintrag ein symbolischer Link oder eine NTFS-Junction ist. Junctions gelten vor Python 3.12
+    nicht als Link (is_symlink() False, is_dir(follow_symlinks=False) True) und werden über das Reparse-Point-Attribut erkannt.
+    """
+    if entry.is_symlink():
+        return True
+    if hasattr(os.path, "isjunction"):
+        return os.path.isjunction(entry.path)
+    try:
+        file_attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+    except OSError:
+        return False
+    return bool(file_attributes & getattr(stat, "FILE_ATTRIBUTE_REPARSE_POINT", 0))
+
+
+def _copy_link(source_link_path: str, target_link_path: str) -> bool:
+    """
+    Legt einen symbolischen Link bzw. eine Junction mit demselben Ziel neu an (als symbolischer Link).
+
+    Rückgabewert:
+    bool: True, wenn der Link angelegt wurde, sonst False (Warnung im Log).
+    """
+    try:
+        link_target = os.readlink(source_link_path)
+        os.symlink(link_target, target_link_path, target_is_directory=os.path.isdir(source_link_path))
+        return True
+    except OSError as e:
+        app_logger.warning(f"Link kann nicht kopiert werden und wird übersprungen: '{source_link_path}' ({e})")
+        return False
+
+
+def _remove_link(link_path: str):
+    """
+    Entfernt einen symbolischen Link bzw. eine Junction selbst, ohne den Inhalt des Ziels zu berühren.
+    """
+    try:
+        os.unlink(link_path)
+    except OSError:
+        os.rmdir(link_path)  # Unter Windows: Verzeichnis-Link bzw. Junction
+
+
+def _try_reflink(source_file_path: str, target_file_path: str) -> bool:
+    """
+    Versucht, die Zieldatei als Copy-on-Write-Klon (Reflink) der Quelldatei anzulegen.
+
+    Rückgabewert:
+    bool: True, wenn der Reflink angelegt wurde, sonst False (die Zieldatei existiert dann nicht).
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False  # z.B. unter Windows
+
+    try:
+        with open(source_file_path, "rb") as source_file, open(target_file_path, "wb") as target_file:
+            fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+        return True
+    except OSError:
+        try:
+            os.remove(target_file_path)
+        except OSError:
+            pass
+        return False
+
+
+def _copy_file_data(source_file_path: str, target_file_path: str, file_size: int):
+    """
+    Kopiert die Daten einer Datei, unter Linux im Kernel über os.copy_file_range, sonst über shutil.copyfile.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(source_file_path, "rb") as source_file, open(target_file_path, "wb") as target_file:
+                remaining = file_size
+                while remaining > 0:
+                    copied = os.copy_file_range(source_file.fileno(), target_file.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining <= 0:
+                return
+        except OSError:
+            pass  # z.B. Dateisystem ohne Unterstützung, dann klassisch kopieren
+
+    shutil.copyfile(source_file_path, target_file_path)
+
+
+def _copy_single_file(source_file_path: str, target_file_path: str, file_size: int, copy_mode: CopyMode) -> str:
+    """
+    Kopiert eine einzelne Datei mit dem gewünschten Verfahren und fällt bei Bedarf auf eine normale Kopie zurück.
+
+    Rückgabewert:
+    str: Das tatsächlich verwendete Verfahren ("hardlink", "reflink" oder "copy").
+    """
+    if copy_mode == CopyMode.HARDLINK:
+        try:
+            os.link(source_file_path, target_file_path)
+            return "hardlink"
+        except OSError as e:
+            app_logger.debug(f"Hardlink nicht möglich, Datei wird kopiert: '{source_file_path}' ({e})")
+
+    if copy_mode == CopyMode.REFLINK:
+        if _try_reflink(source_file_path, target_file_path):
+            shutil.copystat(source_file_path, target_file_path)
+            return "reflink"
+
+    _copy_file_data(source_file_path, target_file_path, file_size)
+    shutil.copystat(source_file_path, target_file_path)  # Zeitstempel und Attribute wie shutil.copy2
+    return "copy"
+
+
+def parallel_copy_directory_contents(source_directory_path, target_directory_path, copy_mode: CopyMode = CopyMode.COPY,
+                                     max_workers: int = DEFAULT_COPY_WORKERS) -> CopyStatistics:
+    """
+    Kopiert den gesamten Inhalt des Quellverzeichnisses parallel in das Zielverzeichnis.
+
+    Die Verzeichnisstruktur wird beim Durchlaufen sofort angelegt, die Dateien werden über einen
+    Thread-Pool mit max_workers Threads parallel kopiert.
+
+    Parameter:
+    source_directory_path (str): Der Pfad des Quellverzeichnisses.
+    target_directory_path (str): Der Pfad des Zielverzeichnisses.
+    copy_mode (CopyMode): Das Kopierverfahren (Standard: CopyMode.COPY).
+    max_workers (int): Anzahl paralleler Threads.
+
+    Rückgabewert:
+    CopyStatistics: Statistik des Kopiervorgangs.
+
+    Wirft:
+    OSError: Wenn das Kopieren des Inhalts nicht erfolgreich ist.
+    """
+    if not os.path.isdir(source_directory_path):
+        raise OSError(f"{source_directory_path} ist kein gültiges Quellverzeichnis.")
+
+    os.makedirs(target_directory_path, exist_ok=True)  # Erstellt das Zielverzeichnis, falls es nicht existiert
+
+    statistics = CopyStatistics()
+    statistics_lock = threading.Lock()
+
+    def copy_task(source_file_path, target_file_path, file_size):
+        used_method = _copy_single_file(source_file_path, target_file_path, file_size, copy_mode)
+        with statistics_lock:
+            statistics.file_count += 1
+            statistics.byte_count += file_size
+            if used_method == "hardlink":
+                statistics.hardlinked_count += 1
+            elif used_method == "reflink":
+                statistics.reflinked_count += 1
+            else:
+                statistics.copied_count += 1
+
+    def link_task(source_link_path, target_link_path):
+        if _copy_link(source_link_path, target_link_path):
+            with statistics_lock:
+                statistics.link_count += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = []
+            pending_directories = [(source_directory_path, target_directory_path)]
+            copied_directories = []
+
+            while pending_directories:
+                current_source, current_target = pending_directories.pop()
+                copied_directories.append((current_source, current_target))
+                with os.scandir(current_source) as entries:
+                    for entry in entries:
+                        target_path = os.path.join(current_target, entry.name)
+                        if _is_link(entry):
+                            # Link neu anlegen, nicht verfolgen (Ziel außerhalb des Baums oder Schleife)
+                            futures.append(executor.submit(link_task, entry.path, target_path))
+                        elif entry.is_dir(follow_symlinks=False):
+                            os.makedirs(target_path, exist_ok=True)
+                            statistics.directory_count += 1
+                            pending_directories.append((entry.path, target_path))
+                        else:
+                            file_size = entry.stat().st_size
+                            futures.append(executor.submit(copy_task, entry.path, target_path, file_size))
+
+            # Auf alle Kopieraufträge warten und den ersten Fehler weiterreichen
+            for future in futures:
+                future.result()
+
+        # Zeitstempel der Verzeichnisse erst am Ende übernehmen, da das Anlegen der Dateien sie verändert
+        for current_source, current_target in copied_directories:
+            shutil.copystat(current_source, current_target)
+
+        app_logger.info(f"Paralleles Kopieren abgeschlossen: {statistics}")
+        return statistics
+    except Exception as e:
+        raise OSError(f"Fehler beim Kopieren des Inhalts: {e}")
+
+
+def parallel_delete_directory_contents(directory_path, max_workers: int = DEFAULT_COPY_WORKERS) -> CopyStatistics:
+    """
+    Löscht den gesamten Inhalt des angegebenen Verzeichnisses parallel.
+
+    Zuerst werden alle Dateien über einen Thread-Pool parallel gelöscht, danach die nun leeren
+    Unterverzeichnisse von unten nach oben entfernt. Das Verzeichnis selbst bleibt erhalten.
+    Symbolische Links und Junctions werden selbst entfernt, ihr Ziel wird nicht durchlaufen.
+
+    Parameter:
+    directory_path (str): Der Pfad des Verzeichnisses, dessen Inhalt gelöscht werden soll.
+    max_workers (int): Anzahl paralleler Threads.
+
+    Rückgabewert:
+    CopyStatistics: Anzahl der gelöschten Dateien und Verzeichnisse.
+
+    Wirft:
+    OSError: Wenn das Löschen des Inhalts nicht erfolgreich ist.
+    """
+    if not os.path.isdir(directory_path):
+        raise OSError(f"{directory_path} ist kein gültiges Verzeichnis.")
+
+    statistics = CopyStatistics()
+
+    try:
+        subdirectories = []
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = []
+            link_futures = []
+            pending_directories = [directory_path]
+
+            while pending_directories:
+                current_directory = pending_directories.pop()
+                with os.scandir(current_directory) as entries:
+                    for entry in entries:
+                        if _is_link(entry):
+                            link_futures.append(executor.submit(_remove_link, entry.path))
+                        elif entry.is_dir(follow_symlinks=False):
+                            subdirectories.append(entry.path)
+                            pending_directories.append(entry.path)
+                        else:
+                            futures.append(executor.submit(os.remove, entry.path))
+
+            for future in futures + link_futures:
+                future.result()
+            statistics.file_count = len(futures)
+            statistics.link_count = len(link_futures)
+
+        # Leere Verzeichnisse von unten nach oben entfernen (tiefste Pfade zuerst)
+        for subdirectory in sorted(subdirectories, key=len, reverse=True):
+            os.rmdir(subdirectory)
+        statistics.directory_count = len(subdirectories)
+
+        app_logger.info(f"Paralleles Löschen abgeschlossen: {statistics}")
+        return statistics
+    except Exception as e:
+        raise OSError(f"Fehler beim Löschen des Inhalts: {e}")
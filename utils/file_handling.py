@@ -10,9 +10,9 @@ Zusätzlich ermöglicht es das Setzen von Erstellungs- und Änderungsdaten für
 Funktionen:
 - copy_directory_contents(source_directory_path, target_directory_path): Kopiert den gesamten Inhalt eines Quellverzeichnisses in ein Zielverzeichnis.
 - delete_directory_contents(directory_path): Löscht den gesamten Inhalt eines angegebenen Verzeichnisses.
-- delete_file(file_path: str, retries=1, delay_ms=200) -> FileOperationResult: Löscht eine Datei und gibt den Status zurück.
+- delete_file(file_path: str) -> FileOperationResult: Löscht eine Datei (ohne blockierende Wiederholung) und gibt den Status zurück.
 - format_datetime_stamp(datetime_stamp, format_string): Formatiert einen Zeitstempel in das angegebene Format.
-- rename_file(current_name: str, new_name: str, retries=1, delay_ms=200) -> FileOperationResult: Benennt eine Datei um und gibt den Status zurück.
+- rename_file(current_name: str, new_name: str) -> FileOperationResult: Benennt eine Datei um (ohne blockierende Wiederholung) und gibt den Status zurück.
 - sanitize_filename(filename: str) -> str: Ersetzt ungültige Zeichen durch Unterstriche.
 - set_file_creation_date(file_path: str, new_creation_date: str) -> FileOperationResult: Setzt das Erstelldatum einer Datei auf einen vorgegebenen Wert und gibt den Status zurück.
 - set_file_modification_date(file_path: str, new_date: str) -> FileOperationResult: Setzt das Änderungsdatum einer Datei auf einen vorgegebenen Wert und gibt den Status zurück.
@@ -126,7 +126,7 @@ def test_file_access(file_path: str) -> list[FileAccessStatus]:
     try:
         # Prüfen, ob die Datei existiert
         if not os.path.exists(file_path):
-            app_logger.warning(f"Datei nicht gefunden: {file_path}")
+            app_logger.warning("Datei nicht gefunden: %s", file_path)
             return [FileAccessStatus.NOT_FOUND]
 
         # Prüfen, ob die Datei gesperrt ist (Windows-typisch)
@@ -134,7 +134,7 @@ def test_file_access(file_path: str) -> list[FileAccessStatus]:
             with open(file_path, "a"):  # Testweise öffnen zum Schreiben
                 pass
         except PermissionError:
-            app_logger.warning(f"Datei ist gesperrt oder nicht schreibbar: {file_path}")
+            app_logger.warning("Datei ist gesperrt oder nicht schreibbar: %s", file_path)
             access_status.append(FileAccessStatus.LOCKED)
 
         # Prüfen, welche Berechtigungen vorliegen
@@ -149,7 +149,7 @@ def test_file_access(file_path: str) -> list[FileAccessStatus]:
 
         # Falls keine der Berechtigungen vorhanden ist
         if not access_status:
-            app_logger.warning(f"Kein Zugriff auf Datei: {file_path}")
+            app_logger.warning("Kein Zugriff auf Datei: %s", file_path)
             access_status.append(FileAccessStatus.NO_PERMISSION)
 
         return access_status
@@ -163,23 +163,22 @@ def test_file_access(file_path: str) -> list[FileAccessStatus]:
         return [FileAccessStatus.UNKNOWN_ERROR]
 
 
-def rename_file(current_name: str, new_name: str, retries=3, delay_ms=200, max_console_output=False) -> FileOperationResult:
+def rename_file(current_name: str, new_name: str, max_console_output=False) -> FileOperationResult:
     """
     Benennt eine Datei um und prüft die erfolgreiche Umbenennung.
-    Neue verbesserte Version
+
+    Es wird nicht mehr blockierend gewartet und erneut versucht. Ist die Datei z.B. durch Outlook oder
+    einen Virenscanner gesperrt, wird sofort PERMISSION_DENIED zurückgegeben. Der Aufrufer kann die
+    Umbenennung dann in eine DeferredRetryQueue (utils.retry_queue) zurückstellen.
 
     Parameter:
     current_name (str): Der aktuelle Dateiname.
     new_name (str): Der neue Dateiname.
-    retries (int): Anzahl der Wiederholungen bei Misserfolg (Standard: 3).
-    delay_ms (int): Millisekunden zwischen den Wiederholungen (Standard: 200).
+    max_console_output (bool): Ausführliche Ausgabe auf der Console.
 
     Rückgabewert:
-    RenameResult: Enum-Wert, der den Erfolg oder Fehler beschreibt.
+    FileOperationResult: Enum-Wert, der den Erfolg oder Fehler beschreibt.
     """
-    attempt = 0
-    rename_file_result = None  # Variable für den Rückgabewert
-
     try:
         if max_console_output: print(f"Prüfe: {os.path.exists(current_name)}")
     except FileNotFoundError as e:
@@ -188,95 +187,76 @@ def rename_file(current_name: str, new_name: str, retries=3, delay_ms=200, max_c
     except Exception as e:
         if max_console_output: print("Allgemeiner Fehler:", e)
 
-    while attempt < retries:
-        try:
-            app_logger.debug(f"Aktueller Dateiname: {current_name}")  # Debugging-Ausgabe: Log-File
-            app_logger.debug(f"Neuer Dateiname: {new_name}")  # Debugging-Ausgabe: Log-File
-            #os.rename(current_name, new_name)
-            shutil.move(current_name, new_name)
-            rename_file_result = FileOperationResult.SUCCESS  # Erfolgreiche Umbenennung
-            break
-        except FileNotFoundError:
-            if max_console_output: print(f"Datei nicht gefunden: {current_name}")  # Debugging-Ausgabe: Console
-            app_logger.error(f"Datei nicht gefunden: {current_name}")  # Debugging-Ausgabe: Log-File
-            rename_file_result = FileOperationResult.FILE_NOT_FOUND  # Datei nicht gefunden
-        except PermissionError:
-            if max_console_output: print(f"Berechtigungsfehler bei Zugriff auf Datei: {current_name}")  # Debugging-Ausgabe: Console
-            app_logger.error(f"Berechtigungsfehler bei Zugriff auf Datei: {current_name}")  # Debugging-Ausgabe: Log-File
-            rename_file_result = FileOperationResult.PERMISSION_DENIED  # Berechtigungsfehler
-        except FileExistsError:
-            if max_console_output: print(f"Zieldatei existiert bereits: {new_name}")  # Debugging-Ausgabe: Console
-            app_logger.error(f"Zieldatei existiert bereits: {new_name}")  # Debugging-Ausgabe: Log-File
-            return FileOperationResult.DESTINATION_EXISTS
-        except IsADirectoryError:
-            if max_console_output: print(f"Kann nicht umbenennen, da die Quelle eine Datei und das Ziel ein Verzeichnis ist.")  # Debugging-Ausgabe: Console
-            app_logger.error(f"Kann nicht umbenennen, da die Quelle eine Datei und das Ziel ein Verzeichnis ist.")  # Debugging-Ausgabe: Log-File
-            return FileOperationResult.INVALID_FILENAME1
-        except NotADirectoryError:
-            if max_console_output: print(f"Ein Teil des Pfades ist kein Verzeichnis: {current_name} oder {new_name}")  # Debugging-Ausgabe: Console
-            app_logger.error(f"Ein Teil des Pfades ist kein Verzeichnis: {current_name} oder {new_name}")  # Debugging-Ausgabe: Log-File
-            return FileOperationResult.INVALID_FILENAME2
-        except Exception as e:
-            rename_file_result = FileOperationResult.UNKNOWN_ERROR  # Unbekannter Fehler
-            app_logger.error(f"Fehler bei Umbenennung: {str(e)}")  # Debugging-Ausgabe: Log-File
-
-        attempt += 1
-        time.sleep(delay_ms / 1000)  # Wartezeit in Sekunden
-
-    return rename_file_result
-
-
-def delete_file(file_path: str, retries=1, delay_ms=200) -> FileOperationResult:
+    try:
+        app_logger.debug("Aktueller Dateiname: %s", current_name)  # Debugging-Ausgabe: Log-File
+        app_logger.debug("Neuer Dateiname: %s", new_name)  # Debugging-Ausgabe: Log-File
+        #os.rename(current_name, new_name)
+        shutil.move(current_name, new_name)
+        return FileOperationResult.SUCCESS  # Erfolgreiche Umbenennung
+    except FileNotFoundError:
+        if max_console_output: print(f"Datei nicht gefunden: {current_name}")  # Debugging-Ausgabe: Console
+        app_logger.error(f"Datei nicht gefunden: {current_name}")  # Debugging-Ausgabe: Log-File
+        return FileOperationResult.FILE_NOT_FOUND  # Datei nicht gefunden
+    except PermissionError:
+        if max_console_output: print(f"Berechtigungsfehler bei Zugriff auf Datei: {current_name}")  # Debugging-Ausgabe: Console
+        app_logger.warning("Berechtigungsfehler bei Zugriff auf Datei (evtl. gesperrt): %s", current_name)  # Debugging-Ausgabe: Log-File
+        return FileOperationResult.PERMISSION_DENIED  # Berechtigungsfehler bzw. Datei gesperrt
+    except FileExistsError:
+        if max_console_output: print(f"Zieldatei existiert bereits: {new_name}")  # Debugging-Ausgabe: Console
+        app_logger.error(f"Zieldatei existiert bereits: {new_name}")  # Debugging-Ausgabe: Log-File
+        return FileOperationResult.DESTINATION_EXISTS
+    except IsADirectoryError:
+        if max_console_output: print(f"Kann nicht umbenennen, da die Quelle eine Datei und das Ziel ein Verzeichnis ist.")  # Debugging-Ausgabe: Console
+        app_logger.error(f"Kann nicht umbenennen, da die Quelle eine Datei und das Ziel ein Verzeichnis ist.")  # Debugging-Ausgabe: Log-File
+        return FileOperationResult.INVALID_FILENAME1
+    except NotADirectoryError:
+        if max_console_output: print(f"Ein Teil des Pfades ist kein Verzeichnis: {current_name} oder {new_name}")  # Debugging-Ausgabe: Console
+        app_logger.error(f"Ein Teil des Pfades ist kein Verzeichnis: {current_name} oder {new_name}")  # Debugging-Ausgabe: Log-File
+        return FileOperationResult.INVALID_FILENAME2
+    except Exception as e:
+        app_logger.error(f"Fehler bei Umbenennung: {str(e)}")  # Debugging-Ausgabe: Log-File
+        return FileOperationResult.UNKNOWN_ERROR  # Unbekannter Fehler
+
+
+def delete_file(file_path: str) -> FileOperationResult:
     """
     Löscht eine Datei und prüft die erfolgreiche Löschung.
 
-    Diese Funktion versucht, die angegebene Datei zu löschen.
-    Bei einem Misserfolg wird die Löschung nach einer konfigurierbaren Anzahl von Versuchen wiederholt.
-    Der Benutzer kann auch eine Verzögerung zwischen den Versuchen angeben.
+    Diese Funktion versucht genau einmal, die angegebene Datei zu löschen. Ist die Datei gesperrt,
+    wird sofort PERMISSION_DENIED zurückgegeben, damit der Aufrufer den Löschversuch in eine
+    DeferredRetryQueue (utils.retry_queue) zurückstellen kann, statt die Verarbeitung zu blockieren.
 
     Parameter:
     file_path (str): Der Pfad zur Datei, die gelöscht werden soll.
-    retries (int): Die Anzahl der Wiederholungen bei Misserfolg (Standard: 1).
-    delay_ms (int): Millisekunden zwischen den Wiederholungen (Standard: 200).
 
     Rückgabewert:
     FileOperationResult: Ein Enum-Wert, der den Erfolg oder Fehler beschreibt.
 
     Beispiel:
-        result = delete_file2('example.txt')
+        result = delete_file('example.txt')
         if result == FileOperationResult.SUCCESS:
             print("Datei erfolgreich gelöscht.")
     """
-    attempt = 0  # Zähler für die Anzahl der Versuche
-    last_error = None  # Variable für den letzten Fehler
-
-    while attempt < retries:
-        try:
-            os.remove(file_path)  # Versuche, die Datei zu löschen
+    try:
+        os.remove(file_path)  # Versuche, die Datei zu löschen
 
-            # Überprüfen, ob die Datei tatsächlich gelöscht wurde
-            if not os.path.exists(file_path):
-                return FileOperationResult.SUCCESS  # Erfolgreich gelöscht
+        # Überprüfen, ob die Datei tatsächlich gelöscht wurde
+        if not os.path.exists(file_path):
+            return FileOperationResult.SUCCESS  # Erfolgreich gelöscht
 
-        except FileNotFoundError:
-            last_error = f"Die Datei '{file_path}' wurde nicht gefunden."  # Fehlerbeschreibung
-            break  # Beende die Schleife, da die Datei nicht existiert
-        except PermissionError:
-            last_error = f"Keine Berechtigung, um die Datei '{file_path}' zu löschen."  # Fehlerbeschreibung
-            break  # Beende die Schleife, da keine Berechtigung besteht
-        except Exception as e:
-            last_error = str(e)  # Speichere den Fehler
-            attempt += 1  # Erhöhe den Versuchszähler
-            time.sleep(delay_ms / 1000)  # Wartezeit in Sekunden
-
-    # Rückgabe im Falle von Misserfolg nach allen Versuchen
-    if last_error:
-        app_logger.error(f"Datei '{file_path}' konnte nicht gelöscht werden: {last_error}")  # Protokolliere den letzten Fehler
-        return FileOperationResult.UNKNOWN_ERROR  # Unbekannter Fehler
-    else:
         app_logger.error(f"Datei '{file_path}' konnte nicht gelöscht werden.")
         return FileOperationResult.UNKNOWN_ERROR  # Rückgabe, wenn die Datei nicht gelöscht werden konnte
 
+    except FileNotFoundError:
+        app_logger.error(f"Die Datei '{file_path}' wurde nicht gefunden.")
+        return FileOperationResult.FILE_NOT_FOUND
+    except PermissionError:
+        app_logger.warning("Keine Berechtigung, um die Datei '%s' zu löschen (evtl. gesperrt).", file_path)
+        return FileOperationResult.PERMISSION_DENIED
+    except Exception as e:
+        app_logger.error(f"Datei '{file_path}' konnte nicht gelöscht werden: {str(e)}")  # Protokolliere den Fehler
+        return FileOperationResult.UNKNOWN_ERROR  # Unbekannter Fehler
+
 
 def sanitize_filename(filename: str) ->str:
     """
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+keyed_executor.py
+
+Dieses Modul stellt einen Thread-Pool bereit, der unabhängige Dateioperationen gleichzeitig ausführt, Operationen auf
+denselben Dateinamen aber in der Reihenfolge der Übergabe nacheinander.
+
+Auf Netzlaufwerken bestehen Umbenennen, Löschen und das Setzen von Zeitstempeln fast nur aus Wartezeit auf den Server
+(SMB-Round-Trips). Werden mehrere solche Operationen gleichzeitig ausgeführt, überlappen sich die Wartezeiten.
+Damit sich die Ergebnisse dadurch nicht ändern, erhält jede Operation Schlüssel (z.B. alter und neuer Dateiname).
+Eine Operation beginnt erst, wenn alle vorher übergebenen Operationen mit einem gemeinsamen Schlüssel beendet sind.
+
+Funktionen und Klassen:
+- operation_key(path): Schlüssel eines Dateipfads (ohne Unterschied der Groß-/Kleinschreibung unter Windows).
+- KeyedThreadPoolExecutor: Thread-Pool mit Reihenfolge je Schlüssel.
+    - submit(keys, fn, *args, **kwargs): Übergibt eine Operation und liefert ein Future.
+    - shutdown(): Wartet auf alle Operationen und beendet den Pool.
+
+Verwendung:
+    executor = KeyedThreadPoolExecutor(max_workers=8)
+    future = executor.submit({operation_key(old_name), operation_key(new_name)}, rename_file, old_name, new_name)
+    ...
+    result = future.result()
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable
+
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'keyed_executor' aktiviert.")
+
+
+def operation_key(path: str) -> str:
+    """
+    Liefert den Schlüssel eines Dateipfads für KeyedThreadPoolExecutor.
+
+    Parameter:
+    path (str): Dateipfad.
+
+    Rückgabewert:
+    str: Normalisierter Pfad (unter Windows ohne Unterschied der Groß-/Kleinschreibung).
+    """
+    return os.path.normcase(os.path.normpath(path))
+
+
+class KeyedThreadPoolExecutor:
+    """
+    Thread-Pool, der Operationen mit gemeinsamen Schlüsseln in der Reihenfolge der Übergabe ausführt.
+    Mit max_workers < 2 werden die Operationen sofort im aufrufenden Thread ausgeführt.
+    """
+
+    def __init__(self, max_workers: int):
+        """
+        Parameter:
+        max_workers (int): Anzahl der Threads (0 oder 1 = ohne Thread-Pool).
+        """
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="msg_apply") if max_workers > 1 else None
+        self._last_future_by_key: dict[str, Future] = {}
+        self._lock = threading.RLock()  # add_done_callback ruft bei bereits beendeten Futures sofort auf
+
+    def submit(self, keys: Iterable[str], fn: Callable, *args, **kwargs) -> Future:
+        """
+        Übergibt eine Operation. Sie beginnt, sobald alle vorher übergebenen Operationen mit einem der Schlüssel beendet sind.
+
+        Parameter:
+        keys (Iterable[str]): Schlüssel der Operation (z.B. operation_key(alter_name), operation_key(neuer_name)).
+        fn (Callable): Auszuführende Funktion.
+        *args, **kwargs: Argumente für fn.
+
+        Rückgabewert:
+        Future: Ergebnis der Operation.
+        """
+        if self._executor is None:
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+
+        with self._lock:
+            keys = set(keys)
+            predecessors = {self._last_future_by_key[key] for key in keys if key in self._last_future_by_key}
+            # Der Thread-Pool arbeitet die Aufträge in Übergabereihenfolge ab; alle Vorgänger laufen also bereits
+            # oder sind beendet, das Warten im Thread kann nicht zu einer Verklemmung führen.
+            future = self._executor.submit(self._run_after, predecessors, fn, args, kwargs)
+            for key in keys:
+                self._last_future_by_key[key] = future
+            future.add_done_callback(lambda done_future, done_keys=keys: self._forget(done_keys, done_future))
+        return future
+
+    def shutdown(self):
+        """
+        Wartet auf alle übergebenen Operationen und beendet den Thread-Pool.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    @staticmethod
+    def _run_after(predecessors: set, fn: Callable, args: tuple, kwargs: dict):
+        wait(predecessors)
+        return fn(*args, **kwargs)
+
+    def _forget(self, keys: set, done_future: Future):
+        """
+        Entfernt die Schlüssel einer beendeten Operation, sofern keine spätere Operation sie übernommen hat.
+        """
+        with self._lock:
+            for key in keys:
+                if self._last_future_by_key.get(key) is done_future:
+                    del self._last_future_by_key[key]
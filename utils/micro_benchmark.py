@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+micro_benchmark.py
+
+Dieses Modul misst die Laufzeit einzelner Funktionen (Micro-Benchmarks) und vergleicht sie mit gespeicherten
+Vergleichswerten (Baseline), ähnlich wie pytest-benchmark, aber ohne zusätzliche Pakete (msg_benchmark.py).
+
+Messung:
+- Kalibrierung: Ohne setup wird eine Funktion je Runde so oft aufgerufen, dass eine Runde mindestens
+  MIN_ROUND_SECONDS dauert (Auflösung der Uhr bei sehr schnellen Funktionen). Mit setup (z.B. frische Kopie einer
+  Datei je Aufruf) wird je Runde genau ein Aufruf gemessen; setup zählt nicht zur Laufzeit.
+- Nach einer Aufwärmrunde werden Runden gemessen, bis min_rounds erreicht und max_time_seconds verstrichen sind
+  (höchstens max_rounds).
+- Statistik je Aufruf: Minimum, Maximum, Mittelwert, Median, Standardabweichung und Aufrufe pro Sekunde.
+
+Vergleich:
+- Die Ergebnisse werden als JSON gespeichert (Aufbau wie bei pytest-benchmark: "machine_info", "datetime",
+  "benchmarks" mit "name", "group" und "stats").
+- Je Benchmark wird ein Kennwert (Standard: Median) mit der Baseline verglichen. Ist er um mehr als die Schwelle
+  (Prozent) schlechter, gilt der Benchmark als verschlechtert. Eine Schwelle je Benchmark in der Baseline
+  ("options": {"threshold_percent": ...}) hat Vorrang vor der allgemeinen Schwelle.
+
+Funktionen und Klassen:
+- BenchmarkCase: Datenklasse mit Name, Funktion, Argumenten und optionalem setup.
+- BenchmarkResult: Datenklasse mit der Statistik eines Benchmarks.
+- BenchmarkStatus: Enum mit dem Ergebnis des Vergleichs (ok, regression, improvement, new).
+- BenchmarkComparison: Datenklasse mit dem Vergleich eines Benchmarks mit der Baseline.
+- run_benchmark(case, min_rounds, max_rounds, max_time_seconds): Misst einen Benchmark.
+- save_benchmark_results(path, results): Speichert die Ergebnisse als JSON.
+- load_benchmark_results(path): Liest gespeicherte Ergebnisse (Baseline).
+- compare_benchmark_results(results, baseline, threshold_percent, statistic): Vergleicht mit der Baseline.
+
+Verwendung:
+    result = run_benchmark(BenchmarkCase("custom_sanitize_text", custom_sanitize_text, ("AW: Angebot",)))
+    comparisons = compare_benchmark_results([result], load_benchmark_results("baseline.json"), threshold_percent=25)
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Optional
+
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'micro_benchmark' aktiviert.")
+
+# Mindestdauer einer Runde bei der Kalibrierung in Sekunden
+MIN_ROUND_SECONDS = 0.01
+
+# Standardwerte der Messung
+DEFAULT_MIN_ROUNDS = 5
+DEFAULT_MAX_ROUNDS = 10000
+DEFAULT_MAX_TIME_SECONDS = 1.0
+
+# Kennwerte, die mit der Baseline verglichen werden können
+COMPARE_STATISTICS = ("min", "median", "mean")
+
+
+@dataclass
+class BenchmarkCase:
+    """
+    BenchmarkCase
+
+    Diese Datenklasse beschreibt einen Benchmark.
+
+    Attribute:
+    - name: Eindeutiger Name (Schlüssel in der Baseline).
+    - function: Die gemessene Funktion.
+    - args, kwargs: Argumente der Funktion (ohne setup).
+    - setup: Liefert vor jedem Aufruf (args, kwargs); die Zeit für setup wird nicht gemessen.
+    - group: Gruppe für die Ausgabe (z.B. die gemessene Funktion).
+    """
+    name: str
+    function: Callable
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    setup: Optional[Callable[[], tuple]] = None
+    group: str = ""
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    BenchmarkResult
+
+    Diese Datenklasse enthält die Statistik eines Benchmarks (Zeiten je Aufruf in Sekunden).
+
+    Attribute:
+    - name, group: Name und Gruppe des Benchmarks.
+    - rounds: Anzahl der gemessenen Runden.
+    - iterations: Aufrufe je Runde.
+    - min, max, mean, median, stddev: Statistik der Zeiten je Aufruf.
+    - ops: Aufrufe pro Sekunde (aus dem Mittelwert).
+    """
+    name: str
+    group: str
+    rounds: int
+    iterations: int
+    min: float
+    max: float
+    mean: float
+    median: float
+    stddev: float
+    ops: float
+
+
+class BenchmarkStatus(Enum):
+    OK = "ok"
+    REGRESSION = "regression"
+    IMPROVEMENT = "improvement"
+    NEW = "new"
+
+
+@dataclass
+class BenchmarkComparison:
+    """
+    BenchmarkComparison
+
+    Diese Datenklasse enthält den Vergleich eines Benchmarks mit der Baseline.
+
+    Attribute:
+    - name: Name des Benchmarks.
+    - status: Ergebnis des Vergleichs.
+    - current_seconds, baseline_seconds: Verglichener Kennwert aktuell bzw. in der Baseline (None = nicht in der Baseline).
+    - change_percent: Veränderung in Prozent (positiv = langsamer).
+    - threshold_percent: Angewendete Schwelle in Prozent.
+    """
+    name: str
+    status: BenchmarkStatus
+    current_seconds: float
+    baseline_seconds: Optional[float] = None
+    change_percent: Optional[float] = None
+    threshold_percent: Optional[float] = None
+
+
+def _call(case: BenchmarkCase, iterations: int) -> float:
+    """
+    Ruft die Funktion iterations-mal auf und liefert die gemessene Zeit (ohne setup).
+    """
+    if case.setup is not None:
+        args, kwargs = case.setup()
+        start_time = time.perf_counter()
+        case.function(*args, **kwargs)
+        return time.perf_counter() - start_time
+
+    function, args, kwargs = case.function, case.args, case.kwargs
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        function(*args, **kwargs)
+    return time.perf_counter() - start_time
+
+
+def _calibrate(case: BenchmarkCase) -> int:
+    """
+    Ermittelt die Aufrufe je Runde, so dass eine Runde mindestens MIN_ROUND_SECONDS dauert (mit setup immer 1).
+    """
+    if case.setup is not None:
+        return 1
+    iterations = 1
+    while True:
+        duration = _call(case, iterations)
+        if duration >= MIN_ROUND_SECONDS:
+            return iterations
+        # Auf die erwartete Anzahl hochrechnen, höchstens verzehnfachen
+        iterations = max(iterations + 1, min(iterations * 10, int(iterations * MIN_ROUND_SECONDS / max(duration, 1e-9) * 1.2)))
+
+
+def run_benchmark(case: BenchmarkCase, min_rounds: int = DEFAULT_MIN_ROUNDS, max_rounds: int = DEFAULT_MAX_ROUNDS,
+                  max_time_seconds: float = DEFAULT_MAX_TIME_SECONDS) -> BenchmarkResult:
+    """
+    Misst einen Benchmark.
+
+    Parameter:
+    case (BenchmarkCase): Der Benchmark.
+    min_rounds (int): Mindestanzahl der gemessenen Runden.
+    max_rounds (int): Höchstanzahl der gemessenen Runden.
+    max_time_seconds (float): Messdauer, nach der keine weitere Runde begonnen wird (sobald min_rounds erreicht sind).
+
+    Rückgabewert:
+    BenchmarkResult: Die Statistik der Zeiten je Aufruf.
+    """
+    iterations = _calibrate(case)
+    _call(case, iterations)  # Aufwärmrunde
+
+    round_seconds = []
+    start_time = time.perf_counter()
+    while len(round_seconds) < max_rounds and (len(round_seconds) < min_rounds or time.perf_counter() - start_time < max_time_seconds):
+        round_seconds.append(_call(case, iterations) / iterations)
+
+    mean_seconds = statistics.fmean(round_seconds)
+    result = BenchmarkResult(name=case.name, group=case.group, rounds=len(round_seconds), iterations=iterations,
+                             min=min(round_seconds), max=max(round_seconds), mean=mean_seconds,
+                             median=statistics.median(round_seconds),
+                             stddev=statistics.stdev(round_seconds) if len(round_seconds) > 1 else 0.0,
+                             ops=1 / mean_seconds if mean_seconds > 0 else 0.0)
+    app_logger.info("Benchmark '%s': Median %.6f s, %s Runden x %s Aufrufe", case.name, result.median, result.rounds, result.iterations)
+    return result
+
+
+def save_benchmark_results(path: str, results: list[BenchmarkResult], threshold_percent: Optional[dict] = None,
+                           kept_benchmarks: Optional[list] = None):
+    """
+    Speichert die Ergebnisse als JSON (Aufbau wie bei pytest-benchmark).
+
+    Parameter:
+    path (str): Pfad der JSON-Datei (das Verzeichnis wird bei Bedarf angelegt).
+    results (list[BenchmarkResult]): Die Ergebnisse.
+    threshold_percent (dict): Schwellen je Benchmark (Name -> Prozent), die mit in die Datei geschrieben werden.
+    kept_benchmarks (list): Unverändert übernommene Einträge (z.B. nicht gemessene Benchmarks einer bisherigen Baseline).
+    """
+    benchmarks = []
+    for result in results:
+        stats = asdict(result)
+        name = stats.pop("name")
+        group = stats.pop("group")
+        benchmark = {"name": name, "group": group, "stats": stats}
+        if threshold_percent and name in threshold_percent:
+            benchmark["options"] = {"threshold_percent": threshold_percent[name]}
+        benchmarks.append(benchmark)
+    benchmarks += kept_benchmarks or []
+
+    data = {
+        "machine_info": {"node": platform.node(), "processor": platform.processor(), "machine": platform.machine(),
+                         "system": platform.system(), "release": platform.release(),
+                         "python_version": platform.python_version(), "python_implementation": platform.python_implementation(),
+                         "cpu_count": os.cpu_count(), "executable": sys.executable},
+        "datetime": datetime.now().isoformat(timespec="seconds"),
+        "benchmarks": benchmarks
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as json_file:
+        json.dump(data, json_file, indent=2, ensure_ascii=False)
+    app_logger.info("Benchmark-Ergebnisse gespeichert: '%s'", path)
+
+
+def load_benchmark_results(path: str) -> dict:
+    """
+    Liest gespeicherte Ergebnisse (Baseline).
+
+    Parameter:
+    path (str): Pfad der JSON-Datei.
+
+    Rückgabewert:
+    dict: Name -> Eintrag mit "stats" (und ggf. "options") aus der Datei.
+
+    Ausnahmen:
+    OSError: Die Datei kann nicht gelesen werden.
+    ValueError: Die Datei enthält kein gültiges JSON mit "benchmarks".
+    """
+    with open(path, "r", encoding="utf-8") as json_file:
+        data = json.load(json_file)
+    if not isinstance(data, dict) or not isinstance(data.get("benchmarks"), list):
+        raise ValueError(f"Keine Benchmark-Ergebnisse in '{path}'")
+    return {benchmark["name"]: benchmark for benchmark in data["benchmarks"]}
+
+
+def compare_benchmark_results(results: list[BenchmarkResult], baseline: dict, threshold_percent: float,
+                              statistic: str = "median") -> list[BenchmarkComparison]:
+    """
+    Vergleicht die Ergebnisse mit der Baseline.
+
+    Parameter:
+    results (list[BenchmarkResult]): Die aktuellen Ergebnisse.
+    baseline (dict): Ergebnis von load_benchmark_results.
+    threshold_percent (float): Zulässige Verschlechterung in Prozent (falls in der Baseline keine eigene Schwelle steht).
+    statistic (str): Verglichener Kennwert (COMPARE_STATISTICS).
+
+    Rückgabewert:
+    list[BenchmarkComparison]: Je Ergebnis ein Vergleich; Benchmarks ohne Baseline haben den Status NEW.
+    """
+    comparisons = []
+    for result in results:
+        current_seconds = getattr(result, statistic)
+        baseline_entry = baseline.get(result.name)
+        if baseline_entry is None or not baseline_entry.get("stats", {}).get(statistic):
+            comparisons.append(BenchmarkComparison(result.name, BenchmarkStatus.NEW, current_seconds))
+            continue
+
+        baseline_seconds = baseline_entry["stats"][statistic]
+        benchmark_threshold_percent = baseline_entry.get("options", {}).get("threshold_percent", threshold_percent)
+        change_percent = (current_seconds - baseline_seconds) / baseline_seconds * 100
+        if change_percent > benchmark_threshold_percent:
+            status = BenchmarkStatus.REGRESSION
+        elif change_percent < -benchmark_threshold_percent:
+            status = BenchmarkStatus.IMPROVEMENT
+        else:
+            status = BenchmarkStatus.OK
+        comparisons.append(BenchmarkComparison(result.name, status, current_seconds, baseline_seconds, change_percent, benchmark_threshold_percent))
+    return comparisons
@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+"""
+msg_corpus.py
+
+Dieses Modul erzeugt einen synthetischen Bestand von MSG-Dateien (Korpus) für Benchmarks und Lasttests von
+msg_file_renamer.py, z.B. einen Verzeichnisbaum mit 100.000 Dateien. Die Dateien werden mit utils.msg_file_writer
+geschrieben; Outlook ist nicht erforderlich.
+
+Einstellbar sind (MsgCorpusOptions):
+- Anzahl der Dateien, Dateien je Verzeichnis und Verzweigung des Verzeichnisbaums.
+- Größe des Nachrichtentexts (logarithmische Normalverteilung um den Median, begrenzt auf ein Maximum); ein Teil der
+  Nachrichten enthält zitierte ältere E-Mails ("-----Ursprüngliche Nachricht-----", "Von:", "Betreff:").
+- Anteil der Nachrichten mit Anhängen, Anzahl und Größe der Anhänge.
+- Anteil der Doubletten: byte-gleiche Kopien einer anderen Datei desselben Verzeichnisses unter anderem Namen.
+- Anteil der Nachrichten mit fehlendem Feld (Betreff, Absender, Versanddatum, Empfänger oder Nachrichtentext).
+- Anteil pathologischer Namen: sehr lange, Unicode- und Sonderzeichen in Betreff, Absender und Dateiname.
+
+Die Verzeichnisse werden unabhängig voneinander erzeugt, jedes mit einem eigenen Zufallsgenerator aus seed und
+Verzeichnisnummer. Derselbe seed liefert daher unabhängig von der Anzahl der Prozesse (workers) denselben Korpus.
+
+Funktionen und Klassen:
+- MsgCorpusOptions: Datenklasse mit den Einstellungen des Korpus.
+- MsgCorpusResult: Datenklasse mit Anzahl und Größe der erzeugten Dateien.
+- plan_corpus_directories(file_count, files_per_directory, directory_fanout): Relative Pfade der Verzeichnisse.
+- generate_msg_corpus(target_directory, options, workers, on_directory_done): Erzeugt den Korpus.
+
+Verwendung:
+    options = MsgCorpusOptions(file_count=100000, duplicate_ratio=0.02, seed=1)
+    result = generate_msg_corpus("/tmp/korpus", options, workers=8)
+"""
+import math
+import os
+import random
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from utils.msg_file_writer import MsgMessage, MsgAttachment, build_msg_bytes
+from logger import initialize_logger, child_process_log_queue, initialize_child_process_logging
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_corpus' aktiviert.")
+
+# Zeitraum der Versanddaten
+_SENT_TIME_START = datetime(2015, 1, 1, tzinfo=timezone.utc)
+_SENT_TIME_SPAN_SECONDS = int((datetime(2026, 1, 1, tzinfo=timezone.utc) - _SENT_TIME_START).total_seconds())
+
+# Anteil der Nachrichten mit zitierten älteren E-Mails und deren maximale Anzahl
+_REPLY_CHAIN_RATIO = 0.3
+_REPLY_CHAIN_MAX_DEPTH = 4
+
+# Anzahl der vorbereiteten Absätze je Verzeichnis (daraus werden die Nachrichtentexte zusammengesetzt)
+_PARAGRAPH_POOL_SIZE = 64
+
+# Felder, von denen bei einer unvollständigen Nachricht eines fehlt
+_MISSING_FIELDS = ("subject", "sender", "sent_time", "recipients", "body")
+
+_FIRST_NAMES = ("Anna", "Ben", "Clara", "David", "Elif", "Felix", "Greta", "Hans", "Ines", "Jonas", "Katrin", "Lukas",
+                "Maria", "Niklas", "Olga", "Paul", "Rüdiger", "Sören", "Tanja", "Uwe", "Jörg", "Zoë", "Ana-Lucía", "Łukasz")
+_LAST_NAMES = ("Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker", "Schulz", "Hoffmann",
+               "Zölch", "Groß", "Krämer", "Öztürk", "Nguyen", "García", "Kowalski", "Dubois", "O'Neill", "van der Berg")
+# Umschreibung von Umlauten usw. im lokalen Teil der E-Mail-Adressen (weitere Akzente entfallen)
+_EMAIL_TRANSLATION = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", "ł": "l", " ": "-", "'": None})
+_DOMAINS = ("example.com", "example.org", "example.net", "beispiel.de", "firma-muster.de", "mail.example.co.uk")
+_SUBJECT_TOPICS = ("Angebot", "Rechnung", "Projektbesprechung", "Protokoll", "Termin", "Bestellung", "Lieferung", "Vertrag",
+                   "Urlaubsantrag", "Bewerbung", "Reklamation", "Newsletter", "Einladung", "Statusbericht", "Freigabe",
+                   "Änderungswunsch", "Wartungsfenster", "Jahresabschluss", "Kündigung", "Rückfrage")
+_SUBJECT_PREFIXES = ("", "", "", "AW: ", "WG: ", "RE: ", "FW: ", "AW: AW: ", "Wichtig: ")
+_WORDS = ("und", "die", "der", "das", "wir", "Sie", "bitte", "Angebot", "Termin", "Projekt", "Rückmeldung", "gerne",
+          "nächste", "Woche", "Unterlagen", "anbei", "Freundliche", "Grüße", "vielen", "Dank", "für", "Ihre", "Anfrage",
+          "Lieferung", "Rechnung", "Budget", "Abstimmung", "Änderungen", "Prüfung", "Freigabe", "morgen", "heute",
+          "bis", "zum", "wie", "besprochen", "Zusammenfassung", "Ergebnis", "offen", "erledigt", "Kunde", "Vertrag")
+_ATTACHMENT_TYPES = ((".pdf", "application/pdf"), (".docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+                     (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"), (".jpg", "image/jpeg"),
+                     (".png", "image/png"), (".zip", "application/zip"), (".txt", "text/plain"))
+
+# Bausteine pathologischer Namen: ungültige Zeichen für Windows-Dateinamen, Unicode, Steuerzeichen, sehr lange Texte
+_PATHOLOGICAL_SUBJECTS = (
+    'Re: Fwd: AW: WG: RE: "Dringend" <Antwort> | Frage? * 50% / 2024\\07 : Teil 1',
+    "Bestellung 😀🚀 – Lieferung (Ü/Ö/Ä/ß) №42 • Prüfung",
+    "مرحبا Angebot שלום 你好 Ελληνικά",
+    "Zeile 1\r\nZeile 2\tTabulator",
+    "   ",
+    "Rechnung ...",
+    "CON",
+    "Ä" * 300,
+    " ".join(["Sehr langer Betreff mit vielen Wörtern"] * 20),
+)
+_PATHOLOGICAL_FILE_NAMES = (
+    "Mail mit sehr langem Namen " + "x" * 180,
+    "Übersicht Ä Ö Ü ß 😀 Ελληνικά",
+    "...mehrere.Punkte...im.Namen",
+    " führendes Leerzeichen",
+    "2024-07-01_12h30_bereits_umbenannt_Angebot",
+    "Kopie (2) von Kopie (1) von Mail",
+    "Mail #1 & 2 + 3 = 100% ; Test",
+)
+
+
+@dataclass
+class MsgCorpusOptions:
+    """
+    MsgCorpusOptions
+
+    Diese Datenklasse enthält die Einstellungen eines synthetischen MSG-Korpus.
+
+    Attribute:
+    - file_count: Anzahl der MSG-Dateien (einschließlich Doubletten).
+    - files_per_directory: Anzahl der MSG-Dateien je Verzeichnis.
+    - directory_fanout: Anzahl der Unterverzeichnisse je Ebene des Verzeichnisbaums.
+    - body_size_median, body_size_sigma, body_size_max: Länge des Nachrichtentexts in Zeichen (Median, Streuung der
+      logarithmischen Normalverteilung, Maximum).
+    - attachment_ratio: Anteil der Nachrichten mit Anhängen.
+    - attachment_count_max: Maximale Anzahl der Anhänge einer Nachricht (gleichverteilt ab 1).
+    - attachment_size_median, attachment_size_max: Größe der Anhänge in Byte (Median der logarithmischen
+      Normalverteilung, Streuung 1.0, Maximum).
+    - duplicate_ratio: Anteil der Doubletten.
+    - missing_field_ratio: Anteil der Nachrichten, in denen ein Feld fehlt.
+    - pathological_ratio: Anteil der Nachrichten bzw. Dateien mit pathologischen Namen.
+    - seed: Startwert der Zufallsgeneratoren.
+    """
+    file_count: int = 1000
+    files_per_directory: int = 100
+    directory_fanout: int = 10
+    body_size_median: int = 2000
+    body_size_sigma: float = 1.0
+    body_size_max: int = 1_000_000
+    attachment_ratio: float = 0.3
+    attachment_count_max: int = 3
+    attachment_size_median: int = 50_000
+    attachment_size_max: int = 10_000_000
+    duplicate_ratio: float = 0.02
+    missing_field_ratio: float = 0.05
+    pathological_ratio: float = 0.05
+    seed: int = 0
+
+
+@dataclass
+class MsgCorpusResult:
+    """
+    MsgCorpusResult
+
+    Diese Datenklasse enthält das Ergebnis von generate_msg_corpus.
+
+    Attribute:
+    - file_count: Anzahl der geschriebenen MSG-Dateien.
+    - duplicate_count: Davon Doubletten.
+    - directory_count: Anzahl der Verzeichnisse mit MSG-Dateien.
+    - total_bytes: Gesamtgröße der MSG-Dateien in Byte.
+    - seconds: Laufzeit in Sekunden.
+    """
+    file_count: int = 0
+    duplicate_count: int = 0
+    directory_count: int = 0
+    total_bytes: int = 0
+    seconds: float = 0.0
+
+
+def plan_corpus_directories(file_count: int, files_per_directory: int, directory_fanout: int) -> list[str]:
+    """
+    Liefert die relativen Pfade der Verzeichnisse des Korpus. Die Verzeichnisse sind die Blätter eines Baums mit
+    directory_fanout Unterverzeichnissen je Ebene; bei nur einem Verzeichnis liegen die Dateien im Zielverzeichnis.
+
+    Parameter:
+    file_count (int): Anzahl der MSG-Dateien.
+    files_per_directory (int): Anzahl der MSG-Dateien je Verzeichnis.
+    directory_fanout (int): Anzahl der Unterverzeichnisse je Ebene (mindestens 2).
+
+    Rückgabewert:
+    list[str]: Relative Pfade, z.B. ["ordner_00/ordner_00", "ordner_00/ordner_01", ...].
+    """
+    directory_count = max(1, math.ceil(file_count / max(1, files_per_directory)))
+    directory_fanout = max(2, directory_fanout)
+    depth = 0
+    while directory_fanout ** depth < directory_count:
+        depth += 1
+
+    relative_directories = []
+    for directory_number in range(directory_count):
+        components = []
+        for _ in range(depth):
+            directory_number, digit = divmod(directory_number, directory_fanout)
+            components.append(f"ordner_{digit:02d}")
+        relative_directories.append(os.path.join(*reversed(components)) if components else "")
+    return relative_directories
+
+
+def _lognormal_size(rng: random.Random, median: int, sigma: float, maximum: int) -> int:
+    """
+    Zufällige Größe aus einer logarithmischen Normalverteilung um den Median, begrenzt auf 1 bis maximum.
+    """
+    if median <= 0:
+        return 0
+    return max(1, min(maximum, int(rng.lognormvariate(math.log(median), sigma))))
+
+
+def _random_person(rng: random.Random, pathological: bool = False) -> tuple[str, str]:
+    """
+    Zufälliger Name und E-Mail-Adresse.
+    """
+    first_name = rng.choice(_FIRST_NAMES)
+    last_name = rng.choice(_LAST_NAMES)
+    local_part = f"{first_name}.{last_name}".lower().translate(_EMAIL_TRANSLATION)
+    local_part = unicodedata.normalize("NFKD", local_part).encode("ascii", "ignore").decode() or "kontakt"
+    name = f"{last_name}, {first_name}" if rng.random() < 0.3 else f"{first_name} {last_name}"
+    if pathological:
+        name = rng.choice((f'"{name}" (Extern) <Vertrieb>', f"{name} | {rng.choice(_DOMAINS)}", name * 8, "Ⓜ️ " + name))
+    return name, f"{local_part}@{rng.choice(_DOMAINS)}"
+
+
+def _paragraph_pool(rng: random.Random) -> list[str]:
+    """
+    Vorbereitete Absätze, aus denen die Nachrichtentexte zusammengesetzt werden (schnell auch für große Texte).
+    """
+    paragraphs = []
+    for _ in range(_PARAGRAPH_POOL_SIZE):
+        words = rng.choices(_WORDS, k=rng.randint(20, 120))
+        lines, line = [], []
+        for word in words:
+            line.append(word)
+            if sum(len(item) + 1 for item in line) > 72:
+                lines.append(" ".join(line))
+                line = []
+        if line:
+            lines.append(" ".join(line))
+        paragraphs.append("\r\n".join(lines).capitalize() + ".")
+    return paragraphs
+
+
+def _random_body(rng: random.Random, options: MsgCorpusOptions, paragraphs: list[str], subject: str, recipient_name: str) -> str:
+    """
+    Nachrichtentext mit der gewünschten Länge, ggf. mit zitierten älteren E-Mails.
+    """
+    target_length = _lognormal_size(rng, options.body_size_median, options.body_size_sigma, options.body_size_max)
+    parts = [f"Hallo {recipient_name},"]
+    length = len(parts[0])
+    while length < target_length:
+        paragraph = rng.choice(paragraphs)
+        parts.append(paragraph)
+        length += len(paragraph) + 4
+    parts.append("Viele Grüße")
+
+    if rng.random() < _REPLY_CHAIN_RATIO:
+        for quote_number in range(rng.randint(1, _REPLY_CHAIN_MAX_DEPTH)):
+            quoted_sender_name, quoted_sender_email = _random_person(rng)
+            quoted_time = _SENT_TIME_START + timedelta(seconds=rng.randrange(_SENT_TIME_SPAN_SECONDS))
+            separator = "-----Ursprüngliche Nachricht-----" if rng.random() < 0.5 else "________________________________"
+            parts.append(f"{separator}\r\nVon: {quoted_sender_name} <{quoted_sender_email}>\r\n"
+                         f"Gesendet: {quoted_time:%d.%m.%Y %H:%M}\r\nAn: {recipient_name}\r\nBetreff: {'AW: ' * quote_number}{subject}")
+            parts.append(rng.choice(paragraphs))
+    return "\r\n\r\n".join(parts)
+
+
+def _random_attachments(rng: random.Random, options: MsgCorpusOptions) -> list[MsgAttachment]:
+    """
+    Zufällige Anhänge (Inhalt: Zufallsbytes in der gewünschten Größe).
+    """
+    if options.attachment_count_max <= 0 or rng.random() >= options.attachment_ratio:
+        return []
+    attachments = []
+    for attachment_number in range(rng.randint(1, options.attachment_count_max)):
+        extension, mime_type = rng.choice(_ATTACHMENT_TYPES)
+        size = _lognormal_size(rng, options.attachment_size_median, 1.0, options.attachment_size_max)
+        attachments.append(MsgAttachment(f"{rng.choice(_SUBJECT_TOPICS)}_{attachment_number + 1}{extension}", rng.randbytes(size), mime_type))
+    return attachments
+
+
+def _random_message(rng: random.Random, options: MsgCorpusOptions, paragraphs: list[str], pathological: bool) -> MsgMessage:
+    """
+    Zufällige Nachricht; mit missing_field_ratio fehlt eines der Felder aus _MISSING_FIELDS.
+    """
+    sender_name, sender_email = _random_person(rng, pathological and rng.random() < 0.5)
+    recipients = [_random_person(rng) for _ in range(rng.choice((1, 1, 1, 2, 3, 8)))]
+    if pathological:
+        subject = rng.choice(_PATHOLOGICAL_SUBJECTS)
+    else:
+        subject = f"{rng.choice(_SUBJECT_PREFIXES)}{rng.choice(_SUBJECT_TOPICS)} {rng.randint(1, 9999)}"
+    message = MsgMessage(subject=subject, sender_name=sender_name, sender_email=sender_email, recipients=recipients,
+                         sent_time=_SENT_TIME_START + timedelta(seconds=rng.randrange(_SENT_TIME_SPAN_SECONDS)),
+                         body=_random_body(rng, options, paragraphs, subject, recipients[0][0]),
+                         attachments=_random_attachments(rng, options),
+                         message_id=f"{rng.getrandbits(64):016x}@{sender_email.split('@')[1]}")
+
+    if rng.random() < options.missing_field_ratio:
+        missing_field = rng.choice(_MISSING_FIELDS)
+        if missing_field == "sender":
+            message.sender_name = message.sender_email = None
+        elif missing_field == "recipients":
+            message.recipients = []
+        else:
+            setattr(message, missing_field, None)
+    return message
+
+
+def _file_name(rng: random.Random, message: MsgMessage, file_number: int, pathological: bool) -> str:
+    """
+    Dateiname der MSG-Datei (ohne Endung): wie beim Speichern aus Outlook aus dem Betreff, sonst mit laufender Nummer.
+    """
+    if pathological:
+        base_name = rng.choice(_PATHOLOGICAL_FILE_NAMES)
+    elif message.subject and message.subject.strip() and rng.random() < 0.7:
+        base_name = message.subject
+    else:
+        base_name = f"Mail_{file_number:06d}"
+    # Zeichen, die unter Windows in Dateinamen nicht erlaubt sind, wie Outlook durch "_" ersetzen
+    base_name = "".join("_" if character in '<>:"/\\|?*' or ord(character) < 32 else character for character in base_name)
+    # Am Ende sind unter Windows weder Leerzeichen noch Punkte erlaubt
+    return base_name[:180].rstrip(" .") or f"Mail_{file_number:06d}"
+
+
+def _generate_directory(target_directory: str, relative_directory: str, directory_number: int, first_file_number: int,
+                        file_count: int, options: MsgCorpusOptions) -> tuple[int, int, int]:
+    """
+    Erzeugt die MSG-Dateien eines Verzeichnisses (auch im Prozess-Pool).
+
+    Rückgabewert:
+    tuple: (Anzahl Dateien, davon Doubletten, Gesamtgröße in Byte).
+    """
+    rng = random.Random(options.seed * 1_000_003 + directory_number)
+    paragraphs = _paragraph_pool(rng)
+    directory_path = os.path.join(target_directory, relative_directory)
+    os.makedirs(directory_path, exist_ok=True)
+
+    used_names = set()
+    written_files = []  # (Dateiname, Inhalt) als Vorlage für Doubletten
+    duplicate_count = 0
+    total_bytes = 0
+    for file_number in range(first_file_number, first_file_number + file_count):
+        pathological = rng.random() < options.pathological_ratio
+        if written_files and rng.random() < options.duplicate_ratio:
+            original_name, data = rng.choice(written_files)
+            base_name = rng.choice((f"{original_name} - Kopie", f"Kopie von {original_name}", f"{original_name} (2)"))
+            duplicate_count += 1
+        else:
+            message = _random_message(rng, options, paragraphs, pathological)
+            data = build_msg_bytes(message)
+            base_name = _file_name(rng, message, file_number, pathological)
+
+        # Eindeutiger Dateiname im Verzeichnis (ohne Beachtung der Groß-/Kleinschreibung wie unter Windows)
+        unique_name = base_name
+        suffix_number = 1
+        while unique_name.casefold() in used_names:
+            suffix_number += 1
+            unique_name = f"{base_name} ({suffix_number})"
+        used_names.add(unique_name.casefold())
+
+        with open(os.path.join(directory_path, unique_name + ".msg"), "wb") as msg_file:
+            msg_file.write(data)
+        total_bytes += len(data)
+        if len(written_files) < 100:
+            written_files.append((unique_name, data))
+    return file_count, duplicate_count, total_bytes
+
+
+def generate_msg_corpus(target_directory: str, options: MsgCorpusOptions, workers: int = 1,
+                        on_directory_done: Optional[Callable[[str, int], None]] = None) -> MsgCorpusResult:
+    """
+    Erzeugt einen synthetischen MSG-Korpus im Zielverzeichnis.
+
+    Parameter:
+    target_directory (str): Zielverzeichnis (wird angelegt; muss leer sein).
+    options (MsgCorpusOptions): Einstellungen des Korpus.
+    workers (int): Anzahl der Prozesse (1 = im aktuellen Prozess).
+    on_directory_done (Callable): Wird nach jedem Verzeichnis mit (relativer Pfad, Anzahl bisher geschriebener Dateien) aufgerufen.
+
+    Rückgabewert:
+    MsgCorpusResult: Anzahl und Größe der erzeugten Dateien.
+
+    Ausnahmen:
+    FileExistsError: Das Zielverzeichnis ist nicht leer.
+    """
+    if os.path.isdir(target_directory) and os.listdir(target_directory):
+        raise FileExistsError(f"Das Zielverzeichnis ist nicht leer: '{target_directory}'")
+    os.makedirs(target_directory, exist_ok=True)
+
+    start_time = time.perf_counter()
+    relative_directories = plan_corpus_directories(options.file_count, options.files_per_directory, options.directory_fanout)
+    files_per_directory = max(1, options.files_per_directory)
+    jobs = [(target_directory, relative_directory, directory_number, directory_number * files_per_directory,
+             min(files_per_directory, options.file_count - directory_number * files_per_directory), options)
+            for directory_number, relative_directory in enumerate(relative_directories)]
+    app_logger.info("MSG-Korpus: %s Dateien in %s Verzeichnissen unter '%s' (%s)", options.file_count, len(jobs), target_directory, options)
+
+    result = MsgCorpusResult(directory_count=len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initialize_child_process_logging,
+                                 initargs=(child_process_log_queue(),)) as executor:
+            directory_results = executor.map(_generate_directory, *zip(*jobs))
+            for job, directory_result in zip(jobs, directory_results):
+                _add_directory_result(result, job[1], directory_result, on_directory_done)
+    else:
+        for job in jobs:
+            _add_directory_result(result, job[1], _generate_directory(*job), on_directory_done)
+
+    result.seconds = time.perf_counter() - start_time
+    app_logger.info("MSG-Korpus erzeugt: %s", result)
+    return result
+
+
+def _add_directory_result(result: MsgCorpusResult, relative_directory: str, directory_result: tuple,
+                          on_directory_done: Optional[Callable[[str, int], None]]):
+    file_count, duplicate_count, total_bytes = directory_result
+    result.file_count += file_count
+    result.duplicate_count += duplicate_count
+    result.total_bytes += total_bytes
+    if on_directory_done:
+        on_directory_done(relative_directory, result.file_count)
@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""
+msg_file_writer.py
+
+Dieses Modul schreibt Outlook-MSG-Dateien ohne Outlook und ohne zusätzliche Pakete (nur Standardbibliothek), z.B. für
+synthetische Testdaten (utils.msg_corpus). Eine MSG-Datei ist eine Compound File (OLE/CFB, [MS-CFB]) mit den
+MAPI-Eigenschaften der Nachricht, der Empfänger und der Anhänge ([MS-OXMSG]):
+
+    Root Entry
+    ├── __properties_version1.0          Eigenschaften fester Länge (Datum, Flags, Größen von Strings/Binärdaten)
+    ├── __substg1.0_<ID><Typ>            Je String- bzw. Binär-Eigenschaft ein Stream (z.B. 0037001F = Betreff)
+    ├── __nameid_version1.0              Zuordnung benannter Eigenschaften (hier leer)
+    ├── __recip_version1.0_#00000000     Je Empfänger ein Storage mit eigenen Eigenschaften
+    └── __attach_version1.0_#00000000    Je Anhang ein Storage mit Dateiname und Inhalt (37010102)
+
+Geschrieben wird Version 3 des Formats (Sektoren zu 512 Byte). Streams unter 4096 Byte liegen im Mini-Stream
+(Mini-Sektoren zu 64 Byte); für große Dateien werden zusätzliche DIFAT-Sektoren angelegt. Die Einträge jedes
+Storage bilden einen Rot-Schwarz-Baum. Strings werden als Unicode (UTF-16LE) gespeichert.
+
+Funktionen und Klassen:
+- MsgAttachment: Datenklasse mit Dateiname und Inhalt eines Anhangs.
+- MsgMessage: Datenklasse mit den Feldern einer Nachricht (None = Feld fehlt in der MSG-Datei).
+- build_msg_bytes(message): Erzeugt den Inhalt der MSG-Datei.
+- write_msg_file(path_and_file_name, message): Schreibt die MSG-Datei.
+
+Verwendung:
+    message = MsgMessage(subject="Angebot", sender_name="Max Muster", sender_email="max@example.com",
+                         recipients=[("Erika Muster", "erika@example.com")], sent_time=datetime.now(timezone.utc),
+                         body="Hallo Erika, ...", attachments=[MsgAttachment("Angebot.pdf", pdf_bytes)])
+    write_msg_file("Angebot.msg", message)
+"""
+import email.utils
+import os
+import struct
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.header import Header
+from typing import Optional
+
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'msg_file_writer' aktiviert.")
+
+# Compound File: Größen und besondere Sektornummern ([MS-CFB])
+_SECTOR_SIZE = 512
+_MINI_SECTOR_SIZE = 64
+_MINI_STREAM_CUTOFF = 4096
+_DIRECTORY_ENTRY_SIZE = 128
+_FAT_ENTRIES_PER_SECTOR = _SECTOR_SIZE // 4
+_HEADER_DIFAT_COUNT = 109
+_FREESECT = 0xFFFFFFFF
+_ENDOFCHAIN = 0xFFFFFFFE
+_FATSECT = 0xFFFFFFFD
+_DIFSECT = 0xFFFFFFFC
+_NOSTREAM = 0xFFFFFFFF
+_CFB_SIGNATURE = bytes.fromhex("D0CF11E0A1B11AE1")
+
+# Typen und Farben der Verzeichniseinträge
+_STORAGE = 1
+_STREAM = 2
+_ROOT_STORAGE = 5
+_RED = 0
+_BLACK = 1
+
+# MAPI-Eigenschaftstypen ([MS-OXCDATA])
+_PT_LONG = 0x0003
+_PT_BOOLEAN = 0x000B
+_PT_SYSTIME = 0x0040
+_PT_UNICODE = 0x001F
+_PT_BINARY = 0x0102
+
+# Flags der Eigenschaften im Properties-Stream (lesbar und schreibbar)
+_PROPERTY_FLAGS = 0x00000006
+
+# Werte einzelner Eigenschaften
+_MSGFLAG_READ = 0x00000001
+_STORE_UNICODE_OK = 0x00040000
+_MAPI_TO = 1
+_ATTACH_BY_VALUE = 1
+
+# Beginn der FILETIME-Zählung (100-Nanosekunden-Intervalle seit 1601-01-01 UTC)
+_FILETIME_EPOCH = datetime(1601, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class MsgAttachment:
+    """
+    MsgAttachment
+
+    Diese Datenklasse enthält einen Anhang einer Nachricht.
+
+    Attribute:
+    - filename: Dateiname des Anhangs.
+    - data: Inhalt des Anhangs.
+    - mime_type: MIME-Typ des Anhangs.
+    """
+    filename: str
+    data: bytes
+    mime_type: str = "application/octet-stream"
+
+
+@dataclass
+class MsgMessage:
+    """
+    MsgMessage
+
+    Diese Datenklasse enthält die Felder einer Nachricht. Felder mit dem Wert None (bzw. leere Listen) werden nicht in
+    die MSG-Datei geschrieben, so dass sich auch unvollständige Nachrichten erzeugen lassen.
+
+    Attribute:
+    - subject: Betreff.
+    - sender_name, sender_email: Name und E-Mail-Adresse des Absenders.
+    - recipients: Empfänger (An) als Liste von (Name, E-Mail-Adresse).
+    - sent_time: Versanddatum (ohne Zeitzone als UTC interpretiert).
+    - body: Nachrichtentext.
+    - attachments: Anhänge.
+    - message_id: Internet-Message-ID (ohne spitze Klammern).
+    - transport_headers: Internet-Kopfzeilen (From, To, Subject, Date, Message-ID) wie bei empfangenen Nachrichten mitschreiben.
+    """
+    subject: Optional[str] = None
+    sender_name: Optional[str] = None
+    sender_email: Optional[str] = None
+    recipients: list = field(default_factory=list)
+    sent_time: Optional[datetime] = None
+    body: Optional[str] = None
+    attachments: list = field(default_factory=list)
+    message_id: Optional[str] = None
+    transport_headers: bool = True
+
+
+class _DirectoryEntry:
+    """
+    Eintrag im Verzeichnis der Compound File (Storage oder Stream).
+    """
+    __slots__ = ("name", "entry_type", "data", "children", "index", "left", "right", "child", "color", "start_sector", "size")
+
+    def __init__(self, name: str, entry_type: int, data: bytes = b"", children: Optional[list] = None):
+        self.name = name
+        self.entry_type = entry_type
+        self.data = data
+        self.children = children if children is not None else []
+        self.index = 0
+        self.left = _NOSTREAM
+        self.right = _NOSTREAM
+        self.child = _NOSTREAM
+        self.color = _BLACK
+        self.start_sector = _ENDOFCHAIN if entry_type == _STREAM else 0
+        self.size = len(data)
+
+
+def _entry_sort_key(entry: _DirectoryEntry) -> tuple:
+    """
+    Reihenfolge der Einträge eines Storage: zuerst nach Länge des Namens, dann ohne Beachtung der Groß-/Kleinschreibung.
+    """
+    return len(entry.name), entry.name.upper()
+
+
+def _build_sibling_tree(ordered_entries: list, low: int, high: int, depth: int, red_depth: int) -> int:
+    """
+    Baut aus den sortierten Einträgen [low, high) einen balancierten Rot-Schwarz-Baum und liefert den Index der Wurzel.
+    Die Teilbäume unterscheiden sich höchstens um einen Eintrag; daher sind alle Blätter auf den beiden untersten Ebenen,
+    und es genügt, die unterste Ebene rot zu färben.
+    """
+    if low >= high:
+        return _NOSTREAM
+    middle = (low + high) // 2
+    entry = ordered_entries[middle]
+    entry.left = _build_sibling_tree(ordered_entries, low, middle, depth + 1, red_depth)
+    entry.right = _build_sibling_tree(ordered_entries, middle + 1, high, depth + 1, red_depth)
+    entry.color = _RED if 0 < depth == red_depth else _BLACK
+    return entry.index
+
+
+def _pack_directory_entry(entry: Optional[_DirectoryEntry]) -> bytes:
+    """
+    Verzeichniseintrag (128 Byte); None = unbenutzter Eintrag.
+    """
+    if entry is None:
+        return struct.pack("<64sHBBIII16sIQQIQ", b"", 0, 0, _RED, _NOSTREAM, _NOSTREAM, _NOSTREAM, b"", 0, 0, 0, 0, 0)
+    name_bytes = (entry.name + "\0").encode("utf-16-le")
+    return struct.pack("<64sHBBIII16sIQQIQ", name_bytes, len(name_bytes), entry.entry_type, entry.color, entry.left, entry.right,
+                       entry.child, b"", 0, 0, 0, entry.start_sector, entry.size)
+
+
+class _SectorAllocator:
+    """
+    Legt Daten in aufeinanderfolgenden Sektoren ab und führt die FAT.
+    """
+
+    def __init__(self):
+        self.fat: list[int] = []
+        self.chunks: list[bytes] = []
+
+    def allocate(self, data: bytes) -> int:
+        """
+        Legt die Daten als Sektorkette ab und liefert den ersten Sektor (ENDOFCHAIN bei leeren Daten).
+        """
+        if not data:
+            return _ENDOFCHAIN
+        sector_count = -(-len(data) // _SECTOR_SIZE)
+        start_sector = len(self.fat)
+        self.fat.extend(range(start_sector + 1, start_sector + sector_count))
+        self.fat.append(_ENDOFCHAIN)
+        self.chunks.append(data)
+        padding = sector_count * _SECTOR_SIZE - len(data)
+        if padding:
+            self.chunks.append(b"\0" * padding)
+        return start_sector
+
+
+def _build_compound_file(root: _DirectoryEntry) -> bytes:
+    """
+    Erzeugt die Compound File (Version 3) mit dem Verzeichnisbaum unter root.
+    """
+    # Verzeichnis: Einträge nummerieren und je Storage die Untereinträge als Rot-Schwarz-Baum verknüpfen
+    entries = []
+    pending_entries = [root]
+    while pending_entries:
+        entry = pending_entries.pop()
+        entry.index = len(entries)
+        entries.append(entry)
+        pending_entries.extend(reversed(entry.children))
+    for entry in entries:
+        if entry.children:
+            ordered_children = sorted(entry.children, key=_entry_sort_key)
+            entry.child = _build_sibling_tree(ordered_children, 0, len(ordered_children), 0, len(ordered_children).bit_length() - 1)
+
+    # Streams ab 4096 Byte in eigenen Sektoren, kleinere im Mini-Stream
+    allocator = _SectorAllocator()
+    mini_stream = bytearray()
+    mini_fat: list[int] = []
+    for entry in entries:
+        if entry.entry_type != _STREAM or not entry.data:
+            continue
+        if entry.size >= _MINI_STREAM_CUTOFF:
+            entry.start_sector = allocator.allocate(entry.data)
+        else:
+            mini_sector_count = -(-entry.size // _MINI_SECTOR_SIZE)
+            entry.start_sector = len(mini_fat)
+            mini_fat.extend(range(entry.start_sector + 1, entry.start_sector + mini_sector_count))
+            mini_fat.append(_ENDOFCHAIN)
+            mini_stream += entry.data
+            mini_stream += b"\0" * (mini_sector_count * _MINI_SECTOR_SIZE - entry.size)
+
+    root.start_sector = allocator.allocate(bytes(mini_stream))
+    root.size = len(mini_stream)
+    mini_fat += [_FREESECT] * (-len(mini_fat) % _FAT_ENTRIES_PER_SECTOR)
+    mini_fat_start_sector = allocator.allocate(struct.pack(f"<{len(mini_fat)}I", *mini_fat))
+    mini_fat_sector_count = len(mini_fat) // _FAT_ENTRIES_PER_SECTOR
+
+    directory_entries = entries + [None] * (-len(entries) % (_SECTOR_SIZE // _DIRECTORY_ENTRY_SIZE))
+    directory_start_sector = allocator.allocate(b"".join(_pack_directory_entry(entry) for entry in directory_entries))
+
+    # FAT- und DIFAT-Sektoren am Ende: so viele, dass die FAT alle Sektoren einschließlich ihrer eigenen erfasst
+    data_sector_count = len(allocator.fat)
+    fat_sector_count = 1
+    while True:
+        difat_sector_count = -(-max(0, fat_sector_count - _HEADER_DIFAT_COUNT) // (_FAT_ENTRIES_PER_SECTOR - 1))
+        if data_sector_count + fat_sector_count + difat_sector_count <= fat_sector_count * _FAT_ENTRIES_PER_SECTOR:
+            break
+        fat_sector_count += 1
+    fat_sectors = list(range(data_sector_count, data_sector_count + fat_sector_count))
+    difat_sectors = list(range(data_sector_count + fat_sector_count, data_sector_count + fat_sector_count + difat_sector_count))
+
+    fat = allocator.fat + [_FATSECT] * fat_sector_count + [_DIFSECT] * difat_sector_count
+    fat += [_FREESECT] * (fat_sector_count * _FAT_ENTRIES_PER_SECTOR - len(fat))
+    allocator.chunks.append(struct.pack(f"<{len(fat)}I", *fat))
+
+    extra_fat_sectors = fat_sectors[_HEADER_DIFAT_COUNT:]
+    for difat_number in range(difat_sector_count):
+        listed_sectors = extra_fat_sectors[difat_number * (_FAT_ENTRIES_PER_SECTOR - 1):(difat_number + 1) * (_FAT_ENTRIES_PER_SECTOR - 1)]
+        listed_sectors += [_FREESECT] * (_FAT_ENTRIES_PER_SECTOR - 1 - len(listed_sectors))
+        next_difat_sector = difat_sectors[difat_number + 1] if difat_number + 1 < difat_sector_count else _ENDOFCHAIN
+        allocator.chunks.append(struct.pack(f"<{_FAT_ENTRIES_PER_SECTOR}I", *listed_sectors, next_difat_sector))
+
+    header_difat = fat_sectors[:_HEADER_DIFAT_COUNT]
+    header_difat += [_FREESECT] * (_HEADER_DIFAT_COUNT - len(header_difat))
+    header = struct.pack("<8s16sHHHHH6sIIIIIIIII", _CFB_SIGNATURE, b"", 0x003E, 0x0003, 0xFFFE, 9, 6, b"", 0, fat_sector_count,
+                         directory_start_sector, 0, _MINI_STREAM_CUTOFF,
+                         mini_fat_start_sector if mini_fat_sector_count else _ENDOFCHAIN, mini_fat_sector_count,
+                         difat_sectors[0] if difat_sectors else _ENDOFCHAIN, difat_sector_count)
+    header += struct.pack(f"<{_HEADER_DIFAT_COUNT}I", *header_difat)
+    return header + b"".join(allocator.chunks)
+
+
+def _to_filetime(value: datetime) -> int:
+    """
+    Wandelt einen Zeitpunkt in FILETIME um (ohne Zeitzone als UTC interpretiert).
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - _FILETIME_EPOCH
+    return (delta.days * 86400 + delta.seconds) * 10_000_000 + delta.microseconds * 10
+
+
+def _property_storage(properties: list, header: bytes, children: Optional[list] = None) -> list:
+    """
+    Erzeugt den Properties-Stream und die __substg1.0-Streams für eine Liste von (Tag, Wert).
+
+    Parameter:
+    properties (list): Eigenschaften als (Tag, Wert); Tag = (ID << 16) | Typ, Werte mit None werden übergangen.
+    header (bytes): Kopf des Properties-Streams (32 Byte für die Nachricht, 8 Byte für Empfänger und Anhänge).
+    children (list): Weitere Einträge des Storage (z.B. Empfänger- und Anhang-Storages).
+
+    Rückgabewert:
+    list: Die Einträge des Storage (Properties-Stream, String-/Binär-Streams und children).
+    """
+    records = [header]
+    entries = list(children or [])
+    for tag, value in properties:
+        if value is None:
+            continue
+        property_type = tag & 0xFFFF
+        if property_type in (_PT_UNICODE, _PT_BINARY):
+            data = value.encode("utf-16-le") if property_type == _PT_UNICODE else value
+            entries.append(_DirectoryEntry(f"__substg1.0_{tag:08X}", _STREAM, data))
+            value_bytes = struct.pack("<II", len(data) + (2 if property_type == _PT_UNICODE else 0), 0)
+        elif property_type == _PT_SYSTIME:
+            value_bytes = struct.pack("<Q", _to_filetime(value))
+        elif property_type == _PT_BOOLEAN:
+            value_bytes = struct.pack("<H6x", 1 if value else 0)
+        else:
+            value_bytes = struct.pack("<I4x", value & 0xFFFFFFFF)
+        records.append(struct.pack("<II", tag, _PROPERTY_FLAGS) + value_bytes)
+    entries.append(_DirectoryEntry("__properties_version1.0", _STREAM, b"".join(records)))
+    return entries
+
+
+def _short_filename(filename: str) -> str:
+    """
+    Kurzer Dateiname im 8.3-Format (wie PR_ATTACH_FILENAME).
+    """
+    stem, extension = os.path.splitext(filename)
+    stem = "".join(character for character in stem.upper() if character.isascii() and character.isalnum())[:6] or "ANHANG"
+    return f"{stem}~1{extension[:4].upper()}"
+
+
+def _transport_headers(message: MsgMessage) -> str:
+    """
+    Internet-Kopfzeilen der Nachricht (nur die vorhandenen Felder).
+    """
+    lines = []
+    if message.sender_email or message.sender_name:
+        lines.append("From: " + email.utils.formataddr((message.sender_name or "", message.sender_email or ""), charset="utf-8"))
+    if message.recipients:
+        lines.append("To: " + ", ".join(email.utils.formataddr((name, address), charset="utf-8") for name, address in message.recipients))
+    if message.subject is not None:
+        lines.append("Subject: " + Header(message.subject, "utf-8").encode())
+    if message.sent_time is not None:
+        sent_time = message.sent_time if message.sent_time.tzinfo else message.sent_time.replace(tzinfo=timezone.utc)
+        lines.append("Date: " + email.utils.format_datetime(sent_time))
+    if message.message_id:
+        lines.append(f"Message-ID: <{message.message_id}>")
+    lines.append("MIME-Version: 1.0")
+    lines.append("Content-Type: " + ("multipart/mixed" if message.attachments else "text/plain; charset=\"utf-8\""))
+    return "\r\n".join(lines) + "\r\n\r\n"
+
+
+def build_msg_bytes(message: MsgMessage) -> bytes:
+    """
+    Erzeugt den Inhalt einer MSG-Datei (Compound File) für eine Nachricht.
+
+    Parameter:
+    message (MsgMessage): Die Nachricht.
+
+    Rückgabewert:
+    bytes: Inhalt der MSG-Datei.
+    """
+    recipient_storages = []
+    for recipient_number, (name, address) in enumerate(message.recipients):
+        properties = [
+            (0x0C150003, _MAPI_TO),           # PR_RECIPIENT_TYPE
+            (0x3001001F, name or address),    # PR_DISPLAY_NAME
+            (0x3002001F, "SMTP"),             # PR_ADDRTYPE
+            (0x3003001F, address),            # PR_EMAIL_ADDRESS
+            (0x39FE001F, address),            # PR_SMTP_ADDRESS
+            (0x5FF6001F, name or address),    # PR_RECIPIENT_DISPLAY_NAME
+            (0x30000003, recipient_number),   # PR_ROWID
+        ]
+        recipient_storages.append(_DirectoryEntry(f"__recip_version1.0_#{recipient_number:08X}", _STORAGE,
+                                                  children=_property_storage(properties, b"\0" * 8)))
+
+    attachment_storages = []
+    for attachment_number, attachment in enumerate(message.attachments):
+        properties = [
+            (0x0E200003, len(attachment.data)),                     # PR_ATTACH_SIZE
+            (0x0E210003, attachment_number),                        # PR_ATTACH_NUM
+            (0x37010102, attachment.data),                          # PR_ATTACH_DATA_BIN
+            (0x3703001F, os.path.splitext(attachment.filename)[1]), # PR_ATTACH_EXTENSION
+            (0x3704001F, _short_filename(attachment.filename)),     # PR_ATTACH_FILENAME
+            (0x37050003, _ATTACH_BY_VALUE),                         # PR_ATTACH_METHOD
+            (0x3707001F, attachment.filename),                      # PR_ATTACH_LONG_FILENAME
+            (0x370E001F, attachment.mime_type),                     # PR_ATTACH_MIME_TAG
+            (0x37140003, 0xFFFFFFFF),                               # PR_RENDERING_POSITION
+        ]
+        attachment_storages.append(_DirectoryEntry(f"__attach_version1.0_#{attachment_number:08X}", _STORAGE,
+                                                   children=_property_storage(properties, b"\0" * 8)))
+
+    name_id_storage = _DirectoryEntry("__nameid_version1.0", _STORAGE, children=[
+        _DirectoryEntry("__substg1.0_00020102", _STREAM),  # GUID-Stream
+        _DirectoryEntry("__substg1.0_00030102", _STREAM),  # Entry-Stream
+        _DirectoryEntry("__substg1.0_00040102", _STREAM),  # String-Stream
+    ])
+
+    display_to = "; ".join(name or address for name, address in message.recipients) if message.recipients else None
+    properties = [
+        (0x001A001F, "IPM.Note"),                                                               # PR_MESSAGE_CLASS
+        (0x0037001F, message.subject),                                                          # PR_SUBJECT
+        (0x00390040, message.sent_time),                                                        # PR_CLIENT_SUBMIT_TIME
+        (0x0042001F, message.sender_name),                                                      # PR_SENT_REPRESENTING_NAME
+        (0x0065001F, message.sender_email),                                                     # PR_SENT_REPRESENTING_EMAIL_ADDRESS
+        (0x007D001F, _transport_headers(message) if message.transport_headers else None),       # PR_TRANSPORT_MESSAGE_HEADERS
+        (0x0C1A001F, message.sender_name),                                                      # PR_SENDER_NAME
+        (0x0C1E001F, "SMTP" if message.sender_email else None),                                 # PR_SENDER_ADDRTYPE
+        (0x0C1F001F, message.sender_email),                                                     # PR_SENDER_EMAIL_ADDRESS
+        (0x0E04001F, display_to),                                                               # PR_DISPLAY_TO
+        (0x0E060040, message.sent_time),                                                        # PR_MESSAGE_DELIVERY_TIME
+        (0x0E070003, _MSGFLAG_READ),                                                            # PR_MESSAGE_FLAGS
+        (0x0E1B000B, bool(message.attachments)),                                                # PR_HASATTACH
+        (0x1000001F, message.body),                                                             # PR_BODY
+        (0x1035001F, f"<{message.message_id}>" if message.message_id else None),                # PR_INTERNET_MESSAGE_ID
+        (0x340D0003, _STORE_UNICODE_OK),                                                        # PR_STORE_SUPPORT_MASK
+        (0x5D01001F, message.sender_email),                                                     # PR_SENDER_SMTP_ADDRESS
+    ]
+    recipient_count = len(message.recipients)
+    attachment_count = len(message.attachments)
+    header = struct.pack("<8xIIII8x", recipient_count, attachment_count, recipient_count, attachment_count)
+    root = _DirectoryEntry("Root Entry", _ROOT_STORAGE,
+                           children=_property_storage(properties, header, [name_id_storage] + recipient_storages + attachment_storages))
+    return _build_compound_file(root)
+
+
+def write_msg_file(path_and_file_name: str, message: MsgMessage) -> int:
+    """
+    Schreibt eine Nachricht als MSG-Datei.
+
+    Parameter:
+    path_and_file_name (str): Pfad und Name der MSG-Datei (eine vorhandene Datei wird überschrieben).
+    message (MsgMessage): Die Nachricht.
+
+    Rückgabewert:
+    int: Größe der geschriebenen Datei in Byte.
+    """
+    data = build_msg_bytes(message)
+    with open(path_and_file_name, "wb") as msg_file:
+        msg_file.write(data)
+    return len(data)
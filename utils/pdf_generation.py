@@ -15,17 +15,38 @@ Verwendungszweck:
 - Erstellung eines PDF-Dokuments mit formatiertem E-Mail-Inhalt und Anhängen.
 - Unterstützung der Darstellung auch bei längeren Inhalten und komplexen Formatierungen.
 
+Schriftarten-Cache:
+Die Schriftarten (NotoSans Regular und Bold) werden je Prozess nur einmal gelesen und ausgewertet (Zeichenbreiten,
+Glyphen-Zuordnung). Jedes weitere Dokument erhält eine Kopie der ausgewerteten Schriftart mit eigener Teilmenge der
+verwendeten Zeichen; die Schriftdatei wird aus dem Speicher geladen. Das Seitengerüst (erste Seite, Schriftarten,
+Hinweistext) wird von create_pdf_document() erzeugt.
+Der Cache verwendet interne Attribute von fpdf2 (TTFFont, SubsetMap) und ist nur mit fpdf2 2.8 geprüft
+(requirements.txt). Fehlen die erwarteten Attribute, wird die Schriftart wie bisher je Dokument mit FPDF.add_font geladen.
+
+Sammel-PDF:
+generate_consolidated_pdf_from_msgs() gibt mehrere E-Mails in ein PDF-Dokument aus (je E-Mail eine neue Seite und ein
+Lesezeichen), z.B. alle E-Mails eines Verzeichnisses oder eines Versandmonats (modules.msg_pdf_consolidation).
+
 Abhängigkeiten:
 - fpdf (zur PDF-Erzeugung)
 - Standardbibliotheken wie os, logging, re
 - Modul 'modules.msg_handling' für den Zugriff auf MSG-Dateien und Statusabfragen.
 """
 
+import html
 import os
 import re
 import unicodedata
+from io import BytesIO
+from typing import Optional
+import fpdf
 from fpdf import FPDF
-from modules.msg_handling import MsgAccessStatus, get_msg_object
+try:
+    from fpdf.fonts import TTFFont, SubsetMap
+except ImportError:  # Andere fpdf2-Version: Schriftarten ohne Cache laden
+    TTFFont = SubsetMap = None
+from fontTools import ttLib
+from modules.msg_handling import MsgAccessStatus, get_msg_object, reduce_thread_in_msg_message
 
 from logger import initialize_logger
 app_logger = initialize_logger(__name__)
@@ -33,69 +54,139 @@ app_logger.debug("Debug-Logging im Modul 'msg_to_pdf' aktiviert.")
 
 ALLOWED_CONTROL_CHARACTERS = ['\n', '\t', '\r', '\f', '\v']
 
+# Status von get_msg_object, bei denen die MSG-Datei nicht gelesen werden konnte (nicht in ein Sammel-PDF übernehmen)
+UNREADABLE_MSG_STATUS = {MsgAccessStatus.DATA_NOT_FOUND, MsgAccessStatus.FILE_NOT_FOUND, MsgAccessStatus.PERMISSION_ERROR,
+                         MsgAccessStatus.TYPE_ERROR, MsgAccessStatus.VALUE_ERROR, MsgAccessStatus.OTHER_ERROR}
+
+# Schriftarten für den PDF-Ausdruck: (Familie, Stil, Datei)
+PDF_FONTS = [
+    ("NotoSans", "", "./font/NotoSans-Regular.ttf"),
+    ("NotoSans", "B", "./font/NotoSans-Bold.ttf"),
+]
+
+# Cache der ausgewerteten Schriftarten je Prozess: (Familie, Stil, Datei) -> (Inhalt der Schriftdatei, TTFFont-Vorlage)
+_font_cache = {}
+
+# Interne Attribute von TTFFont, die der Schriftarten-Cache kopiert bzw. je Dokument neu setzt (geprüft mit fpdf2 2.8.9)
+_FONT_CACHE_REQUIRED_ATTRIBUTES = ("i", "cw", "ttffile", "subset", "ttfont", "missing_glyphs", "biggest_size_pt", "_hbfont")
+
+# None = noch nicht geprüft, sonst Ergebnis von _is_font_cache_supported() für die installierte fpdf2-Version
+_font_cache_supported = None
+
+
+class _PrintableCharacterTable(dict):
+    """
+    Tabelle Zeichen -> erlaubt (druckbar oder explizit erlaubtes Steuerzeichen). Die Prüfung mit str.isprintable()
+    erfolgt je Zeichen nur einmal; danach ist das Ergebnis in der Tabelle zwischengespeichert.
+    """
+
+    def __init__(self, allowed_characters: str):
+        super().__init__()
+        self.allowed_characters = set(allowed_characters)
+
+    def __missing__(self, character: str) -> bool:
+        value = character in self.allowed_characters or character.isprintable()
+        self[character] = value
+        return value
+
+
+def _remove_unprintable_chars(text: str, printable_table: _PrintableCharacterTable) -> str:
+    """
+    Entfernt alle Zeichen, die laut printable_table nicht erlaubt sind. Geprüft werden nur die verschiedenen Zeichen
+    des Textes; entfernt wird mit str.replace je unerlaubtem Zeichen.
+    """
+    for character in set(text):
+        if not printable_table[character]:
+            text = text.replace(character, '')
+    return text
+
+
+# Tabellen für das Entfernen nicht druckbarer Zeichen (clean_email_text bzw. remove_unsupported_chars)
+_PRINTABLE_OR_NEWLINE_TABLE = _PrintableCharacterTable('\n')
+_SUPPORTED_CHARACTERS_TABLE = _PrintableCharacterTable(''.join(ALLOWED_CONTROL_CHARACTERS))
+
+# Mehrfache Leerzeilen (Windows-Zeilenenden), in dieser Reihenfolge ersetzt
+_MULTIPLE_BLANK_LINES = [
+    ('\r\n\r\n \r\n\r\n \r\n\r\n  \r\n\r\n  \r\n\r\n', '\n\n\n'),
+    ('\r\n\r\n \r\n\r\n \r\n\r\n  \r\n\r\n', '\n\n'),
+    ('\r\n\r\n \r\n\r\n \r\n\r\n', '\n\n'),
+    ('\r\n\r\n \r\n\r\n', '\n\n'),
+    ('\r\n\r\n', '\n'),
+]
+
+# Leerzeichen und Tabulatoren vor oder nach einem Zeilenumbruch
+_SPACES_AROUND_NEWLINE_PATTERN = re.compile(r'[ \t]*\n[ \t]*')
+
+# Mehr als zwei Zeilenumbrüche (auch mit Leerraum dazwischen)
+_MULTIPLE_NEWLINES_PATTERN = re.compile(r'(\n\s*){3,}')
+
+# Typische deutsche Grußformeln, vor denen mindestens eine Leerzeile stehen soll
+CLOSING_PHRASES = [
+    "Mit freundlichen Grüßen",
+    "Viele Grüße",
+    "Herzliche Grüße",
+    "Beste Grüße",
+    "Mit besten Grüßen",
+    "Mit herzlichen Grüßen"
+]
+_CLOSING_PHRASES_PATTERN = re.compile(rf"(?<!\n)\n({'|'.join(re.escape(phrase) for phrase in CLOSING_PHRASES)})")
+
+# Spezialfall für eine spezifische E-Mail-Adresse
+_SPECIAL_EMAIL_PATTERN = re.compile(rf'E-Mail: ruediger.zoelch@lgl.bayern.de <mailto:ruediger.zoelch@lgl.bayern.de>')
+_SPECIAL_EMAIL_REPLACEMENT = rf"E-Mail: ruediger.zoelch@lgl.bayern.de <mailto:ruediger.zoelch@lgl.bayern.de>\n"
+
+# Spezielle Zeichen, z.B. Emojis
+SPECIAL_CHARACTERS = {
+    "\U0001f60a": ":)",
+    "\U0001f603": ":)",
+    "\U0001f614": ":)",
+    "\U0001f622": ":)",
+}
+
 
 def clean_email_text(text):
     """
     Bereinigt den Text einer E-Mail, um die Lesbarkeit zu verbessern und unnötige Leerzeilen zu entfernen.
 
+    Alle Muster sind vorab kompiliert; Literal-Ersetzungen laufen über str.replace, Schritte ohne Treffer werden
+    übersprungen und nicht druckbare Zeichen über eine zwischengespeicherte Zeichentabelle erkannt.
+
     :param text: Der ursprüngliche E-Mail-Text.
     :return: Der bereinigte E-Mail-Text.
     """
 
     # 1. Decode eventuell vorhandene HTML-Entities (falls notwendig)
-    import html
     text = html.unescape(text)
 
     # 2. Tabulator durch Leerzeichen
     text = text.replace('\t', '    ')
 
-    # 3a. Mehrfache Leerzeilen Fall 1
-    text = re.sub('\r\n\r\n \r\n\r\n \r\n\r\n  \r\n\r\n  \r\n\r\n', '\n\n\n', text)
-
-    # 3b. Mehrfache Leerzeilen Fall 2
-    text = re.sub('\r\n\r\n \r\n\r\n \r\n\r\n  \r\n\r\n', '\n\n', text)
-
-    # 3c. Mehrfache Leerzeilen Fall 3
-    text = re.sub('\r\n\r\n \r\n\r\n \r\n\r\n', '\n\n', text)
-
-    # 3d. Mehrfache Leerzeilen Fall 4
-    text = re.sub('\r\n\r\n \r\n\r\n', '\n\n', text)
-
-    # 3e. Mehrfache Leerzeilen Fall 6
-    text = re.sub('\r\n\r\n', '\n', text)
+    # 3. Mehrfache Leerzeilen (Fälle 1 bis 6, die Reihenfolge ist maßgeblich)
+    if '\r\n\r\n' in text:
+        for pattern, replacement in _MULTIPLE_BLANK_LINES:
+            text = text.replace(pattern, replacement)
 
     # 4. Normalize Windows-style line endings and remove extra spaces around newlines
     text = text.replace('\r\n', '\n').replace('\r', '\n')
-    text = re.sub(r'[ \t]+\n', '\n', text)
-    text = re.sub(r'\n[ \t]+', '\n', text)
+    if ' \n' in text or '\n ' in text:  # Tabulatoren sind bereits ersetzt
+        text = _SPACES_AROUND_NEWLINE_PATTERN.sub('\n', text)
 
     # 5. Reduce multiple newlines (with optional spaces in between) to a maximum of two
-    text = re.sub(r'(\n\s*){3,}', '\n\n', text)
+    text = _MULTIPLE_NEWLINES_PATTERN.sub('\n\n', text)
 
     # 6. Remove non-printable characters
-    text = ''.join(c for c in text if c.isprintable() or c in '\n')
+    text = _remove_unprintable_chars(text, _PRINTABLE_OR_NEWLINE_TABLE)
 
     # 7. Ensure at least one blank line before typical German closing phrases
-    closing_phrases = [
-        "Mit freundlichen Grüßen",
-        "Viele Grüße",
-        "Herzliche Grüße",
-        "Beste Grüße",
-        "Mit besten Grüßen",
-        "Mit herzlichen Grüßen"
-    ]
-
-    for phrase in closing_phrases:
-        text = re.sub(rf"(?<!\n)\n({phrase})", r"\n\n\1", text)
+    text = _CLOSING_PHRASES_PATTERN.sub(r"\n\n\1", text)
 
     # 8. Spezialfall für eine spezifische E-Mail-Adresse
-    text = re.sub(rf'E-Mail: ruediger.zoelch@lgl.bayern.de <mailto:ruediger.zoelch@lgl.bayern.de>', rf"E-Mail: ruediger.zoelch@lgl.bayern.de <mailto:ruediger.zoelch@lgl.bayern.de>\n", text)
+    text = _SPECIAL_EMAIL_PATTERN.sub(_SPECIAL_EMAIL_REPLACEMENT, text)
 
     # 9. Spezielle Zeichen ersetzen, z.B. Emojis
-    text = text.replace("\U0001f60a", ":)")
-    text = text.replace("\U0001f603", ":)")
-    text = text.replace("\U0001f614", ":)")
-    text = text.replace("\U0001f622", ":)")
+    for special_character, replacement in SPECIAL_CHARACTERS.items():
+        if special_character in text:
+            text = text.replace(special_character, replacement)
 
     return text.strip()
 
@@ -104,34 +195,105 @@ def remove_unsupported_chars(text):
     """
     Entfernt ungültige Zeichen und erlaubt nur explizit definierte Steuerzeichen.
     """
-    return ''.join(
-        c for c in text
-        if c in ALLOWED_CONTROL_CHARACTERS or c.isprintable()
-    )
+    return _remove_unprintable_chars(text, _SUPPORTED_CHARACTERS_TABLE)
 
 
-def generate_pdf_from_msg(msg_path_and_filename:str, MAX_LENGTH_SENDERLIST: int):
+def add_cached_font(pdf: FPDF, family: str, style: str, fname: str):
     """
-    Erzeugt ein PDF-Dokument aus einer MSG-Datei.
+    Fügt dem PDF-Dokument eine Schriftart hinzu (wie FPDF.add_font), liest und wertet die Schriftdatei aber nur einmal
+    je Prozess aus. Folgende Dokumente erhalten eine Kopie der ausgewerteten Schriftart (Zeichenbreiten, Glyphen-Zuordnung,
+    Font-Deskriptor) mit eigener Teilmenge der verwendeten Zeichen; die Schriftdatei wird aus dem Speicher geladen, da
+    fpdf2 sie beim Speichern des Dokuments auf die verwendeten Zeichen reduziert.
+    Bietet die installierte fpdf2-Version die dafür verwendeten internen Attribute nicht, wird nur FPDF.add_font aufgerufen.
+
+    Parameter:
+    pdf (FPDF): Das PDF-Dokument.
+    family (str): Name der Schriftfamilie.
+    style (str): Stil ("" oder "B").
+    fname (str): Pfad zur TTF-Datei.
+    """
+    global _font_cache_supported
+
+    if _font_cache_supported is False:
+        pdf.add_font(family, style=style, fname=fname)
+        return
+
+    cache_key = (family, style, fname)
+    fontkey = f"{family.lower()}{style}"
+
+    if cache_key not in _font_cache:
+        pdf.add_font(family, style=style, fname=fname)
+        loaded_font = pdf.fonts[fontkey]
+        if _font_cache_supported is None:
+            _font_cache_supported = _is_font_cache_supported(loaded_font)
+        if not _font_cache_supported:
+            return
+        with open(loaded_font.ttffile, "rb") as font_file:
+            font_data = font_file.read()
+        font_template = _copy_font(loaded_font)
+        font_template.ttfont = None  # Wird beim Speichern verändert, daher nicht in der Vorlage behalten
+        font_template.subset = None
+        _font_cache[cache_key] = (font_data, font_template)
+        app_logger.debug("Schriftart '%s' (%s) geladen und im Cache abgelegt.", fname, fontkey)  # Debugging-Ausgabe: Log-File
+        return
+
+    font_data, font_template = _font_cache[cache_key]
+    font = _copy_font(font_template)
+    font.i = len(pdf.fonts) + 1
+    font.ttfont = ttLib.TTFont(BytesIO(font_data), recalcTimestamp=False, lazy=True)
+    font.cw = font_template.cw.copy()  # defaultdict, wird bei fehlenden Zeichen ergänzt
+    font.missing_glyphs = []
+    font.biggest_size_pt = 0
+    font._hbfont = None
+    font.subset = SubsetMap(font)
+    pdf.fonts[fontkey] = font
+
+
+def _is_font_cache_supported(font) -> bool:
+    """
+    Prüft, ob die installierte fpdf2-Version die internen Attribute bietet, die der Schriftarten-Cache verwendet.
 
-    :param msg_path_and_filename: Der Dateiname der MSG-Datei.
-    :param MAX_LENGTH_SENDERLIST: Maximale Länge der Empfängerliste im PDF.
-    :return: Der Pfad zur erzeugten PDF-Datei.
+    Parameter:
+    font: Die von FPDF.add_font geladene Schriftart.
+
+    Rückgabewert:
+    bool: True, wenn der Cache verwendet werden kann, sonst False (Warnung im Log).
+    """
+    font_slots = getattr(TTFFont, "__slots__", ()) if TTFFont is not None else ()
+    missing_attributes = [attribute_name for attribute_name in _FONT_CACHE_REQUIRED_ATTRIBUTES
+                          if attribute_name not in font_slots]
+    if SubsetMap is None or not isinstance(font, TTFFont) or missing_attributes:
+        app_logger.warning("Schriftarten-Cache nicht verfügbar (fpdf2 %s, fehlende Attribute: %s); "
+                           "Schriftarten werden je Dokument geladen.",
+                           getattr(fpdf, "FPDF_VERSION", "?"), ", ".join(missing_attributes) or "TTFFont/SubsetMap")
+        return False
+    return True
+
+
+def _copy_font(font: TTFFont) -> TTFFont:
     """
+    Flache Kopie einer TTFFont (Klasse mit __slots__); gemeinsam genutzt werden nur unveränderliche Auswertungen.
+    """
+    font_copy = TTFFont.__new__(TTFFont)
+    for slot_name in TTFFont.__slots__:
+        if hasattr(font, slot_name):
+            setattr(font_copy, slot_name, getattr(font, slot_name))
+    return font_copy
 
-    # Vorbelegung der Rückgabewerte
-    is_generate_pdf_successful = False
-    pdf_path_and_filename = ""
 
-    # PDF erstellen
+def create_pdf_document() -> FPDF:
+    """
+    Erzeugt das Seitengerüst des PDF-Ausdrucks: erste Seite, Schriftarten (aus dem Cache) und Hinweistext.
+
+    Rückgabewert:
+    FPDF: Das vorbereitete PDF-Dokument mit Schriftart NotoSans (8 pt).
+    """
     pdf = FPDF()
     pdf.add_page()
 
-    # Schriftart NotoSans Regular laden
-    pdf.add_font("NotoSans", style="", fname="./font/NotoSans-Regular.ttf", uni=True)
-
-    # Schriftart NotoSans Bold laden
-    pdf.add_font("NotoSans", style="B", fname="./font/NotoSans-Bold.ttf", uni=True)
+    # Schriftarten NotoSans Regular und Bold laden (je Prozess nur einmal ausgewertet)
+    for family, style, fname in PDF_FONTS:
+        add_cached_font(pdf, family, style, fname)
 
     # Segoe UI TTF von Windows einbinden (Unicode-fähig)
     # pdf.add_font("Segoe", "", "C:\\Windows\\Fonts\\segoeui.ttf", uni=True)
@@ -140,141 +302,234 @@ def generate_pdf_from_msg(msg_path_and_filename:str, MAX_LENGTH_SENDERLIST: int)
     pdf.set_font("NotoSans", size=4)
     pdf.write(5, f"Dieser PDF-Ausdruck der Email ist eventuell gekürzt (max 6000 Zeichen). Zusätzlich können Beeinträchtigungen bei der Formatierung auftreten, z.B. Darstellung von Tabellen. Die vollständige Email findet sich in der zugehörigen MSG-Datei.\n")
     pdf.set_font("NotoSans", size=8)
+    return pdf
 
-    # Schritt 1: Überprüfen, ob der Pfad zu einer existierenden Datei führt
-    msg_object = {"status": [MsgAccessStatus.FILE_NOT_FOUND]} # Vorbelegung der Rückgabewerte, auch wenn kein msg_object erzeugt werden kann
-    if os.path.isfile(msg_path_and_filename):
-        app_logger.debug(f"Schritt 1: Die Datei '{msg_path_and_filename}' existiert.")  # Debugging-Ausgabe: Log-File
 
-        # Schritt 2: PDF-Dateiname festlegen
-        pdf_path_and_filename = os.path.splitext(msg_path_and_filename)[0] + ".pdf"
-        app_logger.debug(f"Schritt 2: Dateiname für PDF-Dokument '{pdf_path_and_filename}'.")  # Debugging-Ausgabe: Log-File
+def write_msg_object_to_pdf(pdf: FPDF, msg_object: dict, MAX_LENGTH_SENDERLIST: int, max_quoted_emails: Optional[int] = None):
+    """
+    Gibt den Inhalt einer E-Mail (Versandzeitpunkt, Absender, Empfänger, Betreff, Inhalt, Anhänge) an der aktuellen
+    Position des PDF-Dokuments aus.
+
+    Parameter:
+    pdf (FPDF): Das PDF-Dokument (z.B. aus create_pdf_document()).
+    msg_object (dict): Ergebnis von get_msg_object().
+    MAX_LENGTH_SENDERLIST (int): Maximale Länge der Empfängerliste im PDF.
+    max_quoted_emails (int): Maximale Anzahl zitierter älterer E-Mails im Inhalt (None = alle ausgeben).
+    """
+    # Schritt 4: Zeitstempel ausgeben
+    if not MsgAccessStatus.DATE_MISSING in msg_object["status"]:
+        msg_date = msg_object["date"]
+        app_logger.debug("Schritt 4: Zeitstempel für PDF-Ausgabe '%s'.", msg_date)  # Debugging-Ausgabe: Log-File
 
-        # Schritt 3: Auslesen des msg-Objektes und bei Fehler abbrechen
         try:
-            msg_object = get_msg_object(msg_path_and_filename)
+            pdf.set_font("NotoSans", style="B", size=8)
+            pdf.write(5, f"Versandzeitpunkt: ")
+            pdf.set_font("NotoSans", size=8)
+            pdf.write(5, f"{msg_date}\n")
         except Exception as e:
-            app_logger.warning(f"Schritt 3: Fehler bei der PDF-Erstellung da kein Zugriff auf msg_object: {e}")
-            is_generate_pdf_successful = False
-            return is_generate_pdf_successful, pdf_path_and_filename
+            app_logger.warning("Schritt 4: Fehler bei der PDF-Erstellung: %s", e)
 
-        # Schritt 4: Zeitstempel ausgeben
-        if not MsgAccessStatus.DATE_MISSING in msg_object["status"]:
-            msg_date = msg_object["date"]
-            app_logger.debug(f"Schritt 4: Zeitstempel für PDF-Ausgabe '{msg_date}'.")  # Debugging-Ausgabe: Log-File
-
-            try:
-                pdf.set_font("NotoSans", style="B", size=8)
-                pdf.write(5, f"Versandzeitpunkt: ")
-                pdf.set_font("NotoSans", size=8)
-                pdf.write(5, f"{msg_date}\n")
-            except Exception as e:
-                app_logger.warning(f"Schritt 4: Fehler bei der PDF-Erstellung: {e}")
-
-        # Schritt 5: Sender ausgeben
-        if not MsgAccessStatus.SENDER_MISSING in msg_object["status"]:
-            msg_sender = msg_object["sender"]
-            msg_sender = remove_unsupported_chars(msg_sender)
-            app_logger.debug(f"Schritt 5: Sender für PDF-Ausgabe '{msg_sender}'.")  # Debugging-Ausgabe: Log-File
-
-            try:
-                pdf.set_font("NotoSans", style="B", size=8)
-                pdf.write(5, f"Absender: ")
-                pdf.set_font("NotoSans", size=8)
-                pdf.write(5, f"{msg_sender}\n")
-            except Exception as e:
-                app_logger.warning(f"Schritt 5: Fehler bei der PDF-Erstellung: {e}")
-
-        # Schritt 6: Empfänger ausgeben
-        if not MsgAccessStatus.NO_RECIPIENT_FOUND in msg_object["status"]:
-            msg_recipient = msg_object["recipient"]
-
-            # Extract email addresses using regex
-            emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', msg_recipient)
-            email_list = ', '.join(emails)
-
-            # Truncate the email list if it exceeds the maximum length
-            if len(email_list) > MAX_LENGTH_SENDERLIST:
-                email_list = email_list[:MAX_LENGTH_SENDERLIST] + '<GEKÜRZT>'
-
-            # Remove unsupported characters
-            cleaned_text = remove_unsupported_chars(email_list)
-
-            try:
-                pdf.set_font("NotoSans", style="B", size=8)
-                pdf.write(5, f"Empfänger: ")
-                pdf.set_font("NotoSans", size=8)
-                pdf.write(5, f"{cleaned_text}\n")
-            except Exception as e:
-                app_logger.warning(f"Schritt 6: Fehler bei der PDF-Erstellung: {e}")
-
-        # Schritt 7: Betreff ausgeben
-        if not MsgAccessStatus.SUBJECT_MISSING in msg_object["status"]:
-            cleaned_text = msg_object["subject"]
-            cleaned_text = remove_unsupported_chars(cleaned_text)
-            app_logger.debug(f"Schritt 7: Betreff für PDF-Ausgabe '{cleaned_text}'.")  # Debugging-Ausgabe: Log-File
-
-            # PDF-Inhalt hinzufügen
-            try:
-                pdf.set_font("NotoSans", style="B", size=8)
-                pdf.write(5, f"Betreff: ")
-                pdf.set_font("NotoSans", size=8)
-                pdf.write(5, f"{cleaned_text}\n")
-            except Exception as e:
-                app_logger.warning(f"Schritt 7:  Fehler bei der PDF-Erstellung: {e}")
-
-        # Schritt 8: Inhalt ausgeben
-        if not MsgAccessStatus.BODY_MISSING in msg_object["status"]:
-            msg_body = msg_object["body"]
-
-            # Truncate the body if it exceeds certain number of characters
-            MAX_BODY_LENGTH = 6000
-            if len(msg_body) > MAX_BODY_LENGTH:
-                pdf.set_font("NotoSans", size=8)
-                msg_body = msg_body[:MAX_BODY_LENGTH] + '\n<HINWEIS: NACHRICHT WURDE AUF 6000 ZEICHEN GEKÜRZT! VOLLSTÄNDIGE NACHRICHT SIEHE GLEICHNAMIGES MSG-FILE>'
-
-            # Body ausgeben
-            pdf.set_font("NotoSans", style="B", size=10)
-            pdf.write(5, f"\nInhalt:\n")
+    # Schritt 5: Sender ausgeben
+    if not MsgAccessStatus.SENDER_MISSING in msg_object["status"]:
+        msg_sender = msg_object["sender"]
+        msg_sender = remove_unsupported_chars(msg_sender)
+        app_logger.debug("Schritt 5: Sender für PDF-Ausgabe '%s'.", msg_sender)  # Debugging-Ausgabe: Log-File
+
+        try:
+            pdf.set_font("NotoSans", style="B", size=8)
+            pdf.write(5, f"Absender: ")
             pdf.set_font("NotoSans", size=8)
+            pdf.write(5, f"{msg_sender}\n")
+        except Exception as e:
+            app_logger.warning("Schritt 5: Fehler bei der PDF-Erstellung: %s", e)
 
-            # Text bereinigen, damit kompakte Darstellung möglich
-            cleaned_text = clean_email_text(msg_body)  # <- dein ausgelesener Text
-            cleaned_text = remove_unsupported_chars(cleaned_text)
-            app_logger.debug(f"Schritt 8: Body-Text wurde bereinigt und besitzt nach Kürzung eine Länge von {len(cleaned_text)}")  # Debugging-Ausgabe: Log-File
+    # Schritt 6: Empfänger ausgeben
+    if not MsgAccessStatus.NO_RECIPIENT_FOUND in msg_object["status"]:
+        msg_recipient = msg_object["recipient"]
 
-            # Text ausgeben
-            try:
-                pdf.write(5, f"{cleaned_text}")
-            except Exception as e:
-                app_logger.warning(f"Schritt 8:  Fehler bei der PDF-Erstellung: {e}")
+        # Extract email addresses using regex
+        emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', msg_recipient)
+        email_list = ', '.join(emails)
 
-        else:
-            pdf.set_font("NotoSans", style="B", size=10)
-            pdf.write(5, f"\nInhalt:\n")
+        # Truncate the email list if it exceeds the maximum length
+        if len(email_list) > MAX_LENGTH_SENDERLIST:
+            email_list = email_list[:MAX_LENGTH_SENDERLIST] + '<GEKÜRZT>'
+
+        # Remove unsupported characters
+        cleaned_text = remove_unsupported_chars(email_list)
+
+        try:
+            pdf.set_font("NotoSans", style="B", size=8)
+            pdf.write(5, f"Empfänger: ")
             pdf.set_font("NotoSans", size=8)
-            pdf.write(5, f"\nHINWEIS: NACHRICHT OHNE INHALT ODER KANN NICHT GELESEN WERDEN (z.B. SIGNATURPRÜFUNG)!")
+            pdf.write(5, f"{cleaned_text}\n")
+        except Exception as e:
+            app_logger.warning("Schritt 6: Fehler bei der PDF-Erstellung: %s", e)
 
-        # Schritt 9: Anhänge ausgeben
-        if not MsgAccessStatus.ATTACHMENTS_MISSING in msg_object["status"]:
-            msg_attachments = msg_object["attachments"]
+    # Schritt 7: Betreff ausgeben
+    if not MsgAccessStatus.SUBJECT_MISSING in msg_object["status"]:
+        cleaned_text = msg_object["subject"]
+        cleaned_text = remove_unsupported_chars(cleaned_text)
+        app_logger.debug("Schritt 7: Betreff für PDF-Ausgabe '%s'.", cleaned_text)  # Debugging-Ausgabe: Log-File
+
+        # PDF-Inhalt hinzufügen
+        try:
             pdf.set_font("NotoSans", style="B", size=8)
-            pdf.write(5, f"\n\nAnhänge:\n")
+            pdf.write(5, f"Betreff: ")
+            pdf.set_font("NotoSans", size=8)
+            pdf.write(5, f"{cleaned_text}\n")
+        except Exception as e:
+            app_logger.warning("Schritt 7:  Fehler bei der PDF-Erstellung: %s", e)
+
+    # Schritt 8: Inhalt ausgeben
+    if not MsgAccessStatus.BODY_MISSING in msg_object["status"]:
+        msg_body = msg_object["body"]
+
+        # Zitierte ältere E-Mails (Antwortkette) vor Kürzung und Bereinigung entfernen
+        if max_quoted_emails is not None:
+            reduced_thread = reduce_thread_in_msg_message(msg_body, max_quoted_emails)
+            msg_body = reduced_thread["new_email_text"]
+            app_logger.debug("Schritt 8: %s zitierte ältere E-Mails entfernt.", reduced_thread['deleted_count'])  # Debugging-Ausgabe: Log-File
+
+        # Truncate the body if it exceeds certain number of characters
+        MAX_BODY_LENGTH = 6000
+        if len(msg_body) > MAX_BODY_LENGTH:
             pdf.set_font("NotoSans", size=8)
+            msg_body = msg_body[:MAX_BODY_LENGTH] + '\n<HINWEIS: NACHRICHT WURDE AUF 6000 ZEICHEN GEKÜRZT! VOLLSTÄNDIGE NACHRICHT SIEHE GLEICHNAMIGES MSG-FILE>'
+
+        # Body ausgeben
+        pdf.set_font("NotoSans", style="B", size=10)
+        pdf.write(5, f"\nInhalt:\n")
+        pdf.set_font("NotoSans", size=8)
+
+        # Text bereinigen, damit kompakte Darstellung möglich
+        cleaned_text = clean_email_text(msg_body)  # <- dein ausgelesener Text
+        cleaned_text = remove_unsupported_chars(cleaned_text)
+        app_logger.debug("Schritt 8: Body-Text wurde bereinigt und besitzt nach Kürzung eine Länge von %s", len(cleaned_text))  # Debugging-Ausgabe: Log-File
+
+        # Text ausgeben
+        try:
+            pdf.write(5, f"{cleaned_text}")
+        except Exception as e:
+            app_logger.warning("Schritt 8:  Fehler bei der PDF-Erstellung: %s", e)
+
+    else:
+        pdf.set_font("NotoSans", style="B", size=10)
+        pdf.write(5, f"\nInhalt:\n")
+        pdf.set_font("NotoSans", size=8)
+        pdf.write(5, f"\nHINWEIS: NACHRICHT OHNE INHALT ODER KANN NICHT GELESEN WERDEN (z.B. SIGNATURPRÜFUNG)!")
+
+    # Schritt 9: Anhänge ausgeben
+    if not MsgAccessStatus.ATTACHMENTS_MISSING in msg_object["status"]:
+        msg_attachments = msg_object["attachments"]
+        pdf.set_font("NotoSans", style="B", size=8)
+        pdf.write(5, f"\n\nAnhänge:\n")
+        pdf.set_font("NotoSans", size=8)
+
+        for filename in msg_object["attachments"]:
+           pdf.write(5, f"- {filename}\n")
+
+
+def generate_pdf_from_msg(msg_path_and_filename:str, MAX_LENGTH_SENDERLIST: int, max_quoted_emails: Optional[int] = None):
+    """
+    Erzeugt ein PDF-Dokument aus einer MSG-Datei.
+
+    :param msg_path_and_filename: Der Dateiname der MSG-Datei.
+    :param MAX_LENGTH_SENDERLIST: Maximale Länge der Empfängerliste im PDF.
+    :param max_quoted_emails: Maximale Anzahl zitierter älterer E-Mails im Inhalt (None = alle ausgeben).
+    :return: Der Pfad zur erzeugten PDF-Datei.
+    """
+
+    # Vorbelegung der Rückgabewerte
+    is_generate_pdf_successful = False
+    pdf_path_and_filename = ""
+
+    # PDF erstellen (Seitengerüst mit Schriftarten aus dem Cache)
+    pdf = create_pdf_document()
+
+    # Schritt 1: Überprüfen, ob der Pfad zu einer existierenden Datei führt
+    msg_object = {"status": [MsgAccessStatus.FILE_NOT_FOUND]} # Vorbelegung der Rückgabewerte, auch wenn kein msg_object erzeugt werden kann
+    if os.path.isfile(msg_path_and_filename):
+        app_logger.debug("Schritt 1: Die Datei '%s' existiert.", msg_path_and_filename)  # Debugging-Ausgabe: Log-File
+
+        # Schritt 2: PDF-Dateiname festlegen
+        pdf_path_and_filename = os.path.splitext(msg_path_and_filename)[0] + ".pdf"
+        app_logger.debug("Schritt 2: Dateiname für PDF-Dokument '%s'.", pdf_path_and_filename)  # Debugging-Ausgabe: Log-File
+
+        # Schritt 3: Auslesen des msg-Objektes und bei Fehler abbrechen
+        try:
+            msg_object = get_msg_object(msg_path_and_filename)
+        except Exception as e:
+            app_logger.warning("Schritt 3: Fehler bei der PDF-Erstellung da kein Zugriff auf msg_object: %s", e)
+            is_generate_pdf_successful = False
+            return is_generate_pdf_successful, pdf_path_and_filename
 
-            for filename in msg_object["attachments"]:
-               pdf.write(5, f"- {filename}\n")
+        # Schritte 4 bis 9: Inhalt der E-Mail ausgeben
+        write_msg_object_to_pdf(pdf, msg_object, MAX_LENGTH_SENDERLIST, max_quoted_emails)
 
         # Speichern der PDF-Datei
         pdf.output(pdf_path_and_filename)
 
         is_generate_pdf_successful = True
 
-        app_logger.debug(f"\tDie PDF wurde unter '{os.path.abspath(pdf_path_and_filename)}' gespeichert.")
+        app_logger.debug("\tDie PDF wurde unter '%s' gespeichert.", os.path.abspath(pdf_path_and_filename))
 
     else:
         #print(f"\tDie MSG-Datei '{msg_path_and_filename}' konnte nicht gelesen werden.")
-        app_logger.warning(f"Die MSG-Datei '{msg_path_and_filename}' konnte nicht gelesen werden.")
+        app_logger.warning("Die MSG-Datei '%s' konnte nicht gelesen werden.", msg_path_and_filename)
         is_generate_pdf_successful = False
 
-    return is_generate_pdf_successful, pdf_path_and_filename
\ No newline at end of file
+    return is_generate_pdf_successful, pdf_path_and_filename
+
+def generate_consolidated_pdf_from_msgs(msg_path_and_filenames: list[str], pdf_path_and_filename: str, MAX_LENGTH_SENDERLIST: int,
+                                        max_quoted_emails: Optional[int] = None) -> tuple[int, list[str]]:
+    """
+    Erzeugt ein Sammel-PDF mit mehreren E-Mails. Jede E-Mail beginnt auf einer neuen Seite und erhält einen Eintrag in
+    der Gliederung (Lesezeichen) mit ihrem Dateinamen.
+
+    Die MSG-Dateien werden nacheinander eingelesen und ausgegeben; es wird jeweils nur ein msg_object im Speicher gehalten.
+    Das PDF wird zunächst in eine temporäre Datei geschrieben und erst danach umbenannt, damit ein Abbruch kein
+    unvollständiges Sammel-PDF hinterlässt.
+
+    Parameter:
+    msg_path_and_filenames (list[str]): Absolute Dateinamen der MSG-Dateien in der Reihenfolge der Ausgabe.
+    pdf_path_and_filename (str): Absoluter Dateiname des Sammel-PDF.
+    MAX_LENGTH_SENDERLIST (int): Maximale Länge der Empfängerliste im PDF.
+    max_quoted_emails (int): Maximale Anzahl zitierter älterer E-Mails je E-Mail (None = alle ausgeben).
+
+    Rückgabewert:
+    tuple[int, list[str]]: Anzahl der ausgegebenen E-Mails und Liste der MSG-Dateien, die nicht gelesen werden konnten.
+    """
+    pdf = create_pdf_document()
+    written_count = 0
+    failed_msg_files = []
+
+    for msg_path_and_filename in msg_path_and_filenames:
+        try:
+            msg_object = get_msg_object(msg_path_and_filename)
+        except Exception as e:
+            msg_object = {"status": [MsgAccessStatus.OTHER_ERROR]}
+            app_logger.warning("Fehler beim Lesen der MSG-Datei '%s': %s", msg_path_and_filename, e)
+        if any(status in UNREADABLE_MSG_STATUS for status in msg_object["status"]):
+            app_logger.warning("Die MSG-Datei '%s' konnte für das Sammel-PDF nicht gelesen werden: %s", msg_path_and_filename, [s.value for s in msg_object['status']])
+            failed_msg_files.append(msg_path_and_filename)
+            continue
+
+        # Jede E-Mail auf einer neuen Seite (die erste nach dem Hinweistext), mit Lesezeichen und Dateiname als Überschrift
+        if written_count:
+            pdf.add_page()
+        msg_title = remove_unsupported_chars(os.path.splitext(os.path.basename(msg_path_and_filename))[0])
+        pdf.start_section(msg_title, level=0)
+        pdf.set_font("NotoSans", style="B", size=10)
+        pdf.write(5, f"{msg_title}\n")
+        pdf.set_font("NotoSans", size=8)
+
+        write_msg_object_to_pdf(pdf, msg_object, MAX_LENGTH_SENDERLIST, max_quoted_emails)
+        written_count += 1
+
+    if written_count:
+        pdf.output(pdf_path_and_filename + ".tmp")
+        os.replace(pdf_path_and_filename + ".tmp", pdf_path_and_filename)
+        app_logger.debug("Sammel-PDF mit %s E-Mails unter '%s' gespeichert.", written_count, pdf_path_and_filename)  # Debugging-Ausgabe: Log-File
+
+    return written_count, failed_msg_files
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+pdf_text_golden.py
+
+Dieses Modul sichert ab, dass die beschleunigte Textbereinigung für die PDF-Erzeugung (clean_email_text und
+remove_unsupported_chars in utils.pdf_generation) dieselben Ergebnisse liefert wie die bisherige Umsetzung.
+
+Goldene Testfälle:
+- Die Datei benchmarks/pdf_text_golden.json enthält Eingabetexte mit den erwarteten Ergebnissen beider Funktionen.
+- Die erwarteten Ergebnisse stammen aus der bisherigen Umsetzung (clean_email_text_reference,
+  remove_unsupported_chars_reference), die hier unverändert als Referenz erhalten bleibt.
+- Die Eingaben werden reproduzierbar (seed) aus Bausteinen zusammengesetzt, die jeden Bereinigungsschritt auslösen:
+  CR/LF/Leerzeichen/Tabulator-Folgen, die Muster mehrfacher Leerzeilen, HTML-Entities, Steuer- und Formatzeichen,
+  Grußformeln, Emojis und der Spezialfall einer E-Mail-Adresse.
+
+msg_benchmark.py prüft die goldenen Testfälle vor jeder Messung und misst die Referenz zum Vergleich mit.
+
+Funktionen:
+- clean_email_text_reference(text), remove_unsupported_chars_reference(text): Bisherige Umsetzung.
+- generate_golden_cases(case_count, seed): Erzeugt Eingaben mit den erwarteten Ergebnissen der Referenz.
+- write_golden_file(path, case_count, seed): Schreibt die goldenen Testfälle als JSON.
+- check_golden_file(path): Vergleicht die aktuelle Umsetzung mit den goldenen Testfällen.
+
+Beispiel:
+    mismatches = check_golden_file(PDF_TEXT_GOLDEN_FILE)
+    if mismatches:
+        ...
+"""
+import html
+import json
+import os
+import random
+import re
+
+from utils.pdf_generation import ALLOWED_CONTROL_CHARACTERS, clean_email_text, remove_unsupported_chars
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'pdf_text_golden' aktiviert.")
+
+# Datei mit den goldenen Testfällen (im Repository, neben den Benchmarks)
+PDF_TEXT_GOLDEN_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "pdf_text_golden.json")
+
+# Standardwerte für das Erzeugen der Testfälle
+DEFAULT_GOLDEN_CASE_COUNT = 200
+DEFAULT_GOLDEN_SEED = 0
+
+# Bausteine der Eingabetexte; jeder löst mindestens einen Bereinigungsschritt aus
+_TEXT_BUILDING_BLOCKS = [
+    "\r\n", "\r", "\n", " ", "  ", "\t", "\r\n\r\n", "\r\n\r\n \r\n\r\n", "\r\n\r\n \r\n\r\n \r\n\r\n",
+    "\r\n\r\n \r\n\r\n \r\n\r\n  \r\n\r\n", "\r\n\r\n \r\n\r\n \r\n\r\n  \r\n\r\n  \r\n\r\n", " \r\n ", "\n\t\n", "\n \n \n",
+    "&amp;", "&lt;b&gt;", "&nbsp;", "&#13;&#10;", "&quot;Zitat&quot;", "&#x1F60A;",
+    "\x00", "\x07", "\x0b", "\x0c", "\x1b", "\x7f", "\xad", "\u200b", "\u200e", "\u00a0", "\ufeff", "\U000e0001",
+    "Mit freundlichen Grüßen", "Viele Grüße", "Herzliche Grüße", "Beste Grüße", "Mit besten Grüßen", "Mit herzlichen Grüßen",
+    "\U0001f60a", "\U0001f603", "\U0001f614", "\U0001f622", "\U0001f600",
+    "E-Mail: ruediger.zoelch@lgl.bayern.de <mailto:ruediger.zoelch@lgl.bayern.de>",
+    "Hallo Frau Müller,", "Sehr geehrte Damen und Herren,", "anbei das Angebot.", "Straße", "Tel.: +49 89 1234-0", "x", "ÄÖÜäöüß",
+]
+
+# Handverlesene Grenzfälle, immer am Anfang der Testfälle
+_FIXED_GOLDEN_INPUTS = [
+    "",
+    "   ",
+    "Hallo\r\n\r\n\r\n\r\nWelt",
+    "Text\nMit freundlichen Grüßen\nMax",
+    "Text\n\nMit freundlichen Grüßen",
+    "Zeile 1 \t\r\n\t Zeile 2",
+    "\r\n\r\n \r\n\r\n \r\n\r\n  \r\n\r\n  \r\n\r\n \r\n\r\n",
+    "A\x00B\u200bC\xadD\n\x0bE",
+    "&lt;p&gt;Hallo&lt;/p&gt;&#10;&#10;&#10;&#10;Ende",
+    "Gruß \U0001f60a\U0001f603\U0001f614\U0001f622",
+    "E-Mail: ruediger.zoelch@lgl.bayern.de <mailto:ruediger.zoelch@lgl.bayern.de>Nächste Zeile",
+]
+
+
+def clean_email_text_reference(text):
+    """
+    Bisherige Umsetzung von clean_email_text (unverändert, Referenz für die goldenen Testfälle).
+
+    :param text: Der ursprüngliche E-Mail-Text.
+    :return: Der bereinigte E-Mail-Text.
+    """
+
+    # 1. Decode eventuell vorhandene HTML-Entities (falls notwendig)
+    text = html.unescape(text)
+
+    # 2. Tabulator durch Leerzeichen
+    text = text.replace('\t', '    ')
+
+    # 3a. Mehrfache Leerzeilen Fall 1
+    text = re.sub('\r\n\r\n \r\n\r\n \r\n\r\n  \r\n\r\n  \r\n\r\n', '\n\n\n', text)
+
+    # 3b. Mehrfache Leerzeilen Fall 2
+    text = re.sub('\r\n\r\n \r\n\r\n \r\n\r\n  \r\n\r\n', '\n\n', text)
+
+    # 3c. Mehrfache Leerzeilen Fall 3
+    text = re.sub('\r\n\r\n \r\n\r\n \r\n\r\n', '\n\n', text)
+
+    # 3d. Mehrfache Leerzeilen Fall 4
+    text = re.sub('\r\n\r\n \r\n\r\n', '\n\n', text)
+
+    # 3e. Mehrfache Leerzeilen Fall 6
+    text = re.sub('\r\n\r\n', '\n', text)
+
+    # 4. Normalize Windows-style line endings and remove extra spaces around newlines
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    text = re.sub(r'[ \t]+\n', '\n', text)
+    text = re.sub(r'\n[ \t]+', '\n', text)
+
+    # 5. Reduce multiple newlines (with optional spaces in between) to a maximum of two
+    text = re.sub(r'(\n\s*){3,}', '\n\n', text)
+
+    # 6. Remove non-printable characters
+    text = ''.join(c for c in text if c.isprintable() or c in '\n')
+
+    # 7. Ensure at least one blank line before typical German closing phrases
+    closing_phrases = [
+        "Mit freundlichen Grüßen",
+        "Viele Grüße",
+        "Herzliche Grüße",
+        "Beste Grüße",
+        "Mit besten Grüßen",
+        "Mit herzlichen Grüßen"
+    ]
+
+    for phrase in closing_phrases:
+        text = re.sub(rf"(?<!\n)\n({phrase})", r"\n\n\1", text)
+
+    # 8. Spezialfall für eine spezifische E-Mail-Adresse
+    text = re.sub(rf'E-Mail: ruediger.zoelch@lgl.bayern.de <mailto:ruediger.zoelch@lgl.bayern.de>', rf"E-Mail: ruediger.zoelch@lgl.bayern.de <mailto:ruediger.zoelch@lgl.bayern.de>\n", text)
+
+    # 9. Spezielle Zeichen ersetzen, z.B. Emojis
+    text = text.replace("\U0001f60a", ":)")
+    text = text.replace("\U0001f603", ":)")
+    text = text.replace("\U0001f614", ":)")
+    text = text.replace("\U0001f622", ":)")
+
+    return text.strip()
+
+
+def remove_unsupported_chars_reference(text):
+    """
+    Bisherige Umsetzung von remove_unsupported_chars (unverändert, Referenz für die goldenen Testfälle).
+    """
+    return ''.join(
+        c for c in text
+        if c in ALLOWED_CONTROL_CHARACTERS or c.isprintable()
+    )
+
+
+def generate_golden_cases(case_count: int = DEFAULT_GOLDEN_CASE_COUNT, seed: int = DEFAULT_GOLDEN_SEED) -> list[dict]:
+    """
+    Erzeugt Eingabetexte mit den erwarteten Ergebnissen der Referenz-Umsetzung.
+
+    Parameter:
+    case_count (int): Anzahl der zufällig zusammengesetzten Eingaben (zusätzlich zu den handverlesenen Grenzfällen).
+    seed (int): Startwert des Zufallsgenerators (gleicher Wert, gleiche Testfälle).
+
+    Rückgabewert:
+    list[dict]: Je Testfall "input", "clean_email_text" und "remove_unsupported_chars".
+    """
+    random_generator = random.Random(seed)
+    inputs = list(_FIXED_GOLDEN_INPUTS)
+    for _ in range(case_count):
+        inputs.append("".join(random_generator.choice(_TEXT_BUILDING_BLOCKS) for _ in range(random_generator.randint(1, 24))))
+    return [{"input": text,
+             "clean_email_text": clean_email_text_reference(text),
+             "remove_unsupported_chars": remove_unsupported_chars_reference(text)} for text in inputs]
+
+
+def write_golden_file(path: str = PDF_TEXT_GOLDEN_FILE, case_count: int = DEFAULT_GOLDEN_CASE_COUNT, seed: int = DEFAULT_GOLDEN_SEED) -> int:
+    """
+    Schreibt die goldenen Testfälle als JSON (Steuerzeichen als Escape-Sequenzen).
+
+    Parameter:
+    path (str): Zieldatei.
+    case_count (int): Anzahl der zufällig zusammengesetzten Eingaben.
+    seed (int): Startwert des Zufallsgenerators.
+
+    Rückgabewert:
+    int: Anzahl der geschriebenen Testfälle.
+    """
+    golden_cases = generate_golden_cases(case_count, seed)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as golden_file:
+        json.dump({"seed": seed, "cases": golden_cases}, golden_file, ensure_ascii=True, indent=1)
+    app_logger.info(f"{len(golden_cases)} goldene Testfälle geschrieben: '{path}'")
+    return len(golden_cases)
+
+
+def check_golden_file(path: str = PDF_TEXT_GOLDEN_FILE) -> list[str]:
+    """
+    Vergleicht clean_email_text und remove_unsupported_chars mit den erwarteten Ergebnissen der goldenen Testfälle.
+
+    Parameter:
+    path (str): Datei mit den goldenen Testfällen.
+
+    Rückgabewert:
+    list[str]: Beschreibung je Abweichung (leer, wenn alle Ergebnisse übereinstimmen).
+
+    Ausnahmen:
+    OSError, ValueError: Die Datei fehlt oder ist ungültig.
+    """
+    with open(path, "r", encoding="utf-8") as golden_file:
+        golden_cases = json.load(golden_file)["cases"]
+
+    mismatches = []
+    for case_number, golden_case in enumerate(golden_cases, start=1):
+        for function in (clean_email_text, remove_unsupported_chars):
+            result = function(golden_case["input"])
+            if result != golden_case[function.__name__]:
+                mismatches.append(f"Testfall {case_number}, {function.__name__}({golden_case['input']!r}): "
+                                  f"{result!r} statt {golden_case[function.__name__]!r}")
+    app_logger.info(f"{len(golden_cases)} goldene Testfälle geprüft, {len(mismatches)} Abweichungen ('{path}')")
+    return mismatches
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+retry_queue.py
+
+Dieses Modul stellt eine Warteschlange für zurückgestellte Dateioperationen bereit.
+Dateien, die z.B. von Outlook oder einem Virenscanner gesperrt sind, blockieren damit nicht mehr
+die gesamte Verarbeitung. Statt blockierend zu warten, wird die Operation geparkt und später mit
+exponentiell wachsendem Abstand erneut versucht, während alle anderen Dateien weiterverarbeitet werden.
+
+Funktionen und Klassen:
+- DeferredRetryStatus: Enum mit dem Endergebnis einer zurückgestellten Operation.
+- DeferredOperation: Datenklasse mit einer zurückgestellten Operation und ihrem Ergebnis.
+- DeferredRetryQueue: Warteschlange mit exponentiellem Backoff und konfigurierbarer Frist.
+    - park(...): Stellt eine Operation zurück.
+    - run_due(): Führt alle fälligen Operationen einmal aus (nicht blockierend, z.B. am Ende eines Verzeichnisses).
+    - drain(): Wiederholt alle offenen Operationen bis zum Erfolg oder bis zum Ablauf der Frist (am Ende des Laufs).
+
+Verwendung:
+    retry_queue = DeferredRetryQueue(deadline_seconds=60)
+    result = rename_file(old_name, new_name)
+    if result == FileOperationResult.PERMISSION_DENIED:
+        retry_queue.park("rename", old_name, rename_file, old_name, new_name, target=new_name)
+    ...
+    finished_operations = retry_queue.run_due()
+    ...
+    finished_operations += retry_queue.drain()
+"""
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Optional
+
+from utils.file_handling import FileOperationResult
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'retry_queue' aktiviert.")
+
+
+class DeferredRetryStatus(Enum):
+    PENDING = "Pending"
+    SUCCESS = "Success"
+    FAILED = "Failed"
+    GIVEN_UP = "Given up after deadline"
+
+
+@dataclass
+class DeferredOperation:
+    """
+    DeferredOperation
+
+    Diese Datenklasse beschreibt eine zurückgestellte Dateioperation.
+
+    Attribute:
+    - operation_name: Kurzbezeichnung der Operation (z.B. "rename" oder "delete").
+    - path: Die betroffene Datei.
+    - operation: Die aufzurufende Funktion; sie muss ein FileOperationResult zurückgeben.
+    - args, kwargs: Die Argumente für operation.
+    - target: Optionales Ziel der Operation (z.B. neuer Dateiname).
+    - context: Beliebige Zusatzinformationen des Aufrufers (z.B. Versanddatum).
+    - parked_at: Zeitpunkt (time.monotonic), zu dem die Operation zurückgestellt wurde.
+    - next_attempt_at: Zeitpunkt (time.monotonic) des nächsten Versuchs.
+    - attempts: Anzahl der bisherigen Versuche (inklusive des ersten, fehlgeschlagenen Versuchs).
+    - last_result: Das letzte FileOperationResult.
+    - status: Endergebnis als DeferredRetryStatus.
+    """
+    operation_name: str
+    path: str
+    operation: Callable
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    target: Optional[str] = None
+    context: dict = field(default_factory=dict)
+    parked_at: float = 0.0
+    next_attempt_at: float = 0.0
+    attempts: int = 1
+    last_result: FileOperationResult = FileOperationResult.PERMISSION_DENIED
+    status: DeferredRetryStatus = DeferredRetryStatus.PENDING
+
+
+class DeferredRetryQueue:
+    """
+    Warteschlange für Dateioperationen, die wegen einer Sperre (PermissionError) zurückgestellt wurden.
+
+    Jede Operation wird frühestens nach initial_delay_ms erneut versucht. Nach jedem weiteren
+    fehlgeschlagenen Versuch verdoppelt sich der Abstand bis maximal max_delay_ms. Ist seit dem
+    Zurückstellen mehr als deadline_seconds vergangen, wird die Operation aufgegeben und im Log gemeldet.
+
+    Als "erneut versuchen" gilt nur das Ergebnis PERMISSION_DENIED. Jedes andere Ergebnis beendet die
+    Operation (SUCCESS oder FAILED).
+    """
+
+    def __init__(self, deadline_seconds: float = 60.0, initial_delay_ms: int = 200, max_delay_ms: int = 10000,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialisiert eine neue, leere Warteschlange.
+
+        Parameter:
+        deadline_seconds (float): Frist ab dem Zurückstellen, nach der eine Operation aufgegeben wird.
+        initial_delay_ms (int): Wartezeit bis zum ersten erneuten Versuch.
+        max_delay_ms (int): Obergrenze für die exponentiell wachsende Wartezeit.
+        clock, sleep: Zeitquelle und Wartefunktion (austauschbar, z.B. für Tests).
+        """
+        self.deadline_seconds = deadline_seconds
+        self.initial_delay_ms = initial_delay_ms
+        self.max_delay_ms = max_delay_ms
+        self._clock = clock
+        self._sleep = sleep
+        self._pending: list[DeferredOperation] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def park(self, operation_name: str, path: str, operation: Callable, *args, target: Optional[str] = None,
+             context: Optional[dict] = None, **kwargs) -> DeferredOperation:
+        """
+        Stellt eine Operation zurück, deren erster Versuch mit PERMISSION_DENIED fehlgeschlagen ist.
+
+        Rückgabewert:
+        DeferredOperation: Die zurückgestellte Operation.
+        """
+        now = self._clock()
+        deferred_operation = DeferredOperation(
+            operation_name=operation_name,
+            path=path,
+            operation=operation,
+            args=args,
+            kwargs=kwargs,
+            target=target,
+            context=context or {},
+            parked_at=now,
+            next_attempt_at=now + self.initial_delay_ms / 1000,
+        )
+        self._pending.append(deferred_operation)
+        app_logger.info(f"Operation '{operation_name}' für gesperrte Datei zurückgestellt: '{path}'")
+        return deferred_operation
+
+    def run_due(self) -> list[DeferredOperation]:
+        """
+        Führt alle fälligen Operationen genau einmal aus, ohne zu warten.
+
+        Rückgabewert:
+        list[DeferredOperation]: Alle Operationen, die dabei abgeschlossen wurden (erfolgreich, fehlgeschlagen oder aufgegeben).
+        """
+        finished_operations = []
+        now = self._clock()
+        still_pending = []
+
+        for deferred_operation in self._pending:
+            if deferred_operation.next_attempt_at <= now:
+                self._attempt(deferred_operation)
+
+            if deferred_operation.status == DeferredRetryStatus.PENDING:
+                still_pending.append(deferred_operation)
+            else:
+                finished_operations.append(deferred_operation)
+
+        self._pending = still_pending
+        return finished_operations
+
+    def drain(self) -> list[DeferredOperation]:
+        """
+        Wiederholt alle offenen Operationen, bis sie abgeschlossen sind oder ihre Frist abgelaufen ist.
+        Zwischen den Runden wird bis zum nächsten fälligen Versuch gewartet.
+
+        Rückgabewert:
+        list[DeferredOperation]: Alle Operationen, die dabei abgeschlossen wurden.
+        """
+        finished_operations = []
+        if self._pending:
+            app_logger.info(f"{len(self._pending)} zurückgestellte Operation(en) werden erneut versucht.")
+
+        while self._pending:
+            finished_operations += self.run_due()
+            if self._pending:
+                next_attempt_at = min(op.next_attempt_at for op in self._pending)
+                wait_seconds = next_attempt_at - self._clock()
+                if wait_seconds > 0:
+                    self._sleep(wait_seconds)
+
+        return finished_operations
+
+    def _attempt(self, deferred_operation: DeferredOperation):
+        """
+        Führt einen einzelnen Versuch aus und aktualisiert Status und nächsten Versuchszeitpunkt.
+        """
+        try:
+            result = deferred_operation.operation(*deferred_operation.args, **deferred_operation.kwargs)
+        except Exception as e:
+            app_logger.error(f"Fehler bei zurückgestellter Operation '{deferred_operation.operation_name}' für '{deferred_operation.path}': {e}")
+            result = FileOperationResult.UNKNOWN_ERROR
+
+        deferred_operation.attempts += 1
+        deferred_operation.last_result = result
+        now = self._clock()
+
+        if result == FileOperationResult.PERMISSION_DENIED:
+            if now - deferred_operation.parked_at >= self.deadline_seconds:
+                deferred_operation.status = DeferredRetryStatus.GIVEN_UP
+                app_logger.error(f"Operation '{deferred_operation.operation_name}' nach {deferred_operation.attempts} Versuchen "
+                                 f"und {self.deadline_seconds} s aufgegeben, Datei weiterhin gesperrt: '{deferred_operation.path}'")
+            else:
+                # Exponentieller Backoff, begrenzt durch max_delay_ms und die verbleibende Frist
+                delay_ms = min(self.initial_delay_ms * (2 ** (deferred_operation.attempts - 1)), self.max_delay_ms)
+                deadline_at = deferred_operation.parked_at + self.deadline_seconds
+                deferred_operation.next_attempt_at = min(now + delay_ms / 1000, deadline_at)
+                app_logger.debug(f"Operation '{deferred_operation.operation_name}' weiterhin gesperrt, nächster Versuch in {delay_ms} ms: '{deferred_operation.path}'")
+        elif result == FileOperationResult.SUCCESS:
+            deferred_operation.status = DeferredRetryStatus.SUCCESS
+            app_logger.info(f"Zurückgestellte Operation '{deferred_operation.operation_name}' nach {deferred_operation.attempts} Versuchen erfolgreich: '{deferred_operation.path}'")
+        else:
+            deferred_operation.status = DeferredRetryStatus.FAILED
+            app_logger.error(f"Zurückgestellte Operation '{deferred_operation.operation_name}' fehlgeschlagen ({result.value}): '{deferred_operation.path}'")
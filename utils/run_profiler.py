@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+run_profiler.py
+
+Dieses Modul profiliert die Verarbeitung eines Laufs von msg_file_renamer.py (--profile), auch in der ausgelieferten
+msg_file_renamer.exe, an die sich kein Profiler anhängen lässt. Geschrieben werden eine .prof-Datei (pstats-Format, z.B.
+für snakeviz oder "python -m pstats") und eine Textdatei mit den Funktionen mit der größten kumulierten und eigenen Zeit.
+
+Verfahren:
+- cprofile: Deterministisches Profiling mit cProfile. Profiliert werden der Hauptthread und die Stufen der
+  Verarbeitungskette (wrap), jeder Thread mit einem eigenen Profiler; am Ende werden die Ergebnisse zusammengeführt.
+  Ab Python 3.12 kann nur ein cProfile-Profiler gleichzeitig aktiv sein, die Stufen ließen sich neben dem Hauptthread
+  nicht profilieren. start() wechselt daher ab Python 3.12 zu sampling (Warnung im Log).
+- sampling: Ein Hintergrund-Thread liest in festen Abständen die Aufrufstapel aller Threads (sys._current_frames).
+  Die Messung verlangsamt die Verarbeitung kaum; die Zeiten sind Schätzungen aus der Anzahl der Stichproben und
+  enthalten auch Wartezeiten (z.B. auf das Dateisystem oder auf andere Threads).
+
+Prozess-Pools (--workers, --pdf_workers) werden nicht profiliert. Mit max_files wird das Profiling nach den ersten
+N MSG-Dateien beendet und das Ergebnis sofort geschrieben; der Lauf geht ohne Profiling weiter.
+
+Funktionen und Klassen:
+- ProfilerMode: Enum mit dem Verfahren (none, cprofile, sampling).
+- RunProfiler: Das Profiling eines Laufs.
+    - start(): Beginnt das Profiling (ab Python 3.12 immer sampling).
+    - wrap(handler): Profiliert eine Funktion, die in einem anderen Thread läuft (Stufe der Verarbeitungskette).
+    - file_done(): Zählt eine bearbeitete MSG-Datei; beendet das Profiling nach max_files Dateien.
+    - stop(): Beendet das Profiling und schreibt die .prof- und die Textdatei.
+
+Verwendung:
+    run_profiler = RunProfiler("excel_log_file_2025-01-01", ProfilerMode.CPROFILE, max_files=1000)
+    run_profiler.start()
+    for msg_file in msg_files:
+        ...
+        run_profiler.file_done()
+    run_profiler.stop()
+"""
+import cProfile
+import functools
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from enum import Enum
+from typing import Callable, Optional
+
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'run_profiler' aktiviert.")
+
+# Standardwerte für die Anzahl der Funktionen in der Textdatei und den Abstand der Stichproben
+DEFAULT_TOP_FUNCTION_COUNT = 40
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 0.005
+
+# Maximale Tiefe der ausgewerteten Aufrufstapel beim Sampling
+_MAX_STACK_DEPTH = 200
+
+# Maximale Wartezeit in Sekunden auf laufende profilierte Aufrufe beim Beenden
+_STOP_TIMEOUT_SECONDS = 60
+
+# Ab dieser Version ist nur ein cProfile-Profiler je Prozess gleichzeitig aktiv (sys.monitoring)
+_SINGLE_CPROFILE_VERSION = (3, 12)
+
+
+class ProfilerMode(Enum):
+    NONE = "none"
+    CPROFILE = "cprofile"
+    SAMPLING = "sampling"
+
+
+def _code_key(code) -> tuple:
+    """
+    Schlüssel einer Funktion im pstats-Format (Dateiname, Zeilennummer, Funktionsname).
+    """
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+class _StackSampler:
+    """
+    Liest in festen Abständen die Aufrufstapel aller Threads und zählt je Funktion die Stichproben (eigene und kumulierte)
+    sowie die Aufrufer-Beziehungen.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.sample_count = 0
+        self._self_counts: Counter = Counter()
+        self._cumulative_counts: Counter = Counter()
+        self._caller_counts: Counter = Counter()  # (Aufrufer, Funktion) -> Stichproben
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="run_profiler_sampling", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self):
+        own_thread_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval_seconds):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_thread_id:
+                    self._sample(frame)
+            self.sample_count += 1
+
+    def _sample(self, frame):
+        stack = []
+        while frame is not None and len(stack) < _MAX_STACK_DEPTH:
+            stack.append(_code_key(frame.f_code))
+            frame = frame.f_back
+        if not stack:
+            return
+        self._self_counts[stack[0]] += 1
+        # Rekursive Aufrufe nur einmal je Stichprobe zählen
+        self._cumulative_counts.update(set(stack))
+        self._caller_counts.update(set(zip(stack[1:], stack[:-1])))
+
+    def pstats_data(self) -> dict:
+        """
+        Liefert die Stichproben im Format von pstats (marshal-Daten einer .prof-Datei); Zeiten = Stichproben * Abstand.
+        """
+        callers_by_function: dict[tuple, dict] = {}
+        for (caller, function), count in self._caller_counts.items():
+            callers_by_function.setdefault(function, {})[caller] = (count, count, 0.0, count * self.interval_seconds)
+        return {function: (count, count, self._self_counts.get(function, 0) * self.interval_seconds, count * self.interval_seconds,
+                           callers_by_function.get(function, {}))
+                for function, count in self._cumulative_counts.items()}
+
+
+class RunProfiler:
+    """
+    Profiling eines Laufs mit cProfile oder Stichproben der Aufrufstapel, auf Wunsch nur für die ersten max_files Dateien.
+    """
+
+    def __init__(self, output_base_path: str, mode: ProfilerMode = ProfilerMode.CPROFILE, max_files: int = 0,
+                 top_function_count: int = DEFAULT_TOP_FUNCTION_COUNT, sample_interval_seconds: float = DEFAULT_SAMPLE_INTERVAL_SECONDS):
+        """
+        Parameter:
+        output_base_path (str): Pfad und Dateiname ohne Endung; geschrieben werden <output_base_path>.prof und .txt.
+        mode (ProfilerMode): Verfahren (cprofile oder sampling).
+        max_files (int): Nach so vielen MSG-Dateien das Profiling beenden (0 = ganzer Lauf).
+        top_function_count (int): Anzahl der Funktionen je Liste in der Textdatei.
+        sample_interval_seconds (float): Abstand der Stichproben bei mode SAMPLING.
+        """
+        self.profile_path = output_base_path + ".prof"
+        self.summary_path = output_base_path + ".txt"
+        self.mode = mode
+        self.max_files = max(0, max_files)
+        self.top_function_count = top_function_count
+        self.sample_interval_seconds = sample_interval_seconds
+        self.file_count = 0
+        self.is_active = False
+        self.unprofiled_call_count = 0  # Aufrufe in Threads, für die kein Profiler eingeschaltet werden konnte
+        self._main_profile: Optional[cProfile.Profile] = None
+        self._thread_profiles: list[cProfile.Profile] = []
+        self._thread_local = threading.local()
+        self._lock = threading.Condition()
+        self._active_call_count = 0  # Laufende Aufrufe mit eingeschaltetem Thread-Profiler
+        self._sampler: Optional[_StackSampler] = None
+        self._start_time = 0.0
+        self._seconds = 0.0
+
+    def start(self):
+        """
+        Beginnt das Profiling (cProfile im aufrufenden Thread bzw. den Thread für die Stichproben). Ab Python 3.12 wird
+        statt cprofile das Sampling verwendet, da die Stufen neben dem Hauptthread nicht mit cProfile profiliert werden
+        können und die Auswertung sonst nur den Hauptthread enthielte.
+        """
+        if self.mode == ProfilerMode.CPROFILE and sys.version_info >= _SINGLE_CPROFILE_VERSION:
+            app_logger.warning("Profiling: Ab Python 3.12 ist nur ein cProfile-Profiler gleichzeitig möglich, "
+                               "es wird das Verfahren '%s' verwendet.", ProfilerMode.SAMPLING.value)
+            self.mode = ProfilerMode.SAMPLING
+        self._start_time = time.perf_counter()
+        if self.mode == ProfilerMode.SAMPLING:
+            self._sampler = _StackSampler(self.sample_interval_seconds)
+            self._sampler.start()
+        else:
+            self._main_profile = cProfile.Profile()
+            self._main_profile.enable()
+        self.is_active = True
+        app_logger.info("Profiling (%s) gestartet, Ausgabe: '%s'", self.mode.value, self.profile_path)
+
+    def wrap(self, handler: Callable) -> Callable:
+        """
+        Liefert handler mit Profiling im aufrufenden Thread (nur bei cprofile, beim Sampling werden alle Threads erfasst).
+        Wechselt start() später zum Sampling, ruft die Hülle handler ohne Profiler auf.
+
+        Parameter:
+        handler (Callable): Die Funktion, z.B. eine Stufe der Verarbeitungskette.
+
+        Rückgabewert:
+        Callable: handler selbst oder eine profilierende Hülle.
+        """
+        if self.mode != ProfilerMode.CPROFILE:
+            return handler
+
+        @functools.wraps(handler)
+        def profiled_handler(*args, **kwargs):
+            with self._lock:
+                if not self.is_active or self.mode != ProfilerMode.CPROFILE:
+                    thread_profile = None
+                else:
+                    thread_profile = getattr(self._thread_local, "profile", None)
+                    if thread_profile is None:
+                        thread_profile = self._thread_local.profile = cProfile.Profile()
+                        self._thread_profiles.append(thread_profile)
+                    self._active_call_count += 1
+            if thread_profile is None:
+                return handler(*args, **kwargs)
+            try:
+                try:
+                    thread_profile.enable()
+                except ValueError:
+                    # Ein anderer Profiler ist bereits aktiv (z.B. beim Start über "python -m cProfile")
+                    self.unprofiled_call_count += 1
+                    return handler(*args, **kwargs)
+                try:
+                    return handler(*args, **kwargs)
+                finally:
+                    thread_profile.disable()
+            finally:
+                with self._lock:
+                    self._active_call_count -= 1
+                    self._lock.notify_all()
+        return profiled_handler
+
+    def file_done(self) -> bool:
+        """
+        Zählt eine bearbeitete MSG-Datei und beendet das Profiling, wenn max_files erreicht ist.
+
+        Rückgabewert:
+        bool: True, wenn das Profiling mit dieser Datei beendet wurde.
+        """
+        if not self.is_active:
+            return False
+        self.file_count += 1
+        if self.max_files and self.file_count >= self.max_files:
+            self.stop()
+            return True
+        return False
+
+    def stop(self):
+        """
+        Beendet das Profiling und schreibt die .prof-Datei und die Textdatei. Fehler beim Schreiben werden protokolliert.
+        """
+        with self._lock:
+            if not self.is_active:
+                return
+            self.is_active = False
+        self._seconds = time.perf_counter() - self._start_time
+        try:
+            if self._sampler:
+                self._sampler.stop()
+                with open(self.profile_path, "wb") as profile_file:
+                    marshal.dump(self._sampler.pstats_data(), profile_file)
+                statistics = pstats.Stats(self.profile_path)
+            else:
+                self._main_profile.disable()
+                statistics = pstats.Stats(self._main_profile)
+                with self._lock:
+                    # Profile der Threads erst auswerten, wenn keine profilierte Stufe mehr läuft
+                    if self._lock.wait_for(lambda: self._active_call_count == 0, timeout=_STOP_TIMEOUT_SECONDS):
+                        for thread_profile in self._thread_profiles:
+                            statistics.add(thread_profile)
+                    else:
+                        app_logger.warning("Profiling: Stufen laufen noch, es wird nur der Hauptthread ausgewertet.")
+                        self._thread_profiles = []
+                statistics.dump_stats(self.profile_path)
+            with open(self.summary_path, "w", encoding="utf-8") as summary_file:
+                summary_file.write(self._summary_text(statistics))
+        except OSError as e:
+            app_logger.warning("Profil '%s' konnte nicht geschrieben werden: %s", self.profile_path, e)
+            return
+        app_logger.info("Profiling beendet nach %s MSG-Dateien (%.1f s), Ausgabe: '%s', '%s'", self.file_count, self._seconds,
+                        self.profile_path, self.summary_path)
+
+    def _summary_text(self, statistics: pstats.Stats) -> str:
+        """
+        Textdatei: Kopfzeilen und je eine Liste der Funktionen nach kumulierter und nach eigener Zeit.
+        """
+        text = io.StringIO()
+        text.write(f"Profiling ({self.mode.value}) von {self.file_count} MSG-Dateien in {self._seconds:.1f} s\n")
+        if self._sampler:
+            text.write(f"Stichproben: {self._sampler.sample_count} im Abstand von {self.sample_interval_seconds * 1000:.0f} ms "
+                       f"(Zeiten geschätzt, inkl. Wartezeiten; ncalls = Anzahl der Stichproben)\n")
+        else:
+            text.write(f"Profilierte Threads: 1 + {len(self._thread_profiles)}")
+            if self.unprofiled_call_count:
+                text.write(f", {self.unprofiled_call_count} Aufrufe ohne Profiling (anderer Profiler aktiv)")
+            text.write("\n")
+        text.write("Prozess-Pools (--workers, --pdf_workers) sind nicht enthalten.\n")
+        statistics.stream = text
+        for sort_key, title in (("cumulative", "kumulierter Zeit"), ("tottime", "eigener Zeit")):
+            text.write(f"\n{'=' * 100}\nFunktionen nach {title}\n{'=' * 100}\n")
+            statistics.sort_stats(sort_key).print_stats(self.top_function_count)
+        return text.getvalue()
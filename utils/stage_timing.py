@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+stage_timing.py
+
+Dieses Modul misst die Laufzeiten der Verarbeitungsschritte je MSG-Datei (--performance_timing) und wertet sie für das
+Sheet "Performance" der Excel-Log-Datei aus: Summe und Anteil je Schritt, Mittelwert, Perzentile (Median, p90, p99),
+Durchsatz und die langsamsten Dateien.
+
+Gemessen wird mit time.perf_counter. Die Laufzeiten einer Datei werden in einem dict (Schritt -> Sekunden) gesammelt,
+das mit dem Arbeitsauftrag bzw. dem Ergebnis (auch aus einem Prozess-Pool) weitergereicht wird. Ist die Messung
+ausgeschaltet, ist dieses dict None und timed_stage liefert einen leeren Kontextmanager ohne Zeitmessung.
+
+Funktionen und Klassen:
+- STAGE_*: Namen der gemessenen Schritte.
+- timed_stage(stage_seconds, stage_name): Kontextmanager, der die Laufzeit eines Schritts zu stage_seconds addiert.
+- PerformanceStatistics: Sammelt die Laufzeiten aller Dateien eines Laufs.
+    - timed_iteration(iterable, stage_name): Misst die Wartezeit auf die Elemente eines Iterators (z.B. Verzeichnissuche).
+    - add_file(path_and_file_name, stage_seconds): Übernimmt die Laufzeiten einer Datei.
+    - add_stage(stage_name, seconds): Übernimmt eine Laufzeit ohne Zuordnung zu einer Datei (z.B. aus dem PDF-Pool).
+    - performance_entries(): Einträge für das Sheet "Performance".
+    - summary(): Kurze Zusammenfassung für die Console.
+
+Verwendung:
+    stage_seconds = {}
+    with timed_stage(stage_seconds, STAGE_ACCESS):
+        test_file_access(path)
+    performance_statistics.add_file(path, stage_seconds)
+"""
+import contextlib
+import heapq
+import math
+import time
+from array import array
+from typing import Iterable, Iterator, Optional
+
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'stage_timing' aktiviert.")
+
+# Namen der gemessenen Schritte (in der Reihenfolge der Verarbeitung)
+STAGE_DISCOVERY = "Suche"
+STAGE_ACCESS = "Zugriff"
+STAGE_MSG_READ = "MSG einlesen"
+STAGE_FILENAME = "Dateiname"
+STAGE_RENAME = "Umbenennen"
+STAGE_TIMESTAMPS = "Zeitstempel"
+STAGE_PDF = "PDF"
+STAGE_CONSOLIDATED_PDF = "Sammel-PDF"
+STAGE_EXCEL_LOG = "Excel-Log"
+STAGE_ORDER = (STAGE_DISCOVERY, STAGE_ACCESS, STAGE_MSG_READ, STAGE_FILENAME, STAGE_RENAME, STAGE_TIMESTAMPS, STAGE_PDF,
+               STAGE_CONSOLIDATED_PDF, STAGE_EXCEL_LOG)
+
+# Standardwert für die Anzahl der langsamsten Dateien im Sheet "Performance"
+DEFAULT_TOP_FILE_COUNT = 20
+
+# Spalten des Sheets "Performance"
+PERFORMANCE_COLUMNS = ("Bereich", "Name", "Wert", "Anzahl", "Summe (s)", "Anteil (%)", "Mittelwert (ms)", "Median (ms)",
+                       "p90 (ms)", "p99 (ms)", "Maximum (ms)", "Details")
+
+# Leerer Kontextmanager für ausgeschaltete Messung (wiederverwendbar, keine Zeitmessung)
+_NO_TIMING = contextlib.nullcontext()
+
+
+class _StageTimer:
+    __slots__ = ("stage_seconds", "stage_name", "start_time")
+
+    def __init__(self, stage_seconds: dict, stage_name: str):
+        self.stage_seconds = stage_seconds
+        self.stage_name = stage_name
+        self.start_time = 0.0
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stage_seconds[self.stage_name] = self.stage_seconds.get(self.stage_name, 0.0) + time.perf_counter() - self.start_time
+        return False
+
+
+def timed_stage(stage_seconds: Optional[dict], stage_name: str):
+    """
+    Kontextmanager, der die Laufzeit eines Schritts zu stage_seconds[stage_name] addiert.
+
+    Parameter:
+    stage_seconds (dict): Laufzeiten der Datei (Schritt -> Sekunden); None = Messung ausgeschaltet.
+    stage_name (str): Name des Schritts (STAGE_*).
+
+    Rückgabewert:
+    Kontextmanager (bei ausgeschalteter Messung ein leerer Kontextmanager).
+    """
+    if stage_seconds is None:
+        return _NO_TIMING
+    return _StageTimer(stage_seconds, stage_name)
+
+
+def _percentile(sorted_values, percent: float) -> float:
+    """
+    Perzentil nach dem Rangverfahren (nearest rank) einer aufsteigend sortierten Folge.
+    """
+    return sorted_values[max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)]
+
+
+class _FormattedStageSeconds:
+    """
+    Formatiert die Laufzeiten einer Datei erst bei der Ausgabe in die Log-Datei.
+    """
+    __slots__ = ("stage_seconds",)
+
+    def __init__(self, stage_seconds: dict):
+        self.stage_seconds = stage_seconds
+
+    def __str__(self) -> str:
+        return ", ".join(f"{stage_name} {seconds * 1000:.1f} ms" for stage_name, seconds in self.stage_seconds.items())
+
+
+class PerformanceStatistics:
+    """
+    Sammelt die Laufzeiten der Verarbeitungsschritte aller Dateien eines Laufs.
+    Je Schritt werden die Einzelwerte kompakt (array) gespeichert, von den Dateien nur die langsamsten.
+    """
+
+    def __init__(self, top_file_count: int = DEFAULT_TOP_FILE_COUNT):
+        """
+        Parameter:
+        top_file_count (int): Anzahl der langsamsten Dateien im Sheet "Performance".
+        """
+        self.top_file_count = max(0, top_file_count)
+        self.file_count = 0
+        self._start_time = time.perf_counter()
+        self._stage_seconds: dict[str, array] = {}
+        self._file_total_seconds = array("d")
+        self._slowest_files: list[tuple] = []  # Min-Heap (Summe, laufende Nummer, Datei, Laufzeiten)
+
+    def timed_iteration(self, iterable: Iterable, stage_name: str) -> Iterator:
+        """
+        Reicht die Elemente unverändert weiter und misst je Element die Wartezeit auf next() als Schritt stage_name.
+
+        Parameter:
+        iterable (Iterable): Die Elemente (z.B. die gefundenen Verzeichnisse).
+        stage_name (str): Name des Schritts.
+
+        Rückgabewert:
+        Iterator: Dieselben Elemente in derselben Reihenfolge.
+        """
+        iterator = iter(iterable)
+        while True:
+            start_time = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.add_stage(stage_name, time.perf_counter() - start_time)
+            yield item
+
+    def add_file(self, path_and_file_name: str, stage_seconds: dict):
+        """
+        Übernimmt die Laufzeiten einer Datei und schreibt sie in die Log-Datei.
+
+        Parameter:
+        path_and_file_name (str): Absoluter Dateiname der MSG-Datei.
+        stage_seconds (dict): Laufzeiten der Datei (Schritt -> Sekunden).
+        """
+        self.file_count += 1
+        for stage_name, seconds in stage_seconds.items():
+            self.add_stage(stage_name, seconds)
+        total_seconds = sum(stage_seconds.values())
+        self._file_total_seconds.append(total_seconds)
+        app_logger.info("Laufzeiten '%s': %s", path_and_file_name, _FormattedStageSeconds(stage_seconds))
+
+        if self.top_file_count:
+            slow_file = (total_seconds, self.file_count, path_and_file_name, stage_seconds)
+            if len(self._slowest_files) < self.top_file_count:
+                heapq.heappush(self._slowest_files, slow_file)
+            elif total_seconds > self._slowest_files[0][0]:
+                heapq.heapreplace(self._slowest_files, slow_file)
+
+    def add_stage(self, stage_name: str, seconds: float):
+        """
+        Übernimmt eine Laufzeit eines Schritts.
+
+        Parameter:
+        stage_name (str): Name des Schritts.
+        seconds (float): Laufzeit in Sekunden.
+        """
+        stage_values = self._stage_seconds.get(stage_name)
+        if stage_values is None:
+            stage_values = self._stage_seconds[stage_name] = array("d")
+        stage_values.append(seconds)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """
+        Laufzeit seit dem Anlegen der Statistik in Sekunden.
+        """
+        return time.perf_counter() - self._start_time
+
+    def performance_entries(self) -> list[dict]:
+        """
+        Liefert die Einträge für das Sheet "Performance": Durchsatz, Statistik je Schritt und die langsamsten Dateien.
+
+        Rückgabewert:
+        list[dict]: Einträge mit den Spalten PERFORMANCE_COLUMNS.
+        """
+        elapsed_seconds = self.elapsed_seconds
+        entries = [
+            self._entry("Durchsatz", "Laufzeit (s)", Wert=round(elapsed_seconds, 3)),
+            self._entry("Durchsatz", "MSG-Dateien", Wert=self.file_count),
+            self._entry("Durchsatz", "Dateien pro Sekunde", Wert=round(self.file_count / elapsed_seconds, 2) if elapsed_seconds > 0 else None)
+        ]
+
+        measured_seconds = sum(sum(stage_values) for stage_values in self._stage_seconds.values())
+        for stage_name in self._ordered_stage_names():
+            entries.append(self._statistics_entry("Schritt", stage_name, self._stage_seconds[stage_name], measured_seconds))
+        if self._file_total_seconds:
+            entries.append(self._statistics_entry("Schritt", "Gesamt je MSG-Datei", self._file_total_seconds, None))
+
+        for total_seconds, _, path_and_file_name, stage_seconds in sorted(self._slowest_files, reverse=True):
+            entries.append(self._entry("Langsamste Dateien", path_and_file_name, **{"Summe (s)": round(total_seconds, 4),
+                                                                                    "Details": str(_FormattedStageSeconds(stage_seconds))}))
+        return entries
+
+    def summary(self) -> str:
+        """
+        Liefert eine kurze Zusammenfassung (Durchsatz und Zeitanteile der Schritte) für die Console.
+        """
+        elapsed_seconds = self.elapsed_seconds
+        measured_seconds = sum(sum(stage_values) for stage_values in self._stage_seconds.values())
+        stage_shares = ", ".join(f"{stage_name} {sum(self._stage_seconds[stage_name]) / measured_seconds * 100:.0f}%"
+                                 for stage_name in self._ordered_stage_names()) if measured_seconds > 0 else ""
+        files_per_second = self.file_count / elapsed_seconds if elapsed_seconds > 0 else 0.0
+        return f"{self.file_count} MSG-Dateien in {elapsed_seconds:.1f} s ({files_per_second:.1f} Dateien/s); Zeitanteile: {stage_shares}"
+
+    def _ordered_stage_names(self) -> list[str]:
+        return [stage_name for stage_name in STAGE_ORDER if stage_name in self._stage_seconds] + \
+               [stage_name for stage_name in self._stage_seconds if stage_name not in STAGE_ORDER]
+
+    @staticmethod
+    def _entry(area: str, name: str, **values) -> dict:
+        entry = dict.fromkeys(PERFORMANCE_COLUMNS)
+        entry.update(values, Bereich=area, Name=name)
+        return entry
+
+    def _statistics_entry(self, area: str, name: str, values: array, measured_seconds: Optional[float]) -> dict:
+        sorted_values = sorted(values)
+        total_seconds = sum(sorted_values)
+        return self._entry(area, name, **{
+            "Anzahl": len(sorted_values),
+            "Summe (s)": round(total_seconds, 4),
+            "Anteil (%)": round(total_seconds / measured_seconds * 100, 1) if measured_seconds else None,
+            "Mittelwert (ms)": round(total_seconds / len(sorted_values) * 1000, 2),
+            "Median (ms)": round(_percentile(sorted_values, 50) * 1000, 2),
+            "p90 (ms)": round(_percentile(sorted_values, 90) * 1000, 2),
+            "p99 (ms)": round(_percentile(sorted_values, 99) * 1000, 2),
+            "Maximum (ms)": round(sorted_values[-1] * 1000, 2)
+        })
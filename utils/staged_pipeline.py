@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+staged_pipeline.py
+
+Dieses Modul stellt eine Verarbeitungskette (Pipeline) aus Stufen bereit, die über asyncio gesteuert wird.
+
+Jede Stufe erhält ihre Aufträge über eine begrenzte Warteschlange und führt die blockierende Arbeit in einem Executor
+aus (Thread- oder Prozess-Pool), mit einer eigenen Obergrenze für gleichzeitig laufende Aufträge. Dadurch arbeiten alle
+Stufen gleichzeitig an verschiedenen Aufträgen: Den Durchsatz bestimmt die langsamste Stufe, nicht die Summe aller Stufen.
+
+- Backpressure: Höchstens max_in_flight Aufträge sind gleichzeitig in der Pipeline. Holt der Aufrufer keine Ergebnisse
+  ab, werden keine neuen Aufträge angenommen; der Speicherbedarf bleibt begrenzt.
+- Reihenfolge: Die Ergebnisse werden in der Reihenfolge der Aufträge geliefert. Stufen mit ordered=True beginnen die
+  Aufträge in dieser Reihenfolge (z.B. für Operationen, deren Ergebnis von vorherigen Aufträgen abhängt).
+- Die Ereignisschleife läuft in einem eigenen Thread; der Aufrufer verwendet die Pipeline wie einen normalen Iterator.
+
+Funktionen und Klassen:
+- PipelineStage: Datenklasse mit der Beschreibung einer Stufe.
+- PipelineStageStatistics: Datenklasse mit der Statistik einer Stufe.
+- StagedPipeline: Die Pipeline.
+    - process(items): Führt die Aufträge durch alle Stufen und liefert sie in der ursprünglichen Reihenfolge.
+    - close(): Beendet Ereignisschleife und Executoren.
+
+Verwendung:
+    pipeline = StagedPipeline([
+        PipelineStage("lesen", read_handler, concurrency=8),
+        PipelineStage("schreiben", write_handler, concurrency=4, ordered=True),
+    ], max_in_flight=64)
+    for item in pipeline.process(items):
+        ...
+    pipeline.close()
+"""
+import asyncio
+import functools
+import heapq
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from logger import initialize_logger
+
+# In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
+app_logger = initialize_logger(__name__)
+app_logger.debug("Debug-Logging im Modul 'staged_pipeline' aktiviert.")
+
+# Standardwert für die maximale Anzahl gleichzeitiger Aufträge in der Pipeline
+DEFAULT_MAX_IN_FLIGHT = 64
+
+# Kennungen der Einträge in der Ausgabe-Warteschlange
+_ITEM = "item"
+_ERROR = "error"
+_END = "end"
+
+
+@dataclass
+class PipelineStage:
+    """
+    PipelineStage
+
+    Diese Datenklasse beschreibt eine Stufe der Pipeline.
+
+    Attribute:
+    - name: Name der Stufe (für Statistik und Log).
+    - handler: Funktion handler(item) -> item, die im Executor ausgeführt wird. Bei einem Prozess-Pool müssen handler
+      und item pickle-fähig sein; weitergereicht wird der Rückgabewert.
+    - concurrency: Maximale Anzahl gleichzeitig laufender Aufträge der Stufe.
+    - executor: Executor für handler (Standard: eigener Thread-Pool mit concurrency Threads).
+    - submit: Eigene Übergabe submit(fn, item) -> concurrent.futures.Future statt executor (z.B. KeyedThreadPoolExecutor).
+    - ordered: Aufträge in der Reihenfolge der Pipeline beginnen.
+    - skip: Funktion skip(item) -> bool; Aufträge, für die die Stufe nichts zu tun hat, werden direkt weitergereicht.
+    """
+    name: str
+    handler: Callable[[Any], Any]
+    concurrency: int = 1
+    executor: Optional[Executor] = None
+    submit: Optional[Callable[[Callable, Any], Future]] = None
+    ordered: bool = False
+    skip: Optional[Callable[[Any], bool]] = None
+
+
+@dataclass
+class PipelineStageStatistics:
+    """
+    PipelineStageStatistics
+
+    Diese Datenklasse enthält die Statistik einer Stufe über alle Aufrufe von process().
+
+    Attribute:
+    - name: Name der Stufe.
+    - processed_count: Anzahl der bearbeiteten Aufträge (ohne übersprungene).
+    - skipped_count: Anzahl der direkt weitergereichten Aufträge.
+    - busy_seconds: Summe der Bearbeitungszeiten im Executor.
+    - max_queue_length: Größte beobachtete Länge der Eingangs-Warteschlange.
+    """
+    name: str
+    processed_count: int = 0
+    skipped_count: int = 0
+    busy_seconds: float = 0.0
+    max_queue_length: int = 0
+
+
+def _run_timed(handler: Callable[[Any], Any], item: Any) -> tuple:
+    """
+    Führt handler(item) aus und misst die Bearbeitungszeit (läuft im Executor, ggf. in einem anderen Prozess).
+    """
+    start_time = time.perf_counter()
+    result = handler(item)
+    return result, time.perf_counter() - start_time
+
+
+class StagedPipeline:
+    """
+    Verarbeitungskette aus Stufen mit begrenzten Warteschlangen, gesteuert über asyncio in einem eigenen Thread.
+    """
+
+    def __init__(self, stages: list[PipelineStage], max_in_flight: int = DEFAULT_MAX_IN_FLIGHT):
+        """
+        Parameter:
+        stages (list[PipelineStage]): Die Stufen in der Reihenfolge der Bearbeitung.
+        max_in_flight (int): Maximale Anzahl gleichzeitiger Aufträge in der Pipeline (Backpressure).
+        """
+        self.stages = stages
+        self.max_in_flight = max(1, max_in_flight)
+        self.statistics = [PipelineStageStatistics(stage.name) for stage in stages]
+
+        # Eigene Thread-Pools für Stufen ohne Executor
+        self._own_executors = {}
+        for stage in stages:
+            if stage.executor is None and stage.submit is None:
+                self._own_executors[stage.name] = ThreadPoolExecutor(max_workers=max(1, stage.concurrency), thread_name_prefix=f"pipeline_{stage.name}")
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="staged_pipeline", daemon=True)
+        self._thread.start()
+        app_logger.debug(f"Pipeline gestartet: {[(stage.name, stage.concurrency) for stage in stages]}, max_in_flight={self.max_in_flight}")
+
+    def process(self, items: Iterable) -> Iterator:
+        """
+        Führt die Aufträge durch alle Stufen und liefert sie in der ursprünglichen Reihenfolge.
+        Ein Fehler in einer Stufe bricht die Verarbeitung ab und wird hier erneut ausgelöst.
+
+        Parameter:
+        items (Iterable): Die Aufträge.
+
+        Rückgabewert:
+        Iterator: Die bearbeiteten Aufträge (Rückgabewerte der letzten Stufe) in der Reihenfolge von items.
+        """
+        output_queue = queue.Queue()  # Unbegrenzt; die Anzahl der Einträge ist durch das Fenster begrenzt
+        window = asyncio.Semaphore(self.max_in_flight)
+        run_future = asyncio.run_coroutine_threadsafe(self._run(iter(items), window, output_queue), self._loop)
+        try:
+            while True:
+                kind, value = output_queue.get()
+                if kind == _END:
+                    break
+                if kind == _ERROR:
+                    raise value
+                yield value
+                self._loop.call_soon_threadsafe(window.release)  # Platz für den nächsten Auftrag
+        finally:
+            if not run_future.done():
+                run_future.cancel()
+
+    def close(self):
+        """
+        Beendet die Ereignisschleife und die eigenen Thread-Pools der Stufen.
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        for executor in self._own_executors.values():
+            executor.shutdown(wait=True)
+
+    async def _run(self, items: Iterator, window: asyncio.Semaphore, output_queue: queue.Queue):
+        stage_queues = [asyncio.Queue(maxsize=self.max_in_flight) for _ in range(len(self.stages) + 1)]
+        # Ein Fehler wird sofort gemeldet, da der fehlerhafte Auftrag die Ausgabe in Reihenfolge sonst blockieren würde
+        report_error = lambda error: output_queue.put((_ERROR, error))
+        tasks = [asyncio.create_task(self._run_stage(stage, statistics, stage_queues[index], stage_queues[index + 1], report_error))
+                 for index, (stage, statistics) in enumerate(zip(self.stages, self.statistics))]
+        tasks.append(asyncio.create_task(self._run_sink(stage_queues[-1], output_queue)))
+        try:
+            for sequence_number, item in enumerate(items):
+                await window.acquire()  # Backpressure: warten, bis der Aufrufer Ergebnisse abgeholt hat
+                await stage_queues[0].put((sequence_number, item))
+            await stage_queues[0].put(None)  # Ende der Aufträge
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            report_error(e)
+        finally:
+            for task in tasks:
+                task.cancel()
+        output_queue.put((_END, None))
+
+    async def _run_stage(self, stage: PipelineStage, statistics: PipelineStageStatistics, input_queue: asyncio.Queue, output_queue: asyncio.Queue,
+                         report_error: Callable[[Exception], None]):
+        loop = asyncio.get_running_loop()
+        concurrency = asyncio.Semaphore(max(1, stage.concurrency))
+        running_tasks = set()
+        pending_items = []  # Heap für die Reihenfolge bei ordered=True
+        next_sequence_number = 0
+
+        async def run_item(sequence_number, item):
+            try:
+                if stage.submit is not None:
+                    result, busy_seconds = await asyncio.wrap_future(stage.submit(functools.partial(_run_timed, stage.handler), item))
+                else:
+                    executor = stage.executor or self._own_executors[stage.name]
+                    result, busy_seconds = await loop.run_in_executor(executor, _run_timed, stage.handler, item)
+            except Exception as e:
+                app_logger.error(f"Fehler in der Pipeline-Stufe '{stage.name}': {e}")
+                report_error(e)
+                return
+            finally:
+                concurrency.release()
+            statistics.processed_count += 1
+            statistics.busy_seconds += busy_seconds
+            await output_queue.put((sequence_number, result))
+
+        async def dispatch(sequence_number, item):
+            if stage.skip is not None and stage.skip(item):
+                statistics.skipped_count += 1
+                await output_queue.put((sequence_number, item))
+                return
+            await concurrency.acquire()
+            task = asyncio.create_task(run_item(sequence_number, item))
+            running_tasks.add(task)
+            task.add_done_callback(running_tasks.discard)
+
+        while True:
+            statistics.max_queue_length = max(statistics.max_queue_length, input_queue.qsize())
+            entry = await input_queue.get()
+            if entry is None:
+                break
+            if not stage.ordered:
+                await dispatch(*entry)
+                continue
+            heapq.heappush(pending_items, entry)
+            while pending_items and pending_items[0][0] == next_sequence_number:
+                await dispatch(*heapq.heappop(pending_items))
+                next_sequence_number += 1
+
+        # Auf laufende Aufträge warten und das Ende weiterreichen
+        await asyncio.gather(*running_tasks)
+        await output_queue.put(None)
+
+    async def _run_sink(self, input_queue: asyncio.Queue, output_queue: queue.Queue):
+        pending_items = []
+        next_sequence_number = 0
+        while True:
+            entry = await input_queue.get()
+            if entry is None:
+                break
+            heapq.heappush(pending_items, entry)
+            while pending_items and pending_items[0][0] == next_sequence_number:
+                output_queue.put((_ITEM, heapq.heappop(pending_items)[1]))
+                next_sequence_number += 1
@@ -7,18 +7,21 @@ aus einem Quellverzeichnis. Diese Funktionalität ist nützlich für automatisie
 Umgebung erforderlich ist.
 
 Funktionen:
-- prepare_test_directory(source_dir, target_dir): Erstellt das Zielverzeichnis, löscht dessen Inhalt und kopiert Dateien aus dem Quellverzeichnis.
+- prepare_test_directory(source_dir, target_dir, copy_mode, max_workers): Erstellt das Zielverzeichnis, löscht dessen Inhalt und kopiert Dateien aus dem Quellverzeichnis.
+
+Das Löschen und Kopieren erfolgt parallel über das Modul utils.fast_copy (Thread-Pool, optional Reflinks
+oder Hardlink-Snapshot), damit auch sehr große Testdatenbestände in kurzer Zeit zurückgesetzt werden können.
 """
 
 import os
-from utils.file_handling import delete_directory_contents, copy_directory_contents
+from utils.fast_copy import CopyMode, DEFAULT_COPY_WORKERS, parallel_copy_directory_contents, parallel_delete_directory_contents
 from logger import initialize_logger
 
 # In der Log-Datei wird als Quelle der Modulname "__main__" verwendet
 app_logger = initialize_logger(__name__)
 app_logger.debug("Debug-Logging im Modul 'msg_to_pdf' aktiviert.")
 
-def prepare_test_directory(source_dir, target_dir):
+def prepare_test_directory(source_dir, target_dir, copy_mode: CopyMode = CopyMode.COPY, max_workers: int = DEFAULT_COPY_WORKERS):
     """
     Bereitet das Zielverzeichnis für Tests vor, indem es erstellt, den Inhalt löscht und die Dateien aus dem Quellverzeichnis kopiert.
 
@@ -30,6 +33,8 @@ def prepare_test_directory(source_dir, target_dir):
     Parameter:
     source_dir (str): Der Pfad zum Quellverzeichnis, aus dem die Dateien kopiert werden.
     target_dir (str): Der Pfad zum Zielverzeichnis, das vorbereitet werden soll.
+    copy_mode (CopyMode): Kopierverfahren: COPY (Standard), REFLINK oder HARDLINK (siehe utils.fast_copy).
+    max_workers (int): Anzahl paralleler Threads für Löschen und Kopieren.
 
     Rückgabewert:
     bool: True, wenn die Operation erfolgreich war, andernfalls False.
@@ -46,11 +51,16 @@ def prepare_test_directory(source_dir, target_dir):
 
         # Löschen des Inhalts des Zielverzeichnisses
         print(f"\tLösche Inhalt von: {target_dir}")
-        delete_directory_contents(target_dir)
+        delete_statistics = parallel_delete_directory_contents(target_dir, max_workers=max_workers)
+        app_logger.info(f"Gelöscht: {delete_statistics.file_count} Datei(en), {delete_statistics.directory_count} Verzeichnis(se), "
+                        f"{delete_statistics.link_count} Link(s)")
 
         # Kopieren des Quellverzeichnisses in das Zielverzeichnis
-        print(f"\tKopiere Inhalt von: {source_dir} nach: {target_dir}")
-        copy_directory_contents(source_dir, target_dir)
+        print(f"\tKopiere Inhalt von: {source_dir} nach: {target_dir} (Verfahren: {copy_mode.value})")
+        copy_statistics = parallel_copy_directory_contents(source_dir, target_dir, copy_mode=copy_mode, max_workers=max_workers)
+        app_logger.info(f"Kopiert: {copy_statistics.file_count} Datei(en) mit {copy_statistics.byte_count} Bytes "
+                        f"(Kopie: {copy_statistics.copied_count}, Reflink: {copy_statistics.reflinked_count}, Hardlink: {copy_statistics.hardlinked_count}, "
+                        f"Links: {copy_statistics.link_count})")
 
         return True  # Operation war erfolgreich
     except Exception as e: